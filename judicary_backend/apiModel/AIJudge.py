@@ -11,6 +11,7 @@ import numpy as np
 from sentence_transformers import SentenceTransformer
 from tqdm import tqdm
 from transformers import AutoModelForSeq2SeqLM, AutoTokenizer
+from services.embedding_store import get_embedding_store
 
 class AIJudge:
     def __init__(self):
@@ -147,39 +148,13 @@ class AIJudge:
     def compare_embeddings_with_files(self,input_text):
         # Compute embedding for input text
         input_embedding = self._compute_embedding(input_text)
-        directory_path = self.drt_path
-        
-        # List to store file names and their scores
-        file_scores = []
 
-        device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        # One matrix-vector product over the embedding store (the JSON files
+        # of CASE_EMBEDDINGS_DIR are imported into it on first use)
+        file_scores = get_embedding_store().search(input_embedding, 8)
 
-        # Assuming input_embedding and file_embeddings are on GPU
-        input_embedding = torch.tensor(input_embedding, dtype=torch.float32, device=device)
-
-        files = [f for f in os.listdir(directory_path) if f.endswith('.json')]
-        file_scores = []
-
-        for filename in tqdm(files, desc="Comparing embeddings", unit="file"):
-            file_path = os.path.join(directory_path, filename)
-            try:
-                with open(file_path, 'r', encoding='utf-8') as file:
-                    json_data = json.load(file)
-                    file_embedding = json_data.get('embedding')  # Assuming the key for embedding is 'embedding'
-                    if file_embedding is not None:
-                        # Calculate cosine similarity between input embedding and file embedding
-                        file_embedding = torch.tensor(file_embedding, dtype=torch.float32, device=device)
-                        score = torch.dot(input_embedding, file_embedding) / (torch.norm(input_embedding) * torch.norm(file_embedding))
-                        score = score.item()  # Convert tensor to scalar
-                        file_scores.append((filename, score))
-            except FileNotFoundError:
-                print(f"Error: File not found: {file_path}")
-
-        # Sort files based on scores
-        file_scores.sort(key=lambda x: x[1], reverse=True)
-        
-        # Return top 10 files with scores
-        return self._extract_file_names(file_scores[:8])
+        # Return top 8 files
+        return self._extract_file_names(file_scores)
 
     def _if_legal(self,prompt):
         legal = '''“I've purchased a residential plot from a developer, but upon inspection, I discovered that the plot's dimensions are significantly smaller than what was advertised. What's the usual course of action for buyers facing misrepresentation of property dimensions ” “My renter didn’t pay the rent for last 4 months. What legal actions can I take against him?”
@@ -10,6 +10,7 @@ import os
 import json
 from tqdm import tqdm
 from sentence_transformers import SentenceTransformer
+from services.embedding_store import get_embedding_store
 
 class DLLM:
     def __init__(self):
@@ -269,6 +270,11 @@ class DLLM:
         # Check if processed text is not empty
         embedding = model.encode(processed_text, convert_to_tensor=True).tolist()
         print("Embedding generated successfully")
+
+        # Searches read the contiguous store; the JSON file is kept as a backup
+        store = get_embedding_store()
+        if filename.split('.')[0] not in store:
+            store.add(filename.split('.')[0], embedding)
         
         # Determine output filename
         output_filename = filename.split('.')[0] + '_embedding.json'
@@ -279,7 +285,7 @@ class DLLM:
         if not os.path.exists(output_file):
             # Save embeddings and filename in JSON format in the output directory
             with open(output_file, 'w') as json_file:
-                json.dump({"filename": filename.split('.')[0]+'.txt', "embedding": embedding}, json_file, indent=4)
+                json.dump({"filename": filename.split('.')[0]+'.txt', "embedding": embedding}, json_file)
             print(f"Embedding for {filename} saved successfully.")
         else:
             print(f"Embedding for {filename} already exists.")
@@ -8,6 +8,7 @@ user authentication, search, and analytics.
 import logging
 import os
 import sys
+import threading
 
 # Ensure the backend package directory is on sys.path
 _backend_dir = os.path.dirname(os.path.abspath(__file__))
@@ -32,6 +33,37 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def _warm_search_structures():
+    """Load the search, filter, autocomplete, spelling and similarity indexes for this worker."""
+    from services import index_sync
+    from services.autocomplete import get_autocomplete_index
+    from services.case_number import backfill_keys
+    from services.filter_index import get_filter_index
+    from services.near_duplicates import get_near_duplicate_index
+    from services.party_names import backfill_party_keys
+    from services.search_index import get_search_index
+    from services.similarity_index import get_similarity_index
+    from services.spelling import get_speller
+
+    try:
+        stats = backfill_keys()
+        if stats["updated"] or stats["duplicates"]:
+            logger.info("Case number keys backfilled: %s", stats)
+        stats = backfill_party_keys()
+        if stats["updated"]:
+            logger.info("Party keys backfilled: %s", stats)
+        get_search_index()
+        get_filter_index()
+        get_autocomplete_index()
+        get_speller()
+        get_similarity_index()
+        get_near_duplicate_index()
+    except Exception as exc:
+        logger.error("Search index warm-up failed: %s", exc)
+    # Catch up with other workers' writes in the background from now on
+    index_sync.start(get_config().SEARCH_INDEX_REFRESH_SECONDS)
+
+
 def create_app():
     """Application factory."""
     app = Flask(__name__)
@@ -86,6 +118,10 @@ def create_app():
         sched.start()
         logger.info("Scraper scheduler started")
 
+        # Build the in-memory search structures in the background so the
+        # first keystroke on /search/suggest does not pay for the load.
+        threading.Thread(target=_warm_search_structures, daemon=True).start()
+
     # Health check
     @app.route("/api/health", methods=["GET"])
     def health():
@@ -0,0 +1,103 @@
+"""
+Benchmark – IVF-flat ANN recall and latency vs exact search
+=============================================================
+Generates clustered unit vectors (topic centres plus Gaussian noise, a
+rough stand-in for sentence embeddings of judgments), builds
+``services.ann_index.IVFFlatIndex`` over them, and answers held-out
+queries two ways:
+
+* exact – one matrix-vector product over every vector and ``argpartition``
+  (what ``VectorIndex`` / ``EmbeddingStore`` do below ``ANN_MIN_ROWS``);
+* ivf – the ANN index at several ``nprobe`` settings.
+
+Reports build (k-means training) time, incremental insert cost, and per
+setting the mean / p95 latency and recall@k against the exact top k.
+
+Usage (from judicary_backend/):
+    python benchmarks/bench_ann.py [--docs 100000] [--dim 384] [--k 10]
+        [--nprobe 1 4 8 16 32 64] [--noise 1.5]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.ann_index import IVFFlatIndex  # noqa: E402
+
+
+def unit(matrix):
+    return (matrix / np.linalg.norm(matrix, axis=1, keepdims=True)).astype(np.float32)
+
+
+def clustered(rng, centres, n, noise):
+    picks = rng.integers(0, len(centres), n)
+    return unit(centres[picks] + rng.standard_normal((n, centres.shape[1])) * noise)
+
+
+def timed(fn, queries):
+    samples, results = [], []
+    for query in queries:
+        started = time.perf_counter()
+        results.append(fn(query))
+        samples.append((time.perf_counter() - started) * 1e3)
+    samples.sort()
+    return results, statistics.mean(samples), samples[int(len(samples) * 0.95)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--docs", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--topics", type=int, default=1000)
+    parser.add_argument("--noise", type=float, default=1.5,
+                        help="noise per dimension relative to unit-variance topic centres")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32, 64])
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    centres = rng.standard_normal((args.topics, args.dim))
+    vectors = clustered(rng, centres, args.docs, args.noise)
+    queries = clustered(rng, centres, args.queries, args.noise)
+
+    index = IVFFlatIndex(args.dim)
+    started = time.perf_counter()
+    index.add(np.arange(args.docs), vectors)
+    index.train()
+    print(f"{args.docs} x {args.dim}: trained {len(index.lists)} lists in "
+          f"{time.perf_counter() - started:.1f}s")
+
+    extra = clustered(rng, centres, 1000, args.noise)
+    started = time.perf_counter()
+    for i, vector in enumerate(extra):
+        index.add([args.docs + i], [vector])
+    print(f"Incremental insert: {(time.perf_counter() - started) * 1e6 / len(extra):.0f} us per vector")
+    index.remove(range(args.docs, args.docs + len(extra)))
+
+    def exact(query):
+        scores = vectors @ query
+        top = np.argpartition(-scores, args.k - 1)[:args.k]
+        return set(top.tolist())
+
+    truth, mean, p95 = timed(exact, queries)
+    print(f"\n{'path':<12} {'mean ms':>8} {'p95 ms':>8} {'recall@' + str(args.k):>10}")
+    print(f"{'exact':<12} {mean:>8.2f} {p95:>8.2f} {1.0:>10.3f}")
+    for nprobe in args.nprobe:
+        hits, mean, p95 = timed(lambda q: index.search(q, args.k, nprobe), queries)
+        recall = statistics.mean(
+            len(expected & {item for item, _ in found}) / args.k
+            for expected, found in zip(truth, hits)
+        )
+        print(f"{'ivf/' + str(nprobe):<12} {mean:>8.2f} {p95:>8.2f} {recall:>10.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Benchmark – Embedding store vs the per-file JSON scan
+=======================================================
+Writes N random 384-d embeddings as pretty-printed JSON files (the format
+``DLLM.process_files_in_directory`` produces) and finds the 10 nearest
+neighbours of a query two ways:
+
+* json scan – what ``SimilarCasesRetrieval`` / ``compare_embeddings_with_files``
+  did: ``os.listdir``, ``json.load`` every file, one cosine at a time;
+* store – ``services.embedding_store``: one matrix-vector product over the
+  memory-mapped float32 matrix and ``argpartition``.
+
+Reports disk size, one-off import time, latency per path and whether both
+return the same neighbours.
+
+Usage (from judicary_backend/):
+    python benchmarks/bench_embedding_store.py [--sizes 10000 100000] [--queries 20]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.embedding_store import EmbeddingStore  # noqa: E402
+
+DIM = 384
+
+
+def write_json_files(directory, vectors):
+    for i, vector in enumerate(vectors):
+        with open(os.path.join(directory, f"case{i:06d}_embedding.json"), "w") as f:
+            json.dump({"filename": f"case{i:06d}.txt", "embedding": vector.tolist()}, f, indent=4)
+
+
+def json_scan(directory, query, k):
+    scores = []
+    for filename in os.listdir(directory):
+        with open(os.path.join(directory, filename), "r") as f:
+            data = json.load(f)
+        embedding = np.array(data["embedding"])
+        score = np.dot(query, embedding) / (np.linalg.norm(query) * np.linalg.norm(embedding))
+        scores.append((filename, score))
+    scores.sort(key=lambda x: x[1], reverse=True)
+    return [name.split("_embedding.json")[0] for name, _ in scores[:k]]
+
+
+def dir_size(directory):
+    return sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--queries", type=int, default=20)
+    parser.add_argument("--scan-queries", type=int, default=2)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    print(f"{'n':>7} {'json MB':>8} {'store MB':>9} {'import s':>9} "
+          f"{'scan ms':>9} {'store ms':>9} {'same top10':>11}")
+    for n in args.sizes:
+        root = tempfile.mkdtemp()
+        try:
+            json_dir = os.path.join(root, "json")
+            os.makedirs(json_dir)
+            vectors = rng.standard_normal((n, DIM)).astype(np.float32)
+            write_json_files(json_dir, vectors)
+            queries = rng.standard_normal((args.queries, DIM)).astype(np.float32)
+
+            started = time.perf_counter()
+            store = EmbeddingStore(os.path.join(root, "store"))
+            store.import_json_directory(json_dir)
+            imported = time.perf_counter() - started
+
+            scan_ms, scan_hits = [], []
+            for query in queries[:args.scan_queries]:
+                started = time.perf_counter()
+                scan_hits.append(json_scan(json_dir, query, 10))
+                scan_ms.append((time.perf_counter() - started) * 1e3)
+
+            store = EmbeddingStore(store.directory)    # a fresh worker
+            store_ms, store_hits = [], []
+            for query in queries:
+                started = time.perf_counter()
+                store_hits.append([item_id for item_id, _ in store.search(query, 10)])
+                store_ms.append((time.perf_counter() - started) * 1e3)
+
+            same = sum(a == b for a, b in zip(scan_hits, store_hits))
+            print(f"{n:>7} {dir_size(json_dir) / 2**20:>8.0f} "
+                  f"{dir_size(store.directory) / 2**20:>9.1f} {imported:>9.1f} "
+                  f"{statistics.mean(scan_ms):>9.0f} {statistics.mean(store_ms):>9.2f} "
+                  f"{same:>8}/{len(scan_hits)}")
+        finally:
+            shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+Benchmark – Near-duplicate check cost and accuracy vs corpus size
+===================================================================
+Fills ``services.near_duplicates.NearDuplicateIndex`` with synthetic
+judgments (random sentences from a shared legal vocabulary, so unrelated
+cases still share common shingles) and times the ingest check –
+``find`` plus ``add``, what ``BaseScraper.save_case`` does per case – at
+several corpus sizes.  Held-out probes are either edited copies of an
+indexed case (a fraction of words replaced, a header prepended, as the
+homepage / cause-list / article variants differ) or fresh cases.
+
+Reports per-check latency (should stay flat as the corpus grows), recall
+on the copies and false positives on the fresh cases.
+
+Usage (from judicary_backend/):
+    python benchmarks/bench_near_duplicates.py [--sizes 1000 10000 100000]
+        [--words 400] [--edit 0.03]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services.near_duplicates import NearDuplicateIndex, case_signature  # noqa: E402
+
+COURT = "Supreme Court of Pakistan"
+
+
+def make_text(rng, vocabulary, words):
+    return " ".join(vocabulary[rng.zipf(1.3, words) % len(vocabulary)])
+
+
+def edited(rng, vocabulary, text, fraction):
+    words = text.split()
+    for position in rng.choice(len(words), int(len(words) * fraction), replace=False):
+        words[position] = vocabulary[rng.integers(len(vocabulary))]
+    return "Judgment of the Court " + " ".join(words)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--words", type=int, default=400)
+    parser.add_argument("--edit", type=float, default=0.03,
+                        help="fraction of words replaced in a duplicate")
+    parser.add_argument("--probes", type=int, default=300)
+    parser.add_argument("--threshold", type=float, default=0.7)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    vocabulary = np.array([f"w{i}" for i in range(20000)])
+    print(f"{'cases':>7} {'check ms':>9} {'p95 ms':>7} {'recall':>7} {'false pos':>10}")
+    for n in args.sizes:
+        index = NearDuplicateIndex()
+        texts = [make_text(rng, vocabulary, args.words) for _ in range(n)]
+        for i, text in enumerate(texts):
+            index.add(str(i), COURT, case_signature({"summary": text}))
+
+        samples, found, false_positives = [], 0, 0
+        for p in range(args.probes):
+            duplicate = p % 2 == 0
+            if duplicate:
+                source = int(rng.integers(n))
+                text = edited(rng, vocabulary, texts[source], args.edit)
+            else:
+                text = make_text(rng, vocabulary, args.words)
+            started = time.perf_counter()
+            sig = case_signature({"summary": text})
+            match = index.find(COURT, sig, args.threshold)
+            index.add(f"probe{p}", COURT, sig)
+            samples.append((time.perf_counter() - started) * 1e3)
+            index.remove(f"probe{p}")
+            if duplicate:
+                found += match is not None and match[0] == str(source)
+            else:
+                false_positives += match is not None
+        samples.sort()
+        print(f"{n:>7} {statistics.mean(samples):>9.2f} {samples[int(len(samples) * 0.95)]:>7.2f} "
+              f"{found / (args.probes / 2):>7.3f} {false_positives:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Benchmark – Positional phrase / NEAR queries vs the regex scan
+================================================================
+Generates synthetic judgments with planted exact phrases, near misses
+("doubt which was reasonable") and "bail" / "pre-arrest" pairs at varying
+distances, then answers the same phrase and proximity queries two ways:
+
+* regex – what ``full_text__icontains`` / ``$regex`` does today: one
+  case-insensitive pattern matched against every judgment in turn;
+* index – ``services.query_parser`` over the positional postings of
+  ``services.search_index``.
+
+Reports index build time and size of the positional postings, mean query
+latency per path, and how the matched sets compare (the regex for a phrase
+is a literal substring, so it misses matches that differ in punctuation or
+inflection and counts substrings inside longer words).
+
+Usage (from judicary_backend/):
+    python benchmarks/bench_positional.py [--docs 100000] [--words 120] [--seed 7]
+"""
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import query_parser, search_index  # noqa: E402
+
+VOCABULARY = (
+    "court petitioner respondent appeal order judgment learned counsel argued "
+    "evidence witness prosecution accused trial record section act law police "
+    "report statement complainant offence punishment sentence conviction "
+    "acquittal application hearing notice jurisdiction constitution article "
+    "provision finding reasons facts matter question relief remedy decree suit "
+    "property possession tenant landlord contract agreement payment amount "
+    "inquiry investigation custody arrest warrant magistrate session high "
+    "supreme bench impugned allowed dismissed accepted rejected granted"
+).split()
+
+PLANTS = (
+    (0.02, "the guilt was not proved beyond reasonable doubt"),
+    (0.02, "there was a doubt which was reasonable"),
+    (0.01, "bail under Section 497 Cr.P.C. was sought"),
+    (0.01, "as provided in section 497, the Cr.P.C. applies"),
+)
+
+QUERIES = (
+    ('"reasonable doubt"', re.compile(r"reasonable doubt", re.I)),
+    ('"Section 497 Cr.P.C."', re.compile(r"section 497 cr\.p\.c\.", re.I)),
+    ('bail NEAR/5 "pre-arrest"', re.compile(
+        r"\bbail\W+(?:\w+\W+){0,5}pre-arrest\b|\bpre-arrest\W+(?:\w+\W+){0,5}bail\b", re.I
+    )),
+    ('custody NEAR/3 warrant', re.compile(
+        r"\bcustody\W+(?:\w+\W+){0,3}warrant\b|\bwarrant\W+(?:\w+\W+){0,3}custody\b", re.I
+    )),
+)
+
+
+def make_corpus(n_docs, n_words, rng):
+    docs = []
+    for _ in range(n_docs):
+        words = rng.choices(VOCABULARY, k=n_words)
+        for share, phrase in PLANTS:
+            if rng.random() < share:
+                words.insert(rng.randrange(len(words)), phrase)
+        if rng.random() < 0.03:
+            gap = rng.randint(0, 10)
+            at = rng.randrange(len(words))
+            pair = ["pre-arrest"] + rng.choices(VOCABULARY, k=gap) + ["bail"]
+            if rng.random() < 0.5:
+                pair.reverse()
+            words[at:at] = pair
+        docs.append(" ".join(words).capitalize() + ".")
+    return docs
+
+
+def positional_bytes(index) -> int:
+    total = 0
+    for packs in index.doc_positions:
+        for _, starts, blob in packs.values():
+            total += len(blob) + starts.itemsize * len(starts)
+    return total
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--docs", type=int, default=100000)
+    parser.add_argument("--words", type=int, default=120)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    docs = make_corpus(args.docs, args.words, random.Random(args.seed))
+    corpus_mb = sum(len(d.encode()) for d in docs) / 1e6
+
+    index = search_index.SearchIndex()
+    started = time.perf_counter()
+    for i, text in enumerate(docs):
+        index.add(str(i), {"judgment_text": text})
+    build_s = time.perf_counter() - started
+    size_mb = positional_bytes(index) / 1e6
+    print(f"Corpus: {args.docs} judgments, {corpus_mb:.1f} MB; index built in {build_s:.1f}s, "
+          f"positional postings {size_mb:.1f} MB ({size_mb / corpus_mb:.2f}x text)\n")
+
+    print(f"{'query':<28} {'regex ms':>9} {'index ms':>9} {'speedup':>8} "
+          f"{'regex n':>8} {'index n':>8} {'both':>6}")
+    for query, pattern in QUERIES:
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            regex_hits = {str(i) for i, text in enumerate(docs) if pattern.search(text)}
+        regex_ms = (time.perf_counter() - started) * 1000 / args.repeat
+
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            ranked, _ = query_parser.execute(query, index=index)
+        index_ms = (time.perf_counter() - started) * 1000 / args.repeat
+        index_hits = {case_id for case_id, _ in ranked}
+
+        print(f"{query:<28} {regex_ms:>9.1f} {index_ms:>9.2f} {regex_ms / index_ms:>7.0f}x "
+              f"{len(regex_hits):>8} {len(index_hits):>8} {len(regex_hits & index_hits):>6}")
+
+
+if __name__ == "__main__":
+    main()
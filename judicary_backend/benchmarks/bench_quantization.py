@@ -0,0 +1,124 @@
+"""
+Benchmark – Quantized embedding scans: memory, latency and recall
+==================================================================
+Fills an ``EmbeddingStore`` with clustered unit vectors (topic centres plus
+Gaussian noise, as in ``bench_ann.py``) and answers held-out queries with
+each ``EMBEDDING_STORE_CODEC``:
+
+* float32 – the exact scan over the memory-mapped matrix (ground truth);
+* float16 / int8 – the scan over the in-memory codes, with and without the
+  float32 re-rank of the best ``--rerank`` candidates;
+* ivf+codec – the same through an IVF index whose lists hold the codes.
+
+Reports the bytes each worker keeps in memory for scanning (alongside what
+the pretty-printed JSON files cost on disk), mean latency and recall@k
+against the exact top k.
+
+Usage (from judicary_backend/):
+    python benchmarks/bench_quantization.py [--docs 100000] [--dim 384]
+        [--k 10] [--rerank 200] [--nprobe 16]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import quantization  # noqa: E402
+from services.ann_index import AnnIndex  # noqa: E402
+from services.embedding_store import EmbeddingStore  # noqa: E402
+
+
+def unit(matrix):
+    return (matrix / np.linalg.norm(matrix, axis=1, keepdims=True)).astype(np.float32)
+
+
+def clustered(rng, centres, n, noise):
+    picks = rng.integers(0, len(centres), n)
+    return unit(centres[picks] + rng.standard_normal((n, centres.shape[1])) * noise)
+
+
+def run(store, queries, k):
+    samples, results = [], []
+    for query in queries:
+        started = time.perf_counter()
+        results.append({item_id for item_id, _ in store.search(query, k)})
+        samples.append((time.perf_counter() - started) * 1e3)
+    return results, statistics.mean(samples)
+
+
+def wait_for_ann(store):
+    store.ann.ensure(len(store), store._ann_snapshot, store._ann_vector, store._ann_stamp)
+    while store.ann.index is None:
+        time.sleep(0.1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--docs", type=int, default=100000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--topics", type=int, default=1000)
+    parser.add_argument("--noise", type=float, default=1.5)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rerank", type=int, default=200)
+    parser.add_argument("--nprobe", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    centres = rng.standard_normal((args.topics, args.dim))
+    vectors = clustered(rng, centres, args.docs, args.noise)
+    queries = clustered(rng, centres, args.queries, args.noise)
+    ids = [f"case{i:06d}" for i in range(args.docs)]
+    json_bytes = len(json.dumps({"filename": "case000000.txt",
+                                 "embedding": vectors[0].astype(np.float64).tolist()}, indent=4))
+
+    root = tempfile.mkdtemp()
+    try:
+        directory = os.path.join(root, "store")
+        EmbeddingStore(directory).add_many(ids, vectors)
+        truth, _ = run(EmbeddingStore(directory), queries, args.k)
+
+        print(f"{args.docs} x {args.dim}; JSON files ~{json_bytes * args.docs / 2**20:.0f} MB, "
+              f"float32 file {args.docs * args.dim * 4 / 2**20:.0f} MB")
+        print(f"\n{'path':<22} {'memory MB':>10} {'mean ms':>8} {'recall@' + str(args.k):>10}")
+        for codec in quantization.CODECS:
+            if codec != "float32":
+                # The quantized scan alone, to show what the re-rank recovers
+                codes, scales = quantization.encode(vectors, codec)
+                hits = []
+                for query in queries:
+                    scores = quantization.scores(codes, query, scales)
+                    top = np.argpartition(-scores, args.k - 1)[:args.k]
+                    hits.append({ids[row] for row in top.tolist()})
+                recall = statistics.mean(len(a & b) / args.k for a, b in zip(truth, hits))
+                print(f"{codec + ' no re-rank':<22} {'':>10} {'':>8} {recall:>10.3f}")
+
+            store = EmbeddingStore(directory, codec=codec, rerank=args.rerank)
+            hits, mean = run(store, queries, args.k)
+            recall = statistics.mean(len(a & b) / args.k for a, b in zip(truth, hits))
+            label = codec if codec == "float32" else f"{codec} re-rank {args.rerank}"
+            print(f"{label:<22} {store.memory_bytes() / 2**20:>10.1f} {mean:>8.2f} {recall:>10.3f}")
+
+            ann = AnnIndex(None, "ivf", 0, nprobe=args.nprobe, codec=codec)
+            store = EmbeddingStore(directory, ann, codec, args.rerank)
+            wait_for_ann(store)
+            hits, mean = run(store, queries, args.k)
+            recall = statistics.mean(len(a & b) / args.k for a, b in zip(truth, hits))
+            print(f"{'ivf/' + str(args.nprobe) + ' ' + codec:<22} "
+                  f"{store.memory_bytes() / 2**20:>10.1f} {mean:>8.2f} {recall:>10.3f}")
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Benchmark – /ai/similar TF-IDF: per-request vectors vs the CSR index
+======================================================================
+Generates synthetic cases (topic words mixed with shared legal
+boilerplate) and finds the cases most similar to random targets two ways:
+
+* request – ``similarity_service.find_similar_cases`` over 400 candidates,
+  re-tokenizing them and rebuilding IDF and dict vectors per request (what
+  the route did before);
+* index – ``services.similarity_index`` over the whole corpus: one sparse
+  matrix-vector product and a partial sort.
+
+Reports build time, matrix size, incremental add and IDF refresh cost,
+mean latency per path, and how often each path's top hit shares the
+target's topic.
+
+Usage (from judicary_backend/):
+    python benchmarks/bench_similarity.py [--docs 50000] [--queries 50] [--seed 7]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import similarity_index, similarity_service  # noqa: E402
+
+BOILERPLATE = (
+    "court petitioner respondent appeal order judgment learned counsel argued "
+    "record hearing notice matter question relief allowed dismissed impugned"
+).split()
+
+TOPICS = {
+    "bail": "bail arrest surety bond custody accused release absconded",
+    "rent": "landlord tenant ejectment rent default premises lease",
+    "tax": "income assessment taxpayer commissioner refund levy",
+    "family": "khula maintenance dower custody minor guardian marriage",
+    "service": "employee pension promotion seniority dismissal inquiry",
+    "land": "mutation revenue khasra possession inheritance partition",
+}
+
+# Party names, places and other words specific to a few cases
+RARE_WORDS = 20000
+
+
+def make_cases(n, rng):
+    cases = []
+    for i in range(n):
+        topic = rng.choice(list(TOPICS))
+        words = (rng.choices(TOPICS[topic].split(), k=12) + rng.choices(BOILERPLATE, k=30)
+                 + [f"name{rng.randrange(RARE_WORDS)}" for _ in range(6)])
+        rng.shuffle(words)
+        cases.append({
+            "id": f"c{i}", "topic": topic,
+            "title": f"{topic} case {i}", "summary": " ".join(words),
+            "case_type": "", "cited_statutes": [], "categories": [],
+        })
+    return cases
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--docs", type=int, default=50000)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    cases = make_cases(args.docs, rng)
+    by_id = {c["id"]: c for c in cases}
+
+    index = similarity_index.SimilarityIndex()
+    started = time.perf_counter()
+    for case in cases:
+        index.add_case(case)
+    index.refresh_idf()
+    built = time.perf_counter() - started
+    print(f"Corpus: {args.docs} cases, {len(index.vocabulary)} terms, {len(index.data)} non-zeros")
+    size = sum(a.nbytes for a in (index.indptr, index.indices, index.counts, index.data))
+    print(f"Index build: {built:.1f}s, matrix {size >> 20} MB")
+
+    extra = make_cases(100, rng)
+    started = time.perf_counter()
+    for case in extra:
+        case["id"] = "x" + case["id"]
+        index.add_case(case)
+    index.search_vector(index.case_vector(extra[0]["id"]), 1)
+    print(f"Incremental add: {(time.perf_counter() - started) * 1e3 / len(extra):.2f} ms per case")
+    started = time.perf_counter()
+    index.refresh_idf()
+    print(f"IDF refresh: {(time.perf_counter() - started) * 1e3:.0f} ms\n")
+
+    targets = rng.sample(cases, args.queries)
+    results = {}
+    for name in ("request", "index"):
+        samples, on_topic = [], 0
+        for target in targets:
+            started = time.perf_counter()
+            if name == "request":
+                candidates = rng.sample(cases, 400)
+                top = similarity_service.find_similar_cases(target, candidates, top_n=10)
+                top_ids = [hit["id"] for hit in top]
+            else:
+                top = index.search_vector(index.case_vector(target["id"]), 10, exclude=target["id"])
+                top_ids = [case_id for case_id, _ in top]
+            samples.append((time.perf_counter() - started) * 1e3)
+            on_topic += bool(top_ids) and by_id.get(top_ids[0], {}).get("topic") == target["topic"]
+        results[name] = (statistics.mean(samples), on_topic)
+
+    print(f"{'path':<10} {'mean ms':>9} {'top hit on topic':>18}")
+    for name, (mean, on_topic) in results.items():
+        print(f"{name:<10} {mean:>9.2f} {on_topic:>12}/{len(targets)}")
+
+
+if __name__ == "__main__":
+    main()
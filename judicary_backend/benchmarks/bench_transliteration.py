@@ -0,0 +1,130 @@
+"""
+Benchmark – Roman-Urdu expansion latency and accuracy
+=======================================================
+Expands Roman-Urdu queries (several spellings per term) and English-only
+queries two ways:
+
+* scan – what a dictionary without a key index has to do: compare each
+  query word with every glossary word (skeleton edit distance);
+* index – ``services.transliteration.expand`` with its precompiled
+  phonetic key index (cold: per-word caches cleared before each query).
+
+Reports mean / p95 latency per query for each path, how many Roman
+spellings reach the expected Arabic-script term, and how many English
+words get a (wrong) expansion.
+
+Usage (from judicary_backend/):
+    python benchmarks/bench_transliteration.py [--repeat 200]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from services import transliteration  # noqa: E402
+from services.case_number import edit_distance  # noqa: E402
+
+# Roman spellings -> the Arabic-script term they should reach
+ROMAN = {
+    "zamanat": "ضمانت", "zamant": "ضمانت", "khula": "خلع", "khulla": "خلع",
+    "nan nafqa": "نان نفقہ", "nan-nafqah": "نان نفقہ", "wirasat": "وراثت",
+    "warasat": "وراثت", "talaq": "طلاق", "talak": "طلاق", "nikah": "نکاح",
+    "nikkah": "نکاح", "haq mehr": "حق مہر", "haq-e-mahr": "حق مہر",
+    "qatl": "قتل", "katl": "قتل", "qanoon": "قانون", "kanoon": "قانون",
+    "qanun-e-shahadat": "قانون شہادت", "muqadma": "مقدمہ", "muqaddama": "مقدمہ",
+    "faisla": "فیصلہ", "faisala": "فیصلہ", "adalat": "عدالت", "gawah": "گواہ",
+    "gawahi": "گواہی", "giraftari": "گرفتاری", "jaidad": "جائیداد",
+    "jaedad": "جائیداد", "qabza": "قبضہ", "kabza": "قبضہ", "hizanat": "حضانت",
+    "tauheen e adalat": "توہین عدالت", "umar qaid": "عمر قید", "saza": "سزا",
+    "saza-e-maut": "سزائے موت", "dhoka": "دھوکہ", "dhokha": "دھوکہ",
+    "chori": "چوری", "dakaiti": "ڈکیتی", "jurmana": "جرمانہ", "mulzim": "ملزم",
+    "muddai": "مدعی", "wakeel": "وکیل", "vakil": "وکیل", "bari": "بری",
+    "darkhwast": "درخواست", "sarparasti": "سرپرستی", "milkiyat": "ملکیت",
+}
+
+ENGLISH = (
+    "petitioner respondent order judgment learned counsel argued evidence "
+    "witness prosecution accused trial record section law police report "
+    "statement complainant offence punishment sentence conviction acquittal "
+    "application hearing notice jurisdiction constitution provision finding "
+    "reasons facts matter question relief remedy decree suit property "
+    "possession tenant landlord contract agreement payment amount inquiry "
+    "investigation custody arrest magistrate session high bench impugned "
+    "allowed dismissed accepted rejected granted bail murder theft lahore "
+    "karachi peshawar islamabad sindh punjab writ corpus land rent fine lease "
+    "civil criminal tax income company bank loan service employee pension "
+    "election government federal province minister member union labour wages"
+).split()
+
+
+def scan_expand(text, lexicon):
+    """Expansion by comparing each word with the whole glossary."""
+    result = []
+    for _, _, word in transliteration._roman_words(text):
+        if len(word) < transliteration.MIN_WORD_LENGTH:
+            continue
+        _, shape, _ = transliteration._roman_shape(word)
+        best = min(lexicon, key=lambda entry: edit_distance(shape, entry[1]))
+        if edit_distance(shape, best[1]) <= transliteration.MAX_SKELETON_DISTANCE:
+            result.append((word, best[0]))
+    return result
+
+
+def timed(fn, queries, repeat, cold=None):
+    samples = []
+    for _ in range(repeat):
+        for query in queries:
+            if cold:
+                cold()
+            started = time.perf_counter()
+            fn(query)
+            samples.append((time.perf_counter() - started) * 1e6)
+    samples.sort()
+    return statistics.mean(samples), samples[int(len(samples) * 0.95)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    lexicon = [
+        (urdu, shape)
+        for entries in transliteration._WORDS.values()
+        for urdu, shape, _ in entries
+    ]
+    queries = [f"{roman} application of the petitioner" for roman in ROMAN]
+
+    def cold():
+        transliteration.expand.cache_clear()
+        transliteration._roman_shape.cache_clear()
+
+    print(f"Glossary: {len(lexicon)} Urdu words, "
+          f"{len(transliteration._PHRASES)} phrases; {len(queries)} queries\n")
+    print(f"{'path':<14} {'mean us':>9} {'p95 us':>9}")
+    for name, fn, reset in (
+        ("scan", lambda q: scan_expand(q, lexicon), None),
+        ("index cold", transliteration.expand, cold),
+        ("index cached", transliteration.expand, None),
+    ):
+        mean, p95 = timed(fn, queries, args.repeat, reset)
+        print(f"{name:<14} {mean:>9.1f} {p95:>9.1f}")
+
+    reached = sum(
+        1 for roman, urdu in ROMAN.items()
+        if any(urdu in alternatives for _, alternatives in transliteration.expand(roman))
+    )
+    misses = [
+        (word, transliteration.lookup_word(word))
+        for word in ENGLISH if transliteration.lookup_word(word)
+    ]
+    print(f"\nRoman spellings reaching their Urdu term: {reached}/{len(ROMAN)}")
+    print(f"English words expanded: {len(misses)}/{len(ENGLISH)} {misses}")
+
+
+if __name__ == "__main__":
+    main()
@@ -37,6 +37,82 @@ class Config:
     DEFAULT_PAGE_SIZE = 20
     MAX_PAGE_SIZE = 100
 
+    # Totals for paginated endpoints
+    COUNT_CACHE_TTL_SECONDS = int(os.getenv("COUNT_CACHE_TTL_SECONDS", "60"))
+    COUNT_ESTIMATE_TTL_SECONDS = int(os.getenv("COUNT_ESTIMATE_TTL_SECONDS", "600"))
+    COUNT_CACHE_MAX_ENTRIES = int(os.getenv("COUNT_CACHE_MAX_ENTRIES", "2048"))
+
+    # Cached /search and /cases responses
+    RESULT_CACHE_MAX_BYTES = int(os.getenv("RESULT_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+    RESULT_CACHE_MAX_ENTRY_BYTES = int(os.getenv("RESULT_CACHE_MAX_ENTRY_BYTES", str(1024 * 1024)))
+    RESULT_CACHE_TTL_SECONDS = int(os.getenv("RESULT_CACHE_TTL_SECONDS", "120"))
+
+    # Search index
+    SEARCH_INDEX_DIR = os.getenv(
+        "SEARCH_INDEX_DIR",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "data"),
+    )
+    SEARCH_MAX_CANDIDATES = int(os.getenv("SEARCH_MAX_CANDIDATES", "5000"))
+    SEARCH_INDEX_REFRESH_SECONDS = int(os.getenv("SEARCH_INDEX_REFRESH_SECONDS", "30"))
+    SEARCH_INDEX_SAVE_EVERY = int(os.getenv("SEARCH_INDEX_SAVE_EVERY", "500"))
+    SEARCH_INDEX_SAVE_SECONDS = int(os.getenv("SEARCH_INDEX_SAVE_SECONDS", "300"))
+
+    # In-memory filter bitmaps: filters matching at most this many cases are
+    # sent to MongoDB as an _id list; broader ones keep the regular query,
+    # which the sort index satisfies early anyway
+    FILTER_INDEX_MAX_IDS = int(os.getenv("FILTER_INDEX_MAX_IDS", "5000"))
+
+    # "Did you mean" spelling correction for /search
+    SPELLING_MAX_DISTANCE = int(os.getenv("SPELLING_MAX_DISTANCE", "2"))
+    SPELLING_MIN_COUNT = int(os.getenv("SPELLING_MIN_COUNT", "2"))
+
+    # Dense retrieval and /search?mode=hybrid (needs sentence-transformers)
+    EMBEDDING_MODEL = os.getenv("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+    VECTOR_SEARCH_CANDIDATES = int(os.getenv("VECTOR_SEARCH_CANDIDATES", "200"))
+    VECTOR_MIN_SIMILARITY = float(os.getenv("VECTOR_MIN_SIMILARITY", "0.25"))
+    HYBRID_TIMEOUT_SECONDS = float(os.getenv("HYBRID_TIMEOUT_SECONDS", "0.8"))
+    HYBRID_RRF_K = int(os.getenv("HYBRID_RRF_K", "60"))
+    HYBRID_LEXICAL_WEIGHT = float(os.getenv("HYBRID_LEXICAL_WEIGHT", "1.0"))
+    HYBRID_VECTOR_WEIGHT = float(os.getenv("HYBRID_VECTOR_WEIGHT", "1.0"))
+
+    # Approximate nearest neighbours for the case embeddings ("ivf" or
+    # "exact"); smaller corpora are scanned exactly.  ANN_NLIST 0 = 2·√n
+    # lists; ANN_NPROBE lists are scanned per query (recall vs latency)
+    ANN_METHOD = os.getenv("ANN_METHOD", "ivf")
+    ANN_MIN_ROWS = int(os.getenv("ANN_MIN_ROWS", "20000"))
+    ANN_NLIST = int(os.getenv("ANN_NLIST", "0"))
+    ANN_NPROBE = int(os.getenv("ANN_NPROBE", "16"))
+
+    # Case-file embeddings used by the chatbot and /createCase: the legacy
+    # per-file JSON directory is imported into the contiguous store once
+    CASE_EMBEDDINGS_DIR = os.getenv(
+        "CASE_EMBEDDINGS_DIR",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "Embeddings (complete  case)"),
+    )
+    EMBEDDING_STORE_DIR = os.getenv(
+        "EMBEDDING_STORE_DIR",
+        os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "case_embeddings"),
+    )
+    # In-memory copy searches scan: "float32" (the memmap itself), "float16"
+    # or "int8"; the best EMBEDDING_RERANK_CANDIDATES are re-scored in float32
+    EMBEDDING_STORE_CODEC = os.getenv("EMBEDDING_STORE_CODEC", "int8")
+    EMBEDDING_RERANK_CANDIDATES = int(os.getenv("EMBEDDING_RERANK_CANDIDATES", "200"))
+
+    # /ai/similar?method=tfidf: rows keep the IDF they were added with until
+    # this fraction of the corpus has changed or this much time has passed
+    SIMILARITY_IDF_REFRESH_FRACTION = float(os.getenv("SIMILARITY_IDF_REFRESH_FRACTION", "0.1"))
+    SIMILARITY_IDF_REFRESH_SECONDS = int(os.getenv("SIMILARITY_IDF_REFRESH_SECONDS", "3600"))
+
+    # Near-duplicate judgments at ingest (services.near_duplicates): "flag"
+    # with duplicate_of (the row is kept), "merge" into the earlier case (the
+    # copy is never stored – opt in only) or "off"; cases match when their
+    # estimated shingle Jaccard similarity reaches the threshold
+    NEAR_DUPLICATE_ACTION = os.getenv("NEAR_DUPLICATE_ACTION", "flag")
+    NEAR_DUPLICATE_THRESHOLD = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.7"))
+
+    # /search/export
+    EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "500"))
+
     # CORS
     CORS_ORIGINS = os.getenv("CORS_ORIGINS", "http://localhost:3000,http://localhost:3001,http://localhost:3002").split(",")
 
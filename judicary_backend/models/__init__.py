@@ -7,6 +7,8 @@ from models.chat_model import ChatSession, ChatMessage
 from models.lawyer_model import Lawyer, LawyerReview
 from models.template_model import Template
 from models.notification_model import Notification
+from models.filter_catalogue import FilterCatalogue
+from models.case_deletion import CaseDeletion
 
 __all__ = [
     "Auth", "User", "Case", "ScrapeJob",
@@ -15,4 +17,6 @@ __all__ = [
     "Lawyer", "LawyerReview",
     "Template",
     "Notification",
+    "FilterCatalogue",
+    "CaseDeletion",
 ]
@@ -0,0 +1,44 @@
+"""Case deletion model – tombstones through which other workers drop deleted cases."""
+
+import mongoengine as me
+from datetime import datetime, timedelta
+
+# Tombstones outlive any worker's refresh interval by far; a worker that
+# was down for longer rebuilds (or reconciles) its structures on start-up
+RETENTION_SECONDS = 7 * 24 * 3600
+
+# Re-read this much history on every pull: tombstones written by workers
+# whose clocks lag behind are still seen (removal is idempotent)
+CLOCK_SKEW = timedelta(seconds=60)
+
+
+class CaseDeletion(me.Document):
+    """One document per deleted case, written by ``services.case_events``."""
+
+    meta = {
+        "collection": "case_deletions",
+        "indexes": [
+            {"fields": ["deleted_at"], "expireAfterSeconds": RETENTION_SECONDS},
+        ],
+    }
+
+    case_id = me.StringField(required=True)
+    deleted_at = me.DateTimeField(default=datetime.utcnow)
+
+    @classmethod
+    def since(cls, watermark: datetime) -> tuple:
+        """
+        Cases deleted since *watermark*.
+
+        Returns:
+            (case ids, new watermark)
+        """
+        ids = []
+        latest = watermark
+        for doc in cls.objects(deleted_at__gt=watermark - CLOCK_SKEW).only(
+            "case_id", "deleted_at"
+        ).as_pymongo():
+            ids.append(doc["case_id"])
+            if doc["deleted_at"] > latest:
+                latest = doc["deleted_at"]
+        return ids, latest
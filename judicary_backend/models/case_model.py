@@ -1,7 +1,16 @@
+import bson
 import mongoengine as me
 from datetime import datetime
 
 
+# Fields needed to render a list/search card (never the long text bodies)
+CARD_FIELDS = (
+    "case_number", "title", "court", "case_type", "year", "status",
+    "judge_names", "summary", "judgment_date", "source",
+)
+CARD_SUMMARY_CHARS = 300
+
+
 class CaseParty(me.EmbeddedDocument):
     """Embedded document for case parties (appellants/respondents)."""
 
@@ -26,11 +35,27 @@ class Case(me.Document):
         "collection": "cases",
         "indexes": [
             "case_number",
+            "case_number_key",
+            # Numbers of near-duplicates merged into a case, see
+            # services.near_duplicates
+            "alias_keys",
+            {"fields": ["duplicate_of"], "sparse": True},
+            # One record per (court, canonical case number); legacy rows
+            # without a key are excluded until backfilled.
+            {"fields": ["court", "case_number_key"], "unique": True,
+             "partialFilterExpression": {"case_number_key": {"$exists": True}}},
             "court",
             "status",
             "judge_names",
+            # Normalized party names, see services.party_names (multikey)
+            "appellant_keys",
+            "respondent_keys",
             "case_type",
             "year",
+            "updated_at",
+            # Keyset pagination: (sort key, _id) so every page is one seek
+            {"fields": ["-judgment_date", "-id"]},
+            {"fields": ["court", "-judgment_date", "-id"]},
             {"fields": ["$title", "$summary", "$case_number"],
              "default_language": "english",
              "weights": {"title": 10, "case_number": 8, "summary": 5}},
@@ -39,6 +64,10 @@ class Case(me.Document):
 
     # Core fields
     case_number = me.StringField(required=True)
+    case_number_key = me.StringField()  # canonical form, see services.case_number
+    case_number_aliases = me.ListField(me.StringField())  # merged near-duplicates
+    alias_keys = me.ListField(me.StringField())
+    duplicate_of = me.ObjectIdField()  # flagged near-duplicate of this case
     title = me.StringField(required=True)
     court = me.StringField(required=True)
     bench = me.StringField()
@@ -52,6 +81,8 @@ class Case(me.Document):
     # Parties
     appellants = me.ListField(me.StringField())
     respondents = me.ListField(me.StringField())
+    appellant_keys = me.ListField(me.StringField())   # see services.party_names
+    respondent_keys = me.ListField(me.StringField())
     parties = me.EmbeddedDocumentListField(CaseParty)
 
     # Judges
@@ -91,6 +122,16 @@ class Case(me.Document):
     created_at = me.DateTimeField(default=datetime.utcnow)
     updated_at = me.DateTimeField(default=datetime.utcnow)
 
+    def clean(self):
+        """Derive the canonical case number, alias and party keys on every save."""
+        from services.case_number import case_number_key
+        from services.party_names import party_index_keys
+
+        self.case_number_key = case_number_key(self.case_number)
+        self.alias_keys = [key for key in map(case_number_key, self.case_number_aliases or []) if key]
+        self.appellant_keys = party_index_keys(self.appellants)
+        self.respondent_keys = party_index_keys(self.respondents)
+
     def to_json(self):
         return {
             "id": str(self.id),
@@ -125,16 +166,52 @@ class Case(me.Document):
 
     def to_card_json(self):
         """Lightweight representation for list views."""
+        return Case.card_json_from_son({
+            "_id": self.id,
+            **{field: getattr(self, field) for field in CARD_FIELDS},
+        })
+
+    # ---- Lean card path: raw dicts straight from Mongo, no Document ----
+
+    @staticmethod
+    def card_projection(*extra_fields) -> dict:
+        """
+        ``$project`` spec returning only card fields, with the summary cut
+        to CARD_SUMMARY_CHARS server-side so long summaries never cross the
+        wire.  *extra_fields* (e.g. a sort key) are passed through as-is.
+        """
+        projection = {field: 1 for field in CARD_FIELDS + extra_fields}
+        projection["summary"] = {
+            "$substrCP": [{"$ifNull": ["$summary", ""]}, 0, CARD_SUMMARY_CHARS]
+        }
+        return projection
+
+    @staticmethod
+    def card_json_from_son(row: dict) -> dict:
+        """Card JSON from a raw case dict (as produced by ``card_projection``)."""
+        judgment_date = row.get("judgment_date")
         return {
-            "id": str(self.id),
-            "case_number": self.case_number,
-            "title": self.title,
-            "court": self.court,
-            "case_type": self.case_type,
-            "year": self.year,
-            "status": self.status,
-            "judge_names": self.judge_names or [],
-            "summary": (self.summary or "")[:300],
-            "judgment_date": self.judgment_date.isoformat() if self.judgment_date else None,
-            "source": self.source,
+            "id": str(row["_id"]),
+            "case_number": row.get("case_number"),
+            "title": row.get("title"),
+            "court": row.get("court"),
+            "case_type": row.get("case_type"),
+            "year": row.get("year"),
+            "status": row.get("status", "unknown"),
+            "judge_names": row.get("judge_names") or [],
+            "summary": (row.get("summary") or "")[:CARD_SUMMARY_CHARS],
+            "judgment_date": judgment_date.isoformat() if judgment_date else None,
+            "source": row.get("source"),
+        }
+
+    @classmethod
+    def cards_by_ids(cls, ids) -> dict:
+        """Card JSON for the given case ids, keyed by str(id)."""
+        pipeline = [
+            {"$match": {"_id": {"$in": [bson.ObjectId(i) for i in ids]}}},
+            {"$project": cls.card_projection()},
+        ]
+        return {
+            str(row["_id"]): cls.card_json_from_son(row)
+            for row in cls._get_collection().aggregate(pipeline)
         }
@@ -16,7 +16,11 @@ class Document(me.Document):
 
     meta = {
         "collection": "documents",
-        "indexes": ["user_id", "case_id", "doc_type", "created_at"],
+        "indexes": [
+            "user_id", "case_id", "doc_type", "created_at",
+            {"fields": ["user_id", "-created_at", "-id"]},
+            {"fields": ["user_id", "doc_type", "-created_at", "-id"]},
+        ],
     }
 
     user_id = me.ObjectIdField(required=True)
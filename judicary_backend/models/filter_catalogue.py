@@ -0,0 +1,32 @@
+"""Filter catalogue model – materialized filter values for search and directory UIs."""
+
+import mongoengine as me
+from datetime import datetime
+
+
+class FilterCatalogue(me.Document):
+    """
+    One document per catalogue ("cases", "lawyers") holding the distinct
+    filter values and judge counts, maintained with $addToSet/$inc deltas
+    on every write and rebuilt by the periodic reconciliation job.
+    """
+
+    meta = {"collection": "filter_catalogue"}
+
+    key = me.StringField(primary_key=True)  # "cases" or "lawyers"
+
+    # Case filters
+    courts = me.ListField(me.StringField())
+    case_types = me.ListField(me.StringField())
+    statuses = me.ListField(me.StringField())
+    sources = me.ListField(me.StringField())
+    year_min = me.IntField()
+    year_max = me.IntField()
+    judge_counts = me.DictField()  # escaped judge name -> number of cases
+
+    # Lawyer directory filters
+    specializations = me.ListField(me.StringField())
+    cities = me.ListField(me.StringField())
+
+    reconciled_at = me.DateTimeField()
+    updated_at = me.DateTimeField(default=datetime.utcnow)
@@ -9,7 +9,11 @@ class Notification(me.Document):
 
     meta = {
         "collection": "notifications",
-        "indexes": ["user_id", "is_read", "-created_at", "reminder_date"],
+        "indexes": [
+            "user_id", "is_read", "-created_at", "reminder_date",
+            {"fields": ["user_id", "-created_at", "-id"]},
+            {"fields": ["user_id", "is_read", "-created_at", "-id"]},
+        ],
         "ordering": ["-created_at"],
     }
 
@@ -15,7 +15,12 @@ class ScrapeJob(me.Document):
 
     meta = {
         "collection": "scrape_jobs",
-        "indexes": ["status", "source", "-started_at"],
+        "indexes": [
+            "status", "source", "-started_at",
+            {"fields": ["-created_at", "-id"]},
+            {"fields": ["source", "-created_at", "-id"]},
+            {"fields": ["status", "-created_at", "-id"]},
+        ],
     }
 
     source = me.StringField(required=True)  # e.g., "supreme_court", "lahore_hc"
@@ -13,7 +13,8 @@ from models.case_model import Case
 from services.ai_service import generate_ai_response, generate_case_analysis, detect_language, generate_gemini_summary
 from services.summary_service import generate_summary, generate_headnotes
 from services.extraction_service import extract_entities, extract_key_information
-from services.similarity_service import find_similar_cases, find_similar_by_metadata
+from services.similarity_service import find_similar_by_metadata
+from services.similarity_index import similar_cases
 from routes.auth_routes import token_required
 
 logger = logging.getLogger(__name__)
@@ -204,9 +205,29 @@ def find_similar(case_id):
     if not target:
         return jsonify({"error": "Case not found"}), 404
 
-    limit = request.args.get("limit", 10, type=int)
+    limit = max(1, min(request.args.get("limit", 10, type=int), 100))
     method = request.args.get("method", "metadata")  # "tfidf" or "metadata"
 
+    if method == "tfidf":
+        ranked = similar_cases(target, limit)
+        cards = Case.cards_by_ids([case_id for case_id, _ in ranked])
+        similar = [
+            {
+                "id": case_id,
+                "case_number": cards[case_id]["case_number"] or "",
+                "title": cards[case_id]["title"] or "",
+                "court": cards[case_id]["court"] or "",
+                "year": cards[case_id]["year"],
+                "similarity": round(score, 4),
+            }
+            for case_id, score in ranked if case_id in cards
+        ]
+        return jsonify({
+            "case_id": str(target.id),
+            "similar_cases": similar,
+            "method": method,
+        }), 200
+
     target_data = target.to_json()
 
     # Get candidate cases (same court or same type, limit to 200 for performance)
@@ -225,10 +246,7 @@ def find_similar(case_id):
             if c["id"] not in seen:
                 candidate_data.append(c)
 
-    if method == "tfidf":
-        similar = find_similar_cases(target_data, candidate_data, top_n=limit)
-    else:
-        similar = find_similar_by_metadata(target_data, candidate_data, top_n=limit)
+    similar = find_similar_by_metadata(target_data, candidate_data, top_n=limit)
 
     return jsonify({
         "case_id": str(target.id),
@@ -6,21 +6,27 @@ from flask import Blueprint, request, jsonify
 
 from models.case_model import Case
 from models.scrape_job import ScrapeJob
+from services.count_cache import count_documents
 
 analytics_bp = Blueprint("analytics", __name__)
 
 
+def _listed():
+    """Cases the statistics count: flagged near-duplicates are left out."""
+    return Case.objects(duplicate_of=None)
+
+
 @analytics_bp.route("/analytics/dashboard", methods=["GET"])
 def dashboard_stats():
     """Primary dashboard data."""
-    total_cases = Case.objects.count()
+    total_cases, _ = count_documents(_listed())
 
     # Recent 30 days
     thirty_days_ago = datetime.utcnow() - timedelta(days=30)
-    recent_cases = Case.objects(created_at__gte=thirty_days_ago).count()
+    recent_cases = _listed().filter(created_at__gte=thirty_days_ago).count()
 
     # Courts count
-    courts = Case.objects.distinct("court")
+    courts = _listed().distinct("court")
     total_courts = len([c for c in courts if c])
 
     # Scraper stats
@@ -36,7 +42,7 @@ def dashboard_stats():
         {"$group": {"_id": "$source", "count": {"$sum": 1}}},
         {"$sort": {"count": -1}},
     ]
-    by_source = list(Case.objects.aggregate(*source_pipeline))
+    by_source = list(_listed().aggregate(*source_pipeline))
 
     return jsonify({
         "total_cases": total_cases,
@@ -68,7 +74,7 @@ def case_timeline():
         }},
         {"$sort": {"_id": 1}},
     ]
-    monthly = list(Case.objects.aggregate(*pipeline))
+    monthly = list(_listed().aggregate(*pipeline))
 
     months = [
         "Jan", "Feb", "Mar", "Apr", "May", "Jun",
@@ -99,7 +105,7 @@ def court_analytics():
         }},
         {"$sort": {"total_cases": -1}},
     ]
-    courts = list(Case.objects.aggregate(*pipeline))
+    courts = list(_listed().aggregate(*pipeline))
 
     return jsonify({
         "courts": [
@@ -129,7 +135,7 @@ def judge_analytics():
         {"$sort": {"case_count": -1}},
         {"$limit": limit},
     ]
-    judges = list(Case.objects.aggregate(*pipeline))
+    judges = list(_listed().aggregate(*pipeline))
 
     return jsonify({
         "judges": [
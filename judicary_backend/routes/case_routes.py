@@ -4,22 +4,40 @@ from datetime import datetime
 
 import bson
 from flask import Blueprint, request, jsonify, g
+from mongoengine.errors import NotUniqueError
 from mongoengine.queryset.visitor import Q
 
+from config import get_config
 from models.case_model import Case
 from routes.auth_routes import token_required
+from services import case_events
+from services.case_number import lookup
+from services.count_cache import COUNT_MODES, count_documents
+from services.document_find import DEFAULT_LIMIT, MAX_LIMIT, find_in_case
+from services.filter_index import filter_bitmap, filter_query, get_filter_index
+from services.pagination import paginate_raw, pagination_meta
+from services.party_names import ROLES, case_roles, party_key, party_match
+from services.query_parser import QuerySyntaxError
+from services.result_cache import cached_response
+from services.search_index import get_search_index
 
 case_bp = Blueprint("cases", __name__)
 
 
 @case_bp.route("/cases", methods=["GET"])
+@cached_response("cases")
 def list_cases():
     """List cases with pagination, filtering, and search."""
     page = int(request.args.get("page", 1))
     page_size = min(int(request.args.get("page_size", 20)), 100)
     sort = request.args.get("sort", "-judgment_date")
+    cursor = request.args.get("cursor")
+    count_mode = request.args.get("count", "exact")
+    if count_mode not in COUNT_MODES:
+        return jsonify({"error": f"count must be one of: {', '.join(COUNT_MODES)}"}), 400
 
-    query = Q()
+    # Flagged near-duplicates (services.near_duplicates) are never listed
+    query = Q(duplicate_of=None)
 
     # Text search
     search = request.args.get("search", "").strip()
@@ -39,6 +57,14 @@ def list_cases():
     if year:
         query &= Q(year=int(year))
 
+    year_from = request.args.get("year_from", type=int)
+    if year_from:
+        query &= Q(year__gte=year_from)
+
+    year_to = request.args.get("year_to", type=int)
+    if year_to:
+        query &= Q(year__lte=year_to)
+
     status = request.args.get("status")
     if status:
         query &= Q(status=status)
@@ -51,23 +77,101 @@ def list_cases():
     if source:
         query &= Q(source=source)
 
-    # Execute with pagination
-    total = Case.objects(query).count()
-    cases = (
-        Case.objects(query)
-        .order_by(sort)
-        .skip((page - 1) * page_size)
-        .limit(page_size)
-    )
+    # Filter-only requests are resolved on the in-memory bitmaps: the total
+    # is the bitmap's cardinality and a selective filter becomes an _id seek
+    bitmap = None if search else filter_bitmap(request.args)
+    if bitmap is not None:
+        if len(bitmap) <= get_config().FILTER_INDEX_MAX_IDS:
+            query = Q(id__in=get_filter_index().case_ids(bitmap))
+        else:
+            query = filter_query(request.args)
+
+    # Execute with pagination – card fields only, serialized from raw rows
+    queryset = Case.objects(query)
+    if bitmap is not None:
+        total = len(bitmap) if count_mode != "none" else None
+        total_is_estimate = False
+    else:
+        total, total_is_estimate = count_documents(queryset, count_mode)
+    try:
+        rows, next_cursor = paginate_raw(
+            Case, queryset._query, sort, page, page_size, cursor, Case.card_projection()
+        )
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    return jsonify({
+        "cases": [Case.card_json_from_son(row) for row in rows],
+        "pagination": pagination_meta(page, page_size, total, next_cursor, total_is_estimate),
+    }), 200
+
 
+@case_bp.route("/cases/lookup", methods=["GET"])
+def lookup_case():
+    """
+    Find a case by its number as a user would type it.
+    Query params: case_number (required), court (optional exact court name)
+
+    Exact hits come from the canonical case-number key index; otherwise the
+    closest keys by edit distance are returned as suggestions.
+    """
+    raw = request.args.get("case_number", "").strip()
+    if not raw:
+        return jsonify({"error": "'case_number' is required"}), 400
+    court = request.args.get("court", "").strip() or None
+    return jsonify(lookup(raw, court)), 200
+
+
+@case_bp.route("/cases/parties", methods=["GET"])
+def cases_by_party():
+    """
+    All cases involving a party, however the name is spelled.
+    Query params: name (required), role (any | appellant | respondent),
+    page, page_size, cursor
+
+    Cases whose normalized party key equals the name's key come from the
+    party key indexes; when there are none, cases with the name as a run of
+    whole words in a longer party name are returned instead ("partial").
+    """
+    name = request.args.get("name", "").strip()
+    if not name:
+        return jsonify({"error": "'name' is required"}), 400
+    role = request.args.get("role", "any")
+    if role not in ROLES:
+        return jsonify({"error": f"role must be one of: {', '.join(ROLES)}"}), 400
+    page = int(request.args.get("page", 1))
+    page_size = min(int(request.args.get("page_size", 20)), 100)
+    cursor = request.args.get("cursor")
+
+    key = party_key(name)
+    if not key:
+        return jsonify({"error": "'name' has no searchable words"}), 400
+    # Flagged near-duplicates are left out, as from every listing
+    match, mode = {"$and": [party_match(name, role), {"duplicate_of": None}]}, "exact"
+    total = Case.objects(__raw__=match).count()
+    if not total:
+        match = {"$and": [party_match(name, role, partial=True), {"duplicate_of": None}]}
+        mode = "partial"
+        total = Case.objects(__raw__=match).count()
+
+    projection = Case.card_projection("appellant_keys", "respondent_keys")
+    try:
+        rows, next_cursor = paginate_raw(
+            Case, match, "-judgment_date", page, page_size, cursor, projection
+        )
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    cases = []
+    for row in rows:
+        card = Case.card_json_from_son(row)
+        card["party_roles"] = case_roles(row, key, partial=mode == "partial")
+        cases.append(card)
     return jsonify({
-        "cases": [c.to_card_json() for c in cases],
-        "pagination": {
-            "page": page,
-            "page_size": page_size,
-            "total": total,
-            "total_pages": (total + page_size - 1) // page_size,
-        },
+        "key": key,
+        "match": mode,
+        "cases": cases,
+        "pagination": pagination_meta(page, page_size, total, next_cursor),
     }), 200
 
 
@@ -84,6 +188,40 @@ def get_case(case_id):
     return jsonify({"case": case.to_json()}), 200
 
 
+@case_bp.route("/cases/<case_id>/find", methods=["GET"])
+def find_in_case_text(case_id):
+    """
+    Find terms or phrases inside one case (summary, headnotes, full and
+    judgment text) without loading the text itself.
+
+    Query params:
+        q       (required; the /search query language)
+        limit   (hits to return, default 20, max 100)
+        offset  (hits to skip, for paging through long judgments)
+
+    Each hit carries its field, paragraph number, character offsets and a
+    small context window.
+    """
+    if not bson.ObjectId.is_valid(case_id):
+        return jsonify({"error": "Invalid case ID"}), 400
+    q = request.args.get("q", "").strip()
+    if not q:
+        return jsonify({"error": "'q' is required"}), 400
+    limit = min(max(int(request.args.get("limit", DEFAULT_LIMIT)), 1), MAX_LIMIT)
+    offset = max(int(request.args.get("offset", 0)), 0)
+
+    if not Case.objects(id=case_id).only("id").first():
+        return jsonify({"error": "Case not found"}), 404
+
+    cfg = get_config()
+    get_search_index().refresh(min_interval=cfg.SEARCH_INDEX_REFRESH_SECONDS)
+    try:
+        result = find_in_case(case_id, q, limit, offset)
+    except QuerySyntaxError as exc:
+        return jsonify({"error": f"Invalid query: {exc}"}), 400
+    return jsonify({"case_id": case_id, "q": q, "limit": limit, "offset": offset, **result}), 200
+
+
 @case_bp.route("/cases", methods=["POST"])
 @token_required
 def create_case():
@@ -134,7 +272,11 @@ def create_case():
         except ValueError:
             pass
 
-    case.save()
+    try:
+        case.save()
+    except NotUniqueError:
+        return jsonify({"error": "A case with this number already exists in this court"}), 409
+    case_events.case_saved(case)
 
     return jsonify({"message": "Case created", "case": case.to_json()}), 201
 
@@ -159,14 +301,32 @@ def update_case(case_id):
         "source_url", "pdf_url",
     ]
 
+    previous = case_events.snapshot(case)
+    unkeyed = case.case_number_key is None
     for field in updatable:
         if field in data:
             setattr(case, field, data[field])
 
     case.updated_at = datetime.utcnow()
-    case.save()
-
-    return jsonify({"message": "Case updated", "case": case.to_json()}), 200
+    response = {"message": "Case updated"}
+    try:
+        case.save()
+    except NotUniqueError:
+        if not unkeyed:
+            return jsonify({"error": "A case with this number already exists in this court"}), 409
+        # A legacy row that backfill_keys left unkeyed because another case
+        # in the court owns its key: save the edit and keep it unkeyed.
+        case.clean()
+        response["warning"] = (
+            f"Case number key {case.case_number_key} belongs to another case in this "
+            "court; this case stays unkeyed until the duplicates are merged"
+        )
+        case.case_number_key = None
+        case.save(clean=False)
+    case_events.case_saved(case, previous)
+
+    response["case"] = case.to_json()
+    return jsonify(response), 200
 
 
 @case_bp.route("/cases/<case_id>", methods=["DELETE"])
@@ -181,12 +341,14 @@ def delete_case(case_id):
         return jsonify({"error": "Case not found"}), 404
 
     case.delete()
+    case_events.case_deleted(case)
     return jsonify({"message": "Case deleted"}), 200
 
 
 @case_bp.route("/cases/stats", methods=["GET"])
 def case_stats():
-    """Get aggregate statistics about cases."""
+    """Get aggregate statistics about cases (flagged near-duplicates left out)."""
+    listed = Case.objects(duplicate_of=None)
     pipeline = [
         {"$group": {
             "_id": None,
@@ -195,7 +357,7 @@ def case_stats():
             "years": {"$addToSet": "$year"},
         }},
     ]
-    result = list(Case.objects.aggregate(*pipeline))
+    result = list(listed.aggregate(*pipeline))
 
     # Court distribution
     court_pipeline = [
@@ -203,7 +365,7 @@ def case_stats():
         {"$sort": {"count": -1}},
         {"$limit": 20},
     ]
-    court_dist = list(Case.objects.aggregate(*court_pipeline))
+    court_dist = list(listed.aggregate(*court_pipeline))
 
     # Year distribution
     year_pipeline = [
@@ -212,19 +374,19 @@ def case_stats():
         {"$sort": {"_id": -1}},
         {"$limit": 30},
     ]
-    year_dist = list(Case.objects.aggregate(*year_pipeline))
+    year_dist = list(listed.aggregate(*year_pipeline))
 
     # Status distribution
     status_pipeline = [
         {"$group": {"_id": "$status", "count": {"$sum": 1}}},
     ]
-    status_dist = list(Case.objects.aggregate(*status_pipeline))
+    status_dist = list(listed.aggregate(*status_pipeline))
 
     # Source distribution
     source_pipeline = [
         {"$group": {"_id": "$source", "count": {"$sum": 1}}},
     ]
-    source_dist = list(Case.objects.aggregate(*source_pipeline))
+    source_dist = list(listed.aggregate(*source_pipeline))
 
     return jsonify({
         "total_cases": result[0]["total_cases"] if result else 0,
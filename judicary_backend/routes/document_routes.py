@@ -12,6 +12,9 @@ from models.document_model import Document, ExtractedEntity
 from services.extraction_service import extract_entities
 from services.summary_service import generate_summary
 from routes.auth_routes import token_required
+from services import generations
+from services.count_cache import COUNT_MODES, count_documents
+from services.pagination import paginate, pagination_meta
 
 logger = logging.getLogger(__name__)
 
@@ -88,6 +91,7 @@ def upload_document():
             pass
 
     doc.save()
+    generations.bump("documents")
 
     # Process in background (for now, synchronous for text files)
     if doc.extracted_text:
@@ -145,22 +149,24 @@ def list_documents():
     page = request.args.get("page", 1, type=int)
     page_size = request.args.get("page_size", 20, type=int)
     doc_type = request.args.get("doc_type")
+    cursor = request.args.get("cursor")
+    count_mode = request.args.get("count", "exact")
+    if count_mode not in COUNT_MODES:
+        return jsonify({"error": f"count must be one of: {', '.join(COUNT_MODES)}"}), 400
 
     query = Document.objects(user_id=g.current_user.id)
     if doc_type:
         query = query.filter(doc_type=doc_type)
 
-    total = query.count()
-    docs = query.order_by("-created_at").skip((page - 1) * page_size).limit(page_size)
+    total, total_is_estimate = count_documents(query, count_mode)
+    try:
+        docs, next_cursor = paginate(query, "-created_at", page, page_size, cursor)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
 
     return jsonify({
         "documents": [d.to_json() for d in docs],
-        "pagination": {
-            "page": page,
-            "page_size": page_size,
-            "total": total,
-            "total_pages": (total + page_size - 1) // page_size,
-        },
+        "pagination": pagination_meta(page, page_size, total, next_cursor, total_is_estimate),
     }), 200
 
 
@@ -202,6 +208,7 @@ def delete_document(doc_id):
         logger.error("Failed to delete file: %s", e)
 
     doc.delete()
+    generations.bump("documents")
     return jsonify({"message": "Document deleted"}), 200
 
 
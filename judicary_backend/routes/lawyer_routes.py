@@ -8,6 +8,7 @@ from flask import Blueprint, request, jsonify, g
 
 from models.lawyer_model import Lawyer, LawyerReview
 from routes.auth_routes import token_required
+from services.filter_catalogue import apply_lawyer_delta, get_lawyer_filters
 
 logger = logging.getLogger(__name__)
 
@@ -66,6 +67,7 @@ def seed_lawyers():
         try:
             lawyer = Lawyer(**data)
             lawyer.save()
+            apply_lawyer_delta(lawyer)
         except Exception as e:
             logger.error("Failed to seed lawyer: %s", e)
 
@@ -157,13 +159,11 @@ def add_review(lawyer_id):
 def list_specializations():
     """List all available specializations."""
     seed_lawyers()
-    specs = Lawyer.objects.distinct("specializations")
-    return jsonify({"specializations": sorted(specs)}), 200
+    return jsonify({"specializations": get_lawyer_filters()["specializations"]}), 200
 
 
 @lawyer_bp.route("/lawyers/cities", methods=["GET"])
 def list_cities():
     """List all cities where lawyers are available."""
     seed_lawyers()
-    cities = Lawyer.objects.distinct("city")
-    return jsonify({"cities": sorted([c for c in cities if c])}), 200
+    return jsonify({"cities": get_lawyer_filters()["cities"]}), 200
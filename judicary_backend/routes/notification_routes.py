@@ -8,6 +8,9 @@ from flask import Blueprint, request, jsonify, g
 
 from models.notification_model import Notification
 from routes.auth_routes import token_required
+from services import generations
+from services.count_cache import COUNT_MODES, count_documents
+from services.pagination import paginate, pagination_meta
 
 logger = logging.getLogger(__name__)
 
@@ -21,24 +24,28 @@ def list_notifications():
     page = request.args.get("page", 1, type=int)
     page_size = request.args.get("page_size", 20, type=int)
     unread_only = request.args.get("unread_only", "false").lower() == "true"
+    cursor = request.args.get("cursor")
+    count_mode = request.args.get("count", "exact")
+    if count_mode not in COUNT_MODES:
+        return jsonify({"error": f"count must be one of: {', '.join(COUNT_MODES)}"}), 400
 
     query = Notification.objects(user_id=g.current_user.id)
     if unread_only:
         query = query.filter(is_read=False)
 
-    total = query.count()
-    unread_count = Notification.objects(user_id=g.current_user.id, is_read=False).count()
-    notifications = query.order_by("-created_at").skip((page - 1) * page_size).limit(page_size)
+    total, total_is_estimate = count_documents(query, count_mode)
+    unread_count, _ = count_documents(
+        Notification.objects(user_id=g.current_user.id, is_read=False)
+    )
+    try:
+        notifications, next_cursor = paginate(query, "-created_at", page, page_size, cursor)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
 
     return jsonify({
         "notifications": [n.to_json() for n in notifications],
         "unread_count": unread_count,
-        "pagination": {
-            "page": page,
-            "page_size": page_size,
-            "total": total,
-            "total_pages": (total + page_size - 1) // page_size,
-        },
+        "pagination": pagination_meta(page, page_size, total, next_cursor, total_is_estimate),
     }), 200
 
 
@@ -81,6 +88,7 @@ def create_notification():
             pass
 
     notif.save()
+    generations.bump("notifications")
 
     return jsonify({
         "message": "Notification created",
@@ -102,6 +110,7 @@ def mark_read(notif_id):
 
     notif.is_read = True
     notif.save()
+    generations.bump("notifications")
     return jsonify({"message": "Marked as read"}), 200
 
 
@@ -110,6 +119,7 @@ def mark_read(notif_id):
 def mark_all_read():
     """Mark all notifications as read."""
     Notification.objects(user_id=g.current_user.id, is_read=False).update(set__is_read=True)
+    generations.bump("notifications")
     return jsonify({"message": "All notifications marked as read"}), 200
 
 
@@ -121,6 +131,7 @@ def delete_notification(notif_id):
         notif = Notification.objects(id=notif_id, user_id=g.current_user.id).first()
         if notif:
             notif.delete()
+            generations.bump("notifications")
     except Exception:
         pass
     return jsonify({"message": "Notification deleted"}), 200
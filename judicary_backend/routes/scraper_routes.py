@@ -4,7 +4,9 @@ from flask import Blueprint, request, jsonify
 
 from models.scrape_job import ScrapeJob
 from scrapers.scheduler import ScraperScheduler, SCRAPER_REGISTRY
-from routes.auth_routes import token_required
+from routes.auth_routes import admin_required, token_required
+from services.count_cache import COUNT_MODES, count_documents
+from services.pagination import paginate, pagination_meta
 
 scraper_bp = Blueprint("scraper", __name__)
 
@@ -57,6 +59,41 @@ def run_scraper():
     }), 202
 
 
+@scraper_bp.route("/scraper/dedup", methods=["POST"])
+@admin_required
+def run_dedup():
+    """
+    Find near-duplicate cases in the collection and flag them with
+    duplicate_of ("flag", the default), merge them into the earliest copy and
+    delete them ("merge"), or only log them to the job ("report").
+    """
+    data = request.json or {}
+    action = data.get("action", "flag")
+    if action not in ("merge", "flag", "report"):
+        return jsonify({"error": "action must be one of: merge, flag, report"}), 400
+
+    threshold = data.get("threshold")
+    if threshold is not None:
+        try:
+            threshold = float(threshold)
+        except (TypeError, ValueError):
+            return jsonify({"error": "threshold must be a number"}), 400
+        if not 0 < threshold <= 1:
+            return jsonify({"error": "threshold must be in (0, 1]"}), 400
+
+    if scheduler is None:
+        return jsonify({"error": "Scheduler not initialized"}), 500
+
+    job, error = scheduler.run_dedup(action, threshold)
+    if error:
+        return jsonify({"error": error}), 409
+
+    return jsonify({
+        "message": f"Deduplication ({action}) started",
+        "job_id": str(job.id),
+    }), 202
+
+
 @scraper_bp.route("/scraper/status", methods=["GET"])
 @token_required
 def scraper_status():
@@ -75,6 +112,10 @@ def list_jobs():
     page_size = min(int(request.args.get("page_size", 20)), 50)
     source = request.args.get("source")
     status = request.args.get("status")
+    cursor = request.args.get("cursor")
+    count_mode = request.args.get("count", "exact")
+    if count_mode not in COUNT_MODES:
+        return jsonify({"error": f"count must be one of: {', '.join(COUNT_MODES)}"}), 400
 
     query = ScrapeJob.objects
     if source:
@@ -82,21 +123,15 @@ def list_jobs():
     if status:
         query = query.filter(status=status)
 
-    total = query.count()
-    jobs = (
-        query.order_by("-created_at")
-        .skip((page - 1) * page_size)
-        .limit(page_size)
-    )
+    total, total_is_estimate = count_documents(query, count_mode)
+    try:
+        jobs, next_cursor = paginate(query, "-created_at", page, page_size, cursor)
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
 
     return jsonify({
         "jobs": [j.to_json() for j in jobs],
-        "pagination": {
-            "page": page,
-            "page_size": page_size,
-            "total": total,
-            "total_pages": (total + page_size - 1) // page_size,
-        },
+        "pagination": pagination_meta(page, page_size, total, next_cursor, total_is_estimate),
     }), 200
 
 
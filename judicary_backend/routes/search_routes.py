@@ -1,45 +1,54 @@
 """Search routes – full-text and advanced filtering."""
 
-from flask import Blueprint, request, jsonify
+import bson
+from flask import Blueprint, Response, request, jsonify, stream_with_context
 from mongoengine.queryset.visitor import Q
 
+from config import get_config
 from models.case_model import Case
+from routes.auth_routes import token_required
+from services.autocomplete import suggest
+from services.count_cache import COUNT_MODES, count_documents
+from services.export import (
+    EXPORT_FORMATS, iter_queryset_rows, iter_ranked_rows, parse_fields, sort_ranked_ids,
+    to_csv, to_ndjson,
+)
+from services.facets import faceted_search
+from services.filter_catalogue import get_case_filters
+from services.filter_index import filter_bitmap, filter_query, get_filter_index
+from services.hybrid_search import hybrid_ranked
+from services.pagination import (
+    aggregation_page_stages, decode_cursor, encode_cursor, next_cursor_from_rows,
+    paginate_ranked, paginate_raw, pagination_meta,
+)
+from services.party_names import party_match
+from services.query_parser import QuerySyntaxError, match_terms
+from services.result_cache import cached_response, stats as result_cache_stats
+from services.search_index import explained_search, search_ranked
+from services.snippets import highlight
+from services.spelling import correct_query
 
 search_bp = Blueprint("search", __name__)
 
+SEARCH_MODES = ("lexical", "hybrid")
 
-@search_bp.route("/search", methods=["GET"])
-def search_cases():
-    """
-    Advanced case search with multiple parameters.
-    Query params: q, court, judge, year_from, year_to, case_type, status, page, page_size
-    """
-    q = request.args.get("q", "").strip()
-    court = request.args.get("court", "").strip()
-    judge = request.args.get("judge", "").strip()
-    year_from = request.args.get("year_from", type=int)
-    year_to = request.args.get("year_to", type=int)
-    case_type = request.args.get("case_type", "").strip()
-    status = request.args.get("status", "").strip()
-    appellant = request.args.get("appellant", "").strip()
-    respondent = request.args.get("respondent", "").strip()
-    statute = request.args.get("statute", "").strip()
-    page = int(request.args.get("page", 1))
-    page_size = min(int(request.args.get("page_size", 20)), 100)
-    sort = request.args.get("sort", "-judgment_date")
 
-    query = Q()
+def _build_filter_query(args) -> Q:
+    """Translate the structured search filters (everything except ``q``) into a Q."""
+    court = args.get("court", "").strip()
+    judge = args.get("judge", "").strip()
+    year = args.get("year", type=int)
+    year_from = args.get("year_from", type=int)
+    year_to = args.get("year_to", type=int)
+    source = args.get("source", "").strip()
+    case_type = args.get("case_type", "").strip()
+    status = args.get("status", "").strip()
+    appellant = args.get("appellant", "").strip()
+    respondent = args.get("respondent", "").strip()
+    statute = args.get("statute", "").strip()
 
-    # Full-text search on multiple fields
-    if q and len(q) >= 2:
-        text_q = (
-            Q(title__icontains=q)
-            | Q(summary__icontains=q)
-            | Q(case_number__icontains=q)
-            | Q(full_text__icontains=q)
-            | Q(headnotes__icontains=q)
-        )
-        query &= text_q
+    # Flagged near-duplicates (services.near_duplicates) are never listed
+    query = Q(duplicate_of=None)
 
     if court:
         query &= Q(court__icontains=court)
@@ -47,6 +56,9 @@ def search_cases():
     if judge:
         query &= Q(judge_names__icontains=judge)
 
+    if year:
+        query &= Q(year=year)
+
     if year_from:
         query &= Q(year__gte=year_from)
 
@@ -59,114 +71,315 @@ def search_cases():
     if status:
         query &= Q(status=status)
 
-    if appellant:
-        query &= Q(appellants__icontains=appellant)
+    if source:
+        query &= Q(source=source)
 
-    if respondent:
-        query &= Q(respondents__icontains=respondent)
+    # Parties: whole-word matches on the normalized party keys (index scans)
+    for role, name in (("appellant", appellant), ("respondent", respondent)):
+        match = party_match(name, role, partial=True) if name else None
+        if match:
+            query &= Q(__raw__=match)
 
     if statute:
         query &= Q(cited_statutes__icontains=statute)
 
-    total = Case.objects(query).count()
-    cases = (
-        Case.objects(query)
-        .order_by(sort)
-        .skip((page - 1) * page_size)
-        .limit(page_size)
-    )
+    return query
 
-    return jsonify({
-        "results": [c.to_card_json() for c in cases],
+
+@search_bp.route("/search", methods=["GET"])
+@cached_response("cases")
+def search_cases():
+    """
+    Advanced case search with multiple parameters.
+    Query params: q, court, judge, year, year_from, year_to, case_type, status, source,
+    page, page_size,
+    cursor (opaque ``next_cursor`` from the previous page; replaces ``page``),
+    facets (true to include facet counts scoped to the current query),
+    highlight (false to omit match snippets on ranked searches),
+    mode (lexical | hybrid – hybrid fuses BM25 with dense vector retrieval),
+    explain (true to include the query execution plan),
+    autocorrect (true to re-run a query without hits as its spelling correction;
+    otherwise misspelled queries only get a ``did_you_mean`` suggestion)
+
+    ``q`` accepts the query language of ``services.query_parser``, e.g.
+    ``court:"Lahore High Court" AND (bail OR "pre-arrest") -dismissed year:2019..2023``.
+    When ``q`` is given, candidates are ranked by the BM25 search index and the
+    remaining filters are applied to the ranked ids; results are ordered by
+    relevance unless an explicit ``sort`` is passed.
+    """
+    q = request.args.get("q", "").strip()
+    page = int(request.args.get("page", 1))
+    page_size = min(int(request.args.get("page_size", 20)), 100)
+    cursor = request.args.get("cursor")
+    with_facets = request.args.get("facets", "false").lower() == "true"
+    count_mode = request.args.get("count", "exact")
+    if count_mode not in COUNT_MODES:
+        return jsonify({"error": f"count must be one of: {', '.join(COUNT_MODES)}"}), 400
+    mode = request.args.get("mode", "lexical")
+    if mode not in SEARCH_MODES:
+        return jsonify({"error": f"mode must be one of: {', '.join(SEARCH_MODES)}"}), 400
+    ranked_search = bool(q) and len(q) >= 2
+    sort = request.args.get("sort") or ("relevance" if ranked_search else "-judgment_date")
+
+    query = _build_filter_query(request.args)
+    # Structured filters resolved on the in-memory bitmaps (None when the
+    # request has none, or one the filter index does not cover)
+    bitmap = filter_bitmap(request.args)
+    filters = get_filter_index() if bitmap is not None else None
+
+    scores = {}
+    ranked = []
+    retrieval = None
+    plan = None
+    did_you_mean = None
+    corrected_from = None
+    if ranked_search:
+        try:
+            terms = match_terms(q)
+        except QuerySyntaxError as exc:
+            return jsonify({"error": f"Invalid query: {exc}"}), 400
+        # Full-text search: rank with the inverted index (fused with dense
+        # retrieval in hybrid mode), then apply the filters to the ranked
+        # ids only (an _id index seek, not a scan).
+        with_plan = request.args.get("explain", "false").lower() == "true"
+        ranked, retrieval, plan = _rank(q, mode, with_plan)
+        did_you_mean = correct_query(q)
+        if did_you_mean and not ranked:
+            if request.args.get("autocorrect", "false").lower() == "true":
+                corrected_from, q = q, did_you_mean["query"]
+                terms = match_terms(q)
+                ranked, retrieval, plan = _rank(q, mode, with_plan)
+        if bitmap is not None:
+            ranked = [
+                (case_id, score) for case_id, score in ranked
+                if filters.contains(bitmap, case_id)
+            ]
+            query = Q()
+        scores = dict(ranked)
+        query &= Q(id__in=[case_id for case_id, _ in ranked])
+    elif bitmap is not None:
+        # The total below is the bitmap's cardinality, so the rows must come
+        # from exactly the bitmap's filters
+        if len(bitmap) <= get_config().FILTER_INDEX_MAX_IDS:
+            query = Q(id__in=filters.case_ids(bitmap))
+        else:
+            query = filter_query(request.args)
+
+    facets = None
+    try:
+        if with_facets:
+            cards, total, facets, next_cursor = _faceted_page(
+                query, ranked, sort, page, page_size, cursor
+            )
+            total_is_estimate = False
+        elif ranked_search and sort == "relevance":
+            if bitmap is not None:
+                ordered_ids = [case_id for case_id, _ in ranked]
+            else:
+                matched = {
+                    str(d["_id"]) for d in Case.objects(query).only("id").as_pymongo()
+                }
+                ordered_ids = [case_id for case_id, _ in ranked if case_id in matched]
+            total, total_is_estimate = len(ordered_ids), False
+            page_ids, next_cursor = paginate_ranked(ordered_ids, page, page_size, cursor)
+            by_id = Case.cards_by_ids(page_ids)
+            cards = [by_id[case_id] for case_id in page_ids if case_id in by_id]
+        else:
+            queryset = Case.objects(query)
+            if bitmap is not None and not ranked_search:
+                total = len(bitmap) if count_mode != "none" else None
+                total_is_estimate = False
+            else:
+                total, total_is_estimate = count_documents(queryset, count_mode)
+            rows, next_cursor = paginate_raw(
+                Case, queryset._query, sort, page, page_size, cursor, Case.card_projection()
+            )
+            cards = [Case.card_json_from_son(row) for row in rows]
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    highlights = {}
+    if ranked_search and request.args.get("highlight", "true").lower() == "true":
+        highlights = highlight(q, [card["id"] for card in cards], terms)
+
+    results = []
+    for card in cards:
+        if ranked_search:
+            card["score"] = round(scores.get(card["id"], 0.0), 4)
+            card["highlights"] = highlights.get(card["id"], [])
+        results.append(card)
+
+    response = {
+        "results": results,
         "query": {
             "q": q,
-            "court": court,
-            "judge": judge,
-            "year_from": year_from,
-            "year_to": year_to,
-            "case_type": case_type,
-            "status": status,
+            "court": request.args.get("court", "").strip(),
+            "judge": request.args.get("judge", "").strip(),
+            "year_from": request.args.get("year_from", type=int),
+            "year_to": request.args.get("year_to", type=int),
+            "case_type": request.args.get("case_type", "").strip(),
+            "status": request.args.get("status", "").strip(),
+            "sort": sort,
+            "mode": mode,
         },
-        "pagination": {
-            "page": page,
-            "page_size": page_size,
-            "total": total,
-            "total_pages": (total + page_size - 1) // page_size,
-        },
-    }), 200
+        "pagination": pagination_meta(page, page_size, total, next_cursor, total_is_estimate),
+    }
+    if facets is not None:
+        response["facets"] = facets
+    if retrieval is not None:
+        response["query"]["retrieval"] = retrieval
+    if plan is not None:
+        response["explain"] = plan
+    if corrected_from is not None:
+        response["query"]["corrected_from"] = corrected_from
+    elif did_you_mean is not None:
+        response["did_you_mean"] = did_you_mean
+    return jsonify(response), 200
+
+
+def _rank(q, mode, with_plan=False):
+    """
+    (ranked, retrieval status, plan) for *q* in the given search mode; the
+    plan (None unless *with_plan*) comes from the same execution.
+    """
+    if not with_plan:
+        if mode == "hybrid":
+            return (*hybrid_ranked(q), None)
+        return search_ranked(q), None, None
+
+    plans = []
+
+    def lexical(query):
+        ranked, plan = explained_search(query)
+        plans.append(plan)
+        return ranked
+
+    if mode == "hybrid":
+        ranked, retrieval = hybrid_ranked(q, lexical)
+    else:
+        ranked, retrieval = lexical(q), None
+    return ranked, retrieval, plans[0] if plans else None
+
+
+def _faceted_page(query, ranked, sort, page, page_size, cursor):
+    """
+    Result page plus facet counts for *query* in a single ``$facet`` round trip.
+
+    Returns:
+        (cards, total, facets, next_cursor)
+    """
+    if ranked and sort == "relevance":
+        # Relevance order lives in the index, so sort inside the pipeline by
+        # each case's position in the ranked id list.
+        ranked_oids = [bson.ObjectId(case_id) for case_id, _ in ranked]
+        start = (page - 1) * page_size
+        if cursor:
+            start, _ = decode_cursor(cursor, "relevance")
+            if not isinstance(start, int):
+                raise ValueError("Invalid cursor")
+        stages = [
+            {"$addFields": {"_rank": {"$indexOfArray": [ranked_oids, "$_id"]}}},
+            {"$sort": {"_rank": 1}},
+            {"$skip": start},
+            {"$limit": page_size + 1},
+        ]
+        rows, total, facets = faceted_search(Case.objects(query)._query, stages)
+        next_cursor = None
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            next_cursor = encode_cursor("relevance", start + page_size, str(rows[-1]["_id"]))
+    else:
+        stages = aggregation_page_stages(Case, sort, page, page_size, cursor)
+        sort_field = sort.lstrip("+-")
+        extra = (sort_field,) if sort_field not in ("id", "_id") else ()
+        rows, total, facets = faceted_search(Case.objects(query)._query, stages, extra)
+        rows, next_cursor = next_cursor_from_rows(rows, sort, page_size)
+
+    cards = [Case.card_json_from_son(row) for row in rows]
+    return cards, total, facets, next_cursor
+
+
+@search_bp.route("/search/export", methods=["GET"])
+def export_search():
+    """
+    Stream every case matching a search as NDJSON or CSV.
+    Query params: the same filters as /search plus
+    format (ndjson | csv, default ndjson), sort, and
+    fields (comma-separated case fields; defaults to the card fields)
+
+    Rows come from a single batched server-side cursor or, for a keyword
+    search, are fetched by id one batch at a time, so memory holds at most
+    the ranked ids (with their sort keys), never the rows themselves.
+    """
+    q = request.args.get("q", "").strip()
+    fmt = request.args.get("format", "ndjson").lower()
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": f"format must be one of: {', '.join(EXPORT_FORMATS)}"}), 400
+    try:
+        fields = parse_fields(request.args.get("fields", ""))
+    except ValueError as exc:
+        return jsonify({"error": str(exc)}), 400
+
+    ranked_search = bool(q) and len(q) >= 2
+    sort = request.args.get("sort") or ("relevance" if ranked_search else "-judgment_date")
+    if sort == "relevance" and not ranked_search:
+        return jsonify({"error": "sort=relevance requires q"}), 400
+    batch_size = get_config().EXPORT_BATCH_SIZE
+
+    query = _build_filter_query(request.args)
+    scores = None
+    if ranked_search:
+        try:
+            # Every match, not just the candidates a results page ranks
+            ranked = search_ranked(q, capped=False)
+        except QuerySyntaxError as exc:
+            return jsonify({"error": f"Invalid query: {exc}"}), 400
+        scores = dict(ranked)
+        ordered_ids = [case_id for case_id, _ in ranked]
+        match = Case.objects(query)._query
+        if sort != "relevance":
+            ordered_ids = sort_ranked_ids(ordered_ids, match, sort, batch_size)
+        rows = iter_ranked_rows(ordered_ids, match, fields, batch_size)
+    else:
+        rows = iter_queryset_rows(Case.objects(query), sort, fields, batch_size)
+
+    if fmt == "csv":
+        body, mimetype = to_csv(rows, fields, scores), "text/csv"
+    else:
+        body, mimetype = to_ndjson(rows, fields, scores), "application/x-ndjson"
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename=cases.{fmt}"},
+    )
 
 
 @search_bp.route("/search/filters", methods=["GET"])
 def search_filters():
     """Return available filter values for the search interface."""
-    # Distinct courts
-    courts = Case.objects.distinct("court")
-    courts = [c for c in courts if c]
-
-    # Distinct case types
-    case_types = Case.objects.distinct("case_type")
-    case_types = [t for t in case_types if t]
-
-    # Distinct statuses
-    statuses = Case.objects.distinct("status")
-    statuses = [s for s in statuses if s]
-
-    # Year range
-    year_pipeline = [
-        {"$match": {"year": {"$ne": None}}},
-        {"$group": {
-            "_id": None,
-            "min_year": {"$min": "$year"},
-            "max_year": {"$max": "$year"},
-        }},
-    ]
-    year_result = list(Case.objects.aggregate(*year_pipeline))
-
-    # Top judges
-    judge_pipeline = [
-        {"$unwind": "$judge_names"},
-        {"$group": {"_id": "$judge_names", "count": {"$sum": 1}}},
-        {"$sort": {"count": -1}},
-        {"$limit": 50},
-    ]
-    judges = list(Case.objects.aggregate(*judge_pipeline))
-
-    # Sources
-    sources = Case.objects.distinct("source")
-    sources = [s for s in sources if s]
-
-    return jsonify({
-        "courts": sorted(courts),
-        "case_types": sorted(case_types),
-        "statuses": statuses,
-        "year_range": {
-            "min": year_result[0]["min_year"] if year_result else None,
-            "max": year_result[0]["max_year"] if year_result else None,
-        },
-        "judges": [{"name": j["_id"], "count": j["count"]} for j in judges],
-        "sources": sources,
-    }), 200
+    return jsonify(get_case_filters()), 200
+
+
+@search_bp.route("/search/cache-stats", methods=["GET"])
+@token_required
+def search_cache_stats():
+    """Hit/miss rates and occupancy of the /search and /cases result cache."""
+    return jsonify(result_cache_stats()), 200
 
 
 @search_bp.route("/search/suggest", methods=["GET"])
 def search_suggest():
-    """Return search suggestions / autocomplete based on partial query."""
+    """
+    Return search suggestions / autocomplete based on partial query.
+
+    Served entirely from the in-memory autocomplete index: case suggestions
+    match case numbers and titles (most recent first), ``terms`` match judge
+    names and cited statutes (most cited first).
+    """
     q = request.args.get("q", "").strip()
     if len(q) < 2:
-        return jsonify({"suggestions": []}), 200
-
-    # Search case numbers and titles
-    cases = Case.objects(
-        Q(case_number__icontains=q) | Q(title__icontains=q)
-    ).only("case_number", "title", "court").limit(10)
-
-    suggestions = []
-    for c in cases:
-        suggestions.append({
-            "id": str(c.id),
-            "case_number": c.case_number,
-            "title": c.title[:100],
-            "court": c.court,
-        })
-
-    return jsonify({"suggestions": suggestions}), 200
+        return jsonify({"suggestions": [], "terms": []}), 200
+    limit = min(int(request.args.get("limit", 10)), 25)
+
+    result = suggest(q, limit)
+    return jsonify({"suggestions": result["cases"], "terms": result["terms"]}), 200
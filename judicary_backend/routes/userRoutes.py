@@ -21,6 +21,7 @@ import json
 from tqdm import tqdm
 import io
 from bucket.google_bucket import upload_to_gcs
+from services.embedding_store import get_embedding_store
 from werkzeug.utils import secure_filename
 import bson
 # from celery import Celery
@@ -525,33 +526,18 @@ def userRoutes(app):
         return unique_cases
    
     @app.route('/FindSimilarCases', methods=['POST'])
-    def SimilarCasesRetrieval(search_string, embedding_directory='Embeddings (complete  case)'):
-        input_embedding = None
-        file_scores = []
-        print("i am here")
-        # Load embeddings and find the input embedding
-        for filename in os.listdir(embedding_directory):
-            with open(os.path.join(embedding_directory, filename), 'r') as file:
-                data = json.load(file)
-                if search_string in filename and 'embedding' in data:
-                    input_embedding = np.array(data['embedding'])
-                    break  # Found the input embedding, no need to continue
-
-        if input_embedding is None:
+    def SimilarCasesRetrieval(search_string):
+        # Find the input embedding in the store (exact id, else first id containing it)
+        store = get_embedding_store()
+        input_id = store.find_id(search_string)
+
+        if input_id is None:
             return {"error": "Input embedding not found"}
 
-        # Calculate similarities with other files
-        for filename in os.listdir(embedding_directory):
-            with open(os.path.join(embedding_directory, filename), 'r') as file:
-                data = json.load(file)
-                if 'embedding' in data:
-                    file_embedding = np.array(data['embedding'])
-                    score = np.dot(input_embedding, file_embedding) / (np.linalg.norm(input_embedding) * np.linalg.norm(file_embedding))
-                    file_scores.append((filename, score))
-
-        # Sort and extract similar case filenames
-        file_scores.sort(key=lambda x: x[1], reverse=True)
-        similar_cases = [filename.split('_embedding.json')[0] for filename, _ in file_scores[:10]]  # Adjust the number as needed
+        # One matrix-vector product over all stored embeddings; the input
+        # itself ranks first, as it did with the per-file scan
+        file_scores = store.search_id(input_id, 10)  # Adjust the number as needed
+        similar_cases = [filename for filename, _ in file_scores]
 
         return similar_cases
 
@@ -12,8 +12,12 @@ from datetime import datetime
 import requests
 from bs4 import BeautifulSoup
 
+from config import get_config
 from models.case_model import Case, CaseDate
 from models.scrape_job import ScrapeJob
+from services import case_events, generations
+from services.case_number import case_number_key
+from services.near_duplicates import find_duplicate, merge_fields
 
 logger = logging.getLogger(__name__)
 
@@ -111,22 +115,57 @@ class BaseScraper(ABC):
         if not case_number or not court:
             return "skipped"
 
-        existing = Case.objects(case_number=case_number, court=court).first()
+        # Match on the canonical key so "C.R. 29718 of 2025" and "Civil
+        # Revision 29718/25" update the same record; legacy rows saved
+        # before keys existed are still found by their raw number.
+        key = case_number_key(case_number)
+        existing = (
+            Case.objects(court=court, case_number_key=key).first()
+            or Case.objects(case_number=case_number, court=court).first()
+        )
 
         if existing:
+            previous = case_events.snapshot(existing)
             # Update non-empty fields
             for key, value in data.items():
                 if value and key not in ("case_number", "court"):
                     setattr(existing, key, value)
             existing.updated_at = datetime.utcnow()
             existing.save()
+            case_events.case_saved(existing, previous)
             return "updated"
-        else:
-            case = Case(**data)
-            case.source = self.SOURCE_NAME
-            case.scraped_at = datetime.utcnow()
-            case.save()
-            return "new"
+
+        # The same judgment under another number: a number merged before,
+        # or near-duplicate text (see services.near_duplicates)
+        action = get_config().NEAR_DUPLICATE_ACTION
+        original = Case.objects(court=court, alias_keys=key).first() if key else None
+        if original is None and action != "off":
+            try:
+                match = find_duplicate(data)
+            except Exception as exc:
+                logger.error("Near-duplicate check failed for %s: %s", case_number, exc)
+                match = None
+            if match:
+                original = match[0]
+                logger.info("%s (%s) near-duplicates case %s (similarity %.2f)",
+                            case_number, court, original.id, match[1])
+
+        if original and action != "flag":
+            previous = case_events.snapshot(original)
+            if merge_fields(original, data):
+                original.updated_at = datetime.utcnow()
+                original.save()
+                case_events.case_saved(original, previous)
+            return "updated"
+
+        case = Case(**data)
+        case.source = self.SOURCE_NAME
+        case.scraped_at = datetime.utcnow()
+        if original:
+            case.duplicate_of = original.id
+        case.save()
+        case_events.case_saved(case)
+        return "new"
 
     # ---- Job tracking ----
 
@@ -139,6 +178,7 @@ class BaseScraper(ABC):
             started_at=datetime.utcnow(),
         )
         self.job.save()
+        generations.bump("scrape_jobs")
         self.job.add_log(f"Scraping started for {self.SOURCE_NAME}")
         return self.job
 
@@ -153,6 +193,8 @@ class BaseScraper(ABC):
                 f"Errors {self.job.errors_count}"
             )
             self.job.save()
+            generations.bump("scrape_jobs")
+        case_events.flush()
 
     # ---- Abstract interface ----
 
@@ -12,6 +12,9 @@ from apscheduler.triggers.cron import CronTrigger
 from scrapers.supreme_court_scraper import SupremeCourtScraper
 from scrapers.lahore_hc_scraper import LahoreHighCourtScraper
 from scrapers.case_law_scraper import CaseLawScraper
+from models.scrape_job import ScrapeJob
+from services.filter_catalogue import reconcile as reconcile_filter_catalogue
+from services.near_duplicates import dedup_collection
 
 logger = logging.getLogger(__name__)
 
@@ -66,6 +69,15 @@ class ScraperScheduler:
             replace_existing=True,
         )
 
+        # Hourly rebuild of the filter catalogue to correct delta drift
+        self.scheduler.add_job(
+            self._reconcile_filter_catalogue,
+            CronTrigger(minute=30),
+            id="reconcile_filter_catalogue",
+            name="Filter Catalogue Reconciliation",
+            replace_existing=True,
+        )
+
         self.scheduler.start()
         logger.info("Scraper scheduler started")
 
@@ -100,6 +112,42 @@ class ScraperScheduler:
 
         return job, None
 
+    def run_dedup(self, action="flag", threshold=None):
+        """Run the near-duplicate pass over the cases in a background thread."""
+        if "dedup" in self._running_jobs:
+            return None, "Deduplication is already running"
+
+        job = ScrapeJob(
+            source="dedup",
+            status="running",
+            config={"action": action, "threshold": threshold},
+            started_at=datetime.utcnow(),
+        )
+        job.save()
+
+        def _run():
+            try:
+                self._running_jobs["dedup"] = job
+                stats = dedup_collection(action, threshold, job)
+                job.cases_found = stats["checked"]
+                job.cases_updated = stats["merged"] + stats["flagged"]
+                job.status = "completed"
+                job.add_log(f"Deduplication completed: {stats}")
+            except Exception as e:
+                logger.error("Deduplication failed: %s", e)
+                job.errors_count += 1
+                job.status = "failed"
+                job.add_log(f"Fatal error: {str(e)[:500]}", level="error")
+            finally:
+                job.completed_at = datetime.utcnow()
+                job.save()
+                self._running_jobs.pop("dedup", None)
+
+        thread = Thread(target=_run, daemon=True)
+        thread.start()
+
+        return job, None
+
     def _run_scraper(self, scraper_name, **kwargs):
         """Internal method used by scheduler."""
         scraper_class = SCRAPER_REGISTRY.get(scraper_name)
@@ -113,6 +161,13 @@ class ScraperScheduler:
         except Exception as e:
             logger.error("Scheduled scrape failed for %s: %s", scraper_name, e)
 
+    def _reconcile_filter_catalogue(self):
+        """Internal method used by scheduler."""
+        try:
+            reconcile_filter_catalogue()
+        except Exception as e:
+            logger.error("Filter catalogue reconciliation failed: %s", e)
+
     def get_status(self):
         """Get the current status of all scheduled and running jobs."""
         scheduled = []
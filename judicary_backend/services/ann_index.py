@@ -0,0 +1,436 @@
+"""
+ANN Index – Approximate Nearest Neighbours over Unit Embeddings
+=================================================================
+A brute-force scan costs O(n · dim) per query, too slow for the chatbot and
+hybrid search once every judgment is embedded.  ``IVFFlatIndex`` is an
+inverted-file index with a trained coarse quantizer (CPU only, numpy):
+
+* spherical k-means over a sample of the vectors trains ``nlist``
+  centroids (``2·√n`` by default);
+* every vector is stored in the contiguous list of its nearest centroid,
+  so inserts are incremental (append to one list) and deletes swap the
+  last entry into the hole.  Lists hold float32 vectors or, with a
+  ``quantization`` codec, float16 / int8 codes whose scores are
+  approximate and re-ranked by the owner;
+* a query scores the centroids, scans only the ``nprobe`` nearest lists
+  and partial-sorts their scores.  ``nprobe`` trades recall for latency;
+  ``nprobe >= nlist`` is an exact search.
+
+An untrained index is a single list, i.e. exact search.  The index grows
+stale as vectors are added after training, so ``needs_training`` asks for
+a retrain once the size has grown ``RETRAIN_GROWTH``-fold.
+
+Owners (``vector_search.VectorIndex``, ``embedding_store.EmbeddingStore``)
+use it through ``AnnIndex``, which builds and retrains in a background
+thread, queues writes that arrive meanwhile, and returns None from
+``search`` until an index is ready so callers fall back to their exact
+scan.  A saved index carries the owner's write stamp and is only adopted
+by an owner whose stamp matches.  ``ANN_METHODS`` maps the ``ANN_METHOD`` setting to an index class;
+"exact" disables the ANN path.
+"""
+
+import logging
+import math
+import os
+import pickle
+import threading
+import time
+
+import numpy as np
+
+from services import quantization
+
+logger = logging.getLogger(__name__)
+
+INDEX_VERSION = 2
+KMEANS_ITERATIONS = 12
+TRAIN_SAMPLE_PER_LIST = 64
+MIN_LIST_SIZE = 32
+RETRAIN_GROWTH = 2.0
+
+
+class _InvertedList:
+    """Ids and vector codes (and int8 scales) of one centroid, grown by doubling."""
+
+    __slots__ = ("ids", "vectors", "scales", "size")
+
+    def __init__(self, dim: int, capacity: int = 16, codec: str = "float32"):
+        self.ids = np.zeros(capacity, dtype=np.int64)
+        self.vectors = np.zeros((capacity, dim), dtype=quantization.code_dtype(codec))
+        self.scales = np.zeros(capacity, dtype=np.float32) if codec == "int8" else None
+        self.size = 0
+
+    def append(self, ids, vectors, scales=None) -> int:
+        """Append encoded rows; returns the position of the first."""
+        start, end = self.size, self.size + len(ids)
+        if end > len(self.ids):
+            capacity = max(end, 2 * len(self.ids))
+            grown_ids = np.zeros(capacity, dtype=np.int64)
+            grown_ids[:start] = self.ids[:start]
+            grown = np.zeros((capacity, self.vectors.shape[1]), dtype=self.vectors.dtype)
+            grown[:start] = self.vectors[:start]
+            self.ids, self.vectors = grown_ids, grown
+            if self.scales is not None:
+                grown_scales = np.zeros(capacity, dtype=np.float32)
+                grown_scales[:start] = self.scales[:start]
+                self.scales = grown_scales
+        self.ids[start:end] = ids
+        self.vectors[start:end] = vectors
+        if self.scales is not None:
+            self.scales[start:end] = scales
+        self.size = end
+        return start
+
+    def trim(self):
+        """Drop spare capacity (after a bulk load)."""
+        capacity = max(16, self.size)
+        self.ids = self.ids[:capacity].copy()
+        self.vectors = self.vectors[:capacity].copy()
+        if self.scales is not None:
+            self.scales = self.scales[:capacity].copy()
+
+    def pop(self, position: int):
+        """Remove *position* by moving the last entry into it; returns the moved id."""
+        last = self.size - 1
+        moved = None
+        if position != last:
+            self.ids[position] = self.ids[last]
+            self.vectors[position] = self.vectors[last]
+            if self.scales is not None:
+                self.scales[position] = self.scales[last]
+            moved = int(self.ids[position])
+        self.size = last
+        return moved
+
+
+def spherical_kmeans(vectors, k: int, iterations: int = KMEANS_ITERATIONS, seed: int = 0):
+    """*k* unit centroids maximising the mean cosine of *vectors* to their centroid."""
+    rng = np.random.default_rng(seed)
+    centroids = vectors[rng.choice(len(vectors), k, replace=False)].copy()
+    for _ in range(iterations):
+        assignment = np.argmax(vectors @ centroids.T, axis=1)
+        order = np.argsort(assignment, kind="stable")
+        counts = np.bincount(assignment, minlength=k)
+        sums = np.zeros_like(centroids)
+        nonempty = counts > 0
+        sums[nonempty] = np.add.reduceat(vectors[order], np.cumsum(counts)[nonempty] - counts[nonempty])
+        empty = np.flatnonzero(~nonempty)
+        if len(empty):
+            sums[empty] = vectors[rng.choice(len(vectors), len(empty), replace=False)]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids = (sums / norms).astype(np.float32)
+    return centroids
+
+
+class IVFFlatIndex:
+    """Inverted-file index of unit vectors, scored on their codes inside each list."""
+
+    def __init__(self, dim: int, nlist: int = 0, nprobe: int = 16, codec: str = "float32"):
+        self.dim = dim
+        self.nlist_setting = nlist     # 0: derived from the size at training
+        self.nprobe = nprobe
+        self.codec = quantization.check_codec(codec)
+        self.centroids = np.zeros((1, dim), dtype=np.float32)
+        self.lists = [_InvertedList(dim, codec=codec)]
+        self.where = {}                # id -> (list, position)
+        self.trained_size = 0
+        self.stamp = None              # owner's write stamp when saved
+
+    def __len__(self):
+        return len(self.where)
+
+    @property
+    def is_trained(self) -> bool:
+        return len(self.lists) > 1
+
+    # ---- Writes ----
+
+    def _assign(self, vectors):
+        if len(self.lists) == 1:
+            return np.zeros(len(vectors), dtype=np.int64)
+        return np.argmax(vectors @ self.centroids.T, axis=1)
+
+    def add(self, ids, vectors):
+        """Insert (or move) unit *vectors* under integer *ids*."""
+        ids = np.asarray(ids, dtype=np.int64)
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(ids), self.dim)
+        self.remove([i for i in ids.tolist() if i in self.where])
+        assignment = self._assign(vectors)
+        codes, scales = quantization.encode(vectors, self.codec)
+        order = np.argsort(assignment, kind="stable")
+        bounds = np.flatnonzero(np.diff(assignment[order])) + 1
+        for group in np.split(order, bounds):
+            if not len(group):
+                continue
+            number = int(assignment[group[0]])
+            start = self.lists[number].append(
+                ids[group], codes[group], None if scales is None else scales[group])
+            for offset, item in enumerate(ids[group].tolist()):
+                self.where[item] = (number, start + offset)
+
+    def remove(self, ids):
+        """Drop *ids* (unknown ids are ignored)."""
+        for item in ids:
+            location = self.where.pop(int(item), None)
+            if location is None:
+                continue
+            number, position = location
+            moved = self.lists[number].pop(position)
+            if moved is not None:
+                self.where[moved] = (number, position)
+
+    def train(self, seed: int = 0):
+        """Train the coarse quantizer on the stored vectors and redistribute them."""
+        ids = np.concatenate([l.ids[:l.size] for l in self.lists])
+        vectors = np.concatenate([quantization.decode(l.vectors[:l.size], self._scales(l))
+                                  for l in self.lists])
+        n = len(ids)
+        nlist = self.nlist_setting or int(2 * math.sqrt(n))
+        nlist = max(1, min(nlist, n // MIN_LIST_SIZE))
+        sample = vectors
+        if n > nlist * TRAIN_SAMPLE_PER_LIST:
+            rows = np.random.default_rng(seed).choice(n, nlist * TRAIN_SAMPLE_PER_LIST, replace=False)
+            sample = vectors[rows]
+        self.centroids = (spherical_kmeans(sample, nlist, seed=seed) if nlist > 1
+                          else np.zeros((1, self.dim), dtype=np.float32))
+        self.lists = [_InvertedList(self.dim, max(16, n // nlist), self.codec) for _ in range(nlist)]
+        self.where = {}
+        self.trained_size = n
+        if n:
+            self.add(ids, vectors)
+            for inverted in self.lists:
+                inverted.trim()
+
+    def needs_training(self, min_rows: int) -> bool:
+        n = len(self.where)
+        if n < min_rows:
+            return False
+        return not self.is_trained or n >= RETRAIN_GROWTH * self.trained_size
+
+    @staticmethod
+    def _scales(inverted):
+        return None if inverted.scales is None else inverted.scales[:inverted.size]
+
+    def memory_bytes(self) -> int:
+        """Bytes held by the list codes, scales and ids."""
+        return self.centroids.nbytes + sum(
+            l.ids.nbytes + l.vectors.nbytes + (0 if l.scales is None else l.scales.nbytes)
+            for l in self.lists)
+
+    # ---- Reads ----
+
+    def search(self, query, k: int, nprobe: int = None) -> list:
+        """
+        Approximate top *k* ids for a unit *query* vector.
+
+        Returns:
+            list of (id, cosine similarity), best first; similarities are
+            computed on the codes, so approximate unless the codec is float32
+        """
+        query = np.asarray(query, dtype=np.float32)
+        nprobe = min(nprobe or self.nprobe, len(self.lists))
+        if nprobe >= len(self.lists):
+            probe = range(len(self.lists))
+        else:
+            scores = self.centroids @ query
+            probe = np.argpartition(-scores, nprobe - 1)[:nprobe].tolist()
+        ids, scores = [], []
+        for number in probe:
+            inverted = self.lists[number]
+            if inverted.size:
+                ids.append(inverted.ids[:inverted.size])
+                scores.append(quantization.scores(inverted.vectors[:inverted.size], query,
+                                                  self._scales(inverted)))
+        if not ids:
+            return []
+        ids, scores = np.concatenate(ids), np.concatenate(scores)
+        k = min(k, len(ids))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return list(zip(ids[top].tolist(), scores[top].tolist()))
+
+    # ---- Persistence ----
+
+    def save(self, path: str, stamp=None):
+        """Atomically persist the index to *path*, tagged with the owner's *stamp*."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump({
+                "version": INDEX_VERSION,
+                "dim": self.dim,
+                "nlist_setting": self.nlist_setting,
+                "nprobe": self.nprobe,
+                "codec": self.codec,
+                "trained_size": self.trained_size,
+                "stamp": stamp,
+                "sizes": [l.size for l in self.lists],
+            }, f, protocol=pickle.HIGHEST_PROTOCOL)
+            np.save(f, self.centroids)
+            np.save(f, np.concatenate([l.ids[:l.size] for l in self.lists]))
+            np.save(f, np.concatenate([l.vectors[:l.size] for l in self.lists]))
+            np.save(f, np.concatenate([l.scales[:l.size] if l.scales is not None
+                                       else np.zeros(0, dtype=np.float32) for l in self.lists]))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str):
+        """Load an index saved by ``save``; None if missing or stale."""
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, "rb") as f:
+                state = pickle.load(f)
+                centroids, ids, vectors, scales = np.load(f), np.load(f), np.load(f), np.load(f)
+        except Exception as exc:
+            logger.warning("Could not load ANN index %s: %s", path, exc)
+            return None
+        if state.get("version") != INDEX_VERSION:
+            return None
+        index = cls(state["dim"], state["nlist_setting"], state["nprobe"], state["codec"])
+        index.centroids = centroids
+        index.trained_size = state["trained_size"]
+        index.stamp = state["stamp"]
+        index.lists = []
+        start = 0
+        for number, size in enumerate(state["sizes"]):
+            inverted = _InvertedList(index.dim, max(16, size), index.codec)
+            inverted.append(ids[start:start + size], vectors[start:start + size],
+                            scales[start:start + size] if index.codec == "int8" else None)
+            index.where.update((item, (number, p)) for p, item in enumerate(ids[start:start + size].tolist()))
+            index.lists.append(inverted)
+            start += size
+        return index
+
+
+ANN_METHODS = {"ivf": IVFFlatIndex}
+
+
+class AnnIndex:
+    """
+    An owner's ANN index, built and retrained off the request path.
+
+    Args:
+        dim: vector width (None: taken from the vectors at the first build)
+        method: key of ``ANN_METHODS``, or "exact" for none
+        min_rows: below this many vectors the owner's exact scan is used
+        path: where ``save`` persists the index (optional)
+        codec: ``quantization`` codec of the list vectors; owners re-rank
+            approximate hits unless it is float32
+    """
+
+    def __init__(self, dim, method: str, min_rows: int, nlist: int = 0,
+                 nprobe: int = 16, path: str = None, codec: str = "float32"):
+        self.dim = dim
+        self.codec = quantization.check_codec(codec)
+        self.factory = ANN_METHODS.get(method)
+        self.min_rows = min_rows
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.path = path
+        self.index = None
+        self._building = False
+        self._changed = set()         # ids written while a build was running
+        self._lock = threading.Lock()
+
+    def load(self, stamp) -> bool:
+        """Adopt the persisted index if it was saved at the owner's *stamp*."""
+        if self.factory is None or not self.path:
+            return False
+        index = self.factory.load(self.path)
+        if (index is None or index.stamp != stamp or index.codec != self.codec
+                or index.dim != (self.dim or index.dim)):
+            return False
+        index.nprobe = self.nprobe
+        self.index = index
+        return True
+
+    def save(self, stamp):
+        """Persist the index; *stamp* must cover exactly the writes it holds."""
+        with self._lock:
+            if self.index is not None and self.path:
+                self.index.save(self.path, stamp)
+
+    def upsert(self, ids, vectors):
+        with self._lock:
+            if self.index is not None:
+                self.index.add(ids, vectors)
+            if self._building:
+                self._changed.update(int(i) for i in ids)
+
+    def remove(self, ids):
+        with self._lock:
+            if self.index is not None:
+                self.index.remove(ids)
+            if self._building:
+                self._changed.update(int(i) for i in ids)
+
+    def memory_bytes(self) -> int:
+        index = self.index
+        return 0 if index is None else index.memory_bytes()
+
+    def search(self, query, k: int):
+        """Approximate neighbours, or None when the owner should scan exactly."""
+        index = self.index
+        if index is None:
+            return None
+        with self._lock:
+            return index.search(query, k)
+
+    def ensure(self, live_count: int, snapshot, lookup, stamp):
+        """
+        Start a background (re)build when the owner has grown enough.
+
+        Args:
+            live_count: number of vectors the owner holds
+            snapshot: () -> (ids, vectors) of every live vector
+            lookup: id -> current vector, or None once removed
+            stamp: () -> the owner's write stamp, read under the owner's lock
+                (owners call ``upsert`` / ``remove`` while holding it)
+        """
+        if self.factory is None or self._building or live_count < self.min_rows:
+            return
+        if self.index is not None and not self.index.needs_training(self.min_rows):
+            return
+        with self._lock:
+            if self._building:
+                return
+            self._building = True
+            self._changed = set()
+        threading.Thread(target=self._build, args=(snapshot, lookup, stamp), daemon=True).start()
+
+    def _build(self, snapshot, lookup, stamp):
+        started = time.time()
+        try:
+            ids, vectors = snapshot()
+            index = self.factory(vectors.shape[1], self.nlist, self.nprobe, self.codec)
+            index.add(ids, vectors)
+            index.train()
+            # Replay writes made during the build.  Lookups run outside the
+            # lock (the owner holds its own lock while calling upsert).
+            while True:
+                with self._lock:
+                    changed, self._changed = self._changed, set()
+                    if not changed:
+                        self.index = index
+                        break
+                for item in changed:
+                    vector = lookup(item)
+                    if vector is None:
+                        index.remove([item])
+                    else:
+                        index.add([item], [vector])
+            logger.info(
+                "ANN index built: %d vectors in %d lists in %.1fs",
+                len(index), len(index.lists), time.time() - started,
+            )
+            # Read before saving: writes after it are then in the index but
+            # not the stamp, which only makes a later load rebuild
+            self.save(stamp())
+        except Exception as exc:
+            logger.error("ANN index build failed: %s", exc)
+        finally:
+            with self._lock:
+                self._building = False
+                self._changed = set()
@@ -0,0 +1,380 @@
+"""
+Autocomplete Service – In-memory Prefix Index for /search/suggest
+===================================================================
+/search/suggest is hit on every keystroke, so it must not touch MongoDB.
+This module keeps a sorted array of ``(key, entry)`` pairs where each key
+is a normalised suffix of a case number, title, judge name or statute
+starting at a word boundary.  A prefix lookup is a ``bisect`` to the first
+matching key followed by a scan of the contiguous matching run.
+
+Scans are not repeated per keystroke: every prefix that has been looked up
+keeps its ``TOP_CAPACITY`` best matches of each kind, and writes update
+those rankings in place instead of dropping them.  The one- and two-letter
+prefixes – the longest runs – are ranked when the index is built and kept
+for the worker's lifetime; longer prefixes live in an LRU memo.
+
+Cases are ranked by recency (judgment date, falling back to year);
+judges and statutes by popularity (number of cases citing them).  The
+index is built from MongoDB once per worker and then maintained by
+``services.case_events``; writes made by other workers are picked up by
+``refresh()`` through an ``updated_at`` watermark and deletion
+tombstones, which ``services.index_sync`` runs in the background, off the
+request path.
+"""
+
+import bisect
+import heapq
+import re
+import threading
+import time
+import logging
+from collections import OrderedDict
+from datetime import datetime
+
+from services import index_sync
+from services.text_analysis import fold
+
+logger = logging.getLogger(__name__)
+
+MAX_KEY_LENGTH = 60        # keys are truncated; longer prefixes still match
+MAX_WORD_STARTS = 8        # suffixes indexed per text (one per leading word)
+CACHE_SIZE = 4096          # memoised longer prefixes
+MAX_SUGGESTIONS = 25       # largest limit /search/suggest accepts
+TOP_CAPACITY = 50          # ranked matches kept per prefix and kind
+PINNED_PREFIX_LENGTH = 2   # prefixes up to this length are ranked at build time
+
+ENTITY_FIELDS = {"judge": "judge_names", "statute": "cited_statutes"}
+CASE_FIELDS = ("case_number", "title", "court", "judgment_date", "year",
+               "duplicate_of", "updated_at") + tuple(ENTITY_FIELDS.values())
+
+_NON_ALNUM_RE = re.compile(r"[\W_]+", re.UNICODE)
+
+
+def normalize(text: str) -> str:
+    """Fold case and script variants, collapse punctuation: 'C.R. 297/25' ~ 'c r 297 25'."""
+    return _NON_ALNUM_RE.sub(" ", fold(text)).strip()
+
+
+def _word_start_keys(text: str) -> list:
+    """Normalised suffixes of *text* starting at each of its first words."""
+    norm = normalize(text)
+    if not norm:
+        return []
+    keys = []
+    start = 0
+    for _ in range(MAX_WORD_STARTS):
+        keys.append(norm[start:start + MAX_KEY_LENGTH])
+        nxt = norm.find(" ", start)
+        if nxt == -1:
+            break
+        start = nxt + 1
+    return keys
+
+
+def _recency_score(case) -> float:
+    judgment_date = case.get("judgment_date")
+    if isinstance(judgment_date, datetime):
+        return judgment_date.timestamp()
+    if case.get("year"):
+        return datetime(int(case["year"]), 1, 1).timestamp()
+    return 0.0
+
+
+class _Ranked:
+    """
+    Best matches of one prefix: per group ("cases" / "terms") a list of
+    ``(-score, entry_id)`` sorted best first and holding either every match
+    (``complete``) or exactly the top ``len(list)`` of them.
+    """
+
+    __slots__ = ("groups", "complete")
+
+    def __init__(self, groups, complete):
+        self.groups = groups
+        self.complete = complete
+
+    def add(self, group, item):
+        ranked = self.groups[group]
+        if not self.complete[group] and (not ranked or item > ranked[-1]):
+            # Below the list's tail there may be unseen matches that rank higher
+            return
+        bisect.insort(ranked, item)
+        if len(ranked) > TOP_CAPACITY:
+            ranked.pop()
+            self.complete[group] = False
+
+    def remove(self, group, item) -> bool:
+        """Drop *item*; False once the list is too short to answer every limit."""
+        ranked = self.groups[group]
+        i = bisect.bisect_left(ranked, item)
+        if i < len(ranked) and ranked[i] == item:
+            del ranked[i]
+        return self.complete[group] or len(ranked) >= MAX_SUGGESTIONS
+
+
+def _group(entry_id) -> str:
+    return "cases" if entry_id[0] == "case" else "terms"
+
+
+class AutocompleteIndex:
+    """Sorted-array prefix index over case numbers, titles, judges and statutes."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._items = []          # sorted list of (key, entry_id)
+        self._entries = {}        # entry_id -> suggestion payload (+ "score")
+        self._entry_keys = {}     # entry_id -> list of keys
+        self._case_entities = {}  # case id -> {field: names} for popularity deltas
+        self._top = {}            # short prefix -> _Ranked, kept for the worker's lifetime
+        self._cache = OrderedDict()  # longer prefix -> _Ranked, LRU
+        self._bulk = False        # build(): sort the keys once at the end, not per insert
+        self._last_refresh = 0.0
+        self.watermark = None
+        self.deleted_through = datetime.utcnow()   # deletion tombstones applied up to here
+
+    # ---- Writes ----
+
+    def _ranked_for(self, keys):
+        """Materialised rankings of every prefix of *keys*."""
+        prefixes = {key[:i] for key in keys for i in range(1, len(key) + 1)}
+        for prefix in prefixes:
+            store = self._top if len(prefix) <= PINNED_PREFIX_LENGTH else self._cache
+            ranked = store.get(prefix)
+            if ranked is not None:
+                yield store, prefix, ranked
+
+    def _rank_entry(self, entry_id):
+        if self._bulk:
+            return
+        item = (-self._entries[entry_id]["score"], entry_id)
+        group = _group(entry_id)
+        for _, _, ranked in self._ranked_for(self._entry_keys[entry_id]):
+            ranked.add(group, item)
+
+    def _unrank_entry(self, entry_id):
+        if self._bulk:
+            return
+        item = (-self._entries[entry_id]["score"], entry_id)
+        group = _group(entry_id)
+        for store, prefix, ranked in list(self._ranked_for(self._entry_keys[entry_id])):
+            if not ranked.remove(group, item):
+                del store[prefix]      # rescanned on its next lookup
+
+    def _insert_entry(self, entry_id, keys, payload):
+        self._entries[entry_id] = payload
+        self._entry_keys[entry_id] = keys
+        if self._bulk:
+            return
+        for key in keys:
+            bisect.insort(self._items, (key, entry_id))
+        self._rank_entry(entry_id)
+
+    def _remove_entry(self, entry_id):
+        if entry_id not in self._entries:
+            return
+        self._unrank_entry(entry_id)
+        keys = self._entry_keys.pop(entry_id)
+        self._entries.pop(entry_id)
+        if self._bulk:
+            return
+        for key in keys:
+            i = bisect.bisect_left(self._items, (key, entry_id))
+            if i < len(self._items) and self._items[i] == (key, entry_id):
+                del self._items[i]
+
+    def _adjust_entity(self, kind, name, delta):
+        norm = normalize(name)
+        if not norm:
+            return
+        entry_id = (kind, norm)
+        entry = self._entries.get(entry_id)
+        count = (entry["count"] if entry else 0) + delta
+        if count <= 0:
+            self._remove_entry(entry_id)
+        elif entry:
+            self._unrank_entry(entry_id)
+            entry["count"] = entry["score"] = count
+            self._rank_entry(entry_id)
+        else:
+            payload = {"type": kind, "text": name, "count": count, "score": count}
+            self._insert_entry(entry_id, _word_start_keys(name), payload)
+
+    def add_case(self, case):
+        """Index (or re-index) a Case document or raw case dict."""
+        if not isinstance(case, dict):
+            case = {f: getattr(case, f, None) for f in ("id",) + CASE_FIELDS}
+        case_id = str(case.get("id") or case.get("_id"))
+        with self._lock:
+            updated_at = case.get("updated_at")
+            if updated_at and (self.watermark is None or updated_at > self.watermark):
+                self.watermark = updated_at
+            if case.get("duplicate_of"):
+                # Flagged near-duplicates are never suggested
+                self.remove_case(case_id)
+                return
+            self._remove_entry(("case", case_id))
+            keys = sorted(set(
+                _word_start_keys(case.get("case_number")) + _word_start_keys(case.get("title"))
+            ))
+            payload = {
+                "type": "case",
+                "id": case_id,
+                "case_number": case.get("case_number"),
+                "title": (case.get("title") or "")[:100],
+                "court": case.get("court"),
+                "score": _recency_score(case),
+            }
+            self._insert_entry(("case", case_id), keys, payload)
+
+            previous = self._case_entities.get(case_id, {})
+            current = {}
+            for kind, field in ENTITY_FIELDS.items():
+                old = set(previous.get(field, ()))
+                new = set(case.get(field) or [])
+                for name in new - old:
+                    self._adjust_entity(kind, name, +1)
+                for name in old - new:
+                    self._adjust_entity(kind, name, -1)
+                current[field] = tuple(new)
+            self._case_entities[case_id] = current
+
+    def remove_case(self, case_id):
+        """Drop a case and decrement the popularity of its judges/statutes."""
+        case_id = str(case_id)
+        with self._lock:
+            self._remove_entry(("case", case_id))
+            previous = self._case_entities.pop(case_id, {})
+            for kind, field in ENTITY_FIELDS.items():
+                for name in previous.get(field, ()):
+                    self._adjust_entity(kind, name, -1)
+
+    # ---- Reads ----
+
+    def _scan(self, norm) -> _Ranked:
+        """Rank every entry under *norm* from the sorted keys."""
+        seen = set()
+        i = bisect.bisect_left(self._items, (norm,))
+        while i < len(self._items) and self._items[i][0].startswith(norm):
+            seen.add(self._items[i][1])
+            i += 1
+        groups = {"cases": [], "terms": []}
+        for entry_id in seen:
+            groups[_group(entry_id)].append((-self._entries[entry_id]["score"], entry_id))
+        complete = {}
+        for group, items in groups.items():
+            complete[group] = len(items) <= TOP_CAPACITY
+            groups[group] = heapq.nsmallest(TOP_CAPACITY, items)
+        return _Ranked(groups, complete)
+
+    def _ranked(self, norm) -> _Ranked:
+        if len(norm) <= PINNED_PREFIX_LENGTH:
+            ranked = self._top.get(norm)
+            if ranked is None:
+                ranked = self._top[norm] = self._scan(norm)
+            return ranked
+        ranked = self._cache.get(norm)
+        if ranked is not None:
+            self._cache.move_to_end(norm)
+            return ranked
+        ranked = self._cache[norm] = self._scan(norm)
+        if len(self._cache) > CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return ranked
+
+    def suggest(self, prefix: str, limit: int = 10) -> dict:
+        """
+        Top suggestions for *prefix* (at most ``TOP_CAPACITY`` of each kind).
+
+        Returns:
+            dict with "cases" (most recent first) and "terms" (judges and
+            statutes, most cited first)
+        """
+        norm = normalize(prefix)[:MAX_KEY_LENGTH]
+        if not norm:
+            return {"cases": [], "terms": []}
+
+        strip = lambda m: {k: v for k, v in m.items() if k != "score"}
+        with self._lock:
+            ranked = self._ranked(norm)
+            return {
+                group: [strip(self._entries[entry_id]) for _, entry_id in items[:limit]]
+                for group, items in (("cases", ranked.groups["cases"]),
+                                     ("terms", ranked.groups["terms"]))
+            }
+
+    # ---- Build ----
+
+    def build(self):
+        """(Re)build the whole index from the cases collection."""
+        from models.case_model import Case
+
+        started = time.time()
+        with self._lock:
+            self._items = []
+            self._entries = {}
+            self._entry_keys = {}
+            self._case_entities = {}
+            self._top = {}
+            self._cache.clear()
+            self.watermark = None
+            self.deleted_through = datetime.utcnow()
+            self._bulk = True
+            try:
+                for doc in Case.objects.only(*CASE_FIELDS).as_pymongo().batch_size(1000):
+                    self.add_case(doc)
+            finally:
+                self._bulk = False
+                self._items = sorted(
+                    (key, entry_id) for entry_id, keys in self._entry_keys.items() for key in keys
+                )
+            # The one- and two-letter prefixes have the longest runs; rank
+            # them now so no keystroke ever scans one
+            for length in range(1, PINNED_PREFIX_LENGTH + 1):
+                for prefix in {key[:length] for key, _ in self._items if len(key) >= length}:
+                    self._top[prefix] = self._scan(prefix)
+        logger.info(
+            "Autocomplete index built: %d entries, %d keys in %.1fs",
+            len(self._entries), len(self._items), time.time() - started,
+        )
+
+    def refresh(self, min_interval: float = 0):
+        """Apply cases written and deleted by other workers since the last watermarks."""
+        from models.case_deletion import CaseDeletion
+        from models.case_model import Case
+
+        now = time.time()
+        if now - self._last_refresh < min_interval:
+            return
+        self._last_refresh = now
+        # No watermark yet means the index was built from an empty collection
+        query = Case.objects(updated_at__gt=self.watermark) if self.watermark else Case.objects
+        for doc in query.only(*CASE_FIELDS).as_pymongo():
+            self.add_case(doc)
+        deleted, self.deleted_through = CaseDeletion.since(self.deleted_through)
+        for case_id in deleted:
+            self.remove_case(case_id)
+
+
+# ---------------------------------------------------------------------------
+# Process-wide instance
+# ---------------------------------------------------------------------------
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_autocomplete_index() -> AutocompleteIndex:
+    """Return the shared AutocompleteIndex, building it on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = AutocompleteIndex()
+                index.build()
+                index_sync.register("autocomplete", index.refresh)
+                _index = index
+    return _index
+
+
+def suggest(prefix: str, limit: int = 10) -> dict:
+    """Suggestions for *prefix* from this worker's index."""
+    return get_autocomplete_index().suggest(prefix, min(limit, MAX_SUGGESTIONS))
@@ -0,0 +1,165 @@
+"""
+Case Events – Keep Derived Structures in Step with Case Writes
+================================================================
+Every code path that creates, updates or deletes a Case (the scrapers'
+``save_case`` and the /cases CRUD routes) reports the write here, and this
+module fans it out to the in-process indexes built on top of the
+collection.  A failure in any derived structure is logged and never fails
+the write itself – the structures can always be rebuilt from MongoDB.
+
+Other workers see updates through each structure's ``updated_at``
+watermark; deletions leave a ``CaseDeletion`` tombstone for them.
+"""
+
+import logging
+
+from config import get_config
+from models.case_deletion import CaseDeletion
+from services import generations
+from services.autocomplete import get_autocomplete_index
+from services.filter_catalogue import apply_case_delta
+from services.filter_index import get_filter_index
+from services.near_duplicates import get_near_duplicate_index
+from services.search_index import get_search_index
+from services.similarity_index import get_similarity_index
+from services.spelling import get_speller
+from services.vector_search import get_vector_index
+
+logger = logging.getLogger(__name__)
+
+# Fields whose previous values derived structures need in order to apply
+# an update as a delta (e.g. decrementing the old judges' counts).
+SNAPSHOT_FIELDS = ("court", "case_type", "status", "source", "year", "judge_names",
+                   "duplicate_of")
+
+
+def snapshot(case) -> dict:
+    """Capture the delta-relevant fields of a case before it is modified."""
+    return {
+        field: list(value) if isinstance(value, list) else value
+        for field, value in ((f, getattr(case, f, None)) for f in SNAPSHOT_FIELDS)
+    }
+
+
+def _listed(values: dict):
+    """*values* (a snapshot), or None for a flagged near-duplicate, which no count includes."""
+    return None if not values or values.get("duplicate_of") else values
+
+
+def case_saved(case, previous: dict = None):
+    """
+    Call after a Case has been inserted or updated.
+
+    Args:
+        case: the saved Case
+        previous: ``snapshot(case)`` taken before an update; None for inserts
+    """
+    cfg = get_config()
+    generations.bump("cases", case.court)
+    if previous and previous.get("court") != case.court:
+        generations.bump("cases", previous.get("court"))
+    try:
+        apply_case_delta(_listed(previous), _listed(snapshot(case)))
+    except Exception as exc:
+        logger.error("Filter catalogue update failed for case %s: %s", case.id, exc)
+    try:
+        index = get_search_index()
+        index.add_case(case)
+        index.maybe_save(cfg.SEARCH_INDEX_SAVE_EVERY, cfg.SEARCH_INDEX_SAVE_SECONDS)
+    except Exception as exc:
+        logger.error("Search index update failed for case %s: %s", case.id, exc)
+    try:
+        get_filter_index().add_case(case)
+    except Exception as exc:
+        logger.error("Filter index update failed for case %s: %s", case.id, exc)
+    try:
+        get_autocomplete_index().add_case(case)
+    except Exception as exc:
+        logger.error("Autocomplete update failed for case %s: %s", case.id, exc)
+    try:
+        similarity = get_similarity_index()
+        similarity.add_case(case)
+        similarity.maybe_save(cfg.SEARCH_INDEX_SAVE_EVERY, cfg.SEARCH_INDEX_SAVE_SECONDS)
+    except Exception as exc:
+        logger.error("Similarity index update failed for case %s: %s", case.id, exc)
+    try:
+        duplicates = get_near_duplicate_index()
+        duplicates.add_case(case)
+        duplicates.maybe_save(cfg.SEARCH_INDEX_SAVE_EVERY, cfg.SEARCH_INDEX_SAVE_SECONDS)
+    except Exception as exc:
+        logger.error("Near-duplicate index update failed for case %s: %s", case.id, exc)
+    try:
+        get_speller().add_case(case)
+    except Exception as exc:
+        logger.error("Spelling dictionary update failed for case %s: %s", case.id, exc)
+    try:
+        vectors = get_vector_index()
+        if vectors is not None:
+            vectors.add_cases([case])
+            vectors.maybe_save(cfg.SEARCH_INDEX_SAVE_EVERY, cfg.SEARCH_INDEX_SAVE_SECONDS)
+    except Exception as exc:
+        logger.error("Vector index update failed for case %s: %s", case.id, exc)
+
+
+def case_deleted(case):
+    """Call after a Case has been deleted."""
+    cfg = get_config()
+    generations.bump("cases", case.court)
+    try:
+        # Other workers' structures drop the case when they next refresh
+        CaseDeletion(case_id=str(case.id)).save()
+    except Exception as exc:
+        logger.error("Deletion tombstone failed for case %s: %s", case.id, exc)
+    try:
+        apply_case_delta(_listed(snapshot(case)), None)
+    except Exception as exc:
+        logger.error("Filter catalogue update failed for case %s: %s", case.id, exc)
+    try:
+        index = get_search_index()
+        index.remove(case.id)
+        index.maybe_save(cfg.SEARCH_INDEX_SAVE_EVERY, cfg.SEARCH_INDEX_SAVE_SECONDS)
+    except Exception as exc:
+        logger.error("Search index removal failed for case %s: %s", case.id, exc)
+    try:
+        get_filter_index().remove_case(case.id)
+    except Exception as exc:
+        logger.error("Filter index removal failed for case %s: %s", case.id, exc)
+    try:
+        get_autocomplete_index().remove_case(case.id)
+    except Exception as exc:
+        logger.error("Autocomplete removal failed for case %s: %s", case.id, exc)
+    try:
+        similarity = get_similarity_index()
+        similarity.remove(case.id)
+        similarity.maybe_save(cfg.SEARCH_INDEX_SAVE_EVERY, cfg.SEARCH_INDEX_SAVE_SECONDS)
+    except Exception as exc:
+        logger.error("Similarity index removal failed for case %s: %s", case.id, exc)
+    try:
+        duplicates = get_near_duplicate_index()
+        duplicates.remove(case.id)
+        duplicates.maybe_save(cfg.SEARCH_INDEX_SAVE_EVERY, cfg.SEARCH_INDEX_SAVE_SECONDS)
+    except Exception as exc:
+        logger.error("Near-duplicate index removal failed for case %s: %s", case.id, exc)
+    try:
+        get_speller().remove_case(case.id)
+    except Exception as exc:
+        logger.error("Spelling dictionary removal failed for case %s: %s", case.id, exc)
+    try:
+        vectors = get_vector_index()
+        if vectors is not None:
+            vectors.remove(case.id)
+    except Exception as exc:
+        logger.error("Vector index removal failed for case %s: %s", case.id, exc)
+
+
+def flush():
+    """Persist derived structures, e.g. at the end of a scrape job."""
+    try:
+        get_search_index().save()
+        get_similarity_index().save()
+        get_near_duplicate_index().save()
+        vectors = get_vector_index()
+        if vectors is not None:
+            vectors.save()
+    except Exception as exc:
+        logger.error("Search index save failed: %s", exc)
@@ -0,0 +1,255 @@
+"""
+Case Number Service – Canonical Keys and Fuzzy Lookup
+=======================================================
+The same case is written many ways: the LHC scraper produces "Civil
+Revision 29718/25", users type "C.R. 29718 of 2025", and the Supreme Court
+scraper synthesizes "SC-<filename>" numbers from URLs.  ``case_number_key``
+reduces all of these to one canonical key
+
+    <number>/<4-digit year>/<type code>        e.g. "29718/2025/CR"
+
+which is stored on every Case and backs a unique (court, key) index, so a
+lookup is a single index seek.  The number comes first so that the fuzzy
+fallback can fetch a small candidate set with an anchored prefix scan on
+the number before ranking by edit distance.
+
+Numbers that do not follow the "<type> <number>/<year>" shape (synthetic
+scraper ids, citations) fall back to a ``~``-prefixed slug, which still
+makes exact lookups indexable.
+"""
+
+import logging
+import re
+from datetime import datetime
+
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+# Canonical type code -> spellings seen in cause lists, judgments and user
+# input.  Spellings are matched after lower-casing and collapsing
+# punctuation, either as words ("civil revision") or squashed ("cr").
+CASE_TYPES = {
+    "CA": ["civil appeal", "ca"],
+    "CP": ["civil petition", "cp", "cpla", "civil petition for leave to appeal"],
+    "CR": ["civil revision", "cr", "c rev", "civil rev"],
+    "CRP": ["civil review petition", "civil review", "crp"],
+    "CM": ["civil misc", "civil miscellaneous", "civil misc application", "cm", "cma"],
+    "CO": ["civil original", "co"],
+    "CRLA": ["criminal appeal", "crl appeal", "crla", "cr a"],
+    "CRLP": ["criminal petition", "crl petition", "crlp", "crl pla", "crl p l a",
+             "criminal petition for leave to appeal"],
+    "CRLR": ["criminal revision", "crl revision", "crl rev", "crlr"],
+    "CRLM": ["criminal misc", "criminal miscellaneous", "crl misc", "crlm", "crl m"],
+    "CRLO": ["criminal original", "crl original", "crl org", "crlo"],
+    "WP": ["writ petition", "wp", "writ"],
+    "CONSTP": ["constitution petition", "const petition", "const p", "constp"],
+    "ICA": ["intra court appeal", "ica"],
+    "RFA": ["regular first appeal", "rfa"],
+    "RSA": ["regular second appeal", "rsa"],
+    "FAO": ["first appeal from order", "fao"],
+    "FA": ["family appeal", "fa"],
+    "FP": ["family petition", "fp"],
+    "SMC": ["suo motu case", "suo moto case", "smc"],
+    "HRC": ["human rights case", "hrc"],
+    "EFA": ["execution first appeal", "efa"],
+    "TA": ["tax appeal", "ta"],
+    "TR": ["tax reference", "tr"],
+}
+
+# Codes earlier tables derived for spellings now listed above; keys ending
+# in one are re-derived by ``backfill_keys``
+RETIRED_TYPE_CODES = ("CRLPLA",)
+
+TYPE_ABBREVIATIONS = {
+    spelling: code for code, spellings in CASE_TYPES.items() for spelling in spellings
+}
+
+FALLBACK_PREFIX = "~"
+
+# "29718/25", "29718 of 2025", "1234-B/2024", "No. 12-2019"
+_NUMBER_YEAR_RE = re.compile(
+    r"(?P<number>\d+(?:\s*-?\s*[A-Z](?![A-Z]))?)\s*(?:/|-|\bOF\b)\s*(?P<year>\d{4}|\d{2})\b"
+)
+_NOISE_WORDS_RE = re.compile(r"\b(?:NO|NOS|NUMBER|IN)\b\.?")
+_NON_ALNUM_RE = re.compile(r"[^a-z0-9]+")
+
+
+def expand_year(year: str) -> int:
+    """'25' -> 2025, '98' -> 1998, '2025' -> 2025."""
+    value = int(year)
+    if len(year) == 4:
+        return value
+    pivot = datetime.utcnow().year % 100 + 1
+    return 2000 + value if value <= pivot else 1900 + value
+
+
+def type_code(text: str) -> str:
+    """Canonical code for a case-type phrase ('Crl. Appeal' -> 'CRLA')."""
+    words = _NON_ALNUM_RE.sub(" ", (text or "").lower()).split()
+    if not words:
+        return ""
+    phrase = " ".join(words)
+    squashed = "".join(words)
+    code = TYPE_ABBREVIATIONS.get(phrase) or TYPE_ABBREVIATIONS.get(squashed)
+    return code or squashed.upper()[:20]
+
+
+def case_number_key(case_number: str):
+    """
+    Canonical key for a raw case number, or None if it is empty.
+
+    >>> case_number_key("Civil Revision 29718/25")
+    '29718/2025/CR'
+    >>> case_number_key("C.R. No. 29718 of 2025")
+    '29718/2025/CR'
+    """
+    text = (case_number or "").strip()
+    if not text:
+        return None
+
+    upper = _NOISE_WORDS_RE.sub(" ", text.upper())
+    match = _NUMBER_YEAR_RE.search(upper)
+    if match:
+        number = re.sub(r"[\s\-]", "", match.group("number")).lstrip("0") or "0"
+        year = expand_year(match.group("year"))
+        return f"{number}/{year}/{type_code(upper[:match.start()])}"
+
+    slug = _NON_ALNUM_RE.sub("-", text.lower()).strip("-")
+    return f"{FALLBACK_PREFIX}{slug}" if slug else None
+
+
+def number_prefix(key: str) -> str:
+    """The leading ``<number>/`` of a parsed key, or '' for fallback keys."""
+    if not key or key.startswith(FALLBACK_PREFIX) or "/" not in key:
+        return ""
+    return key.split("/", 1)[0] + "/"
+
+
+def edit_distance(a: str, b: str, max_distance: int = None) -> int:
+    """
+    Levenshtein distance between *a* and *b*.  With *max_distance* the
+    computation stops early and returns ``max_distance + 1`` once every
+    alignment is already further apart than that.
+    """
+    if a == b:
+        return 0
+    if len(a) < len(b):
+        a, b = b, a
+    if max_distance is not None and len(a) - len(b) > max_distance:
+        return max_distance + 1
+
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ca != cb),
+            ))
+        if max_distance is not None and min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+
+# ---------------------------------------------------------------------------
+# Lookup
+# ---------------------------------------------------------------------------
+FUZZY_CANDIDATES = 200
+
+
+def _card_rows(match: dict, limit: int, sort: dict = None):
+    from models.case_model import Case
+
+    pipeline = [
+        {"$match": match},
+        *([{"$sort": sort}] if sort else []),
+        {"$limit": limit},
+        {"$project": Case.card_projection("case_number_key")},
+    ]
+    return list(Case._get_collection().aggregate(pipeline))
+
+
+def lookup(case_number: str, court: str = None, limit: int = 5) -> dict:
+    """
+    Resolve a user-typed case number.
+
+    Exact matches come from the (court, case_number_key) index.  When there
+    are none, the first ``FUZZY_CANDIDATES`` keys sharing the leading digits
+    of the number (an anchored prefix scan in key order on the key index)
+    are ranked by edit distance.
+
+    Returns:
+        dict with "key", "exact" (cards) and "suggestions" (cards with a
+        "distance" field, closest first)
+    """
+    from models.case_model import Case
+
+    key = case_number_key(case_number)
+    result = {"key": key, "exact": [], "suggestions": []}
+    if not key:
+        return result
+
+    scope = {"court": court} if court else {}
+    exact = _card_rows({**scope, "case_number_key": key}, limit)
+    if exact:
+        result["exact"] = [Case.card_json_from_son(row) for row in exact]
+        return result
+
+    prefix = number_prefix(key)
+    if prefix:
+        number = prefix[:-1]
+        anchor = number[:max(1, len(number) - 2)]
+    else:
+        anchor = key[:max(2, len(key) // 2)]
+    candidates = _card_rows(
+        {**scope, "case_number_key": {"$regex": "^" + re.escape(anchor)}},
+        FUZZY_CANDIDATES, sort={"case_number_key": 1},
+    )
+
+    max_distance = max(2, len(key) // 4)
+    scored = []
+    for row in candidates:
+        distance = edit_distance(key, row.get("case_number_key") or "", max_distance)
+        if distance <= max_distance:
+            scored.append((distance, row))
+    scored.sort(key=lambda pair: (pair[0], pair[1].get("case_number_key")))
+
+    for distance, row in scored[:limit]:
+        card = Case.card_json_from_son(row)
+        card["distance"] = distance
+        result["suggestions"].append(card)
+    return result
+
+
+def backfill_keys() -> dict:
+    """
+    Set ``case_number_key`` on cases saved before it existed, or keyed
+    under a ``RETIRED_TYPE_CODES`` code.  Rows whose key collides with an
+    existing case in the same court are duplicates of it and keep their old
+    key, or none (and are reported), rather than being merged blindly.
+
+    Returns:
+        {"updated": n, "duplicates": n}
+    """
+    from models.case_model import Case
+
+    collection = Case._get_collection()
+    stats = {"updated": 0, "duplicates": 0}
+    retired = re.compile("/(?:" + "|".join(RETIRED_TYPE_CODES) + ")$")
+    pending = Case.objects(__raw__={"$or": [
+        {"case_number_key": {"$exists": False}}, {"case_number_key": retired},
+    ]}).only("case_number", "case_number_key").as_pymongo()
+    for row in pending.batch_size(500):
+        key = case_number_key(row.get("case_number"))
+        if not key or key == row.get("case_number_key"):
+            continue
+        try:
+            collection.update_one({"_id": row["_id"]}, {"$set": {"case_number_key": key}})
+            stats["updated"] += 1
+        except DuplicateKeyError:
+            stats["duplicates"] += 1
+            logger.warning("Case %s duplicates case number key %s", row["_id"], key)
+    return stats
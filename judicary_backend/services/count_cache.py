@@ -0,0 +1,89 @@
+"""
+Count Cache – Cached and Estimated Totals for Paginated Endpoints
+===================================================================
+Paginated routes used to run a full ``count()`` before every page, which
+doubles the cost of a request and dominates on broad filters.  Totals are
+now resolved through ``count_documents`` in one of three modes:
+
+    exact     cached per normalised filter signature; recomputed once the
+              collection's write generation moves on or the TTL expires
+    estimate  any cached total younger than the estimate TTL, even if a
+              write has happened since; computed exactly on a miss
+    none      no count at all
+
+An unfiltered query never scans: it is answered from the collection
+metadata via ``estimated_document_count``.  So is a filter in
+``EXCLUSION_FILTERS``, which only leaves out a small, indexed set of rows
+(flagged near-duplicates): the estimate minus the cached exact count of
+the excluded rows.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+
+from config import get_config
+from services import generations
+
+COUNT_MODES = ("exact", "estimate", "none")
+
+# Filters counted as "everything but the rows where the field is set"
+EXCLUSION_FILTERS = ({"duplicate_of": None},)
+
+_cache = OrderedDict()   # (collection, signature) -> (generation, filled_at, count)
+_lock = threading.Lock()
+
+
+def filter_signature(queryset) -> str:
+    """Stable signature for the filter of a mongoengine queryset."""
+    raw = json.dumps(queryset._query, sort_keys=True, default=str)
+    return hashlib.sha1(raw.encode()).hexdigest()
+
+
+def count_documents(queryset, mode: str = "exact"):
+    """
+    Resolve the total for *queryset* according to *mode*.
+
+    Returns:
+        (total, is_estimate) – total is None when mode is "none"
+    """
+    if mode == "none":
+        return None, False
+
+    collection = queryset._document._get_collection_name()
+    if not queryset._query:
+        total = queryset._document._get_collection().estimated_document_count()
+        return total, mode == "estimate"
+    if queryset._query in EXCLUSION_FILTERS:
+        (field,) = queryset._query
+        excluded, _ = count_documents(queryset._document.objects(**{f"{field}__ne": None}))
+        total = queryset._document._get_collection().estimated_document_count()
+        return max(0, total - excluded), mode == "estimate"
+
+    cfg = get_config()
+    key = (collection, filter_signature(queryset))
+    generation = generations.current(collection)
+    now = time.time()
+
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None:
+            cached_gen, filled_at, total = entry
+            age = now - filled_at
+            if mode == "estimate" and age < cfg.COUNT_ESTIMATE_TTL_SECONDS:
+                _cache.move_to_end(key)
+                return total, cached_gen != generation
+            if cached_gen == generation and age < cfg.COUNT_CACHE_TTL_SECONDS:
+                _cache.move_to_end(key)
+                return total, False
+
+    total = queryset.count()
+
+    with _lock:
+        _cache[key] = (generation, now, total)
+        _cache.move_to_end(key)
+        while len(_cache) > cfg.COUNT_CACHE_MAX_ENTRIES:
+            _cache.popitem(last=False)
+    return total, False
@@ -0,0 +1,134 @@
+"""
+Document Find – Search Inside One Judgment
+============================================
+Opening a case used to mean shipping the whole ``judgment_text`` (often
+50 KB and more) so the browser could search it client-side.
+``find_in_case`` answers the same question from the search index:
+
+* the query – terms, "phrases", ``NEAR/n``, Roman-Urdu words: the
+  ``services.query_parser`` language – is matched against the case's
+  positional postings;
+* each hit's token positions are turned into character offsets through the
+  sparse anchors stored at index time (one every ``ANCHOR_INTERVAL``
+  tokens), and its paragraph number through the stored paragraph starts;
+* only a small window around each hit is read from MongoDB, with
+  ``$substrCP`` in a single aggregation, and re-tokenized from its anchor.
+"""
+
+import bisect
+
+from bson import ObjectId
+
+from models.case_model import Case
+from services.query_parser import Near, Phrase, parse, text_leaves
+from services.search_index import FIND_FIELDS, decode_positions, get_search_index
+from services.text_analysis import TOKEN_RE
+
+CONTEXT_CHARS = 80
+DEFAULT_LIMIT = 20
+MAX_LIMIT = 100
+ELLIPSIS = "…"
+
+# Read length after the last anchor of a field (at most ANCHOR_INTERVAL tokens)
+TAIL_CHARS = 4096
+
+
+def _spans(leaves: list, field: str, packed) -> list:
+    """(first, last) positions of every leaf hit in one field, outermost only."""
+    spans = set()
+    for leaf in leaves:
+        if leaf.field and leaf.field != field:
+            continue
+        if isinstance(leaf, (Phrase, Near)):
+            spans.update(leaf.spans(packed))
+        else:
+            spans.update((p, p) for p in decode_positions(packed, leaf.term))
+    result = []
+    for first, last in sorted(spans, key=lambda s: (s[0], -s[1])):
+        if result and last <= result[-1][1]:
+            continue    # inside a longer phrase hit
+        result.append((first, last))
+    return result
+
+
+def _read_range(anchors: list, first: int, last: int):
+    """(anchor, read start, read end) covering positions first..last plus context."""
+    positions = [p for p, _ in anchors]
+    anchor = anchors[bisect.bisect_right(positions, first) - 1]
+    following = bisect.bisect_right(positions, last)
+    end = anchors[following][1] if following < len(anchors) else anchor[1] + TAIL_CHARS
+    return anchor, max(0, anchor[1] - CONTEXT_CHARS), end + CONTEXT_CHARS
+
+
+def _locate(text: str, offset: int, anchor: tuple, first: int, last: int):
+    """Character range of positions first..last in *text* read from *offset*."""
+    anchor_position, anchor_start = anchor
+    start = None
+    tokens = TOKEN_RE.finditer(text, anchor_start - offset)
+    for position, match in enumerate(tokens, anchor_position):
+        if position == first:
+            start = offset + match.start()
+        if position == last:
+            return (start, offset + match.end()) if start is not None else None
+    return None
+
+
+def find_in_case(case_id: str, query: str, limit: int = DEFAULT_LIMIT, offset: int = 0) -> dict:
+    """
+    Occurrences of *query* inside one case's body fields, in document order.
+
+    Returns:
+        {"total", "fields": {field: hits}, "matches": [{"field", "paragraph",
+        "start", "end", "text", "match": [start, end]}]} where start/end are
+        character offsets into the field and "match" is the hit within "text"
+
+    Raises:
+        QuerySyntaxError for malformed queries
+    """
+    node = parse(query)
+    leaves = text_leaves(node) if node is not None else []
+    layout = get_search_index().document_layout(case_id) if leaves else {}
+
+    hits = []
+    counts = {}
+    for field in FIND_FIELDS:
+        if field not in layout:
+            continue
+        packed, anchors, paragraphs = layout[field]
+        spans = _spans(leaves, field, packed)
+        if spans:
+            counts[field] = len(spans)
+            hits.extend((field, first, last, anchors, paragraphs) for first, last in spans)
+    page = hits[offset:offset + limit]
+    result = {"total": len(hits), "fields": counts, "matches": []}
+    if not page:
+        return result
+
+    reads = [_read_range(anchors, first, last) for _, first, last, anchors, _ in page]
+    project = {
+        f"w{k}": {"$substrCP": [{"$ifNull": [f"${field}", ""]}, start, end - start]}
+        for k, ((field, _, _, _, _), (_, start, end)) in enumerate(zip(page, reads))
+    }
+    pipeline = [{"$match": {"_id": ObjectId(case_id)}}, {"$project": project}]
+    row = next(iter(Case._get_collection().aggregate(pipeline)), {})
+
+    for k, ((field, first, last, _, paragraphs), (anchor, start, end)) in enumerate(zip(page, reads)):
+        text = row.get(f"w{k}") or ""
+        located = _locate(text, start, anchor, first, last)
+        if located is None:
+            continue    # text changed since it was indexed
+        hit_start, hit_end = located
+        window_start = max(start, hit_start - CONTEXT_CHARS)
+        window_end = min(start + len(text), hit_end + CONTEXT_CHARS)
+        prefix = ELLIPSIS if window_start > 0 else ""
+        suffix = ELLIPSIS if window_end < start + len(text) or len(text) == end - start else ""
+        shift = len(prefix) - window_start
+        result["matches"].append({
+            "field": field,
+            "paragraph": bisect.bisect_right(paragraphs, hit_start),
+            "start": hit_start,
+            "end": hit_end,
+            "text": prefix + text[window_start - start:window_end - start] + suffix,
+            "match": [hit_start + shift, hit_end + shift],
+        })
+    return result
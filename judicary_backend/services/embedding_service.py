@@ -0,0 +1,78 @@
+"""
+Embedding Service – Sentence Embeddings for Dense Retrieval
+=============================================================
+Wraps a sentence-transformers model (the same MiniLM family used by
+``apiModel.AIJudge``) behind a lazily initialised singleton.  The package
+is optional: when it is not installed or the model cannot be loaded,
+``is_available()`` is False and callers fall back to lexical search.
+
+Vectors are returned L2-normalised as float32 so cosine similarity is a
+plain dot product.
+"""
+
+import logging
+import threading
+
+import numpy as np
+
+from config import get_config
+
+logger = logging.getLogger(__name__)
+
+# Characters of case text fed to the encoder; MiniLM truncates at 256
+# word pieces anyway, so more only costs tokenization time.
+MAX_EMBED_CHARS = 2000
+
+_model = None            # None: not tried yet, False: unavailable
+_model_lock = threading.Lock()
+
+
+def _init_model():
+    """Load the sentence-transformers model once."""
+    global _model
+    if _model is not None:
+        return
+    with _model_lock:
+        if _model is not None:
+            return
+        name = get_config().EMBEDDING_MODEL
+        try:
+            from sentence_transformers import SentenceTransformer
+            _model = SentenceTransformer(name, device="cpu")
+            logger.info("Embedding model loaded: %s", name)
+        except Exception as exc:
+            logger.warning("Embedding model unavailable (%s) – dense retrieval disabled", exc)
+            _model = False
+
+
+def is_available() -> bool:
+    _init_model()
+    return bool(_model)
+
+
+def dimension() -> int:
+    """Embedding width of the loaded model (0 when unavailable)."""
+    return _model.get_sentence_embedding_dimension() if is_available() else 0
+
+
+def case_text(case) -> str:
+    """The text embedded for a case: title, summary and headnotes."""
+    get = case.get if isinstance(case, dict) else lambda f: getattr(case, f, None)
+    parts = [get("title"), get("summary"), get("headnotes")]
+    return " \n".join(p for p in parts if p)[:MAX_EMBED_CHARS]
+
+
+def embed_texts(texts: list, batch_size: int = 32):
+    """
+    Encode *texts* as an (n, dim) float32 array of unit vectors.
+
+    Returns:
+        numpy array, or None when no model is available
+    """
+    if not is_available():
+        return None
+    vectors = _model.encode(
+        list(texts), batch_size=batch_size, convert_to_numpy=True,
+        normalize_embeddings=True, show_progress_bar=False,
+    )
+    return np.asarray(vectors, dtype=np.float32)
@@ -0,0 +1,367 @@
+"""
+Embedding Store – Contiguous On-disk Matrix of Case-file Embeddings
+=====================================================================
+The chatbot (``AIJudge.compare_embeddings_with_files``) and /createCase
+(``SimilarCasesRetrieval``) used to ``os.listdir`` the "Embeddings
+(complete  case)" directory and ``json.load`` one pretty-printed file per
+case on every request, scoring one vector at a time.  The store keeps the
+same embeddings as one matrix:
+
+* ``vectors.f32`` – float32 rows, L2-normalised at ingestion, read through
+  ``numpy.memmap`` so every worker shares the page cache;
+* ``ids.txt`` – one id (the case file name without extension) per row;
+* ``meta.json`` – format version and embedding width.
+
+Both files are append-only.  ``DLLM.process_files_in_directory`` appends a
+row for each new upload, other workers pick up new id lines on their next
+search, and a row is only visible once its id line is written.  A query is
+one BLAS matrix-vector product followed by ``argpartition`` for the top k;
+past ``ANN_MIN_ROWS`` embeddings it goes through an ``ann_index.AnnIndex``
+instead.  The first time the store is opened the existing JSON files are
+imported.
+
+With a float16 or int8 ``codec`` (``EMBEDDING_STORE_CODEC``) each worker
+keeps a ``quantization`` copy of the rows in memory, scans that instead,
+and re-ranks the best ``rerank`` candidates on their float32 rows, so only
+those pages of ``vectors.f32`` are touched.  Once the ANN index answers
+searches its lists hold the codes, and the store drops its own copy until
+an exact scan needs it again.
+"""
+
+import json
+import logging
+import os
+import threading
+
+import numpy as np
+
+from config import get_config
+from services import quantization
+from services.ann_index import AnnIndex
+
+try:
+    import fcntl
+except ImportError:    # Windows: appends are serialised per process only
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+STORE_VERSION = 1
+JSON_SUFFIX = "_embedding.json"
+
+
+def normalise_rows(vectors) -> np.ndarray:
+    """(n, dim) float32 copy of *vectors* with unit-length rows."""
+    matrix = np.array(vectors, dtype=np.float32, ndmin=2)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class EmbeddingStore:
+    """Append-only float32 embedding matrix with an id table."""
+
+    def __init__(self, directory: str, ann: AnnIndex = None, codec: str = "float32",
+                 rerank: int = 200):
+        self.directory = directory
+        self.ann = ann             # approximate search over the rows, or None
+        self.codec = quantization.check_codec(codec)
+        self.rerank = rerank       # quantized candidates re-scored in float32
+        self.vectors_path = os.path.join(directory, "vectors.f32")
+        self.ids_path = os.path.join(directory, "ids.txt")
+        self.meta_path = os.path.join(directory, "meta.json")
+        self._lock = threading.RLock()
+        self.dim = None
+        self.ids = []              # row -> id
+        self.rows = {}             # id -> latest row
+        self.matrix = np.zeros((0, 0), dtype=np.float32)
+        self.codes = None          # quantized rows (grown by doubling), or None
+        self.scales = None         # int8 per-row scales
+        self._encoded = 0          # rows of codes filled so far
+        self._ids_offset = 0       # bytes of ids.txt already read
+        self._sync()
+        if self.ann is not None and self.ann.load(len(self.ids)):
+            self._release_codes()
+
+    def __len__(self):
+        self._sync()
+        return len(self.rows)
+
+    def __contains__(self, item_id):
+        self._sync()
+        return item_id in self.rows
+
+    # ---- Reads ----
+
+    def _sync(self):
+        """Map rows appended (by any process) since the last call."""
+        try:
+            size = os.path.getsize(self.ids_path)
+        except OSError:
+            return
+        with self._lock:
+            if size == self._ids_offset:
+                return
+            if self.dim is None:
+                with open(self.meta_path, encoding="utf-8") as f:
+                    meta = json.load(f)
+                if meta.get("version") != STORE_VERSION:
+                    raise ValueError(f"Unsupported embedding store version in {self.directory}")
+                self.dim = meta["dim"]
+            with open(self.ids_path, "rb") as f:
+                f.seek(self._ids_offset)
+                chunk = f.read()
+            complete = chunk[:chunk.rfind(b"\n") + 1]
+            if not complete:
+                return
+            self._ids_offset += len(complete)
+            first, superseded = len(self.ids), []
+            for item_id in complete.decode("utf-8").splitlines():
+                if item_id in self.rows:
+                    superseded.append(self.rows[item_id])
+                self.rows[item_id] = len(self.ids)
+                self.ids.append(item_id)
+            # Vectors are written before their ids, so every id has its row
+            self.matrix = np.memmap(self.vectors_path, dtype=np.float32, mode="r",
+                                    shape=(len(self.ids), self.dim))
+            if self.codec != "float32" and not self._ann_ready():
+                self._encode_rows()
+            if self.ann is not None:
+                self.ann.remove(superseded)
+                self.ann.upsert(range(first, len(self.ids)), self.matrix[first:])
+
+    def _ann_ready(self) -> bool:
+        return self.ann is not None and self.ann.index is not None
+
+    def _encode_rows(self):
+        """Quantize the matrix rows not yet in ``codes`` / ``scales``."""
+        n, first = len(self.matrix), self._encoded
+        if self.codes is None or n > len(self.codes):
+            capacity = max(n, 2 * (0 if self.codes is None else len(self.codes)))
+            codes = np.zeros((capacity, self.dim), dtype=quantization.code_dtype(self.codec))
+            scales = np.zeros(capacity, dtype=np.float32)
+            if self.codes is not None:
+                codes[:first] = self.codes[:first]
+                scales[:first] = self.scales[:first]
+            self.codes, self.scales = codes, scales
+        for start in range(first, n, quantization.SCORE_CHUNK_ROWS):
+            end = min(n, start + quantization.SCORE_CHUNK_ROWS)
+            codes, scales = quantization.encode(self.matrix[start:end], self.codec)
+            self.codes[start:end] = codes
+            if scales is not None:
+                self.scales[start:end] = scales
+        self._encoded = n
+
+    def _release_codes(self):
+        """Drop the quantized copy while the ANN lists (which hold their own
+        codes) answer searches; ``_encode_rows`` rebuilds it if needed."""
+        self.codes = self.scales = None
+        self._encoded = 0
+
+    def memory_bytes(self) -> int:
+        """Bytes each worker holds for scanning: the codes, or the float32
+        matrix when unquantized (shared page cache), plus the ANN lists."""
+        self._sync()
+        n = len(self.ids)
+        if self.codec == "float32":
+            size = n * (self.dim or 0) * 4
+        else:
+            size = self._encoded * quantization.bytes_per_vector(self.dim, self.codec)
+        return size + (self.ann.memory_bytes() if self.ann is not None else 0)
+
+    def vector(self, item_id):
+        """The stored unit vector of *item_id*, or None."""
+        self._sync()
+        row = self.rows.get(item_id)
+        return None if row is None else np.array(self.matrix[row])
+
+    def find_id(self, text: str):
+        """*text* if it is a stored id, else the first id containing it."""
+        self._sync()
+        if text in self.rows:
+            return text
+        return next((item_id for item_id in self.rows if text and text in item_id), None)
+
+    def search(self, vector, k: int, exclude=None) -> list:
+        """
+        The *k* stored embeddings closest to *vector* by cosine similarity.
+
+        Returns:
+            list of (id, similarity), best first
+        """
+        self._sync()
+        with self._lock:
+            matrix, ids, rows = self.matrix, self.ids, self.rows
+        n = len(matrix)
+        if n == 0 or k <= 0:
+            return []
+        query = normalise_rows(vector)[0]
+        quantized = self.codec != "float32"
+        # Superseded rows and the excluded id may occupy top slots
+        take = min(n, k + (len(ids) - len(rows)) + 1)
+        candidates = None
+        if self.ann is not None:
+            self.ann.ensure(len(rows), self._ann_snapshot, self._ann_vector, self._ann_stamp)
+            hits = self.ann.search(query, max(k + 1, self.rerank) if quantized else k + 1)
+            if hits is not None:
+                candidates = np.array([row for row, _ in hits], dtype=np.int64)
+                scores = np.array([score for _, score in hits], dtype=np.float32)
+                if self.codes is not None:
+                    with self._lock:
+                        self._release_codes()
+        if candidates is None:
+            if quantized:
+                with self._lock:
+                    # Rebuilt here when the ANN index stopped answering
+                    self._encode_rows()
+                    codes, scales = self.codes, self.scales
+                scores = quantization.scores(codes[:n], query,
+                                             scales[:n] if self.codec == "int8" else None)
+                take = min(n, max(take, self.rerank))
+            else:
+                scores = matrix @ query
+            candidates = np.argpartition(-scores, take - 1)[:take]
+            scores = scores[candidates]
+        if quantized and len(candidates):
+            candidates = np.sort(candidates)       # sequential reads of the memmap
+            scores = matrix[candidates] @ query
+        order = np.argsort(-scores)
+        result = []
+        for row, score in zip(candidates[order].tolist(), scores[order].tolist()):
+            item_id = ids[row]
+            if rows.get(item_id) == row and item_id != exclude:
+                result.append((item_id, score))
+                if len(result) == k:
+                    break
+        return result
+
+    def search_id(self, item_id: str, k: int, exclude_self: bool = False) -> list:
+        """Neighbours of a stored embedding (itself first unless excluded)."""
+        vector = self.vector(item_id)
+        if vector is None:
+            return []
+        return self.search(vector, k, exclude=item_id if exclude_self else None)
+
+    def _ann_snapshot(self):
+        with self._lock:
+            rows = sorted(self.rows.values())
+            return rows, np.array(self.matrix[rows])
+
+    def _ann_vector(self, row):
+        with self._lock:
+            return np.array(self.matrix[row]) if self.rows.get(self.ids[row]) == row else None
+
+    def _ann_stamp(self):
+        # Rows are append-only, so the row count identifies the contents
+        with self._lock:
+            return len(self.ids)
+
+    # ---- Writes ----
+
+    def add_many(self, ids: list, vectors, skip_existing: bool = False) -> int:
+        """
+        Append rows; a repeated id supersedes its earlier row unless
+        *skip_existing*, which keeps the stored row instead (checked under
+        the file lock, so concurrent importers do not both append an id).
+
+        Returns:
+            number of rows appended
+        """
+        if not len(ids):
+            return 0
+        matrix = normalise_rows(vectors)
+        with self._lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, ".lock"), "a") as lock:
+                if fcntl is not None:
+                    fcntl.flock(lock, fcntl.LOCK_EX)
+                if not os.path.exists(self.meta_path):
+                    with open(self.meta_path, "w", encoding="utf-8") as f:
+                        json.dump({"version": STORE_VERSION, "dim": matrix.shape[1]}, f)
+                self._sync()
+                if self.dim is not None and matrix.shape[1] != self.dim:
+                    raise ValueError(f"Embedding width {matrix.shape[1]} != store width {self.dim}")
+                if skip_existing:
+                    keep = [i for i, item_id in enumerate(ids) if item_id not in self.rows]
+                    if not keep:
+                        return 0
+                    ids, matrix = [ids[i] for i in keep], matrix[keep]
+                # Vectors first: a row becomes visible only once its id is
+                # written.  Bytes past the last id are from an interrupted
+                # append and are dropped.
+                with open(self.vectors_path, "ab") as f:
+                    expected = len(self.ids) * matrix.shape[1] * matrix.itemsize
+                    if f.tell() != expected:
+                        f.truncate(expected)
+                    f.write(matrix.tobytes())
+                with open(self.ids_path, "ab") as f:
+                    f.write("".join(f"{item_id}\n" for item_id in ids).encode("utf-8"))
+            self._sync()
+        return len(ids)
+
+    def add(self, item_id: str, vector):
+        """Append one embedding."""
+        self.add_many([item_id], [vector])
+
+    def import_json_directory(self, directory: str, batch_size: int = 1000) -> int:
+        """
+        Append the ``{"filename", "embedding"}`` files of *directory* not yet
+        stored (the format ``DLLM.process_files_in_directory`` used to write).
+        Safe to run from several workers at once: each batch skips ids
+        another importer has appended meanwhile.
+
+        Returns:
+            number of embeddings imported
+        """
+        ids, vectors, imported = [], [], 0
+        for name in sorted(os.listdir(directory)):
+            if not name.endswith(".json"):
+                continue
+            item_id = name[:-len(JSON_SUFFIX)] if name.endswith(JSON_SUFFIX) else name[:-5]
+            if item_id in self:
+                continue
+            try:
+                with open(os.path.join(directory, name), encoding="utf-8") as f:
+                    embedding = json.load(f).get("embedding")
+            except (OSError, ValueError) as exc:
+                logger.warning("Skipping embedding file %s: %s", name, exc)
+                continue
+            if embedding is None:
+                continue
+            ids.append(item_id)
+            vectors.append(embedding)
+            if len(ids) == batch_size:
+                imported += self.add_many(ids, vectors, skip_existing=True)
+                ids, vectors = [], []
+        return imported + self.add_many(ids, vectors, skip_existing=True)
+
+
+# ---------------------------------------------------------------------------
+# Process-wide instance
+# ---------------------------------------------------------------------------
+_store = None
+_store_lock = threading.Lock()
+
+
+def get_embedding_store() -> EmbeddingStore:
+    """
+    Return the shared EmbeddingStore, importing the legacy JSON embedding
+    directory into it the first time it is opened empty.
+    """
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                cfg = get_config()
+                ann = AnnIndex(None, cfg.ANN_METHOD, cfg.ANN_MIN_ROWS, cfg.ANN_NLIST,
+                               cfg.ANN_NPROBE, os.path.join(cfg.EMBEDDING_STORE_DIR, "ann.ivf"),
+                               cfg.EMBEDDING_STORE_CODEC)
+                store = EmbeddingStore(cfg.EMBEDDING_STORE_DIR, ann, cfg.EMBEDDING_STORE_CODEC,
+                                       cfg.EMBEDDING_RERANK_CANDIDATES)
+                if not len(store) and os.path.isdir(cfg.CASE_EMBEDDINGS_DIR):
+                    count = store.import_json_directory(cfg.CASE_EMBEDDINGS_DIR)
+                    logger.info("Imported %d embedding files into %s", count, store.directory)
+                logger.info("Embedding store: %d rows, %s codec, %.1f MB in memory",
+                            len(store), store.codec, store.memory_bytes() / 2**20)
+                _store = store
+    return _store
@@ -0,0 +1,79 @@
+"""
+Facets Service – Result Page and Facet Counts in One Aggregation
+==================================================================
+The search page used to call /search and then /search/filters, which ran
+three ``distinct`` scans, a year aggregation and a judge ``$unwind`` over
+the whole collection – seven round trips, none of them scoped to the
+current query.  ``faceted_search`` runs a single ``$facet`` pipeline over
+the matched cases that returns the result page, the total and the facet
+counts together.
+"""
+
+import logging
+
+from models.case_model import Case
+
+logger = logging.getLogger(__name__)
+
+# Facet name in the response -> Case field counted
+VALUE_FACETS = {
+    "courts": "court",
+    "case_types": "case_type",
+    "statuses": "status",
+    "sources": "source",
+}
+TOP_JUDGES = 20
+MAX_YEAR_BUCKETS = 50
+
+
+def _facet_stages() -> dict:
+    stages = {
+        name: [
+            {"$match": {field: {"$nin": [None, ""]}}},
+            {"$group": {"_id": f"${field}", "count": {"$sum": 1}}},
+            {"$sort": {"count": -1}},
+        ]
+        for name, field in VALUE_FACETS.items()
+    }
+    stages["years"] = [
+        {"$match": {"year": {"$ne": None}}},
+        {"$group": {"_id": "$year", "count": {"$sum": 1}}},
+        {"$sort": {"_id": -1}},
+        {"$limit": MAX_YEAR_BUCKETS},
+    ]
+    stages["judges"] = [
+        {"$unwind": "$judge_names"},
+        {"$group": {"_id": "$judge_names", "count": {"$sum": 1}}},
+        {"$sort": {"count": -1}},
+        {"$limit": TOP_JUDGES},
+    ]
+    stages["total"] = [{"$count": "n"}]
+    return stages
+
+
+def faceted_search(match: dict, results_stages: list, extra_fields: tuple = ()):
+    """
+    Run the result page and all facet counts in one round trip.
+
+    Args:
+        match: raw Mongo filter for the current query (``queryset._query``)
+        results_stages: sort/skip/limit stages producing the result page
+        extra_fields: fields kept on result rows besides the card fields
+
+    Returns:
+        (rows, total, facets) – rows are raw dicts with card fields only
+    """
+    projection = {"$project": Case.card_projection(*extra_fields)}
+    facet = _facet_stages()
+    facet["results"] = results_stages + [projection]
+
+    pipeline = [{"$match": match}, {"$facet": facet}]
+    out = next(iter(Case._get_collection().aggregate(pipeline)), {})
+
+    total_rows = out.get("total") or []
+    total = total_rows[0]["n"] if total_rows else 0
+    facets = {
+        name: [{"value": row["_id"], "count": row["count"]} for row in out.get(name, [])]
+        for name in list(VALUE_FACETS) + ["years", "judges"]
+    }
+    return out.get("results", []), total, facets
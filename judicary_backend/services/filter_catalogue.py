@@ -0,0 +1,179 @@
+"""
+Filter Catalogue Service – Materialized Filter Values
+=======================================================
+/search/filters and the lawyer directory filters used to recompute
+``distinct`` values and a judge ``$unwind`` over the whole collection on
+every call.  The values now live in the ``filter_catalogue`` collection:
+case and lawyer writes apply small ``$addToSet``/``$inc``/``$min``/``$max``
+deltas, reads are a single document fetch, and ``reconcile()`` (run by the
+scheduler) rebuilds the documents from scratch to correct any drift, e.g.
+values that disappeared after deletes.
+"""
+
+import logging
+from datetime import datetime
+
+from models.case_model import Case
+from models.filter_catalogue import FilterCatalogue
+from models.lawyer_model import Lawyer
+
+logger = logging.getLogger(__name__)
+
+CASES_KEY = "cases"
+LAWYERS_KEY = "lawyers"
+TOP_JUDGES = 50
+
+# Catalogue list field -> Case field
+CASE_VALUE_FIELDS = {
+    "courts": "court",
+    "case_types": "case_type",
+    "statuses": "status",
+    "sources": "source",
+}
+
+
+def _escape_key(name: str) -> str:
+    """Mongo keys may not contain '.' or start with '$'."""
+    return name.replace(".", "．").replace("$", "＄")
+
+
+def _unescape_key(key: str) -> str:
+    return key.replace("．", ".").replace("＄", "$")
+
+
+def _collection():
+    return FilterCatalogue._get_collection()
+
+
+# ---- Incremental updates ----
+
+def apply_case_delta(old: dict = None, new: dict = None):
+    """
+    Fold one case write into the catalogue.
+
+    Args:
+        old: snapshot of the case before the write (None for inserts)
+        new: snapshot after the write (None for deletes)
+    """
+    update = {"$set": {"updated_at": datetime.utcnow()}}
+
+    if new:
+        add_to_set = {}
+        for list_field, case_field in CASE_VALUE_FIELDS.items():
+            value = new.get(case_field)
+            if value:
+                add_to_set[list_field] = value
+        if add_to_set:
+            update["$addToSet"] = add_to_set
+        if new.get("year"):
+            update["$min"] = {"year_min": new["year"]}
+            update["$max"] = {"year_max": new["year"]}
+
+    judge_delta = {}
+    for judge in (old or {}).get("judge_names") or []:
+        judge_delta[judge] = judge_delta.get(judge, 0) - 1
+    for judge in (new or {}).get("judge_names") or []:
+        judge_delta[judge] = judge_delta.get(judge, 0) + 1
+    inc = {
+        f"judge_counts.{_escape_key(judge)}": n
+        for judge, n in judge_delta.items() if judge and n
+    }
+    if inc:
+        update["$inc"] = inc
+
+    _collection().update_one({"_id": CASES_KEY}, update, upsert=True)
+
+
+def apply_lawyer_delta(lawyer):
+    """Fold a saved lawyer's specializations and city into the catalogue."""
+    update = {"$set": {"updated_at": datetime.utcnow()}}
+    add_to_set = {}
+    if lawyer.specializations:
+        add_to_set["specializations"] = {"$each": list(lawyer.specializations)}
+    if lawyer.city:
+        add_to_set["cities"] = lawyer.city
+    if add_to_set:
+        update["$addToSet"] = add_to_set
+    _collection().update_one({"_id": LAWYERS_KEY}, update, upsert=True)
+
+
+# ---- Reconciliation ----
+
+def reconcile():
+    """Rebuild both catalogue documents from the source collections."""
+    now = datetime.utcnow()
+
+    # Flagged near-duplicates (services.near_duplicates) are left out
+    listed = Case.objects(duplicate_of=None)
+    year_result = list(listed.aggregate(
+        {"$match": {"year": {"$ne": None}}},
+        {"$group": {"_id": None, "min_year": {"$min": "$year"}, "max_year": {"$max": "$year"}}},
+    ))
+    judges = listed.aggregate(
+        {"$unwind": "$judge_names"},
+        {"$group": {"_id": "$judge_names", "count": {"$sum": 1}}},
+    )
+    cases_doc = {
+        list_field: [v for v in listed.distinct(case_field) if v]
+        for list_field, case_field in CASE_VALUE_FIELDS.items()
+    }
+    years = year_result[0] if year_result else {}
+    if years.get("min_year") is not None:
+        # Left out when no case has a year: $min would never replace a null
+        cases_doc.update({"year_min": years["min_year"], "year_max": years["max_year"]})
+    cases_doc.update({
+        "judge_counts": {_escape_key(j["_id"]): j["count"] for j in judges if j["_id"]},
+        "reconciled_at": now,
+        "updated_at": now,
+    })
+    _collection().replace_one({"_id": CASES_KEY}, cases_doc, upsert=True)
+
+    lawyers_doc = {
+        "specializations": [s for s in Lawyer.objects.distinct("specializations") if s],
+        "cities": [c for c in Lawyer.objects.distinct("city") if c],
+        "reconciled_at": now,
+        "updated_at": now,
+    }
+    _collection().replace_one({"_id": LAWYERS_KEY}, lawyers_doc, upsert=True)
+    logger.info("Filter catalogue reconciled")
+
+
+def _load(key: str) -> dict:
+    doc = _collection().find_one({"_id": key})
+    if doc is None or doc.get("reconciled_at") is None:
+        # First read on a fresh database: build the catalogue once.
+        reconcile()
+        doc = _collection().find_one({"_id": key}) or {}
+    return doc
+
+
+# ---- Reads ----
+
+def get_case_filters() -> dict:
+    """Filter values for the search interface, from one document read."""
+    doc = _load(CASES_KEY)
+    judges = [
+        {"name": _unescape_key(name), "count": count}
+        for name, count in (doc.get("judge_counts") or {}).items() if count > 0
+    ]
+    judges.sort(key=lambda j: j["count"], reverse=True)
+    return {
+        "courts": sorted(doc.get("courts") or []),
+        "case_types": sorted(doc.get("case_types") or []),
+        "statuses": doc.get("statuses") or [],
+        "year_range": {
+            "min": doc.get("year_min"),
+            "max": doc.get("year_max"),
+        },
+        "judges": judges[:TOP_JUDGES],
+        "sources": doc.get("sources") or [],
+    }
+
+
+def get_lawyer_filters() -> dict:
+    """Specializations and cities for the lawyer directory."""
+    doc = _load(LAWYERS_KEY)
+    return {
+        "specializations": sorted(doc.get("specializations") or []),
+        "cities": sorted(doc.get("cities") or []),
+    }
@@ -0,0 +1,473 @@
+"""
+Filter Index – In-memory Bitmaps for the Structured Case Filters
+==================================================================
+Most /cases and /search traffic is filter-only (court + year + status +
+case type), and each request used to become ``court__icontains`` /
+``case_type__iexact`` regexes that MongoDB cannot answer from the
+single-field indexes.
+
+``FilterIndex`` maps every distinct court, status, year, case type, source
+and judge to a compressed bitmap of case ordinals.  A filter combination is
+resolved with bitmap ORs (all values a substring filter matches) and ANDs
+(across filters), the total is the bitmap's cardinality, and a selective
+result is handed to MongoDB as an ``_id`` seek instead of a regex scan.
+
+Bitmaps are roaring-style: ordinals are split into a 16-bit high key and a
+16-bit low part, and the lows under each key are stored as a sorted
+``array('H')`` while sparse or as a 65536-bit integer bitset once dense,
+so unions and intersections of dense ranges run word-at-a-time in C.
+
+The index is built from MongoDB on first use, kept current by
+``services.case_events`` and catches up with other workers' writes (the
+``updated_at`` watermark) and deletions (``CaseDeletion`` tombstones) in
+the background through ``services.index_sync``.
+"""
+
+import bisect
+import logging
+import threading
+import time
+from array import array
+from datetime import datetime
+
+from mongoengine.queryset.visitor import Q
+
+from services import index_sync
+
+logger = logging.getLogger(__name__)
+
+# ----- Bitmaps -----
+
+ARRAY_MAX = 4096           # sparse containers hold at most this many lows
+_CHUNK_BYTES = (1 << 16) // 8
+_BYTE_BITS = tuple(tuple(j for j in range(8) if byte >> j & 1) for byte in range(256))
+
+
+def _to_bits(lows) -> int:
+    data = bytearray(_CHUNK_BYTES)
+    for low in lows:
+        data[low >> 3] |= 1 << (low & 7)
+    return int.from_bytes(data, "little")
+
+
+def _to_array(bits: int) -> array:
+    lows = array("H")
+    for i, byte in enumerate(bits.to_bytes(_CHUNK_BYTES, "little")):
+        if byte:
+            base = i << 3
+            lows.extend(base + j for j in _BYTE_BITS[byte])
+    return lows
+
+
+def _pack(container):
+    """Normalise a container to its cheaper form; None when empty."""
+    if isinstance(container, int):
+        n = container.bit_count()
+        if n == 0:
+            return None
+        return _to_array(container) if n <= ARRAY_MAX else container
+    if not container:
+        return None
+    return _to_bits(container) if len(container) > ARRAY_MAX else container
+
+
+def _keep(lows: array, bits: int, present: bool) -> array:
+    """Lows whose bit in *bits* is (or, with present=False, is not) set."""
+    data = bits.to_bytes(_CHUNK_BYTES, "little")
+    return array("H", (v for v in lows if bool(data[v >> 3] >> (v & 7) & 1) == present))
+
+
+def _and(a, b):
+    if isinstance(a, int) and isinstance(b, int):
+        return _pack(a & b)
+    if isinstance(a, int):
+        a, b = b, a
+    if isinstance(b, int):
+        return _pack(_keep(a, b, True))
+    return _pack(array("H", sorted(set(a).intersection(b))))
+
+
+def _or(a, b):
+    if isinstance(a, int) or isinstance(b, int):
+        a = a if isinstance(a, int) else _to_bits(a)
+        b = b if isinstance(b, int) else _to_bits(b)
+        return _pack(a | b)
+    return _pack(array("H", sorted(set(a).union(b))))
+
+
+def _andnot(a, b):
+    if isinstance(a, int):
+        return _pack(a & ~(b if isinstance(b, int) else _to_bits(b)))
+    if isinstance(b, int):
+        return _pack(_keep(a, b, False))
+    return _pack(array("H", sorted(set(a).difference(b))))
+
+
+class Bitmap:
+    """Compressed set of non-negative ints (roaring-style containers)."""
+
+    __slots__ = ("containers",)
+
+    def __init__(self, containers=None):
+        self.containers = containers or {}   # high 16 bits -> array('H') | int
+
+    def add(self, value: int):
+        high, low = value >> 16, value & 0xFFFF
+        container = self.containers.get(high)
+        if container is None:
+            self.containers[high] = array("H", [low])
+        elif isinstance(container, int):
+            self.containers[high] = container | (1 << low)
+        else:
+            i = bisect.bisect_left(container, low)
+            if i == len(container) or container[i] != low:
+                container.insert(i, low)
+                if len(container) > ARRAY_MAX:
+                    self.containers[high] = _to_bits(container)
+
+    def discard(self, value: int):
+        high, low = value >> 16, value & 0xFFFF
+        container = self.containers.get(high)
+        if container is None:
+            return
+        if isinstance(container, int):
+            packed = _pack(container & ~(1 << low))
+        else:
+            i = bisect.bisect_left(container, low)
+            if i < len(container) and container[i] == low:
+                del container[i]
+            packed = container or None
+        if packed is None:
+            del self.containers[high]
+        else:
+            self.containers[high] = packed
+
+    def __contains__(self, value: int) -> bool:
+        container = self.containers.get(value >> 16)
+        if container is None:
+            return False
+        low = value & 0xFFFF
+        if isinstance(container, int):
+            return bool(container >> low & 1)
+        i = bisect.bisect_left(container, low)
+        return i < len(container) and container[i] == low
+
+    def __len__(self) -> int:
+        return sum(
+            c.bit_count() if isinstance(c, int) else len(c) for c in self.containers.values()
+        )
+
+    def __bool__(self) -> bool:
+        return bool(self.containers)
+
+    def __iter__(self):
+        for high in sorted(self.containers):
+            container = self.containers[high]
+            base = high << 16
+            lows = _to_array(container) if isinstance(container, int) else container
+            for low in lows:
+                yield base + low
+
+    def _combine(self, other, op, keys):
+        result = {}
+        for high in keys:
+            a, b = self.containers.get(high), other.containers.get(high)
+            if a is None or b is None:
+                packed = a if b is None else (b if op is _or else None)
+                if isinstance(packed, array):
+                    packed = array("H", packed)
+            else:
+                packed = op(a, b)
+            if packed is not None:
+                result[high] = packed
+        return Bitmap(result)
+
+    def __and__(self, other):
+        return self._combine(other, _and, self.containers.keys() & other.containers.keys())
+
+    def __or__(self, other):
+        return self._combine(other, _or, self.containers.keys() | other.containers.keys())
+
+    def __sub__(self, other):
+        return self._combine(other, _andnot, list(self.containers))
+
+    @staticmethod
+    def union(bitmaps):
+        result = Bitmap()
+        for bitmap in bitmaps:
+            result = result | bitmap
+        return result
+
+
+# ----- Filter index -----
+
+# Filter field -> Case field
+FILTER_FIELDS = {
+    "court": "court",
+    "status": "status",
+    "year": "year",
+    "case_type": "case_type",
+    "source": "source",
+    "judge": "judge_names",
+}
+# How a filter value selects indexed values (mirrors the MongoDB filters
+# the routes build: court__icontains, case_type__iexact, status=..., ...)
+MATCH_MODES = {
+    "court": "icontains",
+    "judge": "icontains",
+    "case_type": "iexact",
+    "status": "exact",
+    "source": "exact",
+    "year": "exact",
+}
+
+INDEXED_FILTERS = ("court", "case_type", "status", "source", "judge", "year", "year_from", "year_to")
+# Filters the index does not cover; requests using them go to MongoDB
+UNINDEXED_FILTERS = ("appellant", "respondent", "statute")
+
+
+def _case_values(case) -> tuple:
+    get = case.get if isinstance(case, dict) else lambda f: getattr(case, f, None)
+    values = set()
+    for name, field in FILTER_FIELDS.items():
+        value = get(field)
+        for v in value if isinstance(value, (list, tuple)) else (value,):
+            if v not in (None, ""):
+                values.add((name, v))
+    return tuple(values)
+
+
+class FilterIndex:
+    """Value -> bitmap-of-ordinals maps for the structured case filters."""
+
+    def __init__(self):
+        self._lock = threading.RLock()
+        self._last_refresh = 0.0
+        self._reset()
+
+    def _reset(self):
+        self.doc_ids = []          # ordinal -> case id (None once removed)
+        self.ordinals = {}         # case id -> ordinal
+        self.doc_values = []       # ordinal -> tuple of (filter, value)
+        self.bitmaps = {name: {} for name in FILTER_FIELDS}   # filter -> value -> Bitmap
+        self.watermark = None
+        self.deleted_through = datetime.utcnow()   # deletion tombstones applied up to here
+
+    # ---- Writes ----
+
+    def add_case(self, case):
+        """Index (or re-index) a Case document or raw case dict."""
+        get = case.get if isinstance(case, dict) else lambda f: getattr(case, f, None)
+        case_id = get("id") or get("_id")
+        if case_id is None:
+            return
+        case_id = str(case_id)
+        values = _case_values(case)
+        updated_at = get("updated_at")
+
+        with self._lock:
+            if updated_at and (self.watermark is None or updated_at > self.watermark):
+                self.watermark = updated_at
+            if get("duplicate_of"):
+                # Flagged near-duplicates match no filter
+                self.remove_case(case_id)
+                return
+            ordinal = self.ordinals.get(case_id)
+            if ordinal is None:
+                ordinal = len(self.doc_ids)
+                self.doc_ids.append(case_id)
+                self.doc_values.append(())
+                self.ordinals[case_id] = ordinal
+            old = set(self.doc_values[ordinal])
+            for name, value in old.difference(values):
+                self._discard(name, value, ordinal)
+            for name, value in set(values).difference(old):
+                self.bitmaps[name].setdefault(value, Bitmap()).add(ordinal)
+            self.doc_values[ordinal] = values
+
+    def remove_case(self, case_id):
+        """Drop a case from every bitmap."""
+        with self._lock:
+            ordinal = self.ordinals.pop(str(case_id), None)
+            if ordinal is None:
+                return
+            for name, value in self.doc_values[ordinal]:
+                self._discard(name, value, ordinal)
+            self.doc_values[ordinal] = ()
+            self.doc_ids[ordinal] = None
+
+    def _discard(self, name, value, ordinal):
+        bitmap = self.bitmaps[name].get(value)
+        if bitmap is not None:
+            bitmap.discard(ordinal)
+            if not bitmap:
+                del self.bitmaps[name][value]
+
+    # ---- Reads ----
+
+    def matching_values(self, name: str, wanted) -> list:
+        """Every indexed value of filter *name* that *wanted* selects."""
+        with self._lock:
+            values = self.bitmaps[name]
+            mode = MATCH_MODES[name]
+            if mode == "exact":
+                return [wanted] if wanted in values else []
+            needle = str(wanted).lower()
+            if mode == "iexact":
+                return [v for v in values if str(v).lower() == needle]
+            return [v for v in values if needle in str(v).lower()]
+
+    def _matching(self, name: str, wanted) -> list:
+        """Bitmaps of every indexed value the filter *wanted* selects."""
+        return [self.bitmaps[name][v] for v in self.matching_values(name, wanted)]
+
+    def resolve(self, filters: dict) -> Bitmap:
+        """
+        Cases matching all *filters* (keys from INDEXED_FILTERS; year,
+        year_from and year_to as ints).  Smallest operand first, stopping
+        as soon as the intersection is empty.
+        """
+        with self._lock:
+            operands = []
+            for name, wanted in filters.items():
+                if name in ("year_from", "year_to"):
+                    continue
+                operands.append(Bitmap.union(self._matching(name, wanted)))
+            low, high = filters.get("year_from"), filters.get("year_to")
+            if low is not None or high is not None:
+                operands.append(Bitmap.union(
+                    bitmap for year, bitmap in self.bitmaps["year"].items()
+                    if isinstance(year, int)
+                    and (low is None or year >= low) and (high is None or year <= high)
+                ))
+            if not operands:
+                return Bitmap()
+            operands.sort(key=len)
+            result = operands[0]
+            for operand in operands[1:]:
+                if not result:
+                    break
+                result = result & operand
+            return result
+
+    def case_ids(self, bitmap: Bitmap) -> list:
+        """Case ids for the ordinals in *bitmap*."""
+        with self._lock:
+            return [self.doc_ids[o] for o in bitmap if self.doc_ids[o] is not None]
+
+    def contains(self, bitmap: Bitmap, case_id) -> bool:
+        ordinal = self.ordinals.get(str(case_id))
+        return ordinal is not None and ordinal in bitmap
+
+    # ---- Maintenance ----
+
+    def build(self):
+        """Load every case's filter values from MongoDB."""
+        from models.case_model import Case
+
+        started = time.time()
+        fields = set(FILTER_FIELDS.values()) | {"duplicate_of", "updated_at"}
+        with self._lock:
+            self._reset()
+            for doc in Case.objects.only(*fields).as_pymongo().batch_size(2000):
+                self.add_case(doc)
+        logger.info(
+            "Filter index built: %d cases in %.1fs", len(self.ordinals), time.time() - started
+        )
+
+    def refresh(self, min_interval: float = 0):
+        """Pick up cases written and deleted by other workers since the last watermarks."""
+        from models.case_deletion import CaseDeletion
+        from models.case_model import Case
+
+        now = time.time()
+        if now - self._last_refresh < min_interval:
+            return
+        self._last_refresh = now
+        # No watermark yet means the index was built from an empty collection
+        fresh = Case.objects(updated_at__gt=self.watermark) if self.watermark else Case.objects
+        fields = set(FILTER_FIELDS.values()) | {"duplicate_of", "updated_at"}
+        for doc in fresh.only(*fields).as_pymongo():
+            self.add_case(doc)
+        deleted, self.deleted_through = CaseDeletion.since(self.deleted_through)
+        for case_id in deleted:
+            self.remove_case(case_id)
+
+
+# ---------------------------------------------------------------------------
+# Process-wide instance
+# ---------------------------------------------------------------------------
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_filter_index() -> FilterIndex:
+    """Return the shared FilterIndex, building it on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = FilterIndex()
+                index.build()
+                index_sync.register("filters", index.refresh)
+                _index = index
+    return _index
+
+
+def indexed_filters(args):
+    """
+    The structured filters in request *args* as ``resolve`` takes them, or
+    None when the index cannot answer the request alone.
+    """
+    if any((args.get(name) or "").strip() for name in UNINDEXED_FILTERS):
+        return None
+    filters = {}
+    for name in INDEXED_FILTERS:
+        raw = (args.get(name) or "").strip()
+        if not raw:
+            continue
+        if name.startswith("year"):
+            try:
+                filters[name] = int(raw)
+            except ValueError:
+                return None
+        else:
+            filters[name] = raw
+    if not filters:
+        return None
+    return filters
+
+
+def filter_bitmap(args):
+    """
+    Bitmap of the cases matching the structured filters in request *args*.
+
+    Returns None when there is nothing for the index to do – no filters, a
+    filter it does not cover, or a malformed year (left for the MongoDB
+    path to handle as before).
+    """
+    filters = indexed_filters(args)
+    if filters is None:
+        return None
+    return get_filter_index().resolve(filters)
+
+
+def filter_query(args) -> Q:
+    """
+    The MongoDB query selecting exactly the cases ``filter_bitmap(args)``
+    does, for bitmaps too large to turn into an ``_id`` list.  Substring
+    and case-insensitive filters become an exact ``$in`` over the stored
+    values they matched, which the single-field indexes can answer.
+    """
+    index = get_filter_index()
+    query = Q(duplicate_of=None)
+    for name, wanted in (indexed_filters(args) or {}).items():
+        if name == "year_from":
+            query &= Q(year__gte=wanted)
+        elif name == "year_to":
+            query &= Q(year__lte=wanted)
+        elif MATCH_MODES[name] == "exact":
+            query &= Q(**{FILTER_FIELDS[name]: wanted})
+        else:
+            query &= Q(**{f"{FILTER_FIELDS[name]}__in": index.matching_values(name, wanted)})
+    return query
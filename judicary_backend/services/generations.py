@@ -0,0 +1,58 @@
+"""
+Write Generations – Cheap Invalidation Tokens for Cached Reads
+================================================================
+Each collection has a monotonically increasing generation number that is
+bumped on every write.  Caches store the generation they were filled at
+and treat an entry as stale once the generation has moved on, so
+invalidation is O(1) and never has to enumerate cache keys.
+
+Case writes additionally bump a per-court generation so caches scoped to a
+single court survive writes to other courts.  Generations are per process;
+caches pair them with a TTL to bound staleness from other workers' writes.
+"""
+
+import threading
+from collections import Counter
+
+_generations = Counter()
+_courts = {}             # collection -> set of lower-cased courts written to
+_lock = threading.Lock()
+
+
+def bump(collection: str, court: str = None):
+    """Record a write to *collection* (optionally scoped to *court*)."""
+    with _lock:
+        _generations[collection] += 1
+        if court:
+            court = court.lower()
+            _generations[(collection, court)] += 1
+            known = _courts.setdefault(collection, set())
+            if court not in known:
+                # A court seen for the first time may match substring
+                # filters that were cached before it existed.
+                known.add(court)
+                _generations[(collection, "*courts")] += 1
+
+
+def current(collection: str, court: str = None) -> int:
+    """Current generation of *collection*, or of one court within it."""
+    if court:
+        return _generations[(collection, court.lower())]
+    return _generations[collection]
+
+
+def court_filter_token(collection: str, court_filter: str) -> tuple:
+    """
+    Invalidation token for reads filtered by ``court__icontains=court_filter``.
+
+    It changes when any court whose name contains the filter is written to,
+    or when a previously unseen court appears, and is unaffected by writes
+    to unrelated courts.
+    """
+    needle = court_filter.lower()
+    with _lock:
+        matching = sorted(c for c in _courts.get(collection, ()) if needle in c)
+        return (
+            _generations[(collection, "*courts")],
+            tuple(_generations[(collection, c)] for c in matching),
+        )
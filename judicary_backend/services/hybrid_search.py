@@ -0,0 +1,96 @@
+"""
+Hybrid Search – Lexical + Dense Retrieval with Reciprocal Rank Fusion
+=======================================================================
+BM25 misses paraphrased legal questions ("can my landlord evict me
+without notice" vs "ejectment of tenant"), while dense retrieval misses
+exact statute numbers and names.  ``hybrid_ranked`` runs the dense leg on
+a small thread pool while the in-memory BM25 leg runs on the request
+thread, waits for the dense leg until ``HYBRID_TIMEOUT_SECONDS`` after the
+start and fuses the results with weighted reciprocal rank fusion:
+
+    score(d) = Σ  weight_r / (k + rank_r(d))
+
+A dense leg that is unavailable or too slow is reported and left out of
+the fusion (its queued work is cancelled so stale queries do not hold up
+the pool), so latency stays bounded and the lexical ranking is always
+returned.
+"""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from config import get_config
+from services.search_index import search_ranked
+from services.vector_search import get_vector_index, vector_ranked
+
+logger = logging.getLogger(__name__)
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="hybrid-search")
+
+
+def reciprocal_rank_fusion(rankings: dict, weights: dict, k: int) -> list:
+    """
+    Fuse ranked id lists.
+
+    Args:
+        rankings: {name: [(case_id, score), ...]} best first
+        weights: {name: weight}
+        k: RRF damping constant
+
+    Returns:
+        [(case_id, fused_score), ...] best first
+    """
+    fused = {}
+    for name, ranked in rankings.items():
+        weight = weights.get(name, 1.0)
+        for rank, (case_id, _) in enumerate(ranked, 1):
+            fused[case_id] = fused.get(case_id, 0.0) + weight / (k + rank)
+    return sorted(fused.items(), key=lambda x: x[1], reverse=True)
+
+
+def hybrid_ranked(query: str, lexical=None):
+    """
+    Rank cases for *query* with both retrievers; *lexical* replaces
+    ``search_ranked`` as the keyword leg.
+
+    Returns:
+        (ranked, status) – ranked is [(case_id, fused_score)], status maps
+        each leg to "ok", "error", and the vector leg also to "timeout",
+        "unavailable" or "building" while the dense index is still being
+        filled
+    """
+    cfg = get_config()
+    started = time.monotonic()
+    status = {"lexical": "ok", "vector": "ok"}
+    vectors = get_vector_index()
+    future = None
+    if vectors is None:
+        status["vector"] = "unavailable"
+    else:
+        future = _executor.submit(vector_ranked, query)
+
+    rankings = {}
+    try:
+        rankings["lexical"] = (lexical or search_ranked)(query)
+    except Exception as exc:
+        logger.error("Hybrid lexical retrieval failed: %s", exc)
+        status["lexical"] = "error"
+
+    if future is not None:
+        remaining = max(0.0, cfg.HYBRID_TIMEOUT_SECONDS - (time.monotonic() - started))
+        try:
+            rankings["vector"] = future.result(timeout=remaining)
+        except FutureTimeout:
+            future.cancel()
+            status["vector"] = "timeout"
+        except Exception as exc:
+            logger.error("Hybrid vector retrieval failed: %s", exc)
+            status["vector"] = "error"
+    if status["vector"] == "ok" and not vectors.ready:
+        status["vector"] = "building"
+
+    weights = {"lexical": cfg.HYBRID_LEXICAL_WEIGHT, "vector": cfg.HYBRID_VECTOR_WEIGHT}
+    ranked = reciprocal_rank_fusion(rankings, weights, cfg.HYBRID_RRF_K)
+    return ranked[:cfg.SEARCH_MAX_CANDIDATES], status
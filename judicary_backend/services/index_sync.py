@@ -0,0 +1,92 @@
+"""
+Index Sync – Background Catch-up with Other Workers' Writes
+=============================================================
+Each worker's in-memory structures follow its own writes through
+``services.case_events``; writes made by other workers are pulled in by
+each structure's ``refresh()``.  Structures that are read on every
+keystroke must not pay for that MongoDB round trip on the request path,
+so they register their refresh here and one daemon thread per worker
+runs them every ``SEARCH_INDEX_REFRESH_SECONDS``.
+
+Deletions reach other workers as ``CaseDeletion`` tombstones.  Structures
+persisted to disk may have missed writes and tombstones while no worker
+had them loaded, so ``reconcile`` compares a freshly loaded structure's
+case ids with the collection once.
+"""
+
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+RECONCILE_BATCH = 1000     # missing cases fetched per query by reconcile()
+
+_refreshers = {}           # name -> callable
+_lock = threading.Lock()
+_thread = None
+_stop = threading.Event()
+
+
+def register(name: str, refresh):
+    """Run *refresh* (no arguments) on every sync pass."""
+    with _lock:
+        _refreshers[name] = refresh
+
+
+def reconcile(name: str, indexed_ids, remove, add, fields, where: dict = None) -> dict:
+    """
+    Make a structure loaded from disk agree with the cases collection:
+    ``remove(case_id)`` every indexed case MongoDB no longer has and
+    ``add(doc)`` every case (raw dict with *fields*) it does not hold.
+    *where* narrows the collection to the cases the structure keeps.
+    """
+    from models.case_model import Case
+
+    started = time.time()
+    live = {str(doc["_id"]) for doc in Case.objects(**(where or {})).only("id").as_pymongo()}
+    indexed = set(indexed_ids)
+    gone = indexed - live
+    for case_id in gone:
+        remove(case_id)
+    missing = list(live - indexed)
+    for start in range(0, len(missing), RECONCILE_BATCH):
+        batch = missing[start:start + RECONCILE_BATCH]
+        for doc in Case.objects(id__in=batch).only(*fields).as_pymongo():
+            add(doc)
+    if gone or missing:
+        logger.info("%s reconciled with MongoDB: %d removed, %d added in %.1fs",
+                    name, len(gone), len(missing), time.time() - started)
+    return {"removed": len(gone), "added": len(missing)}
+
+
+def run_once():
+    """One sync pass; a failing structure is logged and skipped."""
+    with _lock:
+        refreshers = list(_refreshers.items())
+    for name, refresh in refreshers:
+        try:
+            refresh()
+        except Exception as exc:
+            logger.error("Index sync failed for %s: %s", name, exc)
+
+
+def _loop(interval: float):
+    while not _stop.wait(interval):
+        run_once()
+
+
+def start(interval: float):
+    """Start this worker's sync thread (idempotent)."""
+    global _thread
+    with _lock:
+        if _thread is not None and _thread.is_alive():
+            return
+        _stop.clear()
+        _thread = threading.Thread(target=_loop, args=(interval,), name="index-sync", daemon=True)
+        _thread.start()
+
+
+def stop():
+    """Stop the sync thread (tests and shutdown)."""
+    _stop.set()
@@ -0,0 +1,568 @@
+"""
+Near Duplicates – MinHash / LSH Detection of Re-published Judgments
+=====================================================================
+The Supreme Court scraper sees the same judgment on the homepage, the
+cause-lists page and in article blocks, each time under a different (often
+synthesized) case number, so the exact (court, case_number_key) match in
+``BaseScraper.save_case`` never fires and the copies inflate every count
+and similarity result.  This index finds them by content:
+
+1. the case body (summary, headnotes, judgment texts – never the title) is
+   folded and cut into overlapping ``SHINGLE_WORDS``-word shingles, each hashed with CRC-32;
+2. a MinHash signature keeps, for each of ``NUM_PERM`` hash functions
+   ``(a·x + b) mod p``, the minimum over the shingles – two signatures
+   agree in a position with probability equal to the Jaccard similarity
+   of their shingle sets;
+3. the signature is cut into ``BANDS`` bands of ``ROWS`` values, each band
+   hashed to a bucket key (LSH banding).  Cases sharing a bucket are
+   candidates, verified by the fraction of agreeing signature positions
+   against ``NEAR_DUPLICATE_THRESHOLD``.
+
+A check costs one pass over the new text, ``BANDS`` dict lookups and at
+most ``MAX_CANDIDATES`` signature comparisons, whatever the corpus size.
+Only cases of the same court are compared, and bodies with fewer than
+``MIN_SHINGLES`` shingles are never judged: cause-list entries carry only
+a title, and titles of different cases ("X versus Federation of Pakistan
+through Secretary ...") share most of their words.  A match must also be
+``compatible`` – a shared case number key, or no conflicting parsed
+numbers or parties – since boilerplate orders can repeat across cases.
+
+At ingest ``save_case`` saves a near-duplicate with ``duplicate_of`` set
+or, with ``NEAR_DUPLICATE_ACTION = "merge"``, merges it into the case it
+repeats (recording its number in ``case_number_aliases``).
+``dedup_collection`` applies the same to the existing collection.  The
+index is persisted next to the search index (reconciled with the
+collection when loaded) and kept current by ``services.case_events`` and,
+for other workers' writes and deletions, ``services.index_sync``.
+"""
+
+import logging
+import os
+import pickle
+import re
+import threading
+import time
+import zlib
+from datetime import datetime
+
+import numpy as np
+
+from config import get_config
+from services import index_sync
+from services.case_number import case_number_key, number_prefix
+from services.party_names import party_key
+from services.text_analysis import fold
+
+logger = logging.getLogger(__name__)
+
+SHINGLE_WORDS = 3
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+MIN_SHINGLES = 50
+MAX_CANDIDATES = 32
+
+DEDUP_FIELDS = ("summary", "headnotes", "full_text", "judgment_text")
+# Fields ``compatible`` compares besides the text
+MATCH_FIELDS = ("case_number", "case_number_aliases", "appellants", "respondents")
+
+# Fields never copied from a duplicate into the case it repeats
+MERGE_SKIP_FIELDS = {
+    "id", "case_number", "case_number_key", "court", "source", "scraped_at",
+    "created_at", "updated_at", "appellant_keys", "respondent_keys",
+    "case_number_aliases", "alias_keys", "duplicate_of",
+}
+
+# Bump when the shingling or hash functions change
+INDEX_VERSION = 1
+
+_WORD_RE = re.compile(r"\w+")
+_PRIME = (1 << 61) - 1
+_rng = np.random.default_rng(0x5EED)
+# a < 2**32 keeps a·x (x a CRC-32) inside uint64
+_A = _rng.integers(1, 1 << 32, NUM_PERM, dtype=np.uint64)
+_B = _rng.integers(0, _PRIME, NUM_PERM, dtype=np.uint64)
+_BAND_MIX = _rng.integers(1, 1 << 63, ROWS, dtype=np.uint64) | np.uint64(1)
+_BAND_SALT = _rng.integers(0, 1 << 63, BANDS, dtype=np.uint64)
+
+
+def _field_value(case, field):
+    if isinstance(case, dict):
+        return case.get(field)
+    return getattr(case, field, None)
+
+
+def shingles(text: str) -> np.ndarray:
+    """Distinct CRC-32 hashes of the word shingles of *text*."""
+    words = _WORD_RE.findall(fold(text))
+    if len(words) < SHINGLE_WORDS:
+        grams = [" ".join(words)] if words else []
+    else:
+        grams = (" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1))
+    return np.unique(np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64))
+
+
+def signature(hashes: np.ndarray) -> np.ndarray:
+    """MinHash signature (NUM_PERM uint32 values) of shingle *hashes*."""
+    values = (_A[:, None] * hashes[None, :]) % _PRIME
+    values = (values + _B[:, None]) % _PRIME
+    return values.min(axis=1).astype(np.uint32)
+
+
+def band_keys(signatures: np.ndarray) -> np.ndarray:
+    """(n, BANDS) uint64 bucket keys of (n, NUM_PERM) *signatures*."""
+    bands = signatures.reshape(len(signatures), BANDS, ROWS).astype(np.uint64)
+    return (bands * _BAND_MIX).sum(axis=2) ^ _BAND_SALT
+
+
+def case_signature(case):
+    """Signature of a Case or raw case dict, or None if its body is too short."""
+    text = " ".join(str(_field_value(case, f)) for f in DEDUP_FIELDS if _field_value(case, f))
+    hashes = shingles(text)
+    if len(hashes) < MIN_SHINGLES:
+        return None
+    return signature(hashes)
+
+
+def _number_keys(case) -> set:
+    numbers = [_field_value(case, "case_number")] + list(_field_value(case, "case_number_aliases") or [])
+    return {key for key in map(case_number_key, numbers) if key}
+
+
+def compatible(case, other) -> bool:
+    """
+    Whether two cases (Case documents or raw case dicts) whose texts match
+    may be the same case: they share a case number key, or their parsed
+    numbers do not differ and, for appellants and respondents each, they
+    name a common party whenever both name any.
+    """
+    keys, other_keys = _number_keys(case), _number_keys(other)
+    if keys & other_keys:
+        return True
+    parsed = {key for key in keys if number_prefix(key)}
+    other_parsed = {key for key in other_keys if number_prefix(key)}
+    if parsed and other_parsed:
+        return False
+    for field in ("appellants", "respondents"):
+        parties = {party_key(name) for name in _field_value(case, field) or ()} - {None}
+        other_parties = {party_key(name) for name in _field_value(other, field) or ()} - {None}
+        if parties and other_parties and not parties & other_parties:
+            return False
+    return True
+
+
+def merge_fields(existing, data: dict) -> bool:
+    """
+    Fill the empty fields of *existing* (a Case) from a duplicate's *data*
+    and record the duplicate's case number as an alias.
+
+    Returns:
+        True if anything changed
+    """
+    changed = False
+    for field, value in data.items():
+        if field in MERGE_SKIP_FIELDS or field not in existing._fields or not value:
+            continue
+        if not getattr(existing, field, None):
+            setattr(existing, field, value)
+            changed = True
+    for number in [data.get("case_number")] + list(data.get("case_number_aliases") or []):
+        number = (number or "").strip()
+        if number and number != existing.case_number and number not in existing.case_number_aliases:
+            existing.case_number_aliases.append(number)
+            changed = True
+    return changed
+
+
+class NearDuplicateIndex:
+    """MinHash signatures of every case with LSH band buckets."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.RLock()
+        self._last_refresh = 0.0
+        self._last_save = time.time()
+        self._reset()
+
+    def _reset(self):
+        self.doc_ids = []          # row -> case id (None once removed)
+        self.courts = []           # row -> court
+        self.rows = {}             # case id -> row
+        self.signatures = np.zeros((1024, NUM_PERM), dtype=np.uint32)
+        self.buckets = {}          # band key -> row, or list of rows
+        self.live_count = 0
+        self.watermark = None
+        self.deleted_through = datetime.utcnow()   # deletion tombstones applied up to here
+        self._dirty = 0
+
+    def __len__(self):
+        return self.live_count
+
+    # ---- Buckets ----
+
+    def _bucket_add(self, keys, row: int):
+        for key in keys:
+            current = self.buckets.get(key)
+            if current is None:
+                self.buckets[key] = row
+            elif isinstance(current, list):
+                current.append(row)
+            else:
+                self.buckets[key] = [current, row]
+
+    def _bucket_remove(self, keys, row: int):
+        for key in keys:
+            current = self.buckets.get(key)
+            if isinstance(current, list):
+                if row in current:
+                    current.remove(row)
+                if len(current) == 1:
+                    self.buckets[key] = current[0]
+            elif current == row:
+                del self.buckets[key]
+
+    # ---- Writes ----
+
+    def add_case(self, case):
+        """Index (or re-index) a Case document or raw case dict."""
+        case_id = _field_value(case, "id") or _field_value(case, "_id")
+        if case_id is None:
+            return
+        if _field_value(case, "duplicate_of"):
+            # Flagged duplicates are never the case a new one repeats
+            self.remove(case_id)
+        else:
+            self.add(str(case_id), _field_value(case, "court"), case_signature(case))
+        updated_at = _field_value(case, "updated_at")
+        if updated_at and (self.watermark is None or updated_at > self.watermark):
+            self.watermark = updated_at
+
+    def add(self, case_id, court, sig):
+        """Store *sig* as the signature of *case_id* (None: drop the case)."""
+        with self._lock:
+            row = self.rows.get(case_id)
+            if (row is not None and sig is not None and self.courts[row] == court
+                    and np.array_equal(self.signatures[row], sig)):
+                return
+            self._remove_locked(case_id)
+            if sig is None:
+                return
+            row = len(self.doc_ids)
+            if row == len(self.signatures):
+                grown = np.zeros((2 * row, NUM_PERM), dtype=np.uint32)
+                grown[:row] = self.signatures
+                self.signatures = grown
+            self.signatures[row] = sig
+            self.doc_ids.append(case_id)
+            self.courts.append(court)
+            self.rows[case_id] = row
+            self._bucket_add(band_keys(sig[None, :])[0].tolist(), row)
+            self.live_count += 1
+            self._dirty += 1
+
+    def remove(self, case_id):
+        """Drop a case from the index."""
+        with self._lock:
+            if self._remove_locked(str(case_id)):
+                self._dirty += 1
+
+    def _remove_locked(self, case_id) -> bool:
+        row = self.rows.pop(case_id, None)
+        if row is None:
+            return False
+        self._bucket_remove(band_keys(self.signatures[row:row + 1])[0].tolist(), row)
+        self.doc_ids[row] = None
+        self.courts[row] = None
+        self.live_count -= 1
+        return True
+
+    def _compact_locked(self):
+        """Drop the rows of removed and re-indexed cases."""
+        live = [row for row, case_id in enumerate(self.doc_ids) if case_id is not None]
+        signatures = self.signatures[live]
+        doc_ids = [self.doc_ids[row] for row in live]
+        courts = [self.courts[row] for row in live]
+        self._load_rows(doc_ids, courts, signatures)
+
+    def _load_rows(self, doc_ids, courts, signatures):
+        watermark, deleted_through = self.watermark, self.deleted_through
+        self._reset()
+        self.watermark, self.deleted_through = watermark, deleted_through
+        self.signatures = np.zeros((max(1024, 2 * len(doc_ids)), NUM_PERM), dtype=np.uint32)
+        self.signatures[:len(doc_ids)] = signatures
+        self.doc_ids, self.courts = list(doc_ids), list(courts)
+        self.rows = {case_id: row for row, case_id in enumerate(self.doc_ids)}
+        self.live_count = len(self.rows)
+        for row, keys in enumerate(band_keys(signatures).tolist()):
+            self._bucket_add(keys, row)
+
+    # ---- Reads ----
+
+    def find(self, court, sig, threshold: float, exclude=None):
+        """
+        The indexed case of *court* whose signature best matches *sig*.
+
+        Returns:
+            (case_id, estimated Jaccard similarity), or None below *threshold*
+        """
+        if sig is None:
+            return None
+        with self._lock:
+            candidates = []
+            for key in band_keys(sig[None, :])[0].tolist():
+                bucket = self.buckets.get(key)
+                if bucket is None:
+                    continue
+                for row in (bucket if isinstance(bucket, list) else (bucket,)):
+                    if (self.courts[row] == court and self.doc_ids[row] != exclude
+                            and row not in candidates):
+                        candidates.append(row)
+                if len(candidates) >= MAX_CANDIDATES:
+                    break
+            if not candidates:
+                return None
+            candidates = candidates[:MAX_CANDIDATES]
+            agreement = (self.signatures[candidates] == sig).mean(axis=1)
+            best = int(np.argmax(agreement))
+            if agreement[best] < threshold:
+                return None
+            return self.doc_ids[candidates[best]], float(agreement[best])
+
+    def find_case(self, case, threshold: float):
+        """``find`` for a Case or raw case dict (never matching itself)."""
+        case_id = _field_value(case, "id") or _field_value(case, "_id")
+        return self.find(_field_value(case, "court"), case_signature(case), threshold,
+                         exclude=str(case_id) if case_id else None)
+
+    # ---- Maintenance ----
+
+    def rebuild(self):
+        """Rebuild the index from the cases collection."""
+        from models.case_model import Case
+
+        started = time.time()
+        with self._lock:
+            self._reset()
+            cases = Case.objects.only(*DEDUP_FIELDS, "court", "duplicate_of", "updated_at")
+            for doc in cases.as_pymongo().batch_size(500):
+                self.add_case(doc)
+        logger.info("Near-duplicate index rebuilt: %d cases in %.1fs",
+                    self.live_count, time.time() - started)
+        self.save()
+
+    def refresh(self, min_interval: float = 0):
+        """Apply cases written and deleted by other workers since the last watermarks."""
+        from models.case_deletion import CaseDeletion
+        from models.case_model import Case
+
+        now = time.time()
+        if now - self._last_refresh < min_interval:
+            return
+        self._last_refresh = now
+        # No watermark yet means the index was built from an empty collection
+        fresh = Case.objects(updated_at__gt=self.watermark) if self.watermark else Case.objects
+        for doc in fresh.only(*DEDUP_FIELDS, "court", "duplicate_of", "updated_at").as_pymongo():
+            self.add_case(doc)
+        deleted, self.deleted_through = CaseDeletion.since(self.deleted_through)
+        for case_id in deleted:
+            self.remove(case_id)
+
+    def reconcile(self) -> dict:
+        """Drop cases deleted and add cases inserted while the index sat on disk."""
+        self.deleted_through = datetime.utcnow()
+        stats = index_sync.reconcile(
+            "Near-duplicate index", list(self.rows), self.remove, self.add_case,
+            (*DEDUP_FIELDS, "court", "duplicate_of", "updated_at"), where={"duplicate_of": None},
+        )
+        if stats["removed"] or stats["added"]:
+            self.save()
+        return stats
+
+    def save(self):
+        """Atomically persist the signatures to ``self.path``."""
+        if not self.path:
+            return
+        with self._lock:
+            if len(self.doc_ids) > 2 * self.live_count + 1024:
+                self._compact_locked()
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump({
+                    "version": INDEX_VERSION,
+                    "doc_ids": self.doc_ids,
+                    "courts": self.courts,
+                    "watermark": self.watermark,
+                }, f, protocol=pickle.HIGHEST_PROTOCOL)
+                np.save(f, self.signatures[:len(self.doc_ids)])
+            os.replace(tmp_path, self.path)
+            self._dirty = 0
+            self._last_save = time.time()
+
+    def maybe_save(self, every_writes: int, every_seconds: float):
+        """Persist if enough writes or time have accumulated since the last save."""
+        if self._dirty and (
+            self._dirty >= every_writes or time.time() - self._last_save >= every_seconds
+        ):
+            self.save()
+
+    def load(self) -> bool:
+        """Load persisted signatures. Returns False if missing or stale."""
+        if not self.path or not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, "rb") as f:
+                state = pickle.load(f)
+                signatures = np.load(f)
+        except Exception as exc:
+            logger.warning("Could not load near-duplicate index %s: %s", self.path, exc)
+            return False
+        if state.get("version") != INDEX_VERSION:
+            return False
+
+        with self._lock:
+            live = [row for row, case_id in enumerate(state["doc_ids"]) if case_id is not None]
+            self.watermark = state["watermark"]
+            self._load_rows([state["doc_ids"][row] for row in live],
+                            [state["courts"][row] for row in live], signatures[live])
+        return True
+
+
+# ---------------------------------------------------------------------------
+# Process-wide instance – lazily loaded from disk or rebuilt from MongoDB.
+# ---------------------------------------------------------------------------
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_near_duplicate_index() -> NearDuplicateIndex:
+    """Return the shared NearDuplicateIndex, loading or building it on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                cfg = get_config()
+                index = NearDuplicateIndex(os.path.join(cfg.SEARCH_INDEX_DIR, "near_duplicates.bin"))
+                if index.load():
+                    index.reconcile()
+                else:
+                    index.rebuild()
+                index_sync.register("near_duplicates", index.refresh)
+                _index = index
+    return _index
+
+
+def find_duplicate(data: dict):
+    """
+    The stored case that scraped *data* near-duplicates, first catching up
+    with other workers' writes.
+
+    Returns:
+        (Case, estimated Jaccard similarity), or None
+    """
+    from models.case_model import Case
+
+    cfg = get_config()
+    index = get_near_duplicate_index()
+    index.refresh(min_interval=cfg.SEARCH_INDEX_REFRESH_SECONDS)
+    match = index.find_case(data, cfg.NEAR_DUPLICATE_THRESHOLD)
+    if match is None:
+        return None
+    original = Case.objects(id=match[0]).first()
+    if original is None or not compatible(original, data):
+        return None
+    return original, match[1]
+
+
+def repoint_references(duplicate, canonical) -> int:
+    """
+    Point everything that refers to *duplicate* (a Case about to be merged
+    away and deleted) at *canonical*: linked documents, notifications, chat
+    sessions, bookmarks and copies flagged against it.
+
+    Returns:
+        number of documents updated
+    """
+    from models.case_model import Case
+    from models.chat_model import ChatSession
+    from models.document_model import Document
+    from models.notification_model import Notification
+    from models.user_model import User
+
+    old_id, new_id = duplicate.id, canonical.id
+    moved = Document.objects(case_id=old_id).update(set__case_id=new_id)
+    moved += Notification.objects(case_id=old_id).update(
+        set__case_id=new_id, set__case_number=canonical.case_number)
+    moved += ChatSession.objects(context_case_id=old_id).update(set__context_case_id=new_id)
+    moved += Case.objects(duplicate_of=old_id).update(set__duplicate_of=new_id)
+    # saved_cases holds string ids; add the canonical before dropping the copy
+    bookmarked = User.objects(saved_cases=str(old_id))
+    moved += bookmarked.update(add_to_set__saved_cases=str(new_id))
+    User.objects(saved_cases=str(old_id)).update(pull__saved_cases=str(old_id))
+    return moved
+
+
+def dedup_collection(action: str = "flag", threshold: float = None, job=None) -> dict:
+    """
+    Batch pass over the existing cases, oldest first: each case that
+    near-duplicates an earlier, ``compatible`` one of the same court is
+    flagged with ``duplicate_of``, merged into it (*action* "merge":
+    references repointed, then the row deleted) or only reported (*action*
+    "report").  Progress is logged to *job* (a ScrapeJob).
+
+    Returns:
+        {"checked": n, "duplicates": n, "merged": n, "flagged": n}
+    """
+    from models.case_model import Case
+    from services import case_events
+
+    threshold = threshold or get_config().NEAR_DUPLICATE_THRESHOLD
+    index = NearDuplicateIndex()
+    stats = {"checked": 0, "duplicates": 0, "merged": 0, "flagged": 0}
+    numbers = {}   # case id -> the fields ``compatible`` compares
+    rows = (Case.objects(duplicate_of=None)
+            .only(*DEDUP_FIELDS, *MATCH_FIELDS, "court")
+            .order_by("created_at", "id").as_pymongo())
+    for row in rows.batch_size(500):
+        stats["checked"] += 1
+        case_id, court = str(row["_id"]), row.get("court")
+        sig = case_signature(row)
+        match = index.find(court, sig, threshold)
+        if match is None or not compatible(numbers[match[0]], row):
+            if sig is not None:
+                index.add(case_id, court, sig)
+                numbers[case_id] = {field: row.get(field) for field in MATCH_FIELDS}
+            continue
+        stats["duplicates"] += 1
+        message = (f"{row.get('case_number')} ({case_id}) duplicates case {match[0]} "
+                   f"(similarity {match[1]:.2f})")
+        logger.info("Near duplicate: %s", message)
+        if action == "report":
+            if job:
+                job.add_log(f"Duplicate: {message}")
+            continue
+
+        duplicate = Case.objects(id=row["_id"]).first()
+        canonical = Case.objects(id=match[0]).first()
+        if duplicate is None or canonical is None:
+            continue
+        if action == "merge":
+            previous = case_events.snapshot(canonical)
+            data = {field: getattr(duplicate, field) for field in duplicate._fields}
+            if merge_fields(canonical, data):
+                canonical.updated_at = datetime.utcnow()
+                canonical.save()
+                case_events.case_saved(canonical, previous)
+            repoint_references(duplicate, canonical)
+            duplicate.delete()
+            case_events.case_deleted(duplicate)
+            stats["merged"] += 1
+        else:
+            previous = case_events.snapshot(duplicate)
+            duplicate.duplicate_of = canonical.id
+            duplicate.updated_at = datetime.utcnow()
+            duplicate.save()
+            case_events.case_saved(duplicate, previous)
+            stats["flagged"] += 1
+    case_events.flush()
+    return stats
@@ -0,0 +1,242 @@
+"""
+Pagination Service – Keyset (Cursor) Pagination
+=================================================
+Offset pagination (``.skip((page - 1) * page_size)``) makes Mongo walk and
+discard every earlier row, so deep pages get linearly slower.  A cursor
+instead records the sort key and ``_id`` of the last row served and the
+next page resumes with a range predicate on those two values, which is a
+single index seek on a matching ``(sort_field, _id)`` compound index.
+
+Cursors are opaque to clients: URL-safe base64 of a small JSON payload.
+"""
+
+import base64
+import json
+from datetime import datetime
+
+from bson import ObjectId
+from mongoengine.queryset.visitor import Q
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"t": "dt", "v": value.isoformat()}
+    if isinstance(value, ObjectId):
+        return {"t": "oid", "v": str(value)}
+    return {"t": "raw", "v": value}
+
+
+def _decode_value(payload):
+    kind, value = payload.get("t"), payload.get("v")
+    if value is None:
+        return None
+    if kind == "dt":
+        return datetime.fromisoformat(value)
+    if kind == "oid":
+        return ObjectId(value)
+    return value
+
+
+def encode_cursor(sort: str, value, last_id) -> str:
+    """Build an opaque cursor pointing just past a row."""
+    payload = {"s": sort, "k": _encode_value(value), "id": str(last_id)}
+    raw = json.dumps(payload, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, sort: str):
+    """
+    Decode a cursor produced by ``encode_cursor``.
+
+    Returns:
+        (value, last_id) tuple
+
+    Raises:
+        ValueError if the cursor is malformed or was issued for another sort
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        payload = json.loads(raw)
+        last_id = payload["id"]
+        value = _decode_value(payload["k"])
+    except Exception as exc:
+        raise ValueError("Invalid cursor") from exc
+    if payload.get("s") != sort:
+        raise ValueError("Cursor does not match the requested sort")
+    if sort != "relevance":
+        last_id = ObjectId(last_id)
+    return value, last_id
+
+
+def _split_sort(sort: str):
+    """'-judgment_date' -> ('judgment_date', True)."""
+    descending = sort.startswith("-")
+    return sort.lstrip("+-"), descending
+
+
+def keyset_filter(sort: str, value, last_id) -> Q:
+    """
+    Range predicate selecting rows strictly after (value, last_id) in
+    ``order_by(sort, ±id)`` order.  Null sort values sort lowest in Mongo,
+    so they come last on descending sorts and first on ascending ones.
+    """
+    field, descending = _split_sort(sort)
+    if field in ("id", "_id"):
+        return Q(id__lt=last_id) if descending else Q(id__gt=last_id)
+
+    id_op = "lt" if descending else "gt"
+    same_value = Q(**{field: value, f"id__{id_op}": last_id})
+
+    if value is None:
+        if descending:
+            return same_value
+        return same_value | Q(**{f"{field}__ne": None})
+
+    past_value = Q(**{f"{field}__{id_op}": value})
+    if descending:
+        return past_value | same_value | Q(**{field: None})
+    return past_value | same_value
+
+
+def paginate(queryset, sort: str, page: int, page_size: int, cursor: str = None):
+    """
+    Fetch one page of *queryset* ordered by *sort* with ``_id`` as tiebreaker.
+
+    With a cursor the page resumes after the cursor's row; otherwise the
+    classic ``page`` offset is used so existing clients keep working.
+
+    Returns:
+        (items, next_cursor) – next_cursor is None on the last page
+
+    Raises:
+        ValueError for a malformed cursor
+    """
+    field, descending = _split_sort(sort)
+    tiebreak = "-id" if descending else "id"
+    ordered = queryset.order_by(sort, tiebreak) if field not in ("id", "_id") else queryset.order_by(sort)
+
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort)
+        ordered = ordered.filter(keyset_filter(sort, value, last_id))
+    else:
+        ordered = ordered.skip((page - 1) * page_size)
+
+    items = list(ordered.limit(page_size + 1))
+    next_cursor = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        last = items[-1]
+        sort_value = last.id if field in ("id", "_id") else getattr(last, field, None)
+        next_cursor = encode_cursor(sort, sort_value, last.id)
+    return items, next_cursor
+
+
+def paginate_ranked(ordered_ids: list, page: int, page_size: int, cursor: str = None):
+    """
+    Page through an in-memory ranked id list (relevance ordering).
+
+    The cursor stores the offset and id of the last row served; if the
+    ranking shifted since, the id is looked up again so no row is skipped.
+
+    Returns:
+        (page_ids, next_cursor)
+    """
+    start = (page - 1) * page_size
+    if cursor:
+        offset, last_id = decode_cursor(cursor, "relevance")
+        if not isinstance(offset, int):
+            raise ValueError("Invalid cursor")
+        if 0 < offset <= len(ordered_ids) and ordered_ids[offset - 1] == last_id:
+            start = offset
+        elif last_id in ordered_ids:
+            start = ordered_ids.index(last_id) + 1
+        else:
+            start = offset
+
+    page_ids = ordered_ids[start:start + page_size]
+    next_cursor = None
+    end = start + len(page_ids)
+    if page_ids and end < len(ordered_ids):
+        next_cursor = encode_cursor("relevance", end, page_ids[-1])
+    return page_ids, next_cursor
+
+
+def pagination_meta(page: int, page_size: int, total, next_cursor: str = None,
+                    total_is_estimate: bool = False) -> dict:
+    """Standard ``pagination`` block for list responses."""
+    return {
+        "page": page,
+        "page_size": page_size,
+        "total": total,
+        "total_pages": (total + page_size - 1) // page_size if total is not None else None,
+        "total_is_estimate": total_is_estimate,
+        "next_cursor": next_cursor,
+    }
+
+
+def aggregation_page_stages(document, sort: str, page: int, page_size: int,
+                            cursor: str = None) -> list:
+    """
+    Aggregation stages equivalent to ``paginate`` for pipelines that return
+    raw documents.  One extra row is fetched so ``next_cursor_from_rows`` can
+    tell whether another page exists.
+
+    Raises:
+        ValueError for a malformed cursor
+    """
+    field, descending = _split_sort(sort)
+    direction = -1 if descending else 1
+    stages = []
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort)
+        stages.append({"$match": document.objects(keyset_filter(sort, value, last_id))._query})
+    if field in ("id", "_id"):
+        stages.append({"$sort": {"_id": direction}})
+    else:
+        db_field = document._fields[field].db_field if field in document._fields else field
+        stages.append({"$sort": {db_field: direction, "_id": direction}})
+    if not cursor:
+        stages.append({"$skip": (page - 1) * page_size})
+    stages.append({"$limit": page_size + 1})
+    return stages
+
+
+def next_cursor_from_rows(rows: list, sort: str, page_size: int):
+    """
+    Trim the look-ahead row from a raw aggregation page.
+
+    Returns:
+        (rows, next_cursor)
+    """
+    if len(rows) <= page_size:
+        return rows, None
+    rows = rows[:page_size]
+    field, _ = _split_sort(sort)
+    last = rows[-1]
+    sort_value = last["_id"] if field in ("id", "_id") else last.get(field)
+    return rows, encode_cursor(sort, sort_value, last["_id"])
+
+
+def paginate_raw(document, match: dict, sort: str, page: int, page_size: int,
+                 cursor: str = None, projection: dict = None):
+    """
+    ``paginate`` for raw rows: one aggregation that filters, pages and
+    projects server-side, skipping Document construction entirely.  The
+    sort field is always kept on the rows so the next cursor can be built.
+
+    Returns:
+        (rows, next_cursor)
+
+    Raises:
+        ValueError for a malformed cursor
+    """
+    field, _ = _split_sort(sort)
+    pipeline = [{"$match": match}] + aggregation_page_stages(
+        document, sort, page, page_size, cursor
+    )
+    if projection is not None:
+        if field not in ("id", "_id") and field not in projection:
+            projection = {**projection, field: 1}
+        pipeline.append({"$project": projection})
+    rows = list(document._get_collection().aggregate(pipeline))
+    return next_cursor_from_rows(rows, sort, page_size)
@@ -0,0 +1,220 @@
+"""
+Party Names – Normalized Keys for Appellant / Respondent Search
+=================================================================
+The same party is written many ways: "Govt. of Punjab through Secretary
+Home", "Government of the Punjab", "Mohd. Aslam s/o Akram", "Muhammad
+Aslam".  ``party_key`` reduces a name to one canonical key:
+
+1. cut representative and descent clauses ("through its Secretary",
+   "s/o ...", "r/o ...") and trailing "and others";
+2. fold case, script variants and punctuation; drop honorifics (Mr., Mst.,
+   Dr., Haji, M/s ...) and filler words (the, of, and);
+3. expand abbreviations (Govt → government, Deptt → department,
+   Ch. → chaudhry, Pvt → private, Ltd → limited, ...);
+4. map the spellings of common Pakistani names to one phonetic key
+   (Mohammad / Muhammed / Mohd, Rehman / Rahman, Yousaf / Yusuf), after
+   collapsing doubled letters and ee/oo/ou.
+
+    party_key("Govt. of the Punjab through Chief Secretary")  -> "government punjab"
+
+Every Case stores the keys of its appellants and respondents in
+``appellant_keys`` / ``respondent_keys`` (multikey indexes), so "all cases
+involving party X" is an index seek.  Each name is stored as its full key
+plus ``~``-prefixed suffixes starting at every later word, so a partial
+name ("Aslam") is an anchored prefix scan on the same index.
+"""
+
+import re
+
+from services.text_analysis import fold
+
+SUFFIX_PREFIX = "~"
+ROLES = ("any", "appellant", "respondent")
+ROLE_FIELDS = {"appellant": "appellant_keys", "respondent": "respondent_keys"}
+
+# Representative, descent and address clauses follow the party itself
+_CLAUSE_RE = re.compile(
+    r"\s(?:(?:through|thru|thr|via|son of|daughter of|wife of|widow of|resident of)\b"
+    r"|[sdwr]\s*/\s*o\b).*$"
+)
+_OTHERS_RE = re.compile(r"\s*(?:,|\band\b|&)\s*(?:\d+\s+)?(?:others?|another|ors)\b.*$|\betc\b.*$")
+_FIRM_RE = re.compile(r"\bm\s*/\s*s\b\.?")
+_APOSTROPHE_RE = re.compile(r"['’`]")
+_WORD_RE = re.compile(r"\w+")
+
+HONORIFICS = {
+    "mr", "mrs", "ms", "miss", "mst", "mussammat", "musammat", "mosammat",
+    "dr", "doctor", "prof", "professor", "engr", "haji", "hajji", "hafiz",
+    "qari", "maulana", "molana", "maulvi", "mufti", "sahib", "sahiba",
+    "janab", "sir", "late", "hon", "honourable", "honorable", "begum",
+}
+FILLER_WORDS = {"the", "of", "and", "for", "in", "at", "a", "an"}
+
+ABBREVIATIONS = {
+    "govt": "government", "gov": "government", "goverment": "government",
+    "deptt": "department", "dept": "department", "dep": "department",
+    "distt": "district", "dist": "district", "div": "division",
+    "pvt": "private", "ltd": "limited", "co": "company", "corp": "corporation",
+    "assn": "association", "assoc": "association", "univ": "university",
+    "secy": "secretary", "secr": "secretary", "addl": "additional",
+    "asst": "assistant", "dy": "deputy", "supdt": "superintendent",
+    "fed": "federal", "prov": "province", "pak": "pakistan", "intl": "international",
+    "natl": "national", "ch": "chaudhry", "sh": "sheikh", "kpk": "khyber pakhtunkhwa",
+    "kp": "khyber pakhtunkhwa", "nwfp": "khyber pakhtunkhwa",
+    "ajk": "azad jammu kashmir", "isb": "islamabad", "lhr": "lahore", "khi": "karachi",
+}
+
+# Canonical spelling -> variants (compared after collapsing doubled letters
+# and ee/oo/ou, so "Muhammad" and "Muhamad" need no entry of their own)
+NAME_VARIANTS = {
+    "muhammad": ["mohammad", "mohammed", "muhammed", "mohamed", "mohamad", "mohd", "muhd", "md", "mhd"],
+    "ahmad": ["ahmed"],
+    "hussain": ["husain", "hussein", "husein", "hossain"],
+    "hassan": ["hasan"],
+    "rahman": ["rehman", "rahmaan", "rehmaan"],
+    "abdul": ["abdal", "abdel"],
+    "ullah": ["ulla", "ollah"],
+    "chaudhry": ["chaudhary", "choudhry", "chaudri", "chaudhri", "choudhary", "chaudry", "chohdry"],
+    "qureshi": ["qureishi", "quraishi", "qureshy", "kureshi"],
+    "syed": ["sayed", "sayyid", "sayyed", "saiyid", "saiyed", "sayad"],
+    "yusuf": ["yousaf", "yousuf", "yusaf", "yousef", "yousif"],
+    "farooq": ["farooque", "faruq", "farouk", "faruk"],
+    "zulfiqar": ["zulfikar", "zulfiqaar"],
+    "asghar": ["asgher", "asgar"],
+    "riaz": ["riyaz"],
+    "ijaz": ["ejaz", "aijaz"],
+    "imtiaz": ["imtiyaz"],
+    "fayyaz": ["fiaz", "fayaz"],
+    "niaz": ["niyaz"],
+    "khalid": ["khaled"],
+    "tariq": ["tarik", "tareq"],
+    "javed": ["javaid", "javid", "jawed"],
+    "naveed": ["navid", "naweed"],
+    "saeed": ["sayeed"],
+    "ayesha": ["aisha", "ayisha", "aysha"],
+    "zainab": ["zenab", "zaynab"],
+    "fatima": ["fatimah", "fatma"],
+    "sheikh": ["shaikh", "shaykh"],
+    "khawaja": ["khwaja", "khuwaja", "khawja"],
+    "mian": ["miyan"],
+    "bibi": ["bi"],
+}
+
+
+def _spelling(word: str) -> str:
+    """Collapse doubled letters and the long-vowel digraphs of Roman Urdu."""
+    word = re.sub(r"(.)\1+", r"\1", word)
+    return word.replace("ee", "i").replace("oo", "u").replace("ou", "u")
+
+
+NAME_KEYS = {
+    _spelling(variant): _spelling(canonical)
+    for canonical, variants in NAME_VARIANTS.items()
+    for variant in [canonical] + variants
+}
+
+
+def party_words(name: str) -> list:
+    """The canonical words of a party name (see the module docstring)."""
+    text = fold(name or "").strip()
+    if not text:
+        return []
+    text = _APOSTROPHE_RE.sub("", text)
+    text = _CLAUSE_RE.sub("", " " + text)
+    text = _OTHERS_RE.sub("", text)
+    text = _FIRM_RE.sub(" ", text)
+
+    words = []
+    for word in _WORD_RE.findall(text.replace("_", " ")):
+        if word in HONORIFICS or word in FILLER_WORDS:
+            continue
+        for part in ABBREVIATIONS.get(word, word).split():
+            spelled = _spelling(part)
+            words.append(NAME_KEYS.get(spelled, spelled))
+    return words
+
+
+def party_key(name: str):
+    """
+    Canonical key for a party name, or None if nothing is left.
+
+    >>> party_key("Govt. of the Punjab through Chief Secretary")
+    'government punjab'
+    >>> party_key("Mst. Ayesha Bibi w/o Mohd. Aslam")
+    'ayesha bibi'
+    """
+    words = party_words(name)
+    return " ".join(words) if words else None
+
+
+def party_index_keys(names) -> list:
+    """Stored keys for a list of party names: full keys and word suffixes."""
+    keys = set()
+    for name in names or ():
+        words = party_words(name)
+        if not words:
+            continue
+        keys.add(" ".join(words))
+        keys.update(SUFFIX_PREFIX + " ".join(words[i:]) for i in range(1, len(words)))
+    return sorted(keys)
+
+
+def party_match(name: str, role: str = "any", partial: bool = False):
+    """
+    MongoDB filter for cases with party *name* in *role*.  An exact match is
+    an equality seek on the key; *partial* matches any run of whole words
+    ("aslam" finds "muhammad aslam khan") with anchored prefix scans.
+
+    Returns:
+        the filter dict, or None when *name* has no key
+    """
+    key = party_key(name)
+    if not key:
+        return None
+    if partial:
+        body = re.escape(key) + "(?: |$)"
+        value = {"$in": [re.compile("^" + body), re.compile("^" + re.escape(SUFFIX_PREFIX) + body)]}
+    else:
+        value = key
+    fields = ROLE_FIELDS.values() if role == "any" else [ROLE_FIELDS[role]]
+    clauses = [{field: value} for field in fields]
+    return clauses[0] if len(clauses) == 1 else {"$or": clauses}
+
+
+def _key_matches(stored: str, key: str, partial: bool) -> bool:
+    if stored == key:
+        return True
+    if not partial:
+        return False
+    stored = stored[len(SUFFIX_PREFIX):] if stored.startswith(SUFFIX_PREFIX) else stored
+    return stored == key or stored.startswith(key + " ")
+
+
+def case_roles(row: dict, key: str, partial: bool = False) -> list:
+    """Roles (appellant / respondent) in which party *key* appears in *row*."""
+    return [
+        role for role, field in ROLE_FIELDS.items()
+        if any(_key_matches(stored, key, partial) for stored in row.get(field) or ())
+    ]
+
+
+def backfill_party_keys() -> dict:
+    """
+    Set ``appellant_keys`` / ``respondent_keys`` on cases saved before they
+    existed.
+
+    Returns:
+        {"updated": n}
+    """
+    from models.case_model import Case
+
+    collection = Case._get_collection()
+    stats = {"updated": 0}
+    pending = Case.objects(appellant_keys__exists=False).only("appellants", "respondents")
+    for row in pending.as_pymongo().batch_size(500):
+        collection.update_one({"_id": row["_id"]}, {"$set": {
+            "appellant_keys": party_index_keys(row.get("appellants")),
+            "respondent_keys": party_index_keys(row.get("respondents")),
+        }})
+        stats["updated"] += 1
+    return stats
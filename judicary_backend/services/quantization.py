@@ -0,0 +1,85 @@
+"""
+Quantization – Compact Codes for Unit Embeddings
+==================================================
+Float32 embeddings cost 4 bytes per dimension (1.5 KB for a 384-d MiniLM
+vector).  Two codecs shrink the in-memory copy that scans run over:
+
+* ``float16`` – half precision, 2 bytes per dimension;
+* ``int8`` – per-vector scalar quantization: each vector is divided by
+  ``max|x| / 127`` and rounded, 1 byte per dimension plus one float32
+  scale per vector.
+
+Scores computed on codes are approximate, so callers take a few hundred
+candidates from the quantized scan and re-rank them on the exact float32
+rows (``EmbeddingStore`` keeps those on disk, memory-mapped).
+"""
+
+import numpy as np
+
+CODECS = ("float32", "float16", "int8")
+
+# Rows widened to float32 at a time while scoring codes (small enough for
+# the block to stay in cache)
+SCORE_CHUNK_ROWS = 1024
+
+_DTYPES = {"float32": np.float32, "float16": np.float16, "int8": np.int8}
+
+
+def check_codec(codec: str) -> str:
+    if codec not in CODECS:
+        raise ValueError(f"Unknown embedding codec {codec!r}; use one of: {', '.join(CODECS)}")
+    return codec
+
+
+def code_dtype(codec: str):
+    return _DTYPES[check_codec(codec)]
+
+
+def bytes_per_vector(dim: int, codec: str) -> int:
+    """Memory per vector: codes plus the int8 scale."""
+    return dim * np.dtype(code_dtype(codec)).itemsize + (4 if codec == "int8" else 0)
+
+
+def encode(vectors, codec: str):
+    """
+    Codes for float *vectors* (n, dim).
+
+    Returns:
+        (codes, scales) – scales is a float32 array for int8, else None
+    """
+    vectors = np.asarray(vectors, dtype=np.float32)
+    if codec != "int8":
+        return vectors.astype(code_dtype(codec)), None
+    scales = np.abs(vectors).max(axis=1) / 127.0 if len(vectors) else np.zeros(0)
+    scales[scales == 0] = 1.0
+    codes = np.rint(vectors / scales[:, None]).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def decode(codes, scales=None) -> np.ndarray:
+    """Approximate float32 vectors back from codes."""
+    vectors = np.asarray(codes, dtype=np.float32)
+    return vectors * scales[:, None] if scales is not None else vectors
+
+
+def scores(codes, query, scales=None) -> np.ndarray:
+    """
+    Approximate dot products of every code row with a float32 *query*.
+    numpy has no BLAS kernel for float16 or int8, so codes are widened into
+    a reused float32 block a chunk at a time and never all at once.  int8
+    scans run slightly faster than float32 ones; numpy's float16 conversion
+    is slow, so float16 scans cost several times more.
+    """
+    if codes.dtype == np.float32:
+        result = codes @ query
+    else:
+        result = np.empty(len(codes), dtype=np.float32)
+        block = np.empty((min(len(codes), SCORE_CHUNK_ROWS), codes.shape[1]), dtype=np.float32)
+        for start in range(0, len(codes), SCORE_CHUNK_ROWS):
+            chunk = codes[start:start + SCORE_CHUNK_ROWS]
+            widened = block[:len(chunk)]
+            widened[...] = chunk
+            np.matmul(widened, query, out=result[start:start + len(chunk)])
+    if scales is not None:
+        result *= scales
+    return result
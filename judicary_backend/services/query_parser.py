@@ -0,0 +1,849 @@
+"""
+Query Parser – Search Query Language Compiled to Index Operations
+===================================================================
+``/search?q=`` accepts a small query language on top of plain keywords:
+
+    court:"Lahore High Court" AND (bail OR "pre-arrest") -dismissed year:2019..2023
+
+* clauses are ANDed by default; upper-case ``AND`` / ``OR`` and
+  parentheses group them, ``NOT`` or a leading ``-`` negates;
+* ``"..."`` is a phrase (so is a hyphenated word such as pre-arrest);
+* ``field:value`` restricts a term to one text field (title, number,
+  summary, headnotes, text) or matches a structured field (court, judge,
+  statute, type, status, source, year);
+* ``year:2019..2023`` is an inclusive range; either end may be omitted;
+* ``a NEAR/n b`` matches terms or phrases with at most n index terms
+  (stopwords not counted) between them, in either order (``NEAR`` alone
+  means ``NEAR/5``);
+* Roman-Urdu words and phrases ("zamanat", "nan nafqa") also match their
+  Arabic-script and English forms (``services.transliteration``).
+
+``parse`` turns a query into a tree of plan nodes which are evaluated
+directly over the posting lists of ``services.search_index``.  The
+children of an AND run most selective first (by posting-list size): the
+first is materialised and every further child only filters the shrinking
+candidate list – by probing its posting dict when the candidates are
+fewer, otherwise by a merge that follows skip pointers over both sorted
+lists.  Negations have the largest estimates, so they run last, as
+exclusions from the survivors.  The matched set is then BM25F-ranked on
+the positive terms, and ``explain`` reports the plan with estimated and
+actual cardinalities per node.
+"""
+
+import bisect
+import math
+import re
+import time
+
+from services import transliteration
+from services.search_index import (
+    FIELDS, POSITION_FIELDS, decode_all_positions, decode_positions, get_search_index,
+    keyword_value, tokenize, tokenize_with_positions,
+)
+
+
+class QuerySyntaxError(ValueError):
+    """Raised for a query that cannot be parsed."""
+
+
+# Query field name -> indexed text field
+TEXT_FIELD_ALIASES = {
+    "title": "title",
+    "number": "case_number",
+    "case_number": "case_number",
+    "summary": "summary",
+    "headnotes": "headnotes",
+    "text": "full_text",
+    "full_text": "full_text",
+    "judgment": "judgment_text",
+    "judgment_text": "judgment_text",
+}
+# Query field name -> structured (keyword) field
+KEYWORD_FIELD_ALIASES = {
+    "court": "court",
+    "judge": "judge_names",
+    "statute": "cited_statutes",
+    "type": "case_type",
+    "case_type": "case_type",
+    "status": "status",
+    "source": "source",
+    "year": "year",
+}
+# Matched on the whole value; the others match substrings, like the
+# court / judge / statute filters of /search.
+EXACT_KEYWORD_FIELDS = ("case_type", "status", "source", "year")
+
+OPERATORS = ("AND", "OR", "NOT")
+
+NEAR_DEFAULT_DISTANCE = 5
+
+_TOKEN_RE = re.compile(r"""
+      (?P<lparen>\()
+    | (?P<rparen>\))
+    | (?P<phrase>"[^"]*"?)
+    | (?P<field>[A-Za-z_]+):(?P<value>"[^"]*"?|[^\s()"]+)
+    | (?P<near>NEAR(?:/(?P<distance>\d+))?)(?=[\s("]|$)
+    | (?P<neg>-)(?=[^\s\-])
+    | (?P<word>[^\s()"]+)
+""", re.VERBOSE)
+_HYPHENATED_RE = re.compile(r"\w-\w")
+
+
+# ---------------------------------------------------------------------------
+# Posting-list operations
+# ---------------------------------------------------------------------------
+
+def intersect(a: list, b: list) -> list:
+    """
+    Intersection of two ascending ordinal lists.  Every sqrt(n)-th entry
+    acts as a skip pointer: while the element it points to is still behind
+    the other list's cursor, whole blocks are skipped without comparing
+    each entry.
+    """
+    if len(a) > len(b):
+        a, b = b, a
+    na, nb = len(a), len(b)
+    skip_a = max(1, math.isqrt(na))
+    skip_b = max(1, math.isqrt(nb))
+    out = []
+    i = j = 0
+    while i < na and j < nb:
+        x, y = a[i], b[j]
+        if x == y:
+            out.append(x)
+            i += 1
+            j += 1
+        elif x < y:
+            if i + skip_a < na and a[i + skip_a] <= y:
+                while i + skip_a < na and a[i + skip_a] <= y:
+                    i += skip_a
+            else:
+                i += 1
+        elif j + skip_b < nb and b[j + skip_b] <= x:
+            while j + skip_b < nb and b[j + skip_b] <= x:
+                j += skip_b
+        else:
+            j += 1
+    return out
+
+
+def _universe(index) -> list:
+    return [o for o, case_id in enumerate(index.doc_ids) if case_id is not None]
+
+
+def _narrow(index, candidates: list, nodes: list) -> list:
+    """Filter *candidates* through each node in turn, stopping once empty."""
+    for node in nodes:
+        if not candidates:
+            break
+        candidates = node.filter(index, candidates)
+    return candidates
+
+
+# ---------------------------------------------------------------------------
+# Plan nodes
+# ---------------------------------------------------------------------------
+
+class Node:
+    """
+    A plan node.  ``evaluate`` returns the ascending ordinals matching the
+    node; ``filter`` returns the subset of ascending *candidates* that
+    match, which is how AND feeds its survivors to the next child.
+    """
+
+    op = "?"
+
+    def __init__(self):
+        self.estimated = None
+        self.matched = None
+        self.strategy = None
+
+    def estimate(self, index) -> int:
+        raise NotImplementedError
+
+    def evaluate(self, index) -> list:
+        raise NotImplementedError
+
+    def filter(self, index, candidates: list) -> list:
+        self.strategy = "skip-merge"
+        return intersect(candidates, self.evaluate(index))
+
+    def positive_terms(self) -> list:
+        return []
+
+    def describe(self) -> dict:
+        node = {"op": self.op, **self._details()}
+        for key in ("estimated", "matched", "strategy"):
+            value = getattr(self, key)
+            if value is not None:
+                node[key] = value
+        return node
+
+    def _details(self) -> dict:
+        return {}
+
+
+class Term(Node):
+    """An analysed term, optionally restricted to one text field."""
+
+    op = "TERM"
+
+    def __init__(self, term: str, field: str = None):
+        super().__init__()
+        self.term = term
+        self.field = field
+        self._slot = FIELDS.index(field) if field else None
+
+    def _postings(self, index) -> dict:
+        return index.postings.get(self.term, {})
+
+    def estimate(self, index) -> int:
+        self.estimated = len(self._postings(index))
+        return self.estimated
+
+    def _hit(self, tfs) -> bool:
+        return self._slot is None or tfs[self._slot] > 0
+
+    def evaluate(self, index) -> list:
+        plist = self._postings(index)
+        if self._slot is None:
+            result = list(plist)
+        else:
+            result = [o for o, tfs in plist.items() if tfs[self._slot]]
+        self.matched = len(result)
+        return result
+
+    def filter(self, index, candidates: list) -> list:
+        plist = self._postings(index)
+        if len(candidates) <= len(plist):
+            self.strategy = "probe"
+            result = [o for o in candidates if o in plist and self._hit(plist[o])]
+        else:
+            self.strategy = "skip-merge"
+            result = intersect(candidates, self.evaluate(index))
+        self.matched = len(result)
+        return result
+
+    def positive_terms(self) -> list:
+        return [self.term]
+
+    def _details(self) -> dict:
+        details = {"term": self.term}
+        if self.field:
+            details["field"] = self.field
+        return details
+
+
+def _field_packs(index, ordinal, field):
+    """(field, positions triple) pairs of a case, optionally just *field*."""
+    packs = index.doc_positions[ordinal]
+    if field:
+        return [(field, packs[field])] if field in packs else []
+    return list(packs.items())
+
+
+class Phrase(Node):
+    """
+    Terms at fixed relative positions (stopword gaps in the query are kept).
+    Candidates must contain every term; they are then checked against the
+    positional postings.  The case number keeps no
+    positions, so there all terms co-occurring in the field is accepted.
+    """
+
+    op = "PHRASE"
+
+    def __init__(self, terms: list, offsets: list, field: str = None):
+        super().__init__()
+        self.terms = terms
+        self.offsets = offsets
+        self.field = field
+        self._parts = [Term(t, field) for t in terms]
+
+    def estimate(self, index) -> int:
+        self.estimated = min(part.estimate(index) for part in self._parts)
+        return self.estimated
+
+    def evaluate(self, index) -> list:
+        parts = sorted(self._parts, key=lambda p: p.estimate(index))
+        candidates = parts[0].evaluate(index)
+        return self._verify(index, _narrow(index, candidates, parts[1:]))
+
+    def filter(self, index, candidates: list) -> list:
+        self.strategy = "probe"
+        parts = sorted(self._parts, key=lambda p: p.estimate(index))
+        return self._verify(index, _narrow(index, candidates, parts))
+
+    def _verify(self, index, candidates: list) -> list:
+        result = [o for o in candidates if self._matches(index, o)]
+        self.matched = len(result)
+        return result
+
+    def _matches(self, index, ordinal) -> bool:
+        for _, packed in _field_packs(index, ordinal, self.field):
+            if self.spans(packed):
+                return True
+        # Fields without positions: accept co-occurrence within the field
+        for slot, field in enumerate(FIELDS):
+            if field in POSITION_FIELDS or (self.field and field != self.field):
+                continue
+            if all(index.postings.get(t, {}).get(ordinal, (0,) * len(FIELDS))[slot]
+                   for t in self.terms):
+                return True
+        return False
+
+    def spans(self, packed) -> list:
+        """(first, last) token positions of each occurrence in one field."""
+        following = [set(decode_positions(packed, t)) for t in self.terms[1:]]
+        if not all(following):
+            return []
+        pairs = list(zip(self.offsets[1:], following))
+        return [
+            (p, p + self.offsets[-1])
+            for p in decode_positions(packed, self.terms[0])
+            if all(p + offset in positions for offset, positions in pairs)
+        ]
+
+    def positive_terms(self) -> list:
+        return list(self.terms)
+
+    def _details(self) -> dict:
+        details = {"terms": self.terms}
+        if self.field:
+            details["field"] = self.field
+        return details
+
+
+class Near(Node):
+    """
+    ``a NEAR/n b`` – both operands (terms or phrases) occur in the same
+    field with at most *n* index terms between them, in either order.
+    Stored positions count stopwords too, so a pair further apart than *n*
+    positions is measured again in index terms (positions renumbered over
+    every term the field holds) before it is rejected.
+    """
+
+    op = "NEAR"
+
+    def __init__(self, left: Node, right: Node, distance: int):
+        super().__init__()
+        for operand in (left, right):
+            if not all(isinstance(o, (Term, Phrase)) for o in _alternatives(operand)):
+                raise QuerySyntaxError("NEAR operands must be terms or phrases")
+        self.left = left
+        self.right = right
+        self.distance = distance
+        self.field = _alternatives(left)[0].field or _alternatives(right)[0].field
+
+    def estimate(self, index) -> int:
+        self.estimated = min(self.left.estimate(index), self.right.estimate(index))
+        return self.estimated
+
+    def _operands(self, index):
+        return sorted((self.left, self.right), key=lambda o: o.estimate(index))
+
+    def evaluate(self, index) -> list:
+        first, second = self._operands(index)
+        return self._verify(index, second.filter(index, first.evaluate(index)))
+
+    def filter(self, index, candidates: list) -> list:
+        self.strategy = "probe"
+        return self._verify(index, _narrow(index, candidates, self._operands(index)))
+
+    @staticmethod
+    def _spans(node, packed) -> list:
+        spans = []
+        for alternative in _alternatives(node):
+            if isinstance(alternative, Phrase):
+                spans.extend(alternative.spans(packed))
+            else:
+                spans.extend((p, p) for p in decode_positions(packed, alternative.term))
+        return sorted(spans)
+
+    def _verify(self, index, candidates: list) -> list:
+        result = [o for o in candidates if self._matches(index, o)]
+        self.matched = len(result)
+        return result
+
+    @staticmethod
+    def _renumber(spans: list, positions: list) -> list:
+        """*spans* in index-term ordinals instead of token positions."""
+        return [(bisect.bisect_left(positions, s), bisect.bisect_left(positions, e))
+                for s, e in spans]
+
+    def _close(self, left: list, right: list) -> bool:
+        # Two-pointer walk over both span lists (ascending by start)
+        i = j = 0
+        while i < len(left) and j < len(right):
+            (ls, le), (rs, re_) = left[i], right[j]
+            if max(rs - le, ls - re_) - 1 <= self.distance:
+                return True
+            if le < rs:
+                i += 1
+            else:
+                j += 1
+        return False
+
+    def _matches(self, index, ordinal) -> bool:
+        for _, packed in _field_packs(index, ordinal, self.field):
+            left = self._spans(self.left, packed)
+            right = self._spans(self.right, packed) if left else []
+            if not right:
+                continue
+            # Fewer index terms than positions lie between any pair, so the
+            # renumbering is only needed when the positions are too far apart
+            if self._close(left, right):
+                return True
+            positions = decode_all_positions(packed)
+            if self._close(self._renumber(left, positions), self._renumber(right, positions)):
+                return True
+        return False
+
+    def spans(self, packed) -> list:
+        """(first, last) positions of each close enough pair in one field."""
+        left = self._spans(self.left, packed)
+        right = self._spans(self.right, packed) if left else []
+        if not right:
+            return []
+        positions = decode_all_positions(packed)
+        return [
+            (min(ls, rs), max(le, re_))
+            for (ls, le), (als, ale) in zip(left, self._renumber(left, positions))
+            for (rs, re_), (ars, are) in zip(right, self._renumber(right, positions))
+            if max(ars - ale, als - are) - 1 <= self.distance
+        ]
+
+    def positive_terms(self) -> list:
+        return self.left.positive_terms() + self.right.positive_terms()
+
+    def describe(self) -> dict:
+        node = super().describe()
+        node["distance"] = self.distance
+        node["children"] = [self.left.describe(), self.right.describe()]
+        return node
+
+
+class Keyword(Node):
+    """A structured field value (court, judge, year, ...)."""
+
+    op = "FIELD"
+
+    def __init__(self, field: str, value: str):
+        super().__init__()
+        self.field = field
+        self.value = value
+        self._lists = None
+
+    def _matching(self, index) -> list:
+        """Posting dicts of the indexed values this clause matches."""
+        values = index.keywords.get(self.field, {})
+        if self.field in EXACT_KEYWORD_FIELDS:
+            plist = values.get(self.value)
+            return [plist] if plist else []
+        return [plist for value, plist in values.items() if self.value in value]
+
+    def estimate(self, index) -> int:
+        self._lists = self._matching(index)
+        self.estimated = sum(len(plist) for plist in self._lists)
+        return self.estimated
+
+    def evaluate(self, index) -> list:
+        if self._lists is None:
+            self.estimate(index)
+        if len(self._lists) == 1:
+            result = list(self._lists[0])
+        else:
+            result = sorted(set().union(*self._lists))
+        self.matched = len(result)
+        return result
+
+    def filter(self, index, candidates: list) -> list:
+        if self._lists is None:
+            self.estimate(index)
+        if len(candidates) * len(self._lists) <= self.estimated:
+            self.strategy = "probe"
+            result = [o for o in candidates if any(o in plist for plist in self._lists)]
+        else:
+            self.strategy = "skip-merge"
+            result = intersect(candidates, self.evaluate(index))
+        self.matched = len(result)
+        return result
+
+    def _details(self) -> dict:
+        return {"field": self.field, "value": self.value, "values": len(self._lists or ())}
+
+
+class Range(Keyword):
+    """An inclusive numeric range over a structured field (year)."""
+
+    op = "RANGE"
+
+    def __init__(self, field: str, low: int = None, high: int = None):
+        super().__init__(field, f"{'' if low is None else low}..{'' if high is None else high}")
+        self.low = low
+        self.high = high
+
+    def _matching(self, index) -> list:
+        lists = []
+        for value, plist in index.keywords.get(self.field, {}).items():
+            if not value.isdigit():
+                continue
+            number = int(value)
+            if (self.low is None or number >= self.low) and (self.high is None or number <= self.high):
+                lists.append(plist)
+        return lists
+
+
+class Not(Node):
+    """Negation – everything (or every candidate) not matching the child."""
+
+    op = "NOT"
+
+    def __init__(self, child: Node):
+        super().__init__()
+        self.child = child
+
+    def estimate(self, index) -> int:
+        self.estimated = max(index.live_count - self.child.estimate(index), 0)
+        return self.estimated
+
+    def evaluate(self, index) -> list:
+        return self.filter(index, _universe(index))
+
+    def filter(self, index, candidates: list) -> list:
+        self.strategy = "exclude"
+        excluded = set(self.child.filter(index, candidates))
+        result = [o for o in candidates if o not in excluded]
+        self.matched = len(result)
+        return result
+
+    def describe(self) -> dict:
+        node = super().describe()
+        node["children"] = [self.child.describe()]
+        return node
+
+
+class And(Node):
+    """Conjunction, evaluated most selective child first."""
+
+    op = "AND"
+
+    def __init__(self, children: list):
+        super().__init__()
+        self.children = children
+
+    def estimate(self, index) -> int:
+        estimates = [child.estimate(index) for child in self.children]
+        self.estimated = min(estimates) if estimates else 0
+        return self.estimated
+
+    def _ordered(self, index) -> list:
+        for child in self.children:
+            if child.estimated is None:
+                child.estimate(index)
+        # Most selective first; negations last, as exclusions
+        self.children.sort(key=lambda c: (isinstance(c, Not), c.estimated))
+        return self.children
+
+    def evaluate(self, index) -> list:
+        first, *rest = self._ordered(index)
+        result = _narrow(index, first.evaluate(index), rest)
+        self.matched = len(result)
+        return result
+
+    def filter(self, index, candidates: list) -> list:
+        self.strategy = "probe"
+        result = _narrow(index, candidates, self._ordered(index))
+        self.matched = len(result)
+        return result
+
+    def positive_terms(self) -> list:
+        return [t for child in self.children for t in child.positive_terms()]
+
+    def describe(self) -> dict:
+        node = super().describe()
+        node["children"] = [child.describe() for child in self.children]
+        return node
+
+
+class Or(And):
+    """Disjunction – union of the children's matches."""
+
+    op = "OR"
+
+    def estimate(self, index) -> int:
+        total = sum(child.estimate(index) for child in self.children)
+        self.estimated = min(total, index.live_count)
+        return self.estimated
+
+    def evaluate(self, index) -> list:
+        result = sorted(set().union(*(child.evaluate(index) for child in self.children)))
+        self.matched = len(result)
+        return result
+
+    def filter(self, index, candidates: list) -> list:
+        self.strategy = "probe"
+        matched = set()
+        for child in self.children:
+            matched.update(child.filter(index, candidates))
+        result = [o for o in candidates if o in matched]
+        self.matched = len(result)
+        return result
+
+
+# ---------------------------------------------------------------------------
+# Parsing
+# ---------------------------------------------------------------------------
+
+def _lex(query: str) -> list:
+    tokens = []
+    for match in _TOKEN_RE.finditer(query):
+        kind = match.lastgroup
+        if kind == "value":
+            name = match.group("field").lower()
+            if name in TEXT_FIELD_ALIASES or name in KEYWORD_FIELD_ALIASES:
+                tokens.append(("field", (name, match.group("value"))))
+            else:
+                # "PPC:302" – not a field, just text
+                tokens.append(("word", match.group()))
+        elif kind == "near":
+            distance = match.group("distance")
+            tokens.append(("near", int(distance) if distance else NEAR_DEFAULT_DISTANCE))
+        elif kind == "word" and match.group() in OPERATORS:
+            tokens.append(("op", match.group()))
+        elif kind == "word" and _HYPHENATED_RE.search(match.group()) and len(tokenize(match.group())) > 1:
+            # pre-arrest is the phrase "pre arrest"
+            tokens.append(("phrase", match.group()))
+        else:
+            tokens.append((kind, match.group()))
+    return tokens
+
+
+def is_structured(query: str) -> bool:
+    """True when *query* uses any query-language syntax beyond plain words."""
+    return any(kind != "word" for kind, _ in _lex(query or ""))
+
+
+def _combine(cls, children: list):
+    children = [c for c in children if c is not None]
+    if not children:
+        return None
+    if len(children) == 1:
+        return children[0]
+    flat = []
+    for child in children:
+        flat.extend(child.children if type(child) is cls else [child])
+    return cls(flat)
+
+
+def _alternatives(node) -> list:
+    """The Term / Phrase choices of a transliterated OR, or just *node*."""
+    return node.children if type(node) is Or else [node]
+
+
+def indexed_word(word: str) -> bool:
+    """Whether the search index already holds *word* as a term."""
+    terms = tokenize(word)
+    return len(terms) == 1 and get_search_index().document_frequency(terms[0]) > 0
+
+
+def _text_node(raw: str, field: str = None, transliterate: bool = True):
+    """
+    Term or Phrase for a word, quoted phrase or field value – ORed with its
+    Arabic-script and English forms when it is Roman Urdu.
+    """
+    tokens = list(tokenize_with_positions(raw.strip('"')))
+    if not tokens:
+        return None
+    if len(tokens) == 1:
+        node = Term(tokens[0][0], field)
+    else:
+        first = tokens[0][1]
+        node = Phrase([t for t, _, _, _ in tokens], [p - first for _, p, _, _ in tokens], field)
+    if not transliterate:
+        return node
+    return _combine(Or, [node] + [
+        _text_node(alternative, field, transliterate=False)
+        for alternative in transliteration.alternatives(raw, indexed_word)
+    ])
+
+
+def _year(text: str):
+    if not text:
+        return None
+    if not text.isdigit():
+        raise QuerySyntaxError(f"Invalid year: {text}")
+    return int(text)
+
+
+def _field_node(name: str, raw: str):
+    if name in TEXT_FIELD_ALIASES:
+        return _text_node(raw, TEXT_FIELD_ALIASES[name])
+
+    field = KEYWORD_FIELD_ALIASES[name]
+    value = raw.strip('"').strip()
+    if ".." in value:
+        if field != "year":
+            raise QuerySyntaxError(f"Ranges are only supported on year, not {name}")
+        low, high = (part.strip() for part in value.split("..", 1))
+        if not low and not high:
+            raise QuerySyntaxError("A range needs at least one bound")
+        return Range(field, _year(low), _year(high))
+    if field == "year":
+        return Keyword(field, str(_year(value)))
+    value = keyword_value(value)
+    return Keyword(field, value) if value else None
+
+
+class _Parser:
+    """
+    Recursive descent:
+        or := and (OR and)*;  and := unary (AND? unary)*;
+        unary := (NOT | -) unary | near;  near := primary (NEAR/n primary)*
+    """
+
+    def __init__(self, tokens: list):
+        self.tokens = tokens
+        self.pos = 0
+
+    def _peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else (None, None)
+
+    def _take(self):
+        token = self._peek()
+        self.pos += 1
+        return token
+
+    def parse(self):
+        node = self._or()
+        if self.pos < len(self.tokens):
+            raise QuerySyntaxError(f"Unexpected {self._peek()[1]!r}")
+        return node
+
+    def _or(self):
+        children = [self._and()]
+        while self._peek() == ("op", "OR"):
+            self._take()
+            children.append(self._and())
+        return _combine(Or, children)
+
+    def _and(self):
+        children = [self._unary()]
+        while True:
+            token = self._peek()
+            if token[0] in (None, "rparen") or token == ("op", "OR"):
+                break
+            if token == ("op", "AND"):
+                self._take()
+            children.append(self._unary())
+        return _combine(And, children)
+
+    def _unary(self):
+        token = self._peek()
+        if token[0] == "neg" or token == ("op", "NOT"):
+            self._take()
+            child = self._unary()
+            return Not(child) if child is not None else None
+        return self._near()
+
+    def _near(self):
+        node = self._primary()
+        while self._peek()[0] == "near":
+            distance = self._take()[1]
+            right = self._primary()
+            if node is None or right is None:
+                raise QuerySyntaxError("NEAR needs a searchable term on both sides")
+            node = Near(node, right, distance)
+        return node
+
+    def _primary(self):
+        kind, value = self._take()
+        if kind is None:
+            raise QuerySyntaxError("Unexpected end of query")
+        if kind == "lparen":
+            node = self._or()
+            if self._take()[0] != "rparen":
+                raise QuerySyntaxError("Missing closing parenthesis")
+            return node
+        if kind == "rparen":
+            raise QuerySyntaxError("Unexpected ')'")
+        if kind in ("op", "near"):
+            raise QuerySyntaxError("An operator must be followed by a term")
+        if kind == "field":
+            return _field_node(*value)
+        return _text_node(value)
+
+
+def parse(query: str):
+    """
+    Compile *query* into a plan tree.  Plain queries (no syntax) become an
+    OR of their terms, matching the ranked keyword search, plus the forms
+    of any Roman-Urdu words.
+
+    Returns:
+        the root Node, or None when nothing searchable remains (stopwords only)
+
+    Raises:
+        QuerySyntaxError
+    """
+    tokens = _lex(query or "")
+    if not tokens:
+        return None
+    if all(kind == "word" for kind, _ in tokens):
+        terms = list(dict.fromkeys(tokenize(query)))
+        return _combine(Or, [Term(t) for t in terms] + [
+            _text_node(alternative, transliterate=False)
+            for _, alternatives in transliteration.expand(query, indexed_word)
+            for alternative in alternatives
+        ])
+    return _Parser(tokens).parse()
+
+
+# ---------------------------------------------------------------------------
+# Execution
+# ---------------------------------------------------------------------------
+
+def text_leaves(node) -> list:
+    """
+    The positive Term / Phrase / Near nodes of a plan – what a query looks
+    for in the text (negations and structured-field clauses excluded).
+    """
+    if isinstance(node, (Term, Phrase, Near)):
+        return [node]
+    if isinstance(node, And):
+        return [leaf for child in node.children for leaf in text_leaves(child)]
+    return []
+
+
+def match_terms(query: str) -> list:
+    """Terms that contribute to ranking and highlighting (negations excluded)."""
+    node = parse(query)
+    return list(dict.fromkeys(node.positive_terms())) if node is not None else []
+
+
+def execute(query: str, limit: int = None, index=None):
+    """
+    Parse, plan and run *query* against *index* (default: the shared
+    search index).
+
+    Returns:
+        (ranked, plan) – ranked is [(case_id, score)] best first, plan the
+        ``explain`` dict
+    """
+    node = parse(query)
+    index = index or get_search_index()
+    started = time.perf_counter()
+    terms = list(dict.fromkeys(node.positive_terms())) if node is not None else []
+    ranked = index.evaluate(node, terms, limit)
+    plan = {
+        "structured": is_structured(query),
+        "plan": node.describe() if node is not None else None,
+        "ranked_on": terms,
+        "matched": node.matched if node is not None else 0,
+        "elapsed_ms": round((time.perf_counter() - started) * 1000, 3),
+    }
+    return ranked, plan
+
+
+def explain(query: str, limit: int = None) -> dict:
+    """The execution plan of *query* with per-node estimates and match counts."""
+    return execute(query, limit)[1]
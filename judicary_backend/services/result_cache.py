@@ -0,0 +1,142 @@
+"""
+Result Cache – Cached Responses for Hot Read Endpoints
+========================================================
+The case corpus only changes when a scraper runs or a case is edited, yet
+popular requests on /search and /cases (a court filter plus the default
+sort) were recomputed every time.  ``cached_response`` stores the
+serialized JSON body of such requests keyed by a normalised query-string
+signature.
+
+An entry is served only while
+
+* its write generation is current – the global "cases" generation, or the
+  per-court token when the request filters on ``court``, so writes to
+  other courts leave it intact.  Ranked (``q``) searches always use the
+  global generation because any write shifts BM25 document frequencies;
+* it is younger than the TTL, which bounds staleness from writes made by
+  other worker processes.
+
+Entries are evicted least-recently-used once the total body size exceeds
+the byte budget.  Hit/miss counters are exposed through ``stats()``.
+"""
+
+import functools
+import threading
+import time
+from collections import OrderedDict
+
+from flask import Response, request
+
+from config import get_config
+from services import generations
+
+# Parameters whose value is implied when absent; dropped from the signature
+# so "?page=1" and "" share an entry.
+DEFAULT_ARGS = {"page": "1", "page_size": "20", "count": "exact", "facets": "false"}
+
+_cache = OrderedDict()   # key -> (token, filled_at, body)
+_lock = threading.Lock()
+_bytes = 0
+_stats = {"hits": 0, "misses": 0, "stale": 0, "evictions": 0, "uncacheable": 0}
+
+
+def request_signature(path: str, args) -> tuple:
+    """Normalised (path, sorted non-default args) signature of a request."""
+    items = []
+    for key in sorted(args):
+        values = [v.strip() for v in args.getlist(key) if v.strip()]
+        if not values or (len(values) == 1 and DEFAULT_ARGS.get(key) == values[0]):
+            continue
+        items.append((key, tuple(values)))
+    return path, tuple(items)
+
+
+def _generation_token(collection: str, args) -> tuple:
+    court = (args.get("court") or "").strip()
+    if court and not (args.get("q") or "").strip():
+        return ("court", generations.court_filter_token(collection, court))
+    return ("all", generations.current(collection))
+
+
+def _drop(key):
+    global _bytes
+    entry = _cache.pop(key, None)
+    if entry is not None:
+        _bytes -= len(entry[2])
+
+
+def _store(key, token, body, cfg):
+    global _bytes
+    with _lock:
+        _drop(key)
+        _cache[key] = (token, time.time(), body)
+        _bytes += len(body)
+        while _bytes > cfg.RESULT_CACHE_MAX_BYTES and _cache:
+            _drop(next(iter(_cache)))
+            _stats["evictions"] += 1
+
+
+def cached_response(collection: str):
+    """
+    Decorator caching successful GET responses of a read endpoint whose
+    output depends only on the query string and *collection*'s contents.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            cfg = get_config()
+            key = request_signature(request.path, request.args)
+            token = _generation_token(collection, request.args)
+            now = time.time()
+
+            with _lock:
+                entry = _cache.get(key)
+                if entry is not None:
+                    cached_token, filled_at, body = entry
+                    if cached_token == token and now - filled_at < cfg.RESULT_CACHE_TTL_SECONDS:
+                        _cache.move_to_end(key)
+                        _stats["hits"] += 1
+                        return Response(body, status=200, mimetype="application/json",
+                                        headers={"X-Cache": "HIT"})
+                    _drop(key)
+                    _stats["stale"] += 1
+                _stats["misses"] += 1
+
+            result = view(*args, **kwargs)
+            response, status = result if isinstance(result, tuple) else (result, 200)
+            if status != 200 or not isinstance(response, Response):
+                return result
+
+            body = response.get_data()
+            if len(body) > cfg.RESULT_CACHE_MAX_ENTRY_BYTES:
+                with _lock:
+                    _stats["uncacheable"] += 1
+            else:
+                _store(key, token, body, cfg)
+            response.headers["X-Cache"] = "MISS"
+            return response, status
+        return wrapper
+    return decorator
+
+
+def stats() -> dict:
+    """Hit/miss counters and current occupancy, for sizing the cache."""
+    cfg = get_config()
+    with _lock:
+        lookups = _stats["hits"] + _stats["misses"]
+        return {
+            **_stats,
+            "hit_rate": round(_stats["hits"] / lookups, 4) if lookups else None,
+            "entries": len(_cache),
+            "bytes": _bytes,
+            "max_bytes": cfg.RESULT_CACHE_MAX_BYTES,
+            "ttl_seconds": cfg.RESULT_CACHE_TTL_SECONDS,
+        }
+
+
+def clear():
+    """Drop every cached response."""
+    global _bytes
+    with _lock:
+        _cache.clear()
+        _bytes = 0
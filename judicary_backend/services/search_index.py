@@ -0,0 +1,773 @@
+"""
+Search Index – In-process Inverted Index with BM25 Ranking
+============================================================
+Keeps a tokenized inverted index over the searchable case fields so that
+/api/search can rank matches without an unanchored regex scan of the
+``cases`` collection.
+
+Scoring is BM25F: per-field term frequencies are length-normalised against
+the field's average length, combined with the same per-field weights as the
+Mongo text index, and saturated once with k1.
+
+For the body fields the index also keeps where each term occurs (character
+offset and length, delta/varint-encoded per document), so result snippets
+can be cut from the stored text without re-tokenizing it per request.
+
+Every field except the case number additionally stores positional
+postings – each term's token positions, delta/varint-encoded per document
+and field – which phrase and ``NEAR/n`` queries check candidates against.
+Positions count every word token, so a phrase keeps its stopword gaps.
+The long body fields also keep a sparse anchor table (the character offset
+of one token every ``ANCHOR_INTERVAL`` positions) and their paragraph
+starts, so a position can be turned back into text and a paragraph number
+by reading a few hundred characters instead of the whole judgment.
+
+Structured fields (court, year, judges, statutes, ...) are indexed as
+keyword postings next to the text terms, so ``services.query_parser`` can
+evaluate field clauses with the same posting-list operations.
+
+The index lives in memory, is persisted to disk with pickle and is kept
+current by ``services.case_events`` whenever a case is written.  Workers
+that did not perform a write catch up in the background
+(``services.index_sync``) through ``refresh()``, which pulls cases whose
+``updated_at`` is newer than the index watermark and applies deletion
+tombstones.  An index loaded from disk is first reconciled with the
+collection, since writes and deletes may have happened while no worker
+held it.
+
+Memory: everything is held per worker and grows linearly with the corpus,
+without a cap.  The dominant cost is one posting-dict entry per distinct
+(term, case) pair together with that case's packed offsets and positions,
+about 165 bytes per pair in CPython – some 300 KB for a 3,000-word
+judgment, i.e. roughly 3 GB per 10,000 full judgments (title- and
+summary-only cases cost a few KB).  The pickle on disk is of the same
+order.  Size ``SEARCH_INDEX_DIR`` and worker memory accordingly.
+"""
+
+import bisect
+import math
+import os
+import pickle
+import re
+import threading
+import time
+import logging
+from array import array
+from collections import Counter
+from datetime import datetime
+
+from config import get_config
+from services import index_sync
+from services.text_analysis import analyze_with_positions, fold
+
+logger = logging.getLogger(__name__)
+
+
+# ----- Indexed fields and their weights (mirrors Case.meta text index) -----
+FIELD_WEIGHTS = {
+    "title": 10.0,
+    "case_number": 8.0,
+    "summary": 5.0,
+    "headnotes": 3.0,
+    "full_text": 1.0,
+    "judgment_text": 1.0,
+}
+FIELDS = tuple(FIELD_WEIGHTS)
+
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+# Fields whose term offsets are stored for snippets, and the cap on stored
+# occurrences per term per field (bounds memory and per-result work).
+OFFSET_FIELDS = ("summary", "headnotes", "full_text")
+MAX_OFFSETS_PER_TERM = 32
+
+# Fields with positional postings for phrase / proximity queries
+POSITION_FIELDS = ("title", "summary", "headnotes", "full_text", "judgment_text")
+
+# Fields searchable inside one case (/cases/<id>/find): they keep anchors
+# (token position -> character offset every ANCHOR_INTERVAL positions) and
+# paragraph start offsets
+FIND_FIELDS = ("summary", "headnotes", "full_text", "judgment_text")
+ANCHOR_INTERVAL = 32
+_PARAGRAPH_BREAK_RE = re.compile(r"\n\s*\n")
+_LINE_BREAK_RE = re.compile(r"\n+")
+
+# Structured fields indexed as keyword postings, keyed by folded value
+KEYWORD_FIELDS = (
+    "court", "case_type", "status", "source", "year", "judge_names", "cited_statutes",
+)
+
+# Everything add_case reads from a case
+SOURCE_FIELDS = FIELDS + KEYWORD_FIELDS + ("duplicate_of", "updated_at")
+
+# Bump whenever tokenization or the on-disk layout changes so stale
+# pickles are rebuilt instead of loaded.
+INDEX_VERSION = 7
+
+
+def tokenize_with_positions(text: str):
+    """Yield (term, position, start, length) for each index term in *text*."""
+    return analyze_with_positions(text)
+
+
+def tokenize_with_offsets(text: str):
+    """Yield (term, start, length) for each index term in *text*."""
+    for term, _, start, length in tokenize_with_positions(text):
+        yield term, start, length
+
+
+def tokenize(text: str) -> list:
+    """Split text into lower-cased index terms."""
+    return [term for term, _, _ in tokenize_with_offsets(text)]
+
+
+# ----- Varint coding for offset lists -----
+
+def encode_varints(values, out: bytearray):
+    """Append unsigned LEB128 varints for *values* to *out*."""
+    for value in values:
+        while value >= 0x80:
+            out.append((value & 0x7F) | 0x80)
+            value >>= 7
+        out.append(value)
+
+
+def decode_varints(data, start: int = 0, count: int = None):
+    """Decode varints from *data* starting at byte *start*."""
+    values = []
+    value = shift = 0
+    pos = start
+    while pos < len(data) and (count is None or len(values) < count):
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte & 0x80:
+            shift += 7
+        else:
+            values.append(value)
+            value = shift = 0
+    return values
+
+
+def encode_offsets(occurrences: dict):
+    """
+    Pack {term: [(start, length), ...]} into (sorted terms, starts, blob).
+
+    Each term's entry in *blob* is its occurrence count followed by
+    (start delta, length) pairs; ``starts[i]`` is the byte where term i's
+    entry begins.
+    """
+    terms = tuple(sorted(occurrences))
+    starts = array("I")
+    blob = bytearray()
+    for term in terms:
+        starts.append(len(blob))
+        pairs = occurrences[term][:MAX_OFFSETS_PER_TERM]
+        values = [len(pairs)]
+        previous = 0
+        for start, length in pairs:
+            values.extend((start - previous, length))
+            previous = start
+        encode_varints(values, blob)
+    return terms, starts, bytes(blob)
+
+
+def decode_offsets(packed, term: str) -> list:
+    """[(start, length), ...] for *term* from an ``encode_offsets`` triple."""
+    terms, starts, blob = packed
+    i = bisect.bisect_left(terms, term)
+    if i == len(terms) or terms[i] != term:
+        return []
+    count = decode_varints(blob, starts[i], 1)[0]
+    values = decode_varints(blob, starts[i], 1 + 2 * count)[1:]
+    result = []
+    position = 0
+    for delta, length in zip(values[::2], values[1::2]):
+        position += delta
+        result.append((position, length))
+    return result
+
+
+def encode_positions(positions: dict):
+    """
+    Pack {term: [position, ...]} into (sorted terms, starts, blob).  Each
+    term's entry is its occurrence count followed by position deltas.
+    """
+    terms = tuple(sorted(positions))
+    starts = array("I")
+    blob = bytearray()
+    for term in terms:
+        starts.append(len(blob))
+        values = [len(positions[term])]
+        previous = 0
+        for position in positions[term]:
+            values.append(position - previous)
+            previous = position
+        encode_varints(values, blob)
+    return terms, starts, bytes(blob)
+
+
+def decode_positions(packed, term: str) -> list:
+    """Ascending token positions of *term* from an ``encode_positions`` triple."""
+    terms, starts, blob = packed
+    i = bisect.bisect_left(terms, term)
+    if i == len(terms) or terms[i] != term:
+        return []
+    count = decode_varints(blob, starts[i], 1)[0]
+    result = []
+    position = 0
+    for delta in decode_varints(blob, starts[i], 1 + count)[1:]:
+        position += delta
+        result.append(position)
+    return result
+
+
+def decode_all_positions(packed) -> list:
+    """Ascending positions of every term in an ``encode_positions`` triple."""
+    values = decode_varints(packed[2])
+    result = []
+    i = 0
+    while i < len(values):
+        count = values[i]
+        position = 0
+        for delta in values[i + 1:i + 1 + count]:
+            position += delta
+            result.append(position)
+        i += 1 + count
+    result.sort()
+    return result
+
+
+def paragraph_starts(text: str) -> list:
+    """
+    Character offsets where the paragraphs of *text* begin.  Paragraphs are
+    separated by blank lines; text without any is split at line breaks.
+    """
+    if not text:
+        return []
+    breaks = _PARAGRAPH_BREAK_RE if _PARAGRAPH_BREAK_RE.search(text) else _LINE_BREAK_RE
+    return [0] + [m.end() for m in breaks.finditer(text) if m.end() < len(text)]
+
+
+def encode_layout(anchors: list, paragraphs: list) -> bytes:
+    """
+    Pack [(position, start), ...] anchors and paragraph start offsets: the
+    anchor count, delta-coded anchor pairs, then delta-coded paragraph starts.
+    """
+    values = [len(anchors)]
+    previous_position = previous_start = 0
+    for position, start in anchors:
+        values.extend((position - previous_position, start - previous_start))
+        previous_position, previous_start = position, start
+    previous = 0
+    for start in paragraphs:
+        values.append(start - previous)
+        previous = start
+    blob = bytearray()
+    encode_varints(values, blob)
+    return bytes(blob)
+
+
+def decode_layout(blob: bytes):
+    """(anchors, paragraph starts) from an ``encode_layout`` blob."""
+    values = decode_varints(blob)
+    count = values[0]
+    anchors = []
+    position = start = 0
+    for i in range(1, 1 + 2 * count, 2):
+        position += values[i]
+        start += values[i + 1]
+        anchors.append((position, start))
+    paragraphs = []
+    start = 0
+    for delta in values[1 + 2 * count:]:
+        start += delta
+        paragraphs.append(start)
+    return anchors, paragraphs
+
+
+def _field_value(case, field):
+    """Read a field from a Case document or a raw pymongo dict."""
+    if isinstance(case, dict):
+        return case.get(field)
+    return getattr(case, field, None)
+
+
+def keyword_value(value) -> str:
+    """Folded, whitespace-collapsed form of a structured field value."""
+    return " ".join(fold(str(value)).split())
+
+
+def _keywords(fields: dict) -> tuple:
+    """Distinct (field, keyword_value) pairs for the structured fields."""
+    pairs = set()
+    for f in KEYWORD_FIELDS:
+        value = fields.get(f)
+        for v in value if isinstance(value, (list, tuple)) else (value,):
+            if v not in (None, ""):
+                key = keyword_value(v)
+                if key:
+                    pairs.add((f, key))
+    return tuple(pairs)
+
+
+class SearchIndex:
+    """Inverted index over case text fields with BM25F scoring."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.RLock()
+        self._last_refresh = 0.0
+        self._last_save = time.time()
+        self.built = False         # rebuilt or loaded: every untimestamped case is in
+        self._reset()
+
+    def _reset(self):
+        self.doc_ids = []          # ordinal -> case id (None once removed)
+        self.ordinals = {}         # case id -> ordinal
+        self.field_lengths = []    # ordinal -> tuple of per-field token counts
+        self.doc_terms = []        # ordinal -> tuple of distinct terms
+        self.doc_offsets = []      # ordinal -> {field: encode_offsets triple}
+        self.doc_positions = []    # ordinal -> {field: encode_positions triple}
+        self.doc_layouts = []      # ordinal -> {field: encode_layout blob}
+        self.length_totals = [0] * len(FIELDS)
+        self.postings = {}         # term -> {ordinal: tuple of per-field tf}
+        self.doc_keywords = []     # ordinal -> tuple of (field, value)
+        self.keywords = {f: {} for f in KEYWORD_FIELDS}  # field -> value -> {ordinal: None}
+        self.live_count = 0
+        self.watermark = None      # newest updated_at seen by the index
+        self.deleted_through = datetime.utcnow()   # deletion tombstones applied up to here
+        self._dirty = 0
+
+    # ---- Writes ----
+
+    def add_case(self, case):
+        """Index (or re-index) a Case document or raw case dict."""
+        case_id = _field_value(case, "id") or _field_value(case, "_id")
+        if case_id is None:
+            return
+        updated_at = _field_value(case, "updated_at")
+        if _field_value(case, "duplicate_of"):
+            # Flagged near-duplicates are never search results
+            with self._lock:
+                if self._remove_locked(str(case_id)):
+                    self._dirty += 1
+                if updated_at and (self.watermark is None or updated_at > self.watermark):
+                    self.watermark = updated_at
+            return
+        fields = {f: _field_value(case, f) for f in FIELDS + KEYWORD_FIELDS}
+        self.add(str(case_id), fields, updated_at)
+
+    def add(self, case_id, fields, updated_at=None):
+        """Index the given field texts and structured values under *case_id*."""
+        per_field = []
+        offsets = {}
+        positions = {}
+        layouts = {}
+        for f in FIELDS:
+            counts = Counter()
+            occurrences = {} if f in OFFSET_FIELDS else None
+            term_positions = {} if f in POSITION_FIELDS else None
+            anchors = [] if f in FIND_FIELDS else None
+            text = fields.get(f) or ""
+            for term, position, start, length in tokenize_with_positions(text):
+                counts[term] += 1
+                if occurrences is not None:
+                    occurrences.setdefault(term, []).append((start, length))
+                if term_positions is not None:
+                    term_positions.setdefault(term, []).append(position)
+                if anchors is not None and (
+                    not anchors or position // ANCHOR_INTERVAL > anchors[-1][0] // ANCHOR_INTERVAL
+                ):
+                    anchors.append((position, start))
+            per_field.append(counts)
+            if occurrences:
+                offsets[f] = encode_offsets(occurrences)
+            if term_positions:
+                positions[f] = encode_positions(term_positions)
+            if anchors:
+                layouts[f] = encode_layout(anchors, paragraph_starts(text))
+        lengths = tuple(sum(c.values()) for c in per_field)
+        terms = set()
+        for c in per_field:
+            terms.update(c)
+        keywords = _keywords(fields)
+
+        with self._lock:
+            self._remove_locked(case_id)
+            ordinal = len(self.doc_ids)
+            self.doc_ids.append(case_id)
+            self.ordinals[case_id] = ordinal
+            self.field_lengths.append(lengths)
+            self.doc_terms.append(tuple(terms))
+            self.doc_offsets.append(offsets)
+            self.doc_positions.append(positions)
+            self.doc_layouts.append(layouts)
+            self.doc_keywords.append(keywords)
+            for i, n in enumerate(lengths):
+                self.length_totals[i] += n
+            for term in terms:
+                tfs = tuple(c.get(term, 0) for c in per_field)
+                self.postings.setdefault(term, {})[ordinal] = tfs
+            for f, value in keywords:
+                self.keywords[f].setdefault(value, {})[ordinal] = None
+            self.live_count += 1
+            if updated_at and (self.watermark is None or updated_at > self.watermark):
+                self.watermark = updated_at
+            self._dirty += 1
+
+    def remove(self, case_id):
+        """Drop a case from the index."""
+        with self._lock:
+            if self._remove_locked(str(case_id)):
+                self._dirty += 1
+
+    def _remove_locked(self, case_id):
+        ordinal = self.ordinals.pop(case_id, None)
+        if ordinal is None:
+            return False
+        for term in self.doc_terms[ordinal]:
+            plist = self.postings.get(term)
+            if plist is not None:
+                plist.pop(ordinal, None)
+                if not plist:
+                    del self.postings[term]
+        for f, value in self.doc_keywords[ordinal]:
+            plist = self.keywords[f].get(value)
+            if plist is not None:
+                plist.pop(ordinal, None)
+                if not plist:
+                    del self.keywords[f][value]
+        for i, n in enumerate(self.field_lengths[ordinal]):
+            self.length_totals[i] -= n
+        self.doc_ids[ordinal] = None
+        self.doc_terms[ordinal] = ()
+        self.doc_offsets[ordinal] = {}
+        self.doc_positions[ordinal] = {}
+        self.doc_layouts[ordinal] = {}
+        self.doc_keywords[ordinal] = ()
+        self.field_lengths[ordinal] = (0,) * len(FIELDS)
+        self.live_count -= 1
+        return True
+
+    # ---- Reads ----
+
+    def search(self, query: str, limit: int = None) -> list:
+        """
+        Rank cases against *query*.
+
+        Returns:
+            list of (case_id, score) tuples, best first
+        """
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        with self._lock:
+            n_docs = self.live_count
+            if n_docs == 0:
+                return []
+            avg_lengths = [max(total / n_docs, 1.0) for total in self.length_totals]
+            weights = [FIELD_WEIGHTS[f] for f in FIELDS]
+            scores = {}
+
+            for term in terms:
+                plist = self.postings.get(term)
+                if not plist:
+                    continue
+                df = len(plist)
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                for ordinal, tfs in plist.items():
+                    lengths = self.field_lengths[ordinal]
+                    pseudo_tf = 0.0
+                    for i, tf in enumerate(tfs):
+                        if tf:
+                            norm = 1 - BM25_B + BM25_B * lengths[i] / avg_lengths[i]
+                            pseudo_tf += weights[i] * tf / norm
+                    scores[ordinal] = scores.get(ordinal, 0.0) + (
+                        idf * pseudo_tf / (BM25_K1 + pseudo_tf)
+                    )
+
+            ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+            if limit:
+                ranked = ranked[:limit]
+            return [(self.doc_ids[o], s) for o, s in ranked]
+
+    def score(self, ordinals, terms: list, limit: int = None) -> list:
+        """
+        BM25F-rank an already matched set of *ordinals* against *terms*.
+        Cases without any of the terms score 0 and keep newest-first order.
+
+        Returns:
+            list of (case_id, score) tuples, best first
+        """
+        with self._lock:
+            n_docs = max(self.live_count, 1)
+            avg_lengths = [max(total / n_docs, 1.0) for total in self.length_totals]
+            weights = [FIELD_WEIGHTS[f] for f in FIELDS]
+            scores = dict.fromkeys(reversed(ordinals), 0.0)
+            for term in dict.fromkeys(terms):
+                plist = self.postings.get(term)
+                if not plist:
+                    continue
+                df = len(plist)
+                idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+                # Walk whichever side is shorter
+                if len(plist) < len(scores):
+                    pairs = ((o, tfs) for o, tfs in plist.items() if o in scores)
+                else:
+                    pairs = ((o, plist[o]) for o in scores if o in plist)
+                for ordinal, tfs in pairs:
+                    lengths = self.field_lengths[ordinal]
+                    pseudo_tf = 0.0
+                    for i, tf in enumerate(tfs):
+                        if tf:
+                            norm = 1 - BM25_B + BM25_B * lengths[i] / avg_lengths[i]
+                            pseudo_tf += weights[i] * tf / norm
+                    scores[ordinal] += idf * pseudo_tf / (BM25_K1 + pseudo_tf)
+
+            ranked = sorted(scores.items(), key=lambda x: x[1], reverse=True)
+            if limit:
+                ranked = ranked[:limit]
+            return [(self.doc_ids[o], s) for o, s in ranked]
+
+    def evaluate(self, plan, terms: list, limit: int = None) -> list:
+        """
+        Run a compiled query *plan* (see ``services.query_parser``) and rank
+        its matches on *terms*, under one lock so the posting lists cannot
+        change mid-plan.
+        """
+        with self._lock:
+            ordinals = plan.evaluate(self) if plan is not None else []
+            return self.score(ordinals, terms, limit)
+
+    def document_frequency(self, term: str) -> int:
+        """Number of indexed cases containing the analysed *term*."""
+        return len(self.postings.get(term, ()))
+
+    def term_offsets(self, case_id, terms) -> dict:
+        """
+        Stored occurrences of *terms* in a case's body fields.
+
+        Returns:
+            {field: [(start, length, term), ...]} sorted by start
+        """
+        with self._lock:
+            ordinal = self.ordinals.get(str(case_id))
+            if ordinal is None:
+                return {}
+            packed_fields = self.doc_offsets[ordinal]
+        result = {}
+        for field, packed in packed_fields.items():
+            hits = [
+                (start, length, term)
+                for term in terms
+                for start, length in decode_offsets(packed, term)
+            ]
+            if hits:
+                result[field] = sorted(hits)
+        return result
+
+    def document_layout(self, case_id) -> dict:
+        """
+        Positional postings and layout of a case's ``FIND_FIELDS``.
+
+        Returns:
+            {field: (encode_positions triple, anchors, paragraph starts)} –
+            empty when the case is not indexed
+        """
+        with self._lock:
+            ordinal = self.ordinals.get(str(case_id))
+            if ordinal is None:
+                return {}
+            positions = self.doc_positions[ordinal]
+            layouts = self.doc_layouts[ordinal]
+        return {
+            field: (positions[field], *decode_layout(blob))
+            for field, blob in layouts.items()
+            if field in positions
+        }
+
+    # ---- Maintenance ----
+
+    def rebuild(self):
+        """Rebuild the whole index from the cases collection."""
+        from models.case_model import Case
+
+        started = time.time()
+        with self._lock:
+            self._reset()
+            for doc in Case.objects.only(*SOURCE_FIELDS).as_pymongo().batch_size(500):
+                self.add_case(doc)
+            self.built = True
+        logger.info(
+            "Search index rebuilt: %d cases, %d terms in %.1fs",
+            self.live_count, len(self.postings), time.time() - started,
+        )
+        self.save()
+
+    def refresh(self, min_interval: float = 0):
+        """Apply cases written and deleted by other workers since the last watermarks."""
+        from models.case_deletion import CaseDeletion
+        from models.case_model import Case
+
+        now = time.time()
+        if now - self._last_refresh < min_interval:
+            return
+        self._last_refresh = now
+
+        if self.watermark is not None:
+            fresh = Case.objects(updated_at__gt=self.watermark)
+        elif self.built:
+            # Built from a collection without timestamped cases: every case
+            # written since carries an updated_at, the rest are indexed
+            fresh = Case.objects(updated_at__ne=None)
+        else:
+            fresh = Case.objects
+        for doc in fresh.only(*SOURCE_FIELDS).as_pymongo():
+            self.add_case(doc)
+        deleted, self.deleted_through = CaseDeletion.since(self.deleted_through)
+        for case_id in deleted:
+            self.remove(case_id)
+
+    def reconcile(self) -> dict:
+        """Drop cases deleted and add cases inserted while the index sat on disk."""
+        self.deleted_through = datetime.utcnow()
+        stats = index_sync.reconcile(
+            "Search index", list(self.ordinals), self.remove, self.add_case, SOURCE_FIELDS,
+            where={"duplicate_of": None},
+        )
+        if stats["removed"] or stats["added"]:
+            self.save()
+        return stats
+
+    def save(self):
+        """Atomically persist the index to ``self.path``."""
+        if not self.path:
+            return
+        with self._lock:
+            state = {
+                "version": INDEX_VERSION,
+                "doc_ids": self.doc_ids,
+                "field_lengths": self.field_lengths,
+                "doc_terms": self.doc_terms,
+                "doc_offsets": self.doc_offsets,
+                "doc_positions": self.doc_positions,
+                "doc_layouts": self.doc_layouts,
+                "doc_keywords": self.doc_keywords,
+                "keywords": self.keywords,
+                "length_totals": self.length_totals,
+                "postings": self.postings,
+                "live_count": self.live_count,
+                "watermark": self.watermark,
+            }
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, self.path)
+            self._dirty = 0
+            self._last_save = time.time()
+
+    def maybe_save(self, every_writes: int, every_seconds: float):
+        """Persist if enough writes or time have accumulated since the last save."""
+        if self._dirty and (
+            self._dirty >= every_writes or time.time() - self._last_save >= every_seconds
+        ):
+            self.save()
+
+    def load(self) -> bool:
+        """Load a persisted index. Returns False if missing or stale."""
+        if not self.path or not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, "rb") as f:
+                state = pickle.load(f)
+        except Exception as exc:
+            logger.warning("Could not load search index %s: %s", self.path, exc)
+            return False
+        if state.get("version") != INDEX_VERSION:
+            logger.info("Search index on disk is version %s, rebuilding", state.get("version"))
+            return False
+
+        with self._lock:
+            self._reset()
+            self.doc_ids = state["doc_ids"]
+            self.field_lengths = state["field_lengths"]
+            self.doc_terms = state["doc_terms"]
+            self.doc_offsets = state["doc_offsets"]
+            self.doc_positions = state["doc_positions"]
+            self.doc_layouts = state["doc_layouts"]
+            self.doc_keywords = state["doc_keywords"]
+            self.keywords = state["keywords"]
+            self.length_totals = state["length_totals"]
+            self.postings = state["postings"]
+            self.live_count = state["live_count"]
+            self.watermark = state["watermark"]
+            self.ordinals = {
+                cid: i for i, cid in enumerate(self.doc_ids) if cid is not None
+            }
+            self.built = True
+        return True
+
+
+# ---------------------------------------------------------------------------
+# Process-wide instance – lazily loaded from disk or rebuilt from MongoDB.
+# ---------------------------------------------------------------------------
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_search_index() -> SearchIndex:
+    """Return the shared SearchIndex, loading or building it on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                cfg = get_config()
+                index = SearchIndex(os.path.join(cfg.SEARCH_INDEX_DIR, "search_index.pkl"))
+                if index.load():
+                    index.reconcile()
+                else:
+                    index.rebuild()
+                index_sync.register("search", index.refresh)
+                _index = index
+    return _index
+
+
+def search_ranked(query: str, capped: bool = True) -> list:
+    """
+    Rank cases for *query*.
+    Queries using the query language (field:, "phrases", AND/OR/NOT, ...)
+    or containing Roman-Urdu terms are compiled by ``services.query_parser``;
+    other plain keywords are ranked directly.
+
+    Interactive searches keep the best ``SEARCH_MAX_CANDIDATES``; exports
+    pass ``capped=False`` to rank every match.
+
+    Raises:
+        QuerySyntaxError for malformed structured queries
+    """
+    from services import query_parser, transliteration
+
+    cfg = get_config()
+    limit = cfg.SEARCH_MAX_CANDIDATES if capped else None
+    index = get_search_index()
+    if (query_parser.is_structured(query)
+            or transliteration.expand(query or "", query_parser.indexed_word)):
+        return query_parser.execute(query, limit=limit)[0]
+    return index.search(query, limit=limit)
+
+
+def explained_search(query: str) -> tuple:
+    """
+    ``search_ranked`` run through ``services.query_parser`` (plain keywords
+    included), returning the plan of that one execution alongside.
+
+    Returns:
+        (ranked, plan) – plan is the ``query_parser.explain`` dict
+    """
+    from services import query_parser
+
+    return query_parser.execute(query, limit=get_config().SEARCH_MAX_CANDIDATES)
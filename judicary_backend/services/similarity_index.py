@@ -0,0 +1,422 @@
+"""
+Similarity Index – Persistent Sparse TF-IDF Matrix for Similar Cases
+======================================================================
+``/ai/similar?method=tfidf`` used to load a few hundred full cases per
+request, re-tokenize them and rebuild IDF and dict vectors from scratch,
+and could only ever find neighbours among those candidates.  This index
+keeps one L2-normalised TF-IDF row per case for the whole corpus in CSR
+form (numpy ``indptr`` / ``indices`` / ``data`` arrays), so "cases similar
+to X" is a single sparse matrix-vector product with X's row (a gather and
+a segmented ``add.reduceat``) followed by a partial sort for the top k.
+
+* Writes are incremental: a saved case gets a new row (appended in batches
+  on the next read), an updated or deleted case has its old row zeroed,
+  and document frequencies are kept current.
+* Rows keep the IDF in force when they were added.  Once enough writes
+  have accumulated (``SIMILARITY_IDF_REFRESH_FRACTION`` of the corpus) or
+  ``SIMILARITY_IDF_REFRESH_SECONDS`` have passed, every row is re-weighted
+  from its stored term counts with fresh IDF and dead rows are compacted.
+
+Text and tokens are those of ``services.similarity_service`` (title,
+summary, type, statutes, categories).  The matrix is persisted next to the
+search index, like ``services.vector_search``, reconciled with the
+collection when loaded and kept in step with other workers by
+``services.index_sync``.
+"""
+
+import logging
+import os
+import pickle
+import threading
+import time
+from collections import Counter
+from datetime import datetime
+
+import numpy as np
+
+from config import get_config
+from services import index_sync
+from services.similarity_service import SIMILARITY_FIELDS, case_text, tokenize
+
+logger = logging.getLogger(__name__)
+
+# Scores below this are noise (shared boilerplate words only)
+MIN_SIMILARITY = 0.01
+
+# Everything add_case reads from a case
+SOURCE_FIELDS = tuple(SIMILARITY_FIELDS) + ("duplicate_of", "updated_at")
+
+# Bump when the weighting or the indexed text changes
+INDEX_VERSION = 2
+
+
+def _field_value(case, field):
+    if isinstance(case, dict):
+        return case.get(field)
+    return getattr(case, field, None)
+
+
+def _normalise(weights):
+    norm = float(np.sqrt(np.dot(weights, weights)))
+    return weights / norm if norm else weights
+
+
+class SimilarityIndex:
+    """L2-normalised TF-IDF rows for every case, stored as a CSR matrix."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.RLock()
+        self._last_refresh = 0.0
+        self._last_save = time.time()
+        self._reset()
+
+    def _reset(self):
+        self.vocabulary = {}       # term -> column
+        self.df = np.zeros(1024, dtype=np.int32)   # column -> live rows containing it
+        self.doc_ids = []          # row -> case id (None once removed)
+        self.rows = {}             # case id -> row
+        self.indptr = np.zeros(1, dtype=np.int64)
+        self.indices = np.zeros(0, dtype=np.int32)
+        self.counts = np.zeros(0, dtype=np.float32)   # raw term counts, for IDF refresh
+        self.data = np.zeros(0, dtype=np.float32)     # normalised TF-IDF weights
+        self.starts = np.zeros(0, dtype=np.int64)     # indptr of the non-empty rows
+        self.nonempty = np.zeros(0, dtype=bool)       # row -> has any terms
+        self.pending = []          # (columns, counts) of rows not yet in the CSR arrays
+        self.live_count = 0
+        self.watermark = None
+        self.deleted_through = datetime.utcnow()   # deletion tombstones applied up to here
+        self.stale_writes = 0      # writes since the last IDF refresh
+        self._last_idf_refresh = time.time()
+        self._dirty = 0
+
+    # ---- Weighting ----
+
+    def _idf(self):
+        """IDF per column, as in ``similarity_service.compute_idf``."""
+        n = max(self.live_count, 1)
+        return (np.log(n / (self.df[:len(self.vocabulary)] + 1.0)) + 1.0).astype(np.float32)
+
+    def _columns(self, tokens, grow: bool):
+        """(columns, counts) of *tokens*; unknown terms are added when *grow*."""
+        columns, counts = [], []
+        for term, count in Counter(tokens).items():
+            column = self.vocabulary.get(term)
+            if column is None:
+                if not grow:
+                    continue
+                column = len(self.vocabulary)
+                self.vocabulary[term] = column
+                if column == len(self.df):
+                    self.df = np.concatenate([self.df, np.zeros_like(self.df)])
+            columns.append(column)
+            counts.append(count)
+        order = np.argsort(columns)
+        return (np.asarray(columns, dtype=np.int32)[order],
+                np.asarray(counts, dtype=np.float32)[order])
+
+    # ---- Writes ----
+
+    def add_case(self, case):
+        """Index (or re-index) a Case document or raw case dict."""
+        case_id = _field_value(case, "id") or _field_value(case, "_id")
+        if case_id is None:
+            return
+        updated_at = _field_value(case, "updated_at")
+        if _field_value(case, "duplicate_of"):
+            # Flagged near-duplicates are never suggested as similar cases
+            self.remove(case_id)
+            with self._lock:
+                if updated_at and (self.watermark is None or updated_at > self.watermark):
+                    self.watermark = updated_at
+            return
+        text = case_text({f: _field_value(case, f) for f in SIMILARITY_FIELDS})
+        self.add(str(case_id), tokenize(text), updated_at)
+
+    def add(self, case_id, tokens: list, updated_at=None):
+        """Store the term counts of *tokens* as the row of *case_id*."""
+        with self._lock:
+            self._remove_locked(case_id)
+            columns, counts = self._columns(tokens, grow=True)
+            self.df[columns] += 1
+            self.rows[case_id] = len(self.doc_ids)
+            self.doc_ids.append(case_id)
+            self.pending.append((columns, counts))
+            self.live_count += 1
+            self.stale_writes += 1
+            self._dirty += 1
+            if updated_at and (self.watermark is None or updated_at > self.watermark):
+                self.watermark = updated_at
+
+    def remove(self, case_id):
+        """Drop a case from the index."""
+        with self._lock:
+            if self._remove_locked(str(case_id)):
+                self.stale_writes += 1
+                self._dirty += 1
+
+    def _remove_locked(self, case_id):
+        row = self.rows.pop(case_id, None)
+        if row is None:
+            return False
+        flushed = len(self.indptr) - 1
+        if row < flushed:
+            start, end = self.indptr[row], self.indptr[row + 1]
+            self.df[self.indices[start:end]] -= 1
+            self.data[start:end] = 0.0
+        else:
+            columns, _ = self.pending[row - flushed]
+            self.df[columns] -= 1
+            self.pending[row - flushed] = (columns[:0], np.zeros(0, dtype=np.float32))
+        self.doc_ids[row] = None
+        self.live_count -= 1
+        return True
+
+    def _flush_locked(self):
+        """Append pending rows to the CSR arrays, weighted with the current IDF."""
+        if not self.pending:
+            return
+        idf = self._idf()
+        lengths = [len(columns) for columns, _ in self.pending]
+        weights = [_normalise(counts * idf[columns]) for columns, counts in self.pending]
+        self.indices = np.concatenate([self.indices] + [c for c, _ in self.pending])
+        self.counts = np.concatenate([self.counts] + [c for _, c in self.pending])
+        self.data = np.concatenate([self.data] + weights).astype(np.float32, copy=False)
+        self.indptr = np.concatenate([self.indptr, self.indptr[-1] + np.cumsum(lengths)])
+        self.pending = []
+        self._segments()
+
+    def _segments(self):
+        # add.reduceat cannot express empty segments, so it runs over the
+        # starts of the non-empty rows only
+        self.nonempty = np.diff(self.indptr) > 0
+        self.starts = self.indptr[:-1][self.nonempty]
+
+    def _row_sums(self, values):
+        sums = np.zeros(len(self.nonempty), dtype=np.float32)
+        if len(self.starts):
+            sums[self.nonempty] = np.add.reduceat(values, self.starts)
+        return sums
+
+    def refresh_idf(self):
+        """Re-weight every row with fresh IDF and compact removed rows."""
+        with self._lock:
+            self._flush_locked()
+            alive = np.fromiter((cid is not None for cid in self.doc_ids), dtype=bool,
+                                count=len(self.doc_ids))
+            lengths = np.diff(self.indptr)
+            if not alive.all():
+                keep = np.repeat(alive, lengths)
+                lengths = lengths[alive]
+                self.indices = self.indices[keep]
+                self.counts = self.counts[keep]
+                self.indptr = np.concatenate([[0], np.cumsum(lengths)]).astype(np.int64)
+                self.doc_ids = [cid for cid in self.doc_ids if cid is not None]
+                self.rows = {cid: i for i, cid in enumerate(self.doc_ids)}
+                self._segments()
+            data = self.counts * self._idf()[self.indices]
+            norms = np.sqrt(self._row_sums(data * data))
+            norms[norms == 0] = 1.0
+            self.data = data / np.repeat(norms, lengths)
+            self.stale_writes = 0
+            self._last_idf_refresh = time.time()
+            self._dirty += 1
+
+    def maybe_refresh_idf(self, fraction: float, every_seconds: float):
+        """Refresh IDF once enough of the corpus or enough time has changed."""
+        if self.stale_writes and (
+            self.stale_writes >= max(1, fraction * self.live_count)
+            or time.time() - self._last_idf_refresh >= every_seconds
+        ):
+            self.refresh_idf()
+
+    # ---- Reads ----
+
+    def case_vector(self, case_id):
+        """(columns, weights) of a stored case, or None if it is not indexed."""
+        with self._lock:
+            row = self.rows.get(str(case_id))
+            if row is None:
+                return None
+            self._flush_locked()
+            start, end = self.indptr[row], self.indptr[row + 1]
+            return self.indices[start:end].copy(), self.data[start:end].copy()
+
+    def text_vector(self, text: str):
+        """(columns, weights) of arbitrary *text*; terms unknown to the index drop out."""
+        with self._lock:
+            columns, counts = self._columns(tokenize(text), grow=False)
+            return columns, _normalise(counts * self._idf()[columns])
+
+    def search_vector(self, vector, limit: int, exclude=None) -> list:
+        """
+        Cases most similar to the sparse *vector* (columns, weights).
+
+        Returns:
+            list of (case_id, similarity), best first
+        """
+        columns, weights = vector
+        if not len(columns):
+            return []
+        with self._lock:
+            self._flush_locked()
+            query = np.zeros(len(self.vocabulary), dtype=np.float32)
+            query[columns] = weights
+            scores = self._row_sums(self.data * query[self.indices])
+            doc_ids = list(self.doc_ids)
+        k = min(limit + 1, len(scores))
+        if k == 0:
+            return []
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            (doc_ids[row], float(scores[row])) for row in top
+            if scores[row] >= MIN_SIMILARITY and doc_ids[row] not in (None, exclude)
+        ][:limit]
+
+    # ---- Maintenance ----
+
+    def rebuild(self):
+        """Rebuild the whole matrix from the cases collection."""
+        from models.case_model import Case
+
+        started = time.time()
+        with self._lock:
+            self._reset()
+            cases = Case.objects.only(*SOURCE_FIELDS).as_pymongo()
+            for doc in cases.batch_size(1000):
+                self.add_case(doc)
+            self.refresh_idf()
+        logger.info(
+            "Similarity index rebuilt: %d cases, %d terms, %d non-zeros in %.1fs",
+            self.live_count, len(self.vocabulary), len(self.data), time.time() - started,
+        )
+        self.save()
+
+    def refresh(self, min_interval: float = 0):
+        """Apply cases written and deleted by other workers since the last watermarks."""
+        from models.case_deletion import CaseDeletion
+        from models.case_model import Case
+
+        now = time.time()
+        if now - self._last_refresh < min_interval:
+            return
+        self._last_refresh = now
+        # No watermark yet means the index was built from an empty collection
+        fresh = Case.objects(updated_at__gt=self.watermark) if self.watermark else Case.objects
+        for doc in fresh.only(*SOURCE_FIELDS).as_pymongo():
+            self.add_case(doc)
+        deleted, self.deleted_through = CaseDeletion.since(self.deleted_through)
+        for case_id in deleted:
+            self.remove(case_id)
+
+    def reconcile(self) -> dict:
+        """Drop cases deleted and add cases inserted while the index sat on disk."""
+        self.deleted_through = datetime.utcnow()
+        stats = index_sync.reconcile(
+            "Similarity index", list(self.rows), self.remove, self.add_case, SOURCE_FIELDS,
+            where={"duplicate_of": None},
+        )
+        if stats["removed"] or stats["added"]:
+            self.save()
+        return stats
+
+    def save(self):
+        """Atomically persist the matrix to ``self.path``."""
+        if not self.path:
+            return
+        with self._lock:
+            self._flush_locked()
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump({
+                    "version": INDEX_VERSION,
+                    "terms": list(self.vocabulary),
+                    "doc_ids": self.doc_ids,
+                    "live_count": self.live_count,
+                    "stale_writes": self.stale_writes,
+                    "watermark": self.watermark,
+                }, f, protocol=pickle.HIGHEST_PROTOCOL)
+                for array in (self.df[:len(self.vocabulary)], self.indptr, self.indices,
+                              self.counts, self.data):
+                    np.save(f, array)
+            os.replace(tmp_path, self.path)
+            self._dirty = 0
+            self._last_save = time.time()
+
+    def maybe_save(self, every_writes: int, every_seconds: float):
+        """Persist if enough writes or time have accumulated since the last save."""
+        if self._dirty and (
+            self._dirty >= every_writes or time.time() - self._last_save >= every_seconds
+        ):
+            self.save()
+
+    def load(self) -> bool:
+        """Load a persisted matrix. Returns False if missing or stale."""
+        if not self.path or not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, "rb") as f:
+                state = pickle.load(f)
+                df, indptr, indices, counts, data = (np.load(f) for _ in range(5))
+        except Exception as exc:
+            logger.warning("Could not load similarity index %s: %s", self.path, exc)
+            return False
+        if state.get("version") != INDEX_VERSION:
+            return False
+
+        with self._lock:
+            self._reset()
+            self.vocabulary = {term: i for i, term in enumerate(state["terms"])}
+            self.df = np.zeros(max(1024, 2 * len(df)), dtype=np.int32)
+            self.df[:len(df)] = df
+            self.doc_ids = state["doc_ids"]
+            self.rows = {cid: i for i, cid in enumerate(self.doc_ids) if cid is not None}
+            self.indptr, self.indices, self.counts, self.data = indptr, indices, counts, data
+            self._segments()
+            self.live_count = state["live_count"]
+            self.stale_writes = state["stale_writes"]
+            self.watermark = state["watermark"]
+        return True
+
+
+# ---------------------------------------------------------------------------
+# Process-wide instance – lazily loaded from disk or rebuilt from MongoDB.
+# ---------------------------------------------------------------------------
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_similarity_index() -> SimilarityIndex:
+    """Return the shared SimilarityIndex, loading or building it on first use."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                cfg = get_config()
+                index = SimilarityIndex(os.path.join(cfg.SEARCH_INDEX_DIR, "similarity_index.bin"))
+                if index.load():
+                    index.reconcile()
+                else:
+                    index.rebuild()
+                index_sync.register("similarity", index.refresh)
+                _index = index
+    return _index
+
+
+def similar_cases(case, limit: int) -> list:
+    """
+    Cases most similar to *case* (a Case) across the whole corpus, first
+    refreshing IDF when due.
+
+    Returns:
+        list of (case_id, similarity), best first
+    """
+    cfg = get_config()
+    index = get_similarity_index()
+    index.maybe_refresh_idf(cfg.SIMILARITY_IDF_REFRESH_FRACTION, cfg.SIMILARITY_IDF_REFRESH_SECONDS)
+    vector = index.case_vector(case.id)
+    if vector is None:
+        vector = index.text_vector(case_text({f: getattr(case, f, None) for f in SIMILARITY_FIELDS}))
+    return index.search_vector(vector, limit, exclude=str(case.id))
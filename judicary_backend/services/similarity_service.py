@@ -2,41 +2,45 @@
 Similarity Service – Find Similar Cases
 =========================================
 Uses TF-IDF cosine similarity to find cases similar to a given case.
-Works with the existing MongoDB case collection.
+Works with the existing MongoDB case collection; ``/ai/similar`` ranks the
+whole corpus through the persistent matrix in ``services.similarity_index``,
+which shares ``case_text`` and ``tokenize`` with the functions here.
 """
 
-import re
 import math
 import logging
 from collections import Counter
 
-logger = logging.getLogger(__name__)
+from services.text_analysis import analyze
 
+logger = logging.getLogger(__name__)
 
-# ----- Stop words for legal text -----
-STOP_WORDS = {
-    "the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for",
-    "of", "with", "by", "from", "is", "was", "are", "were", "be", "been",
-    "being", "have", "has", "had", "do", "does", "did", "will", "would",
-    "could", "should", "may", "might", "shall", "can", "this", "that",
-    "these", "those", "it", "its", "not", "no", "nor", "as", "if", "than",
-    "so", "such", "each", "every", "all", "both", "few", "more", "most",
-    "other", "some", "any", "only", "own", "same", "very", "just", "also",
-    "into", "about", "between", "through", "during", "before", "after",
-    "above", "below", "under", "over", "again", "further", "then", "once",
-    "here", "there", "when", "where", "why", "how", "what", "which", "who",
-    "whom", "up", "out", "off", "down", "they", "them", "their", "he",
-    "him", "his", "she", "her", "we", "us", "our", "you", "your", "i", "me",
-    "my", "said", "upon", "per", "mr", "mrs", "ms", "vs", "versus",
-}
+# Case fields whose text makes up a case's TF-IDF vector
+SIMILARITY_FIELDS = ("title", "summary", "case_type", "cited_statutes", "categories")
 
 
 def tokenize(text: str) -> list:
-    """Tokenize and clean text for TF-IDF."""
-    if not text:
-        return []
-    words = re.findall(r'\b[a-z]{3,}\b', text.lower())
-    return [w for w in words if w not in STOP_WORDS]
+    """
+    Tokenize and clean text for TF-IDF using the shared Urdu/English
+    analysis chain.  Bare numbers and very short Latin tokens carry no
+    topical signal for similarity and are dropped.
+    """
+    return [
+        t for t in analyze(text)
+        if not t.isdigit() and (len(t) >= 3 or not t.isascii())
+    ]
+
+
+def case_text(case: dict) -> str:
+    """The text of *case* (a case dict) that similarity is computed on."""
+    parts = []
+    for field in SIMILARITY_FIELDS:
+        value = case.get(field)
+        if isinstance(value, (list, tuple)):
+            value = " ".join(v for v in value if v)
+        if value:
+            parts.append(value)
+    return " ".join(parts)
 
 
 def compute_tf(tokens: list) -> dict:
@@ -95,15 +99,7 @@ def find_similar_cases(target_case: dict, candidate_cases: list, top_n: int = 10
     Returns:
         list of dicts with case info and similarity score
     """
-    # Build target text
-    target_text = " ".join(filter(None, [
-        target_case.get("title", ""),
-        target_case.get("summary", ""),
-        target_case.get("case_type", ""),
-        " ".join(target_case.get("cited_statutes", [])),
-        " ".join(target_case.get("categories", [])),
-    ]))
-    target_tokens = tokenize(target_text)
+    target_tokens = tokenize(case_text(target_case))
 
     if not target_tokens:
         return []
@@ -112,14 +108,7 @@ def find_similar_cases(target_case: dict, candidate_cases: list, top_n: int = 10
     all_tokens = [target_tokens]
     candidate_texts = []
     for case in candidate_cases:
-        text = " ".join(filter(None, [
-            case.get("title", ""),
-            case.get("summary", ""),
-            case.get("case_type", ""),
-            " ".join(case.get("cited_statutes", []) if case.get("cited_statutes") else []),
-            " ".join(case.get("categories", []) if case.get("categories") else []),
-        ]))
-        tokens = tokenize(text)
+        tokens = tokenize(case_text(case))
         all_tokens.append(tokens)
         candidate_texts.append(tokens)
 
@@ -0,0 +1,121 @@
+"""
+Snippets Service – Highlighted Match Windows for Search Results
+=================================================================
+Result cards only carry the first 300 characters of the summary, which
+rarely shows why a long judgment matched.  ``highlight`` picks the best
+windows of each result's summary, headnotes or full text using the term
+offsets stored in the search index, then cuts just those windows out of
+MongoDB with ``$substrCP`` – one aggregation for the whole page, and the
+judgment text is never loaded or re-tokenized in Python.
+
+Per result the work is bounded by the number of stored occurrences of the
+query terms (at most ``MAX_OFFSETS_PER_TERM`` per term and field), not by
+the length of the document.
+"""
+
+from bson import ObjectId
+
+from models.case_model import Case
+from services.search_index import get_search_index, tokenize
+
+SNIPPET_CHARS = 180
+MAX_SNIPPETS = 2
+ELLIPSIS = "…"
+
+# Preferred field on equal scores (earlier wins)
+FIELD_ORDER = ("summary", "headnotes", "full_text")
+
+
+def _best_windows(field: str, hits: list) -> list:
+    """
+    Candidate windows for one field as (score, field, hits_in_window).
+    Score is distinct query terms first, then total occurrences.
+    """
+    windows = []
+    right = 0
+    for left in range(len(hits)):
+        limit = hits[left][0] + SNIPPET_CHARS
+        right = max(right, left)
+        while right + 1 < len(hits) and hits[right + 1][0] + hits[right + 1][1] <= limit:
+            right += 1
+        inside = hits[left:right + 1]
+        score = (len({term for _, _, term in inside}), len(inside))
+        windows.append((score, field, inside))
+    return windows
+
+
+def _choose(offsets: dict) -> list:
+    """Up to MAX_SNIPPETS non-overlapping windows, best first."""
+    candidates = []
+    for field, hits in offsets.items():
+        candidates.extend(_best_windows(field, hits))
+    candidates.sort(key=lambda w: (-w[0][0], -w[0][1], FIELD_ORDER.index(w[1]), w[2][0][0]))
+
+    chosen = []
+    for _, field, inside in candidates:
+        first_start = inside[0][0]
+        last_end = inside[-1][0] + inside[-1][1]
+        # Centre the matched span inside the window
+        start = max(0, first_start - (SNIPPET_CHARS - (last_end - first_start)) // 2)
+        end = start + SNIPPET_CHARS
+        if any(f == field and start < e and s < end for f, s, e, _ in chosen):
+            continue
+        chosen.append((field, start, end, inside))
+        if len(chosen) == MAX_SNIPPETS:
+            break
+    return chosen
+
+
+def highlight(query: str, case_ids: list, terms: list = None) -> dict:
+    """
+    Highlighted snippets for the given results of *query*.  Pass *terms* to
+    highlight already analysed terms instead (e.g. the positive terms of a
+    structured query).
+
+    Returns:
+        {case_id: [{"field", "text", "matches": [[start, end], ...]}, ...]}
+        where matches are character ranges within "text"
+    """
+    terms = list(dict.fromkeys(terms if terms is not None else tokenize(query)))
+    if not terms or not case_ids:
+        return {}
+
+    index = get_search_index()
+    plans = {}
+    for case_id in case_ids:
+        offsets = index.term_offsets(case_id, terms)
+        if offsets:
+            plans[case_id] = _choose(offsets)
+    if not plans:
+        return {}
+
+    # Windows differ per case, so each projected window is only evaluated
+    # for the case it belongs to; other rows get null.
+    windows = [(case_id, w) for case_id, ws in plans.items() for w in ws]
+    project = {
+        f"w{k}": {"$cond": [
+            {"$eq": ["$_id", ObjectId(case_id)]},
+            {"$substrCP": [{"$ifNull": [f"${field}", ""]}, start, end - start]},
+            None,
+        ]}
+        for k, (case_id, (field, start, end, _)) in enumerate(windows)
+    }
+    pipeline = [
+        {"$match": {"_id": {"$in": [ObjectId(case_id) for case_id in plans]}}},
+        {"$project": project},
+    ]
+    rows = {str(row["_id"]): row for row in Case._get_collection().aggregate(pipeline)}
+
+    result = {}
+    for k, (case_id, (field, start, end, inside)) in enumerate(windows):
+        text = rows.get(case_id, {}).get(f"w{k}")
+        if not text:
+            continue
+        prefix = ELLIPSIS if start > 0 else ""
+        suffix = ELLIPSIS if len(text) == end - start else ""
+        shift = len(prefix) - start
+        matches = [[s + shift, s + length + shift] for s, length, _ in inside]
+        result.setdefault(case_id, []).append(
+            {"field": field, "text": prefix + text + suffix, "matches": matches}
+        )
+    return result
@@ -0,0 +1,300 @@
+"""
+Spelling Service – Symmetric-Delete Correction for Legal Queries
+==================================================================
+"habeus corpus", "Qanun-e-Shahdat" or "Peshawer" match nothing, and users
+retry with variations.  ``correct_query`` proposes a corrected query
+("did you mean") using a SymSpell-style dictionary:
+
+* every dictionary word is indexed under all strings reachable from its
+  first ``PREFIX_LENGTH`` characters by up to ``max_distance`` deletions;
+* a query word generates its own deletes and looks them up, so candidates
+  within the edit distance come from a handful of dict probes instead of
+  comparing against the whole vocabulary; only those candidates get an
+  exact (bounded) edit-distance check.
+
+Words come from the case corpus (titles, summaries, headnotes – a word
+must appear in at least ``SPELLING_MIN_COUNT`` cases to become a
+correction target, so one-off typos in the data are not proposed), the
+legal glossary in ``translation_service`` and the entity names in the
+``extraction_service`` patterns.  Each case's distinct words are kept so
+an edit counts only the words it adds or drops; this worker's writes
+arrive through ``services.case_events`` and other workers' writes and
+deletions through ``refresh()``, registered with ``services.index_sync``
+like the search indexes.  A query word that the search index knows (e.g. from judgment
+text) or that is Roman Urdu for a glossary entry is never "corrected".
+"""
+
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+from config import get_config
+from services import index_sync
+from services.case_number import edit_distance
+from services.search_index import get_search_index, tokenize
+from services.text_analysis import STOP_WORDS, TOKEN_RE, fold
+from services.transliteration import glossary_terms
+
+logger = logging.getLogger(__name__)
+
+PREFIX_LENGTH = 7
+MIN_WORD_LENGTH = 3
+CORPUS_FIELDS = ("title", "summary", "headnotes")
+SOURCE_FIELDS = CORPUS_FIELDS + ("updated_at",)
+
+# Glossary and entity words always count as established vocabulary
+DICTIONARY_COUNT = 1000
+
+LOOKUP_CACHE_SIZE = 8192   # memoised corrections per dictionary
+
+QUERY_OPERATORS = ("AND", "OR", "NOT", "NEAR")
+
+_REGEX_ESCAPE_RE = re.compile(r"\\[A-Za-z]")
+_SUFFIX_GROUP_RE = re.compile(r"(?<=[A-Za-z])\(\?:[^()]*\)")   # Hon(?:ourable|'ble)
+_PATTERN_WORD_RE = re.compile(r"[A-Za-z]+(?:-[A-Za-z]+)*")
+
+
+def _deletes(word: str, max_distance: int) -> set:
+    """All strings reachable from *word* by 1..max_distance deletions."""
+    result = set()
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier if len(w) > 1 for i in range(len(w))}
+        result.update(frontier)
+    return result
+
+
+def _words(text: str):
+    """Folded words of *text* worth spelling (letters only, no stopwords)."""
+    for match in TOKEN_RE.finditer(text or ""):
+        word = fold(match.group())
+        if len(word) >= MIN_WORD_LENGTH and word.isalpha() and word not in STOP_WORDS:
+            yield word
+
+
+def pattern_words(pattern: str) -> list:
+    """Literal words in a regex such as ``(?:Lahore|Sindh)\\s+High\\s+Court``."""
+    text = _SUFFIX_GROUP_RE.sub("", _REGEX_ESCAPE_RE.sub(" ", pattern))
+    return [w for literal in _PATTERN_WORD_RE.findall(text) for w in _words(literal)]
+
+
+def dictionary_words() -> set:
+    """Words from the legal glossary and the entity extraction patterns."""
+    from services.extraction_service import PATTERNS
+    from services.translation_service import LEGAL_DICT_EN_UR
+
+    words = set()
+    for english, urdu in LEGAL_DICT_EN_UR.items():
+        words.update(_words(english))
+        words.update(_words(urdu))
+    for patterns in PATTERNS.values():
+        for pattern in patterns:
+            words.update(pattern_words(pattern))
+    return words
+
+
+class SpellingDictionary:
+    """Word frequencies plus the symmetric-delete lookup table."""
+
+    def __init__(self, max_distance: int = 2, min_count: int = 2):
+        self.max_distance = max_distance
+        self.min_count = min_count
+        self.counts = {}     # word -> number of cases (or DICTIONARY_COUNT)
+        self.deletes = {}    # delete variant of a word prefix -> [words]
+        self._cache = OrderedDict()   # word -> lookup result, LRU
+        self._case_words = {}         # case id -> its distinct words, for edit deltas
+        self._lock = threading.RLock()
+        self._last_refresh = 0.0
+        self.watermark = None
+        self.deleted_through = datetime.utcnow()   # deletion tombstones applied up to here
+
+    def add(self, word: str, count: int = 1):
+        """
+        Count *word* (a negative *count* uncounts it); it is a correction
+        target while its count is at least ``min_count``.
+        """
+        with self._lock:
+            before = self.counts.get(word, 0)
+            after = before + count
+            if after > 0:
+                self.counts[word] = after
+            else:
+                self.counts.pop(word, None)
+            if (before >= self.min_count) != (after >= self.min_count):
+                prefix = word[:PREFIX_LENGTH]
+                for variant in _deletes(prefix, self.max_distance) | {prefix}:
+                    if after >= self.min_count:
+                        self.deletes.setdefault(variant, []).append(word)
+                    else:
+                        words = self.deletes[variant]
+                        words.remove(word)
+                        if not words:
+                            del self.deletes[variant]
+                # Only gaining or losing a correction target can change an
+                # answer (other count changes merely reorder equally distant ties)
+                self._cache.clear()
+
+    def add_case(self, case):
+        """Count (or re-count) the words of a Case document or raw case dict."""
+        if not isinstance(case, dict):
+            case = {f: getattr(case, f, None) for f in ("id",) + SOURCE_FIELDS}
+        case_id = str(case.get("id") or case.get("_id"))
+        words = set(_words(" ".join(case.get(f) or "" for f in CORPUS_FIELDS)))
+        with self._lock:
+            updated_at = case.get("updated_at")
+            if updated_at and (self.watermark is None or updated_at > self.watermark):
+                self.watermark = updated_at
+            previous = set(self._case_words.get(case_id, ()))
+            for word in words - previous:
+                self.add(word)
+            for word in previous - words:
+                self.add(word, -1)
+            self._case_words[case_id] = tuple(words)
+
+    def remove_case(self, case_id):
+        """Uncount the words of a deleted case."""
+        with self._lock:
+            for word in self._case_words.pop(str(case_id), ()):
+                self.add(word, -1)
+
+    def known(self, word: str) -> bool:
+        return self.counts.get(word, 0) >= self.min_count
+
+    def lookup(self, word: str):
+        """
+        Best correction for a folded *word*.
+
+        Returns:
+            (suggestion, distance) – closest established word, most frequent
+            on ties – or None when the word is known or nothing is close
+        """
+        if self.known(word) or len(word) < MIN_WORD_LENGTH:
+            return None
+        with self._lock:
+            if word in self._cache:
+                self._cache.move_to_end(word)
+                return self._cache[word]
+            result = self._lookup(word)
+            self._cache[word] = result
+            if len(self._cache) > LOOKUP_CACHE_SIZE:
+                self._cache.popitem(last=False)
+            return result
+
+    def _lookup(self, word: str):
+        prefix = word[:PREFIX_LENGTH]
+        seen = set()
+        best = None
+        for variant in _deletes(prefix, self.max_distance) | {prefix}:
+            for candidate in self.deletes.get(variant, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                if abs(len(candidate) - len(word)) > self.max_distance:
+                    continue
+                distance = edit_distance(word, candidate, self.max_distance)
+                if distance > self.max_distance:
+                    continue
+                key = (distance, -self.counts[candidate], candidate)
+                if best is None or key < best:
+                    best = key
+        return (best[2], best[0]) if best else None
+
+    def refresh(self, min_interval: float = 0):
+        """Apply cases written and deleted by other workers since the last watermarks."""
+        from models.case_deletion import CaseDeletion
+        from models.case_model import Case
+
+        now = time.time()
+        if now - self._last_refresh < min_interval:
+            return
+        self._last_refresh = now
+        # No watermark yet means the dictionary was built from an empty collection
+        query = Case.objects(updated_at__gt=self.watermark) if self.watermark else Case.objects
+        for doc in query.only(*SOURCE_FIELDS).as_pymongo():
+            self.add_case(doc)
+        deleted, self.deleted_through = CaseDeletion.since(self.deleted_through)
+        for case_id in deleted:
+            self.remove_case(case_id)
+
+
+# ---------------------------------------------------------------------------
+# Process-wide instance
+# ---------------------------------------------------------------------------
+_speller = None
+_speller_lock = threading.Lock()
+
+
+def build_dictionary() -> SpellingDictionary:
+    """Build the dictionary from the glossary, entity patterns and cases."""
+    from models.case_model import Case
+
+    cfg = get_config()
+    started = time.time()
+    speller = SpellingDictionary(cfg.SPELLING_MAX_DISTANCE, cfg.SPELLING_MIN_COUNT)
+    for word in dictionary_words():
+        speller.add(word, DICTIONARY_COUNT)
+    for doc in Case.objects.only(*SOURCE_FIELDS).as_pymongo().batch_size(1000):
+        speller.add_case(doc)
+    logger.info(
+        "Spelling dictionary built: %d words (%d correction targets) in %.1fs",
+        len(speller.counts), sum(1 for c in speller.counts.values() if c >= speller.min_count),
+        time.time() - started,
+    )
+    return speller
+
+
+def get_speller() -> SpellingDictionary:
+    """Return the shared SpellingDictionary, building it on first use."""
+    global _speller
+    if _speller is None:
+        with _speller_lock:
+            if _speller is None:
+                speller = build_dictionary()
+                index_sync.register("spelling", speller.refresh)
+                _speller = speller
+    return _speller
+
+
+def _match_case(original: str, word: str) -> str:
+    if len(original) > 1 and original.isupper():
+        return word.upper()
+    if original[:1].isupper():
+        return word[:1].upper() + word[1:]
+    return word
+
+
+def correct_query(query: str):
+    """
+    "Did you mean" for *query*: each unknown word replaced by its best
+    correction, keeping the rest of the query (operators, fields, quotes,
+    punctuation) as typed.
+
+    Returns:
+        {"query": corrected text, "corrections": [{"original", "suggestion",
+        "distance"}]} or None when every word is known
+    """
+    speller = get_speller()
+    index = get_search_index()
+    corrections = []
+
+    def replace(match):
+        original = match.group()
+        if original in QUERY_OPERATORS or query[match.end():match.end() + 1] == ":":
+            return original
+        word = fold(original)
+        if not word.isalpha() or word in STOP_WORDS or glossary_terms(word):
+            return original
+        hit = speller.lookup(word)
+        if hit is None or all(index.document_frequency(t) for t in tokenize(original)):
+            return original
+        suggestion, distance = hit
+        corrections.append({"original": original, "suggestion": suggestion, "distance": distance})
+        return _match_case(original, suggestion)
+
+    corrected = TOKEN_RE.sub(replace, query or "")
+    if not corrections:
+        return None
+    return {"query": corrected, "corrections": corrections}
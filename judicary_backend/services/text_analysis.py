@@ -0,0 +1,170 @@
+"""
+Text Analysis – Tokenization for Mixed Urdu / English Legal Text
+==================================================================
+The old tokenizers kept ``[a-z]{3,}`` (dropping Urdu entirely) or plain
+``\\w+`` (splitting Urdu words at every diacritic and treating the
+Arabic and Urdu code points for the same letter as different terms).
+``analyze`` is the single analysis chain now shared by the search index
+and the TF-IDF similarity code:
+
+1. find word tokens, keeping diacritics, tatweel and zero-width joiners
+   inside the token so offsets still point at the original text (a
+   zero-width non-joiner or space separates words, as writers use the two
+   interchangeably in compounds such as "بے دخلی");
+2. fold each token: NFKC (presentation forms), Arabic → Urdu letter
+   variants (yeh, kaf, heh, hamza-on-alef), strip diacritics, tatweel
+   and zero-width characters, Urdu/Arabic-Indic digits → ASCII, lower-case;
+3. drop English and Urdu stopwords;
+4. light stemming – common English inflections and Urdu plural/oblique
+   suffixes, only when a reasonable stem remains.
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+
+# ----- Character folding -----
+
+# Arabic-script variants typed interchangeably in Urdu text
+_LETTER_MAP = {
+    "ي": "ی",  # ARABIC YEH            -> FARSI YEH (ی)
+    "ى": "ی",  # ALEF MAKSURA          -> FARSI YEH
+    "ې": "ی",  # ARABIC E              -> FARSI YEH
+    "ك": "ک",  # ARABIC KAF            -> KEHEH (ک)
+    "ه": "ہ",  # ARABIC HEH            -> HEH GOAL (ہ)
+    "ۀ": "ہ",  # HEH WITH YEH ABOVE    -> HEH GOAL
+    "ۃ": "ہ",  # TEH MARBUTA GOAL      -> HEH GOAL
+    "ة": "ہ",  # TEH MARBUTA           -> HEH GOAL
+    "أ": "ا",  # ALEF WITH HAMZA ABOVE -> ALEF
+    "إ": "ا",  # ALEF WITH HAMZA BELOW -> ALEF
+    "ٱ": "ا",  # ALEF WASLA            -> ALEF
+}
+# Diacritics (harakat, superscript alef, Quranic marks), tatweel, zero-width
+_STRIP_CHARS = (
+    [chr(c) for c in range(0x064B, 0x0660)]
+    + [chr(c) for c in range(0x06D6, 0x06EE)]
+    + ["\u0670", "\u0640", "\u200b", "\u200c", "\u200d", "\u200e", "\u200f", "\ufeff"]
+)
+# Arabic-Indic and Extended (Urdu) digits
+_DIGITS = {chr(0x0660 + i): str(i) for i in range(10)}
+_DIGITS.update({chr(0x06F0 + i): str(i) for i in range(10)})
+
+_FOLD_TABLE = str.maketrans({
+    **_LETTER_MAP,
+    **_DIGITS,
+    **{ch: None for ch in _STRIP_CHARS},
+})
+
+# A word: letters/digits plus the marks and joiner folded away above
+TOKEN_RE = re.compile(
+    r"[\w\u064B-\u065F\u0670\u0640\u06D6-\u06ED\u200D]+", re.UNICODE
+)
+
+
+def fold(text: str) -> str:
+    """Normalise Arabic-script variants, digits and case in *text*."""
+    if not text:
+        return ""
+    return unicodedata.normalize("NFKC", text).translate(_FOLD_TABLE).lower()
+
+
+# ----- Stopwords -----
+
+ENGLISH_STOP_WORDS = {
+    "the", "a", "an", "and", "or", "but", "in", "on", "at", "to", "for",
+    "of", "with", "by", "from", "is", "was", "are", "were", "be", "been",
+    "being", "have", "has", "had", "do", "does", "did", "will", "would",
+    "could", "should", "may", "might", "shall", "can", "this", "that",
+    "these", "those", "it", "its", "not", "no", "nor", "as", "if", "than",
+    "so", "such", "each", "every", "all", "both", "few", "more", "most",
+    "other", "some", "any", "only", "own", "same", "very", "just", "also",
+    "into", "about", "between", "through", "during", "before", "after",
+    "above", "below", "under", "over", "again", "further", "then", "once",
+    "here", "there", "when", "where", "why", "how", "what", "which", "who",
+    "whom", "up", "out", "off", "down", "they", "them", "their", "he",
+    "him", "his", "she", "her", "we", "us", "our", "you", "your", "i", "me",
+    "my", "said", "upon", "per", "mr", "mrs", "ms", "vs", "versus",
+}
+
+URDU_STOP_WORDS = {fold(w) for w in (
+    "کا", "کی", "کے", "ہے", "ہیں", "ہو", "ہوں", "ہوا", "ہوئی", "ہوئے", "تھا",
+    "تھی", "تھے", "میں", "سے", "کو", "نے", "پر", "اور", "یا", "یہ", "وہ",
+    "اس", "ان", "ایک", "جو", "جس", "جن", "کہ", "بھی", "تو", "ہی", "نہ",
+    "نہیں", "گیا", "گئی", "گئے", "کر", "کرنے", "کیا", "کی", "لیے", "لئے",
+    "ساتھ", "تک", "بعد", "پہلے", "اپنے", "اپنی", "اپنا", "والے", "والی",
+    "والا", "جب", "اگر", "مگر", "لیکن", "چونکہ", "بنام", "بمقابلہ",
+    "دی", "دیا", "دیے", "دے", "گا", "گی", "رہا", "رہی", "رہے",
+)}
+
+STOP_WORDS = ENGLISH_STOP_WORDS | URDU_STOP_WORDS
+
+
+# ----- Light stemming -----
+
+# Urdu plural / oblique endings, longest first (already folded)
+_URDU_SUFFIXES = tuple(sorted({fold(s) for s in (
+    "یوں", "وں", "یاں", "یں", "ات", "ئیں",
+)}, key=len, reverse=True))
+_ARABIC_SCRIPT_RE = re.compile(r"[\u0600-\u06FF]")
+
+
+@lru_cache(maxsize=65536)
+def stem(term: str) -> str:
+    """Strip common inflections, keeping at least a 3-character stem."""
+    if _ARABIC_SCRIPT_RE.search(term):
+        for suffix in _URDU_SUFFIXES:
+            if term.endswith(suffix) and len(term) - len(suffix) >= 2:
+                return term[:-len(suffix)]
+        return term
+
+    if not term.isalpha() or len(term) <= 3:
+        return term
+    if term.endswith("ies") and len(term) > 4:
+        return term[:-3] + "y"
+    if term.endswith(("sses", "shes", "ches", "xes")):
+        term = term[:-2]
+    elif term.endswith("s") and not term.endswith(("ss", "us", "is")):
+        term = term[:-1]
+    if term.endswith("ing") and len(term) > 5:
+        term = term[:-3]
+    elif term.endswith("eed") and len(term) > 4:
+        term = term[:-1]
+    elif term.endswith("ed") and len(term) > 4:
+        term = term[:-2]
+    # A silent final e goes from every form, so "file", "files", "filed"
+    # and "filing" all stem to "fil" ("agree" keeps its ee)
+    if term.endswith("e") and not term.endswith("ee") and len(term) > 3:
+        term = term[:-1]
+    return term
+
+
+# ----- Analysis chain -----
+
+def analyze_with_positions(text: str):
+    """
+    Yield (term, position, start, length) for each index term.  Positions
+    count every word token, stopwords included, so the gaps of a phrase
+    survive analysis; start and length are character offsets into *text*.
+    """
+    if not text:
+        return
+    for position, match in enumerate(TOKEN_RE.finditer(text)):
+        token = match.group()
+        # ASCII needs no script folding; skip NFKC on the common path
+        token = token.lower() if token.isascii() else fold(token)
+        if not token or token in STOP_WORDS:
+            continue
+        if len(token) == 1 and not token.isdigit():
+            continue
+        yield stem(token), position, match.start(), match.end() - match.start()
+
+
+def analyze_with_offsets(text: str):
+    """Yield (term, start, length) for each index term, offsets into *text*."""
+    for term, _, start, length in analyze_with_positions(text):
+        yield term, start, length
+
+
+def analyze(text: str) -> list:
+    """Index / query terms for *text*."""
+    return [term for term, _, _ in analyze_with_offsets(text)]
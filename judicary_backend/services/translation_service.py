@@ -92,6 +92,7 @@ LEGAL_DICT_EN_UR = {
     "provision": "شق",
     "clause": "شق",
     "precedent": "نظیر",
+    "law of evidence": "قانون شہادت",
     "habeas corpus": "حق حبس بدن",
     "mandamus": "حکم امتناعی",
     "injunction": "حکم امتناعی",
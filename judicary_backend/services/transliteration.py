@@ -0,0 +1,273 @@
+"""
+Transliteration – Roman-Urdu Query Expansion
+==============================================
+Users type Urdu legal terms in Latin script ("zamanat", "khula", "nan
+nafqa", "wirasat"), which never match the Arabic-script terms of Urdu
+judgments or the glossary in ``translation_service``.  ``expand`` maps the
+Roman-Urdu words of a query to their Arabic-script forms and English
+equivalents so the query parser can OR them in as alternatives.
+
+Roman spellings vary ("qanoon" / "kanoon", "muqadma" / "muqaddama") and
+Urdu script leaves short vowels out, so both sides are reduced to a
+phonetic key before matching:
+
+* letters map to a shared alphabet (kh → خ, sh → ش, ch → چ, q/c → k,
+  ض/ظ/ذ/ز → z, ث/ص/س → s, ط/ٹ/ت → t, aspiration (ھ, "bh", "dh") dropped);
+* doubled letters collapse, vowels, h and non-initial w/y drop out, and a
+  leading vowel becomes a marker so "adalat" cannot match "dlt" words.
+
+Every glossary word and phrase is keyed once, at import, so a query word
+costs one dict probe.  A candidate must also agree on the skeleton that
+keeps h (at most ``MAX_SKELETON_DISTANCE`` apart, exactly for one-letter
+keys such as "haq") and on the final vowel ("saza" → سزا, not سزائے or
+سازی; "revenue" is not رہن).
+
+The keys are loose enough that English words land on glossary entries
+("appeal" → اپیل, "dower" → دار), so the English vocabulary of the
+glossary is never looked up, and callers pass *known* – the words the
+search index already holds – to leave those alone as well.
+"""
+
+import re
+from functools import lru_cache
+
+from services.case_number import edit_distance
+from services.text_analysis import STOP_WORDS, TOKEN_RE, fold
+from services.translation_service import LEGAL_DICT_EN_UR
+
+MIN_WORD_LENGTH = 3
+MAX_SKELETON_DISTANCE = 1
+
+# Glossary keys that are themselves Roman Urdu, unlike the rest of its
+# English vocabulary
+ROMAN_GLOSSARY_KEYS = {"nikah", "talaq", "khula"}
+
+# Izafat and postpositions between the words of a Roman-Urdu phrase
+# ("haq-e-mehr", "tauheen e adalat")
+ROMAN_CONNECTORS = {"e", "o", "ka", "ki", "ke", "ko", "se", "ne", "aur", "ya"}
+
+ROMAN_DIGRAPHS = (
+    ("kh", "X"), ("gh", "g"), ("sh", "S"), ("ch", "C"), ("zh", "z"), ("ph", "f"),
+    ("th", "t"), ("dh", "d"), ("bh", "b"), ("jh", "j"), ("rh", "r"), ("ee", "i"),
+    ("oo", "u"), ("ou", "u"), ("x", "ks"), ("q", "k"), ("c", "k"), ("v", "w"),
+    ("o", "u"),
+)
+_ROMAN_WORD_RE = re.compile(r"[a-z]+")
+
+_URDU_LETTERS = {
+    "ا": "a", "آ": "a", "ع": "a", "ب": "b", "پ": "p", "ت": "t", "ٹ": "t", "ط": "t",
+    "ث": "s", "س": "s", "ص": "s", "ش": "S", "ج": "j", "چ": "C", "ح": "h", "ہ": "h",
+    "خ": "X", "د": "d", "ڈ": "d", "ذ": "z", "ز": "z", "ژ": "z", "ض": "z", "ظ": "z",
+    "ر": "r", "ڑ": "r", "غ": "g", "گ": "g", "ف": "f", "ق": "k", "ک": "k", "ل": "l",
+    "م": "m", "ن": "n", "ں": "n", "ے": "e", "ۃ": "a",
+}
+_VOWELS = "aeiu"
+
+
+def roman_letters(word: str) -> str:
+    """A Latin-script word in the shared phonetic alphabet."""
+    letters = word.lower()
+    for digraph, letter in ROMAN_DIGRAPHS:
+        letters = letters.replace(digraph, letter)
+    if letters.endswith("y"):
+        letters = letters[:-1] + "i"
+    return letters
+
+
+def urdu_letters(word: str) -> str:
+    """An Arabic-script word in the shared phonetic alphabet."""
+    folded = fold(word)
+    letters = []
+    for i, ch in enumerate(folded):
+        if ch == "و":
+            letters.append("w" if i == 0 else "u")
+        elif ch == "ی":
+            letters.append("y" if i == 0 else "i")
+        elif ch == "ہ" and i == len(folded) - 1 and i > 0 and folded[i - 1] not in "او":
+            letters.append("a")    # silent final heh (not in گواہ, توجہ is)
+        else:
+            letters.append(_URDU_LETTERS.get(ch, ""))
+    return "".join(letters)
+
+
+def skeleton(letters: str) -> str:
+    """Consonants of *letters* (h kept), with a marker for a leading vowel."""
+    out = []
+    for i, ch in enumerate(letters):
+        if i and ch == letters[i - 1]:
+            continue
+        if ch in _VOWELS:
+            if i == 0:
+                out.append("_")
+        elif ch not in "wy" or i == 0:
+            out.append(ch)
+    return "".join(out)
+
+
+def phonetic_key(letters: str) -> str:
+    """The skeleton without h (Roman writers add and drop it freely)."""
+    return skeleton(letters).replace("h", "")
+
+
+def _ending(letters: str) -> str:
+    return letters[-1] if letters and letters[-1] in _VOWELS else ""
+
+
+# ---------------------------------------------------------------------------
+# Precompiled key index over the legal glossary
+# ---------------------------------------------------------------------------
+
+def _build_lexicon():
+    """
+    Returns:
+        (words, phrases, english) – phonetic key -> [(urdu word, skeleton,
+        ending)], tuple of keys -> [(urdu phrase, skeletons)], and urdu
+        term -> [english terms]
+    """
+    words, phrases, english = {}, {}, {}
+    for en, ur in LEGAL_DICT_EN_UR.items():
+        for urdu in (part.strip() for part in ur.split("/")):
+            english.setdefault(urdu, []).append(en)
+            parts = urdu.split()
+            letters = [urdu_letters(p) for p in parts]
+            for part, part_letters in zip(parts, letters):
+                entry = (part, skeleton(part_letters), _ending(part_letters))
+                bucket = words.setdefault(phonetic_key(part_letters), [])
+                if entry not in bucket:
+                    bucket.append(entry)
+            if len(parts) > 1:
+                keys = tuple(phonetic_key(l) for l in letters)
+                entry = (urdu, tuple(skeleton(l) for l in letters))
+                bucket = phrases.setdefault(keys, [])
+                if entry not in bucket:
+                    bucket.append(entry)
+    return words, phrases, english
+
+
+_WORDS, _PHRASES, _ENGLISH = _build_lexicon()
+ENGLISH_WORDS = {
+    word for en in LEGAL_DICT_EN_UR for word in _ROMAN_WORD_RE.findall(en.lower())
+} - ROMAN_GLOSSARY_KEYS
+MAX_PHRASE_WORDS = max((len(keys) for keys in _PHRASES), default=1)
+
+
+def _roman_words(text: str) -> list:
+    """(start, end, letters) of the Latin-script words of *text*."""
+    result = []
+    for match in TOKEN_RE.finditer(text or ""):
+        word = match.group().lower()
+        if _ROMAN_WORD_RE.fullmatch(word):
+            result.append((match.start(), match.end(), word))
+    return result
+
+
+@lru_cache(maxsize=65536)
+def _roman_shape(word: str) -> tuple:
+    """(phonetic key, skeleton, ending) of a lower-case Latin-script word."""
+    letters = roman_letters(word)
+    shape = skeleton(letters)
+    return shape.replace("h", ""), shape, _ending(letters)
+
+
+def _similar(shape: str, urdu_shape: str, key: str) -> int:
+    """Skeleton distance, or None when too far apart for *key*."""
+    limit = MAX_SKELETON_DISTANCE if len(key) > 1 else 0
+    distance = edit_distance(shape, urdu_shape, limit)
+    return distance if distance <= limit else None
+
+
+def lookup_word(word: str) -> list:
+    """Arabic-script glossary words a Roman-Urdu *word* may stand for."""
+    if (len(word) < MIN_WORD_LENGTH or word in STOP_WORDS or word in ROMAN_CONNECTORS
+            or word in ENGLISH_WORDS):
+        return []
+    key, shape, ending = _roman_shape(word)
+    scored = []
+    for urdu, urdu_shape, urdu_ending in _WORDS.get(key, ()):
+        distance = _similar(shape, urdu_shape, key)
+        if distance is not None and urdu_ending == ending:
+            scored.append((distance, urdu))
+    if not scored:
+        return []
+    best = min(distance for distance, _ in scored)
+    return [urdu for distance, urdu in scored if distance == best]
+
+
+def glossary_terms(word: str) -> list:
+    """Glossary entries (not just parts of phrases) a Roman *word* spells."""
+    return [urdu for urdu in lookup_word(word) if urdu in _ENGLISH]
+
+
+def _lookup_phrase(words: list) -> list:
+    """Glossary phrases spelled by the Roman *words* (connectors removed)."""
+    shapes = [_roman_shape(w) for w in words]
+    return [
+        urdu for urdu, urdu_shapes in _PHRASES.get(tuple(key for key, _, _ in shapes), ())
+        if all(_similar(shape, urdu_shape, key) is not None
+               for (key, shape, _), urdu_shape in zip(shapes, urdu_shapes))
+    ]
+
+
+def _alternatives(original: str, urdu_forms: list) -> list:
+    result = list(urdu_forms)
+    for urdu in urdu_forms:
+        result.extend(en for en in _ENGLISH.get(urdu, ()) if en != original.lower())
+    return list(dict.fromkeys(result))
+
+
+def expand(text: str, known=None) -> tuple:
+    """
+    Roman-Urdu words and phrases in *text* with their Arabic-script forms
+    and English equivalents, longest phrase first.  Single words for which
+    the predicate *known* holds (already index terms) are left alone.
+
+    Returns:
+        tuple of (original, alternatives) pairs, e.g.
+        ("nan nafqa", ("نان نفقہ", "maintenance"))
+    """
+    expansions = _expand(text)
+    if known is None:
+        return expansions
+    return tuple(
+        (original, forms) for original, forms in expansions
+        if not (_ROMAN_WORD_RE.fullmatch(original.lower()) and known(original.lower()))
+    )
+
+
+@lru_cache(maxsize=4096)
+def _expand(text: str) -> tuple:
+    words = _roman_words(text)
+    result = []
+    i = 0
+    while i < len(words):
+        match = None
+        # Phrases: up to MAX_PHRASE_WORDS content words, connectors skipped
+        content, j = [], i
+        while j < len(words) and len(content) < MAX_PHRASE_WORDS:
+            if not content or words[j][2] not in ROMAN_CONNECTORS:
+                content.append(j)
+            j += 1
+            if len(content) > 1:
+                forms = _lookup_phrase([words[k][2] for k in content])
+                if forms:
+                    match = (content[-1], forms)
+        if match is None:
+            forms = lookup_word(words[i][2])
+            if forms:
+                match = (i, forms)
+        if match is not None:
+            end, forms = match
+            original = text[words[i][0]:words[end][1]]
+            result.append((original, tuple(_alternatives(original, forms))))
+            i = end + 1
+        else:
+            i += 1
+    return tuple(result)
+
+
+def alternatives(text: str, known=None) -> list:
+    """Alternatives for *text* when it is, as a whole, one Roman-Urdu term."""
+    expansions = expand(text.strip().strip('"'), known)
+    if len(expansions) == 1 and expansions[0][0] == text.strip().strip('"'):
+        return list(expansions[0][1])
+    return []
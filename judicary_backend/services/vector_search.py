@@ -0,0 +1,323 @@
+"""
+Vector Search – In-process Dense Index over Case Embeddings
+=============================================================
+Holds one unit-normalised embedding per case in a contiguous float32
+matrix, so a query is a single matrix-vector product on the CPU followed
+by a partial sort.  Rows are appended in place (the buffer grows by
+doubling) and removed cases are zeroed, mirroring the ordinal scheme of
+``services.search_index``.
+
+The matrix is persisted next to the search index with ``numpy.save``.
+Embedding the whole corpus is slow on a CPU, so a missing index is built
+in a background thread; until it is ready ``search`` returns what has been
+embedded so far and hybrid search degrades towards lexical ranking.  For
+the same reason other workers' writes and deletions (``CaseDeletion``
+tombstones) are embedded and applied by ``services.index_sync``, never on
+the request path, and a loaded index is reconciled with the collection in
+the background.  Flagged near-duplicates (``duplicate_of``) are not held.
+
+Past ``ANN_MIN_ROWS`` cases, queries go through an ``ann_index.AnnIndex``
+(IVF-flat by default) over the same rows instead of scanning the matrix.
+"""
+
+import os
+import pickle
+import threading
+import time
+import logging
+from datetime import datetime
+
+import numpy as np
+
+from config import get_config
+from services import embedding_service, index_sync
+from services.ann_index import AnnIndex
+
+logger = logging.getLogger(__name__)
+
+TEXT_FIELDS = ("title", "summary", "headnotes")
+SOURCE_FIELDS = TEXT_FIELDS + ("duplicate_of", "updated_at")
+BUILD_BATCH = 256
+
+# Bump when the embedded text or the model changes
+INDEX_VERSION = 1
+
+
+class VectorIndex:
+    """Dense cosine-similarity index over case embeddings."""
+
+    def __init__(self, dim: int, path=None, ann: AnnIndex = None):
+        self.dim = dim
+        self.path = path
+        self.ann = ann             # approximate search over the rows, or None
+        self._lock = threading.RLock()
+        self._last_refresh = 0.0
+        self._last_save = time.time()
+        self.ready = False
+        self._reset()
+
+    def _reset(self):
+        self.vectors = np.zeros((1024, self.dim), dtype=np.float32)
+        self.doc_ids = []          # row -> case id (None once removed)
+        self.rows = {}             # case id -> row
+        self.watermark = None
+        self.deleted_through = datetime.utcnow()   # deletion tombstones applied up to here
+        self.sequence = 0          # write counter, stamps the saved ANN index
+        self._dirty = 0
+
+    # ---- Writes ----
+
+    def add_vectors(self, case_ids: list, vectors, updated_at=None):
+        """Store precomputed unit vectors for *case_ids*."""
+        with self._lock:
+            written = []
+            for case_id, vector in zip(case_ids, vectors):
+                row = self.rows.get(case_id)
+                if row is None:
+                    row = len(self.doc_ids)
+                    if row == len(self.vectors):
+                        grown = np.zeros((2 * len(self.vectors), self.dim), dtype=np.float32)
+                        grown[:row] = self.vectors
+                        self.vectors = grown
+                    self.doc_ids.append(case_id)
+                    self.rows[case_id] = row
+                self.vectors[row] = vector
+                written.append(row)
+                self._dirty += 1
+            self.sequence += 1
+            if self.ann is not None and written:
+                self.ann.upsert(written, self.vectors[written])
+            if updated_at and (self.watermark is None or updated_at > self.watermark):
+                self.watermark = updated_at
+
+    def add_cases(self, cases: list):
+        """Embed and store Case documents or raw case dicts (flagged ones are dropped)."""
+        embed, ids, newest = [], [], None
+        for case in cases:
+            get = case.get if isinstance(case, dict) else lambda f, c=case: getattr(c, f, None)
+            updated_at = get("updated_at")
+            if updated_at and (newest is None or updated_at > newest):
+                newest = updated_at
+            if get("duplicate_of"):
+                self.remove(get("id") or get("_id"))
+            else:
+                embed.append(case)
+                ids.append(str(get("id") or get("_id")))
+        vectors = []
+        if embed:
+            vectors = embedding_service.embed_texts([embedding_service.case_text(c) for c in embed])
+            if vectors is None:
+                return
+        self.add_vectors(ids, vectors, newest)
+
+    def remove(self, case_id):
+        """Drop a case from the index."""
+        with self._lock:
+            row = self.rows.pop(str(case_id), None)
+            if row is not None:
+                self.vectors[row] = 0.0
+                self.doc_ids[row] = None
+                self.sequence += 1
+                self._dirty += 1
+                if self.ann is not None:
+                    self.ann.remove([row])
+
+    # ---- Reads ----
+
+    def search_vector(self, query_vector, limit: int) -> list:
+        """
+        Nearest cases to a unit *query_vector* by cosine similarity.
+
+        Returns:
+            list of (case_id, similarity), best first
+        """
+        if self.ann is not None:
+            self.ann.ensure(len(self.rows), self._ann_snapshot, self._ann_vector, self._ann_stamp)
+            hits = self.ann.search(query_vector, limit)
+            if hits is not None:
+                doc_ids = self.doc_ids
+                return [(doc_ids[row], score) for row, score in hits if doc_ids[row] is not None]
+        with self._lock:
+            n = len(self.doc_ids)
+            if n == 0:
+                return []
+            scores = self.vectors[:n] @ query_vector
+            doc_ids = list(self.doc_ids)
+        k = min(limit, n)
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(doc_ids[i], float(scores[i])) for i in top if doc_ids[i] is not None]
+
+    def search(self, query: str, limit: int) -> list:
+        """Embed *query* and return its nearest cases."""
+        vectors = embedding_service.embed_texts([query])
+        if vectors is None:
+            return []
+        return self.search_vector(vectors[0], limit)
+
+    def _ann_snapshot(self):
+        with self._lock:
+            rows = [row for row, case_id in enumerate(self.doc_ids) if case_id is not None]
+            return rows, self.vectors[rows]
+
+    def _ann_vector(self, row):
+        with self._lock:
+            return None if self.doc_ids[row] is None else self.vectors[row].copy()
+
+    def _ann_stamp(self):
+        with self._lock:
+            return self.sequence
+
+    # ---- Maintenance ----
+
+    def build(self):
+        """Embed every case (run in a background thread)."""
+        from models.case_model import Case
+
+        started = time.time()
+        self.deleted_through = datetime.utcnow()
+        self._add_batched(Case.objects(duplicate_of=None).only(*SOURCE_FIELDS))
+        self.ready = True
+        logger.info(
+            "Vector index built: %d cases in %.1fs", len(self.rows), time.time() - started
+        )
+        self.save()
+
+    def _add_batched(self, queryset):
+        batch = []
+        for doc in queryset.as_pymongo().batch_size(BUILD_BATCH):
+            batch.append(doc)
+            if len(batch) == BUILD_BATCH:
+                self.add_cases(batch)
+                batch = []
+        self.add_cases(batch)
+
+    def refresh(self, min_interval: float = 0):
+        """Apply cases written and deleted by other workers since the last watermarks."""
+        from models.case_deletion import CaseDeletion
+        from models.case_model import Case
+
+        now = time.time()
+        if now - self._last_refresh < min_interval or not self.ready:
+            return   # a build in progress picks the writes up itself
+        self._last_refresh = now
+        # No watermark yet means the index was built from an empty collection
+        fresh = Case.objects(updated_at__gt=self.watermark) if self.watermark else Case.objects
+        self._add_batched(fresh.only(*SOURCE_FIELDS))
+        deleted, self.deleted_through = CaseDeletion.since(self.deleted_through)
+        for case_id in deleted:
+            self.remove(case_id)
+
+    def reconcile(self) -> dict:
+        """Drop cases deleted and embed cases inserted while the index sat on disk."""
+        self.deleted_through = datetime.utcnow()
+        stats = index_sync.reconcile(
+            "Vector index", list(self.rows), self.remove, lambda doc: self.add_cases([doc]),
+            SOURCE_FIELDS, where={"duplicate_of": None},
+        )
+        if stats["removed"] or stats["added"]:
+            self.save()
+        return stats
+
+    def save(self):
+        """Atomically persist ids and vectors to ``self.path``."""
+        if not self.path:
+            return
+        with self._lock:
+            n = len(self.doc_ids)
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "wb") as f:
+                pickle.dump({
+                    "version": INDEX_VERSION,
+                    "dim": self.dim,
+                    "doc_ids": self.doc_ids,
+                    "watermark": self.watermark,
+                    "sequence": self.sequence,
+                }, f, protocol=pickle.HIGHEST_PROTOCOL)
+                np.save(f, self.vectors[:n])
+            os.replace(tmp_path, self.path)
+            self._dirty = 0
+            self._last_save = time.time()
+            if self.ann is not None:
+                self.ann.save(self.sequence)
+
+    def maybe_save(self, every_writes: int, every_seconds: float):
+        """Persist if enough writes or time have accumulated since the last save."""
+        if self._dirty and (
+            self._dirty >= every_writes or time.time() - self._last_save >= every_seconds
+        ):
+            self.save()
+
+    def load(self) -> bool:
+        """Load a persisted index. Returns False if missing or stale."""
+        if not self.path or not os.path.exists(self.path):
+            return False
+        try:
+            with open(self.path, "rb") as f:
+                state = pickle.load(f)
+                vectors = np.load(f)
+        except Exception as exc:
+            logger.warning("Could not load vector index %s: %s", self.path, exc)
+            return False
+        if state.get("version") != INDEX_VERSION or state.get("dim") != self.dim:
+            return False
+
+        with self._lock:
+            self._reset()
+            capacity = max(1024, len(vectors))
+            self.vectors = np.zeros((capacity, self.dim), dtype=np.float32)
+            self.vectors[:len(vectors)] = vectors
+            self.doc_ids = state["doc_ids"]
+            self.rows = {cid: i for i, cid in enumerate(self.doc_ids) if cid is not None}
+            self.watermark = state["watermark"]
+            self.sequence = state.get("sequence", 0)
+            self.ready = True
+            if self.ann is not None:
+                self.ann.load(self.sequence)
+        return True
+
+
+# ---------------------------------------------------------------------------
+# Process-wide instance
+# ---------------------------------------------------------------------------
+_index = None
+_index_lock = threading.Lock()
+
+
+def get_vector_index():
+    """
+    Return the shared VectorIndex, or None when no embedding model is
+    available.  A missing index starts building in the background.
+    """
+    global _index
+    if _index is None:
+        if not embedding_service.is_available():
+            return None
+        with _index_lock:
+            if _index is None:
+                cfg = get_config()
+                path = os.path.join(cfg.SEARCH_INDEX_DIR, "vector_index.bin")
+                dim = embedding_service.dimension()
+                ann = AnnIndex(dim, cfg.ANN_METHOD, cfg.ANN_MIN_ROWS, cfg.ANN_NLIST,
+                               cfg.ANN_NPROBE, f"{path}.ivf")
+                index = VectorIndex(dim, path, ann)
+                target = index.reconcile if index.load() else index.build
+                threading.Thread(target=target, daemon=True).start()
+                index_sync.register("vectors", index.refresh)
+                _index = index
+    return _index
+
+
+def vector_ranked(query: str, limit: int = None) -> list:
+    """
+    Dense ranking for *query*.  Hits below VECTOR_MIN_SIMILARITY are
+    dropped so unrelated cases are not fused into the results just for
+    being the nearest available.
+    """
+    cfg = get_config()
+    index = get_vector_index()
+    if index is None:
+        return []
+    ranked = index.search(query, limit or cfg.VECTOR_SEARCH_CANDIDATES)
+    return [(case_id, score) for case_id, score in ranked if score >= cfg.VECTOR_MIN_SIMILARITY]
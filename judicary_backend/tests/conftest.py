@@ -0,0 +1,129 @@
+"""
+Shared fixtures: an in-memory MongoDB (mongomock) behind mongoengine, the
+Flask app in testing mode and fresh per-worker search structures per test.
+
+Run from judicary_backend/:  python -m pytest -q tests
+"""
+
+import os
+import sys
+import tempfile
+
+import pytest
+
+os.environ["FLASK_ENV"] = "testing"
+os.environ.setdefault("SEARCH_INDEX_DIR", tempfile.mkdtemp(prefix="judiciary-test-index-"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mongomock  # noqa: E402
+import mongoengine  # noqa: E402
+from mongomock import aggregate as _aggregate  # noqa: E402
+
+_connect = mongoengine.connect
+
+
+def _mongomock_connect(*args, **kwargs):
+    kwargs.pop("host", None)
+    return _connect("judiciary_test", host="mongodb://localhost",
+                    mongo_client_class=mongomock.MongoClient, uuidRepresentation="standard")
+
+
+mongoengine.connect = _mongomock_connect
+
+# mongomock lacks two aggregation operators the routes use
+_array_operator = _aggregate._Parser._handle_array_operator
+_string_operator = _aggregate._Parser._handle_string_operator
+
+
+def _handle_array_operator(self, operator, values):
+    if operator == "$indexOfArray":
+        array = values[0] if isinstance(values[0], list) else self.parse(values[0])
+        value = self.parse(values[1])
+        return array.index(value) if value in array else -1
+    return _array_operator(self, operator, values)
+
+
+def _handle_string_operator(self, operator, values):
+    if operator == "$substrCP":
+        value = self.parse(values[0]) or ""
+        return value[values[1]:values[1] + values[2]]
+    return _string_operator(self, operator, values)
+
+
+_aggregate._Parser._handle_array_operator = _handle_array_operator
+_aggregate._Parser._handle_string_operator = _handle_string_operator
+
+import app as app_module  # noqa: E402
+
+# Modules holding a lazily built per-worker singleton in ``_index``
+_INDEX_MODULES = ("autocomplete", "filter_index", "near_duplicates", "search_index",
+                  "similarity_index", "vector_search")
+
+
+@pytest.fixture(autouse=True)
+def clean_state():
+    """Empty collections, derived structures and caches before each test."""
+    import importlib
+
+    from services import count_cache, index_sync, result_cache, spelling
+
+    db = mongoengine.connection.get_db()
+    for name in db.list_collection_names():
+        db.drop_collection(name)
+    for name in _INDEX_MODULES:
+        importlib.import_module(f"services.{name}")._index = None
+    spelling._speller = None
+    count_cache._cache.clear()
+    result_cache.clear()
+    index_sync._refreshers.clear()
+    directory = os.environ["SEARCH_INDEX_DIR"]
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        if os.path.isfile(path):
+            os.remove(path)
+    yield
+
+
+@pytest.fixture
+def app():
+    return app_module.app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def admin_headers():
+    from models.auth_model import Auth
+    from routes.auth_routes import create_token
+
+    admin = Auth(email="admin@example.com", password="x", role="admin").save()
+    return {"Authorization": "Bearer " + create_token(admin)}
+
+
+@pytest.fixture
+def make_case():
+    """Insert a Case with sensible defaults; keyword arguments override them."""
+    from datetime import datetime
+
+    from models.case_model import Case
+
+    counter = iter(range(1, 1_000_000))
+
+    def make(**fields):
+        n = next(counter)
+        values = {
+            "case_number": f"C.P. {n}/2020",
+            "title": f"Petitioner {n} v. The State",
+            "court": "Supreme Court of Pakistan",
+            "year": 2020,
+            "judgment_date": datetime(2020, 1, 1),
+            "source": "supreme_court",
+            "summary": f"Judgment number {n}.",
+        }
+        values.update(fields)
+        return Case(**values).save()
+
+    return make
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from services.ann_index import IVFFlatIndex
+
+
+def _unit(rows):
+    return (rows / np.linalg.norm(rows, axis=1, keepdims=True)).astype(np.float32)
+
+
+@pytest.fixture
+def clustered():
+    rng = np.random.default_rng(11)
+    centres = rng.standard_normal((20, 32))
+    points = centres[rng.integers(20, size=4000)] + 0.3 * rng.standard_normal((4000, 32))
+    return _unit(points), _unit(centres + 0.3 * rng.standard_normal((20, 32)))
+
+
+def _exact(vectors, query, k):
+    scores = vectors @ query
+    return np.argsort(-scores)[:k].tolist()
+
+
+def _trained(vectors, **kwargs):
+    index = IVFFlatIndex(vectors.shape[1], **kwargs)
+    index.add(np.arange(len(vectors)), vectors)
+    index.train()
+    return index
+
+
+def test_untrained_index_is_exact(clustered):
+    vectors, queries = clustered
+    index = IVFFlatIndex(32)
+    index.add(np.arange(500), vectors[:500])
+    assert not index.is_trained
+    assert [i for i, _ in index.search(queries[0], 10)] == _exact(vectors[:500], queries[0], 10)
+
+
+def test_probing_every_list_is_exact(clustered):
+    vectors, queries = clustered
+    index = _trained(vectors)
+    assert index.is_trained and len(index.lists) > 1
+    found = [i for i, _ in index.search(queries[0], 10, nprobe=len(index.lists))]
+    assert found == _exact(vectors, queries[0], 10)
+
+
+def test_recall_with_few_probes(clustered):
+    vectors, queries = clustered
+    index = _trained(vectors, nprobe=8)
+    hits = sum(len(set(i for i, _ in index.search(q, 10)) & set(_exact(vectors, q, 10)))
+               for q in queries)
+    assert hits / (10 * len(queries)) >= 0.9
+
+
+def test_remove_and_move(clustered):
+    vectors, queries = clustered
+    index = _trained(vectors)
+    best = _exact(vectors, queries[0], 1)[0]
+    index.remove([best])
+    assert best not in [i for i, _ in index.search(queries[0], 10, nprobe=len(index.lists))]
+    index.add([best], queries[0][None, :])
+    top, score = index.search(queries[0], 1)[0]
+    assert top == best and score == pytest.approx(1.0, abs=1e-5)
+    assert len(index) == len(vectors)
+
+
+@pytest.mark.parametrize("codec", ["float32", "int8"])
+def test_save_and_load_round_trip(tmp_path, clustered, codec):
+    vectors, queries = clustered
+    index = _trained(vectors, codec=codec)
+    path = str(tmp_path / "ann.bin")
+    index.save(path, stamp=7)
+    loaded = IVFFlatIndex.load(path)
+    assert loaded.stamp == 7 and len(loaded) == len(index)
+    assert loaded.search(queries[3], 10) == index.search(queries[3], 10)
+
+
+def test_int8_scores_are_close_to_float(clustered):
+    vectors, queries = clustered
+    exact = _trained(vectors)
+    coded = _trained(vectors, codec="int8")
+    full = dict(exact.search(queries[0], 50, nprobe=len(exact.lists)))
+    for item, score in coded.search(queries[0], 10, nprobe=len(coded.lists)):
+        assert score == pytest.approx(full.get(item, float(vectors[item] @ queries[0])), abs=0.02)
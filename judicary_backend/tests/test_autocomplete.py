@@ -0,0 +1,93 @@
+from datetime import datetime
+
+from services import autocomplete
+from services.autocomplete import AutocompleteIndex
+
+
+def _case(n, title, **fields):
+    case = {"_id": f"id{n}", "case_number": f"C.P. {n}/2020", "title": title,
+            "court": "Lahore High Court", "judgment_date": datetime(2000 + n % 20, 1, 1 + n % 28)}
+    case.update(fields)
+    return case
+
+
+def _expected(cases, prefix, limit):
+    norm = autocomplete.normalize(prefix)
+    hits = [c for c in cases
+            if any(k.startswith(norm) for k in autocomplete._word_start_keys(c["title"])
+                   + autocomplete._word_start_keys(c["case_number"]))]
+    hits.sort(key=lambda c: (-autocomplete._recency_score(c), ("case", c["_id"])))
+    return [c["_id"] for c in hits[:limit]]
+
+
+def test_limit_is_not_part_of_memo(make_case):
+    index = AutocompleteIndex()
+    for n in range(40):
+        index.add_case(_case(n, f"Bail application {n}"))
+    assert len(index.suggest("bail app", 3)["cases"]) == 3
+    assert len(index.suggest("bail app", 20)["cases"]) == 20
+    assert len(index.suggest("bail app", 5)["cases"]) == 5
+
+
+def test_build_matches_incremental_inserts(make_case):
+    for n in range(30):
+        make_case(title=f"Murder appeal {n}", judge_names=[f"Justice {n % 4}"])
+    built = AutocompleteIndex()
+    built.build()
+    incremental = AutocompleteIndex()
+    from models.case_model import Case
+    for doc in Case.objects.only(*autocomplete.CASE_FIELDS).as_pymongo():
+        incremental.add_case(doc)
+    assert built._items == incremental._items
+    for prefix in ("mu", "murder appeal 1", "ju", "c p 1"):
+        assert built.suggest(prefix, 25) == incremental.suggest(prefix, 25)
+
+
+def test_rankings_follow_writes_without_rescanning():
+    index = AutocompleteIndex()
+    cases = [_case(n, f"Tax reference {n}") for n in range(80)]
+    for case in cases:
+        index.add_case(case)
+    assert [c["id"] for c in index.suggest("ta", 10)["cases"]] == _expected(cases, "ta", 10)
+
+    # A newer case enters the top of the pinned ranking in place
+    newest = _case(99, "Tax reference newest", judgment_date=datetime(2030, 1, 1))
+    index.add_case(newest)
+    cases.append(newest)
+    assert "ta" in index._top
+    assert index.suggest("ta", 1)["cases"][0]["id"] == "id99"
+
+    # Removing ranked cases keeps answers exact until the list must be rescanned
+    for case in sorted(cases, key=autocomplete._recency_score, reverse=True)[:40]:
+        index.remove_case(case["_id"])
+        cases.remove(case)
+        assert [c["id"] for c in index.suggest("ta", 25)["cases"]] == _expected(cases, "ta", 25)
+
+
+def test_entity_popularity_updates_ranking():
+    index = AutocompleteIndex()
+    index.add_case(_case(1, "A", judge_names=["Justice Ahmed"]))
+    index.add_case(_case(2, "B", judge_names=["Justice Akram"]))
+    index.add_case(_case(3, "C", judge_names=["Justice Akram"]))
+    assert [t["text"] for t in index.suggest("justice a", 5)["terms"]] == ["Justice Akram", "Justice Ahmed"]
+    index.remove_case("id2")
+    index.remove_case("id3")
+    assert [t["text"] for t in index.suggest("justice a", 5)["terms"]] == ["Justice Ahmed"]
+
+
+def test_suggest_does_not_query_mongo(make_case, monkeypatch):
+    make_case(title="Constitutional petition")
+    index = autocomplete.get_autocomplete_index()
+    monkeypatch.setattr(index, "refresh", lambda *a, **k: (_ for _ in ()).throw(AssertionError))
+    assert autocomplete.suggest("constitutional", 5)["cases"]
+
+
+def test_background_refresh_picks_up_other_workers_writes(make_case):
+    from services import index_sync
+
+    index = autocomplete.get_autocomplete_index()
+    # Written by "another worker": straight to MongoDB, no case event
+    make_case(title="Habeas corpus petition")
+    assert autocomplete.suggest("habeas", 5)["cases"] == []
+    index_sync.run_once()
+    assert [c["title"] for c in autocomplete.suggest("habeas", 5)["cases"]] == ["Habeas corpus petition"]
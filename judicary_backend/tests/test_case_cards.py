@@ -0,0 +1,28 @@
+from models.case_model import CARD_SUMMARY_CHARS, Case
+
+
+def test_raw_card_matches_document_card(make_case):
+    case = make_case(summary="x" * (CARD_SUMMARY_CHARS + 50), judge_names=["Justice A"],
+                     full_text="long judgment text " * 100)
+    by_id = Case.cards_by_ids([str(case.id)])
+    assert by_id[str(case.id)] == Case.objects(id=case.id).first().to_card_json()
+    assert len(by_id[str(case.id)]["summary"]) == CARD_SUMMARY_CHARS
+
+
+def test_projection_leaves_out_heavy_fields(make_case):
+    make_case(full_text="long judgment text " * 100, judgment_text="more text")
+    row = next(Case._get_collection().aggregate([{"$project": Case.card_projection()}]))
+    assert "full_text" not in row and "judgment_text" not in row
+
+
+def test_list_endpoint_serves_cards(client, make_case):
+    case = make_case(status="decided", full_text="long judgment text")
+    card = client.get("/api/cases").get_json()["cases"][0]
+    assert card == Case.objects(id=case.id).first().to_card_json()
+
+
+def test_missing_fields_get_card_defaults():
+    card = Case.card_json_from_son({"_id": "5f0000000000000000000001"})
+    assert card["status"] == "unknown"
+    assert card["judge_names"] == [] and card["summary"] == ""
+    assert card["judgment_date"] is None
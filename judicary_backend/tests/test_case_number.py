@@ -0,0 +1,66 @@
+from models.case_model import Case
+from services.case_number import backfill_keys, case_number_key, lookup
+
+
+def test_key_is_shared_by_spellings():
+    assert case_number_key("Civil Revision 29718/25") == "29718/2025/CR"
+    assert case_number_key("C.R. No. 29718 of 2025") == "29718/2025/CR"
+
+
+def test_criminal_petition_for_leave_spellings_share_a_key():
+    keys = {case_number_key(n) for n in (
+        "Crl.P.L.A. 12/2020", "Crl. P.L.A. No. 12 of 2020", "Crl. PLA 12/2020",
+        "Criminal Petition 12/2020", "Criminal Petition for Leave to Appeal 12/2020")}
+    assert keys == {"12/2020/CRLP"}
+
+
+def test_backfill_rekeys_retired_type_codes(make_case):
+    case = make_case(case_number="Crl.P.L.A. 12/2020")
+    Case._get_collection().update_one({"_id": case.id}, {"$set": {"case_number_key": "12/2020/CRLPLA"}})
+    assert backfill_keys()["updated"] == 1
+    assert Case.objects.get(id=case.id).case_number_key == "12/2020/CRLP"
+
+
+def test_exact_and_fuzzy_lookup(make_case):
+    make_case(case_number="Civil Revision 29718/25")
+    assert len(lookup("C.R. 29718 of 2025")["exact"]) == 1
+    result = lookup("C.R. 29719 of 2025")
+    assert result["exact"] == []
+    assert result["suggestions"][0]["distance"] == 1
+
+
+def test_fuzzy_scan_is_in_key_order(make_case, monkeypatch):
+    monkeypatch.setattr("services.case_number.FUZZY_CANDIDATES", 3)
+    for number in (12399, 12395, 12391, 12345):
+        make_case(case_number=f"C.P. {number}/2020")
+    suggestions = lookup("C.P. 12346/2020")["suggestions"]
+    # Keys 12345, 12391, 12395 are scanned; 12399 is past the candidate cap
+    assert [card["case_number"] for card in suggestions] == [
+        "C.P. 12345/2020", "C.P. 12391/2020", "C.P. 12395/2020"]
+
+
+def test_editing_an_unkeyed_collision_keeps_it_unkeyed(client, admin_headers, make_case):
+    Case.ensure_indexes()
+    owner = make_case(case_number="C.P. 7/2020")
+    legacy = make_case(case_number="C.P. 8/2020")
+    # As backfill_keys leaves a row whose key another case in the court owns
+    Case._get_collection().update_one(
+        {"_id": legacy.id}, {"$set": {"case_number": "CP 7 of 2020"}, "$unset": {"case_number_key": ""}})
+
+    response = client.put(f"/api/cases/{legacy.id}", json={"title": "Corrected title"},
+                          headers=admin_headers)
+    assert response.status_code == 200
+    assert "warning" in response.get_json()
+    stored = Case._get_collection().find_one({"_id": legacy.id})
+    assert stored["title"] == "Corrected title"
+    assert "case_number_key" not in stored
+    assert Case.objects(id=owner.id).first().case_number_key == "7/2020/CP"
+
+
+def test_editing_a_keyed_case_into_a_collision_is_refused(client, admin_headers, make_case):
+    Case.ensure_indexes()
+    make_case(case_number="C.P. 7/2020", court="Lahore High Court")
+    other = make_case(case_number="C.P. 7/2020")
+    response = client.put(f"/api/cases/{other.id}", json={"court": "Lahore High Court"},
+                          headers=admin_headers)
+    assert response.status_code == 409
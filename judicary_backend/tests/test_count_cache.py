@@ -0,0 +1,75 @@
+import pytest
+from mongoengine.queryset import QuerySet
+
+from config import get_config
+from models.case_model import Case
+from services import count_cache, generations
+
+
+@pytest.fixture
+def counted(monkeypatch, make_case):
+    """Number of real count() round trips."""
+    for court in ("Lahore High Court", "Lahore High Court", "Sindh High Court"):
+        make_case(court=court)
+    calls = []
+    original = QuerySet.count
+
+    def count(self, *args, **kwargs):
+        calls.append(self._query)
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(QuerySet, "count", count)
+    return calls
+
+
+def test_exact_total_is_cached_per_filter(counted):
+    lahore = Case.objects(court__icontains="lahore")
+    sindh = Case.objects(court__icontains="sindh")
+    assert count_cache.count_documents(lahore) == (2, False)
+    assert count_cache.count_documents(Case.objects(court__icontains="lahore")) == (2, False)
+    assert count_cache.count_documents(sindh) == (1, False)
+    assert len(counted) == 2
+
+
+def test_write_generation_invalidates_exact_total(counted, make_case):
+    lahore = Case.objects(court__icontains="lahore")
+    count_cache.count_documents(lahore)
+    make_case(court="Lahore High Court")
+    generations.bump("cases", "Lahore High Court")
+    assert count_cache.count_documents(lahore) == (3, False)
+    assert len(counted) == 2
+
+
+def test_estimate_serves_a_stale_total_within_its_ttl(counted, make_case, monkeypatch):
+    lahore = Case.objects(court__icontains="lahore")
+    count_cache.count_documents(lahore, "estimate")
+    make_case(court="Lahore High Court")
+    generations.bump("cases", "Lahore High Court")
+    assert count_cache.count_documents(lahore, "estimate") == (2, True)
+    monkeypatch.setattr(get_config(), "COUNT_ESTIMATE_TTL_SECONDS", 0)
+    assert count_cache.count_documents(lahore, "estimate") == (3, False)
+
+
+def test_none_and_unfiltered_modes_skip_count(counted):
+    assert count_cache.count_documents(Case.objects(court="x"), "none") == (None, False)
+    assert count_cache.count_documents(Case.objects) == (3, False)
+    assert counted == []
+
+
+def test_cases_endpoint_reports_estimates(client, counted):
+    params = {"court": "Lahore", "search": "Petitioner", "count": "estimate"}
+    first = client.get("/api/cases", query_string=params).get_json()["pagination"]
+    assert first["total"] == 2 and first["total_is_estimate"] is False
+    none = client.get("/api/cases", query_string={**params, "count": "none"}).get_json()
+    assert none["pagination"]["total"] is None
+    assert client.get("/api/cases", query_string={"count": "bogus"}).status_code == 400
+
+
+def test_listed_total_is_estimate_minus_cached_flagged_rows(client, counted, make_case):
+    original = Case.objects.first()
+    make_case(duplicate_of=original.id)
+    for _ in range(2):
+        assert client.get("/api/cases").get_json()["pagination"]["total"] == 3
+        assert client.get("/api/analytics/dashboard").get_json()["total_cases"] == 3
+    assert {"duplicate_of": None} not in counted
+    assert counted.count({"duplicate_of": {"$ne": None}}) == 1
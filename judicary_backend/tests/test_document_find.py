@@ -0,0 +1,47 @@
+import pytest
+
+from services.document_find import find_in_case
+
+PARAGRAPH = "The learned counsel for the parties addressed arguments at length on the record. "
+
+
+@pytest.fixture
+def judgment(make_case):
+    text = (PARAGRAPH * 30 + "\n\n" + PARAGRAPH * 20 + "The petitioner sought pre-arrest bail.\n\n"
+            + PARAGRAPH * 10 + "Bail of the accused is confirmed.")
+    return make_case(summary="Criminal petition.", judgment_text=text)
+
+
+def test_hits_carry_offsets_paragraphs_and_context(judgment):
+    result = find_in_case(str(judgment.id), "bail")
+    assert result["total"] == 2 and result["fields"] == {"judgment_text": 2}
+    first, second = result["matches"]
+    text = judgment.judgment_text
+    assert text[first["start"]:first["end"]] == "bail"
+    assert text[second["start"]:second["end"]] == "Bail"
+    assert (first["paragraph"], second["paragraph"]) == (2, 3)
+    start, end = first["match"]
+    assert first["text"][start:end] == "bail"
+
+
+def test_phrases_and_near_span_the_whole_hit(judgment):
+    text = judgment.judgment_text
+    phrase = find_in_case(str(judgment.id), '"pre-arrest bail"')["matches"]
+    assert [text[m["start"]:m["end"]] for m in phrase] == ["pre-arrest bail"]
+    near = find_in_case(str(judgment.id), "bail NEAR/0 accused")["matches"]
+    assert [text[m["start"]:m["end"]] for m in near] == ["Bail of the accused"]
+
+
+def test_paging_through_hits(judgment):
+    assert find_in_case(str(judgment.id), "counsel", limit=5)["total"] == 60
+    page = find_in_case(str(judgment.id), "counsel", limit=5, offset=58)["matches"]
+    assert len(page) == 2
+
+
+def test_endpoint_validates_input(client, judgment):
+    assert client.get(f"/api/cases/{judgment.id}/find").status_code == 400
+    assert client.get("/api/cases/nope/find", query_string={"q": "bail"}).status_code == 400
+    missing = "5f0000000000000000000001"
+    assert client.get(f"/api/cases/{missing}/find", query_string={"q": "bail"}).status_code == 404
+    body = client.get(f"/api/cases/{judgment.id}/find", query_string={"q": "bail"}).get_json()
+    assert body["total"] == 2
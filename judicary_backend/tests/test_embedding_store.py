@@ -0,0 +1,81 @@
+import json
+import threading
+
+import numpy as np
+import pytest
+
+from services.embedding_store import EmbeddingStore
+
+
+@pytest.fixture
+def json_directory(tmp_path):
+    rng = np.random.default_rng(3)
+    directory = tmp_path / "json"
+    directory.mkdir()
+    for n in range(100):
+        (directory / f"case{n:03d}_embedding.json").write_text(json.dumps(
+            {"filename": f"case{n:03d}.txt", "embedding": rng.standard_normal(16).tolist()}))
+    return directory
+
+
+def test_concurrent_imports_store_each_id_once(tmp_path, json_directory):
+    directory = str(tmp_path / "store")
+    stores = [EmbeddingStore(directory) for _ in range(4)]   # one per worker
+    counts = []
+    threads = [threading.Thread(target=lambda s=s: counts.append(
+        s.import_json_directory(str(json_directory), batch_size=7))) for s in stores]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(counts) == 100
+    fresh = EmbeddingStore(directory)
+    assert len(fresh) == 100 and len(fresh.ids) == 100
+
+
+def test_add_many_supersedes_unless_skipping(tmp_path):
+    store = EmbeddingStore(str(tmp_path))
+    assert store.add_many(["a", "b"], [[1, 0], [0, 1]]) == 2
+    assert store.add_many(["a"], [[1, 1]], skip_existing=True) == 0
+    assert store.add_many(["a"], [[1, 1]]) == 1
+    assert np.allclose(store.vector("a"), [2 ** -0.5, 2 ** -0.5])
+    assert [item_id for item_id, _ in store.search([1, 1], 2)] == ["a", "b"]
+
+
+def _wait_for_ann(store):
+    import time
+
+    store.ann.ensure(len(store), store._ann_snapshot, store._ann_vector, store._ann_stamp)
+    deadline = time.time() + 30
+    while store.ann.index is None and time.time() < deadline:
+        time.sleep(0.05)
+    assert store.ann.index is not None
+
+
+def test_quantized_copy_is_dropped_while_ann_answers(tmp_path):
+    from services.ann_index import AnnIndex
+
+    rng = np.random.default_rng(5)
+    vectors = rng.standard_normal((400, 32)).astype(np.float32)
+    ids = [f"case{n}" for n in range(400)]
+    EmbeddingStore(str(tmp_path)).add_many(ids, vectors)
+
+    ann = AnnIndex(None, "ivf", 100, nlist=8, nprobe=8, codec="int8")
+    store = EmbeddingStore(str(tmp_path), ann, "int8", rerank=50)
+    assert store.codes is not None
+    exact = [item_id for item_id, _ in store.search(vectors[7], 5)]
+    assert exact[0] == "case7"
+
+    _wait_for_ann(store)
+    assert [item_id for item_id, _ in store.search(vectors[7], 5)][0] == "case7"
+    assert store.codes is None
+    assert store.memory_bytes() == ann.memory_bytes()
+
+    # New rows are not encoded while the ANN index is live ...
+    store.add("late", vectors[3] + 0.01)
+    assert store.codes is None
+    # ... and the exact fallback rebuilds the copy when it is needed again
+    ann.index = None
+    assert [item_id for item_id, _ in store.search(vectors[7], 5)] == exact
+    assert store._encoded == len(store.ids)
@@ -0,0 +1,51 @@
+import json
+
+import pytest
+
+from config import get_config
+
+
+@pytest.fixture
+def bail_cases(make_case):
+    for n in range(6):
+        make_case(summary=f"Post-arrest bail granted in appeal number {n}", year=2018 + n % 2)
+    make_case(summary="Land revenue mutation dispute")
+
+
+@pytest.mark.parametrize("sort", ["relevance", "-judgment_date"])
+def test_ranked_export_is_not_capped(client, bail_cases, monkeypatch, sort):
+    monkeypatch.setattr(get_config(), "SEARCH_MAX_CANDIDATES", 2)
+    body = client.get("/api/search/export", query_string={"q": "bail", "sort": sort}).get_data(as_text=True)
+    records = [json.loads(line) for line in body.splitlines()]
+    assert len(records) == 6
+    assert all("score" in record for record in records)
+
+
+def test_export_applies_filters(client, bail_cases):
+    body = client.get("/api/search/export",
+                      query_string={"q": "bail", "year": "2019", "format": "csv"}).get_data(as_text=True)
+    assert len(body.strip().splitlines()) == 1 + 3
+
+
+@pytest.mark.parametrize("sort", ["-year", "year", "id"])
+def test_sorted_ranked_export_fetches_in_batches(client, bail_cases, monkeypatch, sort):
+    from mongomock.collection import Collection
+
+    from models.case_model import Case
+
+    id_lists = []
+    find = Collection.find
+
+    def spy(self, filter=None, *args, **kwargs):
+        id_lists.extend(len(c["_id"]["$in"]) for c in (filter or {}).get("$and", ()) if "_id" in c)
+        id_lists.extend([len(filter["_id"]["$in"])] if "_id" in (filter or {}) else [])
+        return find(self, filter, *args, **kwargs)
+
+    monkeypatch.setattr(Collection, "find", spy)
+    monkeypatch.setattr(get_config(), "EXPORT_BATCH_SIZE", 2)
+    body = client.get("/api/search/export",
+                      query_string={"q": "bail", "sort": sort, "fields": "year"}).get_data(as_text=True)
+    ids = [json.loads(line)["id"] for line in body.splitlines()]
+    expected = Case.objects(summary__icontains="bail").order_by(sort, "-id" if sort[0] == "-" else "id")
+    assert ids == [str(case.id) for case in expected]
+    assert id_lists and max(id_lists) <= 2
@@ -0,0 +1,45 @@
+import pytest
+
+
+@pytest.fixture
+def corpus(make_case):
+    make_case(summary="bail granted", court="Lahore High Court", year=2019,
+              status="decided", judge_names=["Justice A", "Justice B"])
+    make_case(summary="bail refused", court="Lahore High Court", year=2020,
+              status="pending", judge_names=["Justice A"])
+    make_case(summary="bail on medical grounds", court="Sindh High Court", year=2020,
+              status="decided", judge_names=["Justice C"])
+    make_case(summary="land mutation", court="Sindh High Court", year=2021, status="decided")
+
+
+def _counts(facet):
+    return {row["value"]: row["count"] for row in facet}
+
+
+def test_facets_are_scoped_to_the_query(client, corpus):
+    body = client.get("/api/search", query_string={"q": "bail", "facets": "true"}).get_json()
+    facets = body["facets"]
+    assert _counts(facets["courts"]) == {"Lahore High Court": 2, "Sindh High Court": 1}
+    assert _counts(facets["years"]) == {2020: 2, 2019: 1}
+    assert _counts(facets["statuses"]) == {"decided": 2, "pending": 1}
+    assert _counts(facets["judges"])["Justice A"] == 2
+    assert body["pagination"]["total"] == 3
+
+
+@pytest.mark.parametrize("params", [
+    {"q": "bail"},
+    {"q": "bail", "sort": "-judgment_date"},
+    {"court": "Sindh"},
+])
+def test_faceted_page_matches_plain_page(client, corpus, params):
+    plain = client.get("/api/search", query_string={**params, "page_size": 2}).get_json()
+    faceted = client.get("/api/search", query_string={**params, "page_size": 2, "facets": "true"}).get_json()
+    assert [r["id"] for r in faceted["results"]] == [r["id"] for r in plain["results"]]
+    assert faceted["pagination"]["total"] == plain["pagination"]["total"]
+    assert "facets" not in plain
+
+
+def test_facets_follow_filters(client, corpus):
+    body = client.get("/api/search", query_string={"court": "Sindh", "facets": "true"}).get_json()
+    assert _counts(body["facets"]["courts"]) == {"Sindh High Court": 2}
+    assert _counts(body["facets"]["years"]) == {2021: 1, 2020: 1}
@@ -0,0 +1,58 @@
+from models.case_model import Case
+from services import case_events, filter_catalogue
+
+
+def _saved(make_case, **fields):
+    case = make_case(**fields)
+    case_events.case_saved(case)
+    return case
+
+
+def test_incremental_deltas_match_a_rebuild(make_case):
+    filter_catalogue.get_case_filters()          # reconciled on the empty collection
+    _saved(make_case, court="Lahore High Court", year=2019, judge_names=["Justice A"])
+    _saved(make_case, court="Sindh High Court", year=2022, case_type="Writ",
+           judge_names=["Justice A", "Justice B"])
+    incremental = filter_catalogue.get_case_filters()
+    assert incremental["courts"] == ["Lahore High Court", "Sindh High Court"]
+    assert incremental["year_range"] == {"min": 2019, "max": 2022}
+    assert incremental["judges"][0] == {"name": "Justice A", "count": 2}
+
+    filter_catalogue.reconcile()
+    assert filter_catalogue.get_case_filters() == incremental
+
+
+def test_update_moves_judge_counts(make_case):
+    filter_catalogue.get_case_filters()
+    case = _saved(make_case, judge_names=["Justice A"])
+    previous = case_events.snapshot(case)
+    case.judge_names = ["Justice B"]
+    case.save()
+    case_events.case_saved(case, previous)
+    judges = filter_catalogue.get_case_filters()["judges"]
+    assert judges == [{"name": "Justice B", "count": 1}]
+
+
+def test_judge_names_with_dots_round_trip(make_case):
+    filter_catalogue.get_case_filters()
+    _saved(make_case, judge_names=["Mr. Justice A.B. Khan"])
+    assert filter_catalogue.get_case_filters()["judges"] == [
+        {"name": "Mr. Justice A.B. Khan", "count": 1}]
+
+
+def test_reconcile_drops_values_of_deleted_cases(make_case):
+    filter_catalogue.get_case_filters()
+    kept = _saved(make_case, court="Lahore High Court")
+    gone = _saved(make_case, court="Peshawar High Court")
+    Case.objects(id=gone.id).delete()
+    case_events.case_deleted(gone)
+    assert "Peshawar High Court" in filter_catalogue.get_case_filters()["courts"]
+    filter_catalogue.reconcile()
+    assert filter_catalogue.get_case_filters()["courts"] == [kept.court]
+
+
+def test_filters_endpoint_reads_the_catalogue(client, make_case):
+    _saved(make_case, court="Lahore High Court", status="decided")
+    body = client.get("/api/search/filters").get_json()
+    assert body["courts"] == ["Lahore High Court"]
+    assert body["statuses"] == ["decided"]
@@ -0,0 +1,77 @@
+import pytest
+
+from config import get_config
+from models.case_model import Case
+from services import case_events, index_sync
+from services.filter_index import Bitmap, filter_query, get_filter_index
+
+
+@pytest.fixture
+def corpus(make_case):
+    for n in range(12):
+        make_case(court="Lahore High Court" if n % 2 else "Sindh High Court",
+                  year=2015 + n % 4, source="lhc" if n % 3 else "shc", status="decided")
+
+
+def test_bitmap_set_operations():
+    a, b = Bitmap(), Bitmap()
+    for n in range(0, 200000, 3):
+        a.add(n)
+    for n in range(0, 200000, 5):
+        b.add(n)
+    assert len(a & b) == len(range(0, 200000, 15))
+    assert len(a | b) == len(set(range(0, 200000, 3)) | set(range(0, 200000, 5)))
+    assert list(a - b)[:3] == [3, 6, 9]
+
+
+@pytest.mark.parametrize("max_ids", [5000, 2])
+@pytest.mark.parametrize("path,params", [
+    ("/api/search", {"source": "shc"}),
+    ("/api/search", {"court": "lahore", "year": "2016"}),
+    ("/api/search", {"year_from": "2016", "year_to": "2017"}),
+    ("/api/cases", {"source": "lhc", "year_from": "2017"}),
+    ("/api/cases", {"court": "sindh", "status": "decided"}),
+])
+def test_total_matches_rows(client, corpus, monkeypatch, max_ids, path, params):
+    monkeypatch.setattr(get_config(), "FILTER_INDEX_MAX_IDS", max_ids)
+    body = client.get(path, query_string={**params, "page_size": 100}).get_json()
+    rows = body.get("results", body.get("cases"))
+    assert body["pagination"]["total"] == len(rows)
+    year = int(params.get("year", 0))
+    for row in Case.objects(id__in=[r["id"] for r in rows]):
+        if "source" in params:
+            assert row.source == params["source"]
+        if year:
+            assert row.year == year
+        if "year_from" in params:
+            assert row.year >= int(params["year_from"])
+
+
+def test_large_filter_query_uses_exact_values(corpus, make_case):
+    make_case(court="Lahore High Court, Bahawalpur Bench", case_type="Writ Petition")
+    query = Case.objects(filter_query({"court": "LAHORE", "case_type": "writ petition"}))._query
+    assert sorted(query["court"]["$in"]) == ["Lahore High Court", "Lahore High Court, Bahawalpur Bench"]
+    assert query["case_type"] == {"$in": ["Writ Petition"]}
+
+
+def test_refresh_applies_other_workers_writes_and_deletes(make_case):
+    kept, deleted = make_case(source="lhc"), make_case(source="lhc")
+    index = get_filter_index()
+    assert len(index.resolve({"source": "lhc"})) == 2
+
+    # Another worker inserts one case and deletes another
+    make_case(source="lhc")
+    Case.objects(id=deleted.id).delete()
+    case_events.CaseDeletion(case_id=str(deleted.id)).save()
+    index_sync.run_once()
+
+    ids = set(index.case_ids(index.resolve({"source": "lhc"})))
+    assert str(kept.id) in ids and str(deleted.id) not in ids
+    assert len(ids) == 2
+
+
+def test_case_deleted_leaves_tombstone(make_case):
+    case = make_case()
+    case.delete()
+    case_events.case_deleted(case)
+    assert case_events.CaseDeletion.objects(case_id=str(case.id)).count() == 1
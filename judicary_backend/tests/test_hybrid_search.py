@@ -0,0 +1,53 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from config import get_config
+from services import hybrid_search
+
+LEXICAL = [("a", 3.0), ("b", 2.0)]
+
+
+@pytest.fixture
+def legs(monkeypatch):
+    release = threading.Event()
+
+    def slow_vectors(query):
+        release.wait(2)
+        return [("c", 0.9)]
+
+    monkeypatch.setattr(get_config(), "HYBRID_TIMEOUT_SECONDS", 0.05)
+    monkeypatch.setattr(hybrid_search, "get_vector_index", lambda: SimpleNamespace(ready=True))
+    monkeypatch.setattr(hybrid_search, "vector_ranked", slow_vectors)
+    yield monkeypatch
+    release.set()
+
+
+def test_vector_timeout_falls_back_to_lexical(legs):
+    legs.setattr(hybrid_search, "search_ranked", lambda query: LEXICAL)
+    ranked, status = hybrid_search.hybrid_ranked("ejectment of tenant")
+    assert [case_id for case_id, _ in ranked] == ["a", "b"]
+    assert status == {"lexical": "ok", "vector": "timeout"}
+
+
+def test_slow_lexical_leg_is_never_dropped(legs):
+    def slow_lexical(query):
+        time.sleep(0.1)
+        return LEXICAL
+
+    legs.setattr(hybrid_search, "search_ranked", slow_lexical)
+    ranked, status = hybrid_search.hybrid_ranked("ejectment of tenant")
+    assert [case_id for case_id, _ in ranked] == ["a", "b"]
+    assert status["lexical"] == "ok"
+
+
+def test_both_legs_are_fused(monkeypatch):
+    monkeypatch.setattr(hybrid_search, "get_vector_index", lambda: SimpleNamespace(ready=True))
+    monkeypatch.setattr(hybrid_search, "vector_ranked", lambda query: [("b", 0.9), ("c", 0.8)])
+    monkeypatch.setattr(hybrid_search, "search_ranked", lambda query: LEXICAL)
+    ranked, status = hybrid_search.hybrid_ranked("ejectment of tenant")
+    assert ranked[0][0] == "b"
+    assert {case_id for case_id, _ in ranked} == {"a", "b", "c"}
+    assert status == {"lexical": "ok", "vector": "ok"}
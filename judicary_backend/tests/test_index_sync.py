@@ -0,0 +1,76 @@
+import pytest
+
+from models.case_deletion import CaseDeletion
+from models.case_model import Case
+from services import (
+    autocomplete, index_sync, near_duplicates, search_index, similarity_index,
+)
+
+TEXT = ("The petitioner sought pre-arrest bail in a case registered under "
+        "section 489-F of the Pakistan Penal Code for a dishonoured cheque. "
+        "Learned counsel contends that the dispute is purely civil in nature, "
+        "that the complainant has already filed a suit for recovery of the same "
+        "amount and that the arrest of the petitioner would serve no purpose as "
+        "the cheque is already in the custody of the police")
+
+
+def _delete_elsewhere(case):
+    """A delete performed by another worker: the row and its tombstone."""
+    Case.objects(id=case.id).delete()
+    CaseDeletion(case_id=str(case.id)).save()
+
+
+@pytest.fixture
+def cases(make_case):
+    return [make_case(summary=f"{TEXT} number {n}") for n in range(3)]
+
+
+def test_search_index_reload_reconciles_with_collection(cases, make_case):
+    search_index.get_search_index().save()
+    ghost = cases[0]
+    Case.objects(id=ghost.id).delete()           # no tombstone: long gone
+    added = make_case(summary=TEXT)
+
+    search_index._index = None
+    index = search_index.get_search_index()
+    ids = {case_id for case_id, _ in index.search("cheque")}
+    assert str(ghost.id) not in ids
+    assert str(added.id) in ids
+    assert index.live_count == Case.objects.count()
+
+
+@pytest.mark.parametrize("module,getter,ids", [
+    (search_index, "get_search_index", lambda ix: set(ix.ordinals)),
+    (similarity_index, "get_similarity_index", lambda ix: set(ix.rows)),
+    (near_duplicates, "get_near_duplicate_index", lambda ix: set(ix.rows)),
+    (autocomplete, "get_autocomplete_index",
+     lambda ix: {e[1] for e in ix._entries if e[0] == "case"}),
+])
+def test_refresh_applies_remote_deletes(cases, module, getter, ids):
+    index = getattr(module, getter)()
+    assert str(cases[1].id) in ids(index)
+    _delete_elsewhere(cases[1])
+    index_sync.run_once()
+    assert str(cases[1].id) not in ids(index)
+    assert str(cases[0].id) in ids(index)
+
+
+@pytest.mark.parametrize("module,getter,ids", [
+    (similarity_index, "get_similarity_index", lambda ix: set(ix.rows)),
+    (near_duplicates, "get_near_duplicate_index", lambda ix: set(ix.rows)),
+])
+def test_reload_reconciles(cases, make_case, module, getter, ids):
+    index = getattr(module, getter)()
+    index.save()
+    Case.objects(id=cases[0].id).delete()
+    added = make_case(summary="An entirely different judgment about land revenue "
+                              "mutation entries and the limitation for a civil suit "
+                              "challenging them, holding that time runs from the date "
+                              "of knowledge of the entry and not from its attestation "
+                              "by the revenue officer, so that the suit instituted "
+                              "within six years of that knowledge was within time and "
+                              "the decree of the trial court is restored")
+    module._index = None
+    reloaded = getattr(module, getter)()
+    assert ids(reloaded) == {str(c.id) for c in Case.objects}
+    assert str(added.id) in ids(reloaded)
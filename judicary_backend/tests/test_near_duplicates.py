@@ -0,0 +1,158 @@
+import pytest
+
+from config import get_config
+from models.case_model import Case
+from scrapers.base_scraper import BaseScraper
+from services import case_events, near_duplicates
+from services.autocomplete import get_autocomplete_index
+from services.filter_catalogue import get_case_filters
+from services.similarity_index import get_similarity_index
+
+JUDGMENT = (
+    "This appeal arises from the judgment of the learned High Court whereby the "
+    "constitutional petition of the appellant regarding the regularisation of his "
+    "service as a lecturer in the education department was dismissed on the ground "
+    "that the posts had been advertised afresh and no vested right had accrued "
+    "to him; we have heard the learned counsel for the parties at length and "
+    "perused the record with their able assistance"
+)
+
+
+class _Scraper(BaseScraper):
+    SOURCE_NAME = "supreme_court"
+
+    def scrape(self, **kwargs):
+        pass
+
+    def parse_case_list(self, soup):
+        return []
+
+    def parse_case_detail(self, soup, url=None):
+        return {}
+
+
+@pytest.fixture
+def flagged(make_case):
+    canonical = make_case(case_number="C.A. 10/2021", summary=JUDGMENT,
+                          judge_names=["Justice Umar"], status="decided")
+    copy = make_case(case_number="SC-HOME-77", summary="Judgment: " + JUDGMENT,
+                     judge_names=["Justice Umar"], status="decided",
+                     duplicate_of=canonical.id)
+    case_events.case_saved(copy)
+    return canonical, copy
+
+
+def test_signature_estimates_jaccard():
+    sig = near_duplicates.case_signature({"summary": JUDGMENT})
+    same = near_duplicates.case_signature({"summary": "Judgment: " + JUDGMENT})
+    other = near_duplicates.case_signature({"summary": JUDGMENT[::-1]})
+    assert (sig == same).mean() >= 0.7
+    assert (sig == other).mean() < 0.2
+
+
+@pytest.mark.parametrize("params", [
+    {"q": "regularisation lecturer"},
+    {"q": "regularisation lecturer", "sort": "-judgment_date"},
+    {"court": "supreme"},
+    {"status": "decided", "judge": "umar"},
+    {"q": "regularisation", "facets": "true"},
+])
+def test_flagged_copy_is_not_listed(client, flagged, params):
+    canonical, copy = flagged
+    body = client.get("/api/search", query_string=params).get_json()
+    assert [r["id"] for r in body["results"]] == [str(canonical.id)]
+    assert body["pagination"]["total"] == 1
+    for facet in (body.get("facets") or {}).values():
+        assert sum(bucket["count"] for bucket in facet) <= 1
+
+
+def test_flagged_copy_is_left_out_of_counts(client, flagged):
+    canonical, copy = flagged
+    assert client.get("/api/cases").get_json()["pagination"]["total"] == 1
+    assert client.get("/api/cases", query_string={"court": "supreme"}).get_json()["pagination"]["total"] == 1
+    assert client.get("/api/analytics/dashboard").get_json()["total_cases"] == 1
+    assert client.get("/api/cases/stats").get_json()["total_cases"] == 1
+    judges = {j["name"]: j["count"] for j in get_case_filters()["judges"]}
+    assert judges == {"Justice Umar": 1}
+
+
+def test_flagged_copy_is_out_of_derived_indexes(flagged):
+    canonical, copy = flagged
+    assert [c["id"] for c in get_autocomplete_index().suggest("sc home", 5)["cases"]] == []
+    assert str(copy.id) not in get_similarity_index().rows
+    assert str(copy.id) not in near_duplicates.get_near_duplicate_index().rows
+
+
+def test_merge_repoints_references(make_case):
+    from bson import ObjectId
+
+    from models.auth_model import Auth
+    from models.chat_model import ChatSession
+    from models.document_model import Document
+    from models.notification_model import Notification
+    from models.user_model import User
+
+    canonical = make_case(case_number="C.A. 10/2021", summary=JUDGMENT)
+    duplicate = make_case(case_number="SC-HOME-77", summary="Judgment: " + JUDGMENT)
+    flagged_copy = make_case(case_number="SC-LIST-3", summary=JUDGMENT, duplicate_of=duplicate.id)
+    owner = ObjectId()
+    Document(user_id=owner, case_id=duplicate.id, original_filename="a.pdf",
+             stored_filename="a.pdf", file_path="/tmp/a.pdf").save()
+    Notification(user_id=owner, case_id=duplicate.id, case_number="SC-HOME-77",
+                 title="Hearing", message="Tomorrow").save()
+    ChatSession(user_id=owner, context_case_id=duplicate.id).save()
+    auth = Auth(email="u@example.com", password="x").save()
+    User(auth_id=auth, first_name="A", last_name="B",
+         saved_cases=[str(duplicate.id), str(canonical.id)]).save()
+
+    stats = near_duplicates.dedup_collection("merge")
+
+    assert stats["merged"] == 1
+    assert not Case.objects(id=duplicate.id).first()
+    assert Document.objects.get().case_id == canonical.id
+    notification = Notification.objects.get()
+    assert (notification.case_id, notification.case_number) == (canonical.id, "C.A. 10/2021")
+    assert ChatSession.objects.get().context_case_id == canonical.id
+    assert User.objects.get().saved_cases == [str(canonical.id)]
+    assert Case.objects.get(id=flagged_copy.id).duplicate_of == canonical.id
+    assert "SC-HOME-77" in Case.objects.get(id=canonical.id).case_number_aliases
+
+
+def test_cause_list_titles_are_never_judged(monkeypatch):
+    monkeypatch.setattr(get_config(), "NEAR_DUPLICATE_ACTION", "merge")
+    rest = " versus Federation of Pakistan through Secretary Ministry of Interior Islamabad and others"
+    scraper = _Scraper()
+    for number, appellant in (("SC-LIST-1", "Muhammad Ali Khan"), ("SC-LIST-2", "Ahmed Raza")):
+        assert scraper.save_case({"case_number": number, "court": "Supreme Court of Pakistan",
+                                  "title": appellant + rest}) == "new"
+    assert Case.objects(duplicate_of=None).count() == 2
+
+
+@pytest.mark.parametrize("first, second", [
+    ({"case_number": "C.A. 10/2021"}, {"case_number": "C.A. 11/2021"}),
+    ({"case_number": "SC-HOME-1", "appellants": ["Muhammad Ali Khan"]},
+     {"case_number": "SC-HOME-2", "appellants": ["Ahmed Raza"]}),
+])
+def test_incompatible_numbers_or_parties_are_kept_apart(monkeypatch, make_case, first, second):
+    monkeypatch.setattr(get_config(), "NEAR_DUPLICATE_ACTION", "merge")
+    make_case(summary=JUDGMENT, **first)
+    data = {"court": "Supreme Court of Pakistan", "title": "Appeal", "summary": "Judgment: " + JUDGMENT,
+            **second}
+    assert _Scraper().save_case(data) == "new"
+    assert Case.objects(duplicate_of=None).count() == 2
+    assert near_duplicates.dedup_collection("report")["duplicates"] == 0
+
+
+def test_compatible_copy_is_flagged_by_default(make_case):
+    original = make_case(case_number="C.A. 10/2021", summary=JUDGMENT, appellants=["Muhammad Ali Khan"])
+    data = {"case_number": "SC-HOME-1", "court": "Supreme Court of Pakistan", "title": "Appeal",
+            "summary": "Judgment: " + JUDGMENT, "appellants": ["Mohd. Ali Khan"]}
+    assert _Scraper().save_case(data) == "new"
+    assert Case.objects.get(case_number="SC-HOME-1").duplicate_of == original.id
+
+
+def test_dedup_flags_by_default(make_case):
+    canonical = make_case(case_number="C.A. 10/2021", summary=JUDGMENT)
+    copy = make_case(case_number="SC-HOME-77", summary="Judgment: " + JUDGMENT)
+    assert near_duplicates.dedup_collection()["flagged"] == 1
+    assert Case.objects.get(id=copy.id).duplicate_of == canonical.id
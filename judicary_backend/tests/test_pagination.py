@@ -0,0 +1,69 @@
+from datetime import datetime
+
+import pytest
+
+from services.pagination import decode_cursor, encode_cursor, paginate_ranked
+
+
+@pytest.fixture
+def listed(make_case):
+    """Ties on the sort key and rows without one, as scraped data has."""
+    dates = [datetime(2020, 1, 1)] * 3 + [datetime(2021, 5, 1), datetime(2019, 3, 1)] + [None] * 3
+    return [str(make_case(judgment_date=date).id) for date in dates]
+
+
+def _walk(client, path, page_size, **params):
+    seen, cursor = [], None
+    for _ in range(20):
+        query = {"page_size": page_size, **params, **({"cursor": cursor} if cursor else {})}
+        body = client.get(path, query_string=query).get_json()
+        seen.extend(card["id"] for card in body.get("cases", body.get("results", [])))
+        cursor = body["pagination"]["next_cursor"]
+        if cursor is None:
+            return seen
+    raise AssertionError("cursor never ran out")
+
+
+@pytest.mark.parametrize("sort", ["-judgment_date", "judgment_date", "-id", "title"])
+def test_cursor_walk_matches_offset_pages(client, listed, sort):
+    by_cursor = _walk(client, "/api/cases", 3, sort=sort)
+    by_offset = []
+    for page in (1, 2, 3):
+        body = client.get("/api/cases", query_string={"page": page, "page_size": 3, "sort": sort}).get_json()
+        by_offset.extend(card["id"] for card in body["cases"])
+    assert by_cursor == by_offset
+    assert sorted(by_cursor) == sorted(listed)
+
+
+def test_cursor_for_another_sort_is_rejected(client, listed):
+    body = client.get("/api/cases", query_string={"page_size": 3}).get_json()
+    cursor = body["pagination"]["next_cursor"]
+    response = client.get("/api/cases", query_string={"cursor": cursor, "sort": "title"})
+    assert response.status_code == 400
+    assert client.get("/api/cases", query_string={"cursor": "not-a-cursor"}).status_code == 400
+
+
+def test_cursor_round_trip():
+    moment = datetime(2020, 1, 2, 3, 4, 5)
+    cursor = encode_cursor("-judgment_date", moment, "5f0000000000000000000001")
+    value, last_id = decode_cursor(cursor, "-judgment_date")
+    assert value == moment and str(last_id) == "5f0000000000000000000001"
+    with pytest.raises(ValueError):
+        decode_cursor(cursor, "judgment_date")
+
+
+def test_ranked_cursor_survives_a_shifted_ranking():
+    ids = [f"c{n}" for n in range(10)]
+    first, cursor = paginate_ranked(ids, 1, 4)
+    assert first == ids[:4]
+    # A new case ranked ahead of the served ones must not repeat c3
+    shifted = ["new"] + ids
+    second, _ = paginate_ranked(shifted, 1, 4, cursor)
+    assert second == ids[4:8]
+
+
+def test_search_relevance_cursor_walk(client, make_case):
+    for n in range(7):
+        make_case(summary="bail " * (n + 1) + "granted")
+    walked = _walk(client, "/api/search", 3, q="bail")
+    assert len(walked) == len(set(walked)) == 7
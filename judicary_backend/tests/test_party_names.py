@@ -0,0 +1,53 @@
+import pytest
+
+from services.party_names import party_index_keys, party_key
+
+
+@pytest.mark.parametrize("first,second", [
+    ("Govt. of the Punjab through Chief Secretary", "Government of Punjab"),
+    ("Mohd. Aslam s/o Akram", "Muhammad Aslam"),
+    ("Mst. Rehmat Bibi and others", "Rehmat Bibi"),
+    ("M/s Pak Cement (Pvt.) Ltd.", "Pak Cement Private Limited"),
+])
+def test_spellings_share_a_key(first, second):
+    assert party_key(first) == party_key(second)
+
+
+def test_index_keys_include_word_suffixes():
+    assert party_index_keys(["Muhammad Aslam Khan"]) == [
+        "muhamad aslam khan", "~aslam khan", "~khan"]
+
+
+@pytest.fixture
+def parties(make_case):
+    return {
+        "aslam_appeals": make_case(appellants=["Mohd. Aslam s/o Akram"], respondents=["The State"]),
+        "aslam_responds": make_case(appellants=["Govt. of the Punjab"], respondents=["Muhammad Aslam"]),
+        "aslam_khan": make_case(appellants=["Muhammad Aslam Khan"]),
+    }
+
+
+def _names(body, parties):
+    ids = {str(case.id): name for name, case in parties.items()}
+    return {ids[card["id"]]: card["party_roles"] for card in body["cases"]}
+
+
+def test_exact_key_match_with_roles(client, parties):
+    body = client.get("/api/cases/parties", query_string={"name": "Muhammad Aslam"}).get_json()
+    assert body["match"] == "exact"
+    assert _names(body, parties) == {"aslam_appeals": ["appellant"], "aslam_responds": ["respondent"]}
+    body = client.get("/api/cases/parties",
+                      query_string={"name": "Mohammad Aslam", "role": "respondent"}).get_json()
+    assert set(_names(body, parties)) == {"aslam_responds"}
+
+
+def test_partial_match_falls_back_to_word_runs(client, parties):
+    body = client.get("/api/cases/parties", query_string={"name": "Aslam Khan"}).get_json()
+    assert body["match"] == "partial"
+    assert set(_names(body, parties)) == {"aslam_khan"}
+
+
+def test_party_endpoint_validates_input(client):
+    assert client.get("/api/cases/parties").status_code == 400
+    assert client.get("/api/cases/parties", query_string={"name": "x", "role": "judge"}).status_code == 400
+    assert client.get("/api/cases/parties", query_string={"name": "the of"}).status_code == 400
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from services import quantization
+from services.embedding_store import EmbeddingStore, normalise_rows
+
+
+@pytest.fixture
+def unit_rows():
+    rng = np.random.default_rng(2)
+    return normalise_rows(rng.standard_normal((3000, 64)).astype(np.float32))
+
+
+@pytest.mark.parametrize("codec,tolerance", [("float32", 1e-6), ("float16", 2e-3), ("int8", 2e-2)])
+def test_code_scores_approximate_float_dot_products(unit_rows, codec, tolerance):
+    codes, scales = quantization.encode(unit_rows, codec)
+    assert codes.dtype == quantization.code_dtype(codec)
+    query = unit_rows[0]
+    assert np.abs(quantization.scores(codes, query, scales) - unit_rows @ query).max() < tolerance
+    assert np.abs(quantization.decode(codes, scales) - unit_rows).max() < tolerance
+
+
+def test_memory_per_vector():
+    assert quantization.bytes_per_vector(384, "float32") == 1536
+    assert quantization.bytes_per_vector(384, "float16") == 768
+    assert quantization.bytes_per_vector(384, "int8") == 388
+
+
+def test_zero_rows_and_unknown_codecs():
+    codes, scales = quantization.encode(np.zeros((2, 4)), "int8")
+    assert not codes.any() and (scales == 1.0).all()
+    with pytest.raises(ValueError):
+        quantization.check_codec("int4")
+
+
+@pytest.mark.parametrize("codec", ["float16", "int8"])
+def test_store_reranks_quantized_candidates_exactly(tmp_path, unit_rows, codec):
+    ids = [f"case{n}" for n in range(len(unit_rows))]
+    EmbeddingStore(str(tmp_path)).add_many(ids, unit_rows)
+    exact = EmbeddingStore(str(tmp_path))
+    coded = EmbeddingStore(str(tmp_path), codec=codec, rerank=100)
+    assert coded.memory_bytes() < exact.memory_bytes()
+    for query in unit_rows[:20]:
+        expected = exact.search(query, 10)
+        got = coded.search(query, 10)
+        assert [i for i, _ in got] == [i for i, _ in expected]
+        assert [s for _, s in got] == pytest.approx([s for _, s in expected], abs=1e-6)
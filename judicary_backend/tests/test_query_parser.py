@@ -0,0 +1,101 @@
+import pytest
+
+from services.query_parser import Phrase, QuerySyntaxError, is_structured, parse
+from services.search_index import search_ranked
+
+
+def _ids(query):
+    return {case_id for case_id, _ in search_ranked(query)}
+
+
+def test_hyphenated_word_is_a_phrase():
+    node = parse("pre-arrest")
+    assert isinstance(node, Phrase) and node.terms == ["pre", "arrest"]
+    assert is_structured("pre-arrest bail")
+    assert not is_structured("pre arrest bail")
+
+
+def test_hyphenated_word_matches_adjacent_terms_only(make_case):
+    adjacent = make_case(summary="Pre-arrest bail was refused")
+    apart = make_case(summary="Pre trial detention after arrest")
+    assert _ids("pre-arrest") == {str(adjacent.id)}
+    assert str(apart.id) in _ids("pre arrest")
+
+
+def test_near_does_not_count_stopwords(make_case):
+    close = make_case(summary="bail of the accused")
+    one_between = make_case(summary="bail granted to the accused")
+    two_between = make_case(summary="bail granted promptly to accused")
+    assert _ids("bail NEAR/0 accused") == {str(close.id)}
+    assert _ids("bail NEAR/1 accused") == {str(close.id), str(one_between.id)}
+    assert str(two_between.id) in _ids("bail NEAR/2 accused")
+
+
+def test_near_requires_terms():
+    with pytest.raises(QuerySyntaxError):
+        parse("bail NEAR court:Lahore")
+
+
+@pytest.fixture
+def corpus(make_case):
+    return {
+        "lahore_bail": make_case(court="Lahore High Court", year=2019, summary="bail granted",
+                                 title="State v. Akram"),
+        "lahore_refused": make_case(court="Lahore High Court", year=2021,
+                                    summary="bail dismissed on merits"),
+        "sindh_bail": make_case(court="Sindh High Court", year=2023, summary="bail granted"),
+        "land": make_case(court="Lahore High Court", year=2020, summary="land mutation"),
+    }
+
+
+def _named(corpus, query):
+    names = {str(case.id): name for name, case in corpus.items()}
+    return {names[case_id] for case_id in _ids(query)}
+
+
+@pytest.mark.parametrize("query,expected", [
+    ("bail AND court:Lahore", {"lahore_bail", "lahore_refused"}),
+    ('court:"Lahore High Court" bail -dismissed', {"lahore_bail"}),
+    ("bail NOT dismissed", {"lahore_bail", "sindh_bail"}),
+    ("(mutation OR dismissed) court:lahore", {"lahore_refused", "land"}),
+    ("bail year:2020..", {"lahore_refused", "sindh_bail"}),
+    ("year:..2020", {"lahore_bail", "land"}),
+    ("title:akram", {"lahore_bail"}),
+    ("summary:akram", set()),
+])
+def test_structured_queries(corpus, query, expected):
+    assert _named(corpus, query) == expected
+
+
+@pytest.mark.parametrize("query", [
+    "(bail", "bail)", "bail AND", "court:x..y", "year:abc", "year:..", "NEAR bail",
+])
+def test_syntax_errors(query):
+    with pytest.raises(QuerySyntaxError):
+        parse(query)
+
+
+def test_and_runs_most_selective_first_and_negations_last(corpus, client):
+    plan = client.get("/api/search", query_string={
+        "q": "-dismissed bail title:akram", "explain": "true"}).get_json()["explain"]["plan"]
+    assert [child["op"] for child in plan["children"]] == ["TERM", "TERM", "NOT"]
+    assert plan["children"][0]["term"] == "akram"
+    assert plan["matched"] == 1
+
+
+@pytest.mark.parametrize("mode", ["lexical", "hybrid"])
+def test_explain_reuses_the_ranking_execution(corpus, client, monkeypatch, mode):
+    from services import query_parser
+
+    calls = []
+    execute = query_parser.execute
+    monkeypatch.setattr(query_parser, "execute", lambda *a, **kw: calls.append(a) or execute(*a, **kw))
+    body = client.get("/api/search", query_string={
+        "q": "bail -dismissed", "explain": "true", "mode": mode}).get_json()
+    assert len(calls) == 1
+    assert body["explain"]["matched"] == len(body["results"])
+
+
+def test_invalid_query_is_a_bad_request(client):
+    response = client.get("/api/search", query_string={"q": "(bail"})
+    assert response.status_code == 400
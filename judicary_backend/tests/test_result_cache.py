@@ -0,0 +1,67 @@
+from werkzeug.datastructures import MultiDict
+
+from config import get_config
+from services import case_events, result_cache
+
+
+def _get(client, path, **params):
+    response = client.get(path, query_string=params)
+    return response.headers.get("X-Cache"), response.get_json()
+
+
+def test_signature_ignores_defaults_and_order():
+    signature = result_cache.request_signature
+    assert signature("/api/cases", MultiDict([("page", "1"), ("court", "Lahore")])) == \
+        signature("/api/cases", MultiDict([("court", "Lahore ")]))
+    assert signature("/api/cases", MultiDict([("a", "1"), ("b", "2")])) == \
+        signature("/api/cases", MultiDict([("b", "2"), ("a", "1")]))
+    assert signature("/api/cases", MultiDict([("page", "2")])) != signature("/api/cases", MultiDict())
+    assert signature("/api/cases", MultiDict()) != signature("/api/search", MultiDict())
+
+
+def test_repeat_request_is_served_from_cache(client, make_case):
+    make_case()
+    assert _get(client, "/api/cases")[0] == "MISS"
+    assert _get(client, "/api/cases", page=1)[0] == "HIT"
+    assert _get(client, "/api/cases", page_size=5)[0] == "MISS"
+
+
+def test_write_to_another_court_keeps_court_scoped_entries(client, make_case):
+    case_events.case_saved(make_case(court="Lahore High Court"))
+    _get(client, "/api/cases", court="Lahore")
+    _get(client, "/api/cases")
+    case_events.case_saved(make_case(court="Lahore High Court"))  # court already known
+    case_events.case_saved(make_case(court="Sindh High Court"))   # new court
+    # A court seen for the first time could match older substring filters
+    assert _get(client, "/api/cases", court="Lahore")[0] == "MISS"
+    _get(client, "/api/cases", court="Lahore")
+    case_events.case_saved(make_case(court="Sindh High Court"))
+    status, body = _get(client, "/api/cases", court="Lahore")
+    assert status == "HIT" and body["pagination"]["total"] == 2
+    status, body = _get(client, "/api/cases")
+    assert status == "MISS" and body["pagination"]["total"] == 4
+
+
+def test_ranked_search_is_invalidated_by_any_write(client, make_case):
+    case_events.case_saved(make_case(court="Lahore High Court", summary="bail granted"))
+    _get(client, "/api/search", q="bail", court="Lahore")
+    case_events.case_saved(make_case(court="Sindh High Court", summary="land"))
+    assert _get(client, "/api/search", q="bail", court="Lahore")[0] == "MISS"
+
+
+def test_ttl_and_byte_budget(client, make_case, monkeypatch):
+    make_case()
+    monkeypatch.setattr(get_config(), "RESULT_CACHE_TTL_SECONDS", 0)
+    _get(client, "/api/cases")
+    assert _get(client, "/api/cases")[0] == "MISS"
+    monkeypatch.setattr(get_config(), "RESULT_CACHE_TTL_SECONDS", 60)
+    monkeypatch.setattr(get_config(), "RESULT_CACHE_MAX_BYTES", 1)
+    result_cache.clear()
+    _get(client, "/api/cases")
+    stats = result_cache.stats()
+    assert stats["entries"] == 0 and stats["bytes"] == 0 and stats["evictions"] >= 1
+
+
+def test_errors_are_not_cached(client):
+    assert client.get("/api/cases", query_string={"count": "bogus"}).status_code == 400
+    assert result_cache.stats()["entries"] == 0
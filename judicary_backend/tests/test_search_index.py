@@ -0,0 +1,91 @@
+from services.search_index import SearchIndex, search_ranked
+
+
+def _index(*docs):
+    index = SearchIndex()
+    for n, fields in enumerate(docs):
+        index.add(f"c{n}", fields)
+    return index
+
+
+def test_title_outweighs_body():
+    index = _index(
+        {"title": "Bail application", "full_text": "civil dispute"},
+        {"title": "Civil dispute", "full_text": "bail application mentioned"},
+    )
+    assert [case_id for case_id, _ in index.search("bail")] == ["c0", "c1"]
+
+
+def test_rare_terms_weigh_more():
+    index = _index(
+        {"summary": "appeal murder"},
+        {"summary": "appeal cheque"},
+        {"summary": "appeal land"},
+    )
+    ranked = dict(index.search("appeal cheque"))
+    assert max(ranked, key=ranked.get) == "c1"
+    assert ranked["c0"] == ranked["c2"] < ranked["c1"]
+
+
+def test_shorter_field_ranks_higher_for_same_tf():
+    index = _index(
+        {"summary": "bail " + "filler " * 40},
+        {"summary": "bail granted"},
+    )
+    assert index.search("bail")[0][0] == "c1"
+
+
+def test_remove_and_reindex():
+    index = _index({"summary": "bail granted"}, {"summary": "bail refused"})
+    index.remove("c0")
+    assert [case_id for case_id, _ in index.search("bail")] == ["c1"]
+    assert index.live_count == 1
+    index.add("c1", {"summary": "land mutation"})
+    assert index.search("bail") == []
+    assert [case_id for case_id, _ in index.search("mutation")] == ["c1"]
+
+
+def test_save_and_load_round_trip(tmp_path):
+    path = str(tmp_path / "search.pkl")
+    index = _index({"title": "Habeas corpus petition"}, {"summary": "Bail granted"})
+    index.path = path
+    index.save()
+    loaded = SearchIndex(path)
+    assert loaded.load()
+    assert loaded.search("habeas") == index.search("habeas")
+    assert loaded.live_count == 2
+
+
+def test_search_ranked_follows_case_writes(make_case):
+    bail = make_case(title="Bail before arrest", summary="Pre-arrest bail")
+    make_case(summary="Bail mentioned once")
+    ranked = search_ranked("bail")
+    assert ranked[0][0] == str(bail.id)
+    assert len(ranked) == 2
+
+
+def test_search_endpoint_orders_by_relevance(client, make_case):
+    make_case(summary="Bail mentioned once in a long land dispute about mutation entries")
+    best = make_case(title="Bail", summary="Bail granted")
+    body = client.get("/api/search", query_string={"q": "bail"}).get_json()
+    assert body["results"][0]["id"] == str(best.id)
+    assert body["pagination"]["total"] == 2
+
+
+def test_refresh_without_watermark_does_not_rescan(make_case, monkeypatch):
+    from models.case_model import Case
+
+    legacy = make_case(summary="Legacy bail order")
+    Case._get_collection().update_one({"_id": legacy.id}, {"$unset": {"updated_at": ""}})
+    index = SearchIndex()
+    index.rebuild()
+    assert index.watermark is None
+    added = []
+    add_case = index.add_case
+    monkeypatch.setattr(index, "add_case", lambda doc: added.append(doc["_id"]) or add_case(doc))
+    index.refresh()
+    assert added == []
+    fresh = make_case(summary="Fresh bail order")
+    index.refresh()
+    assert added == [fresh.id]
+    assert {case_id for case_id, _ in index.search("bail")} == {str(legacy.id), str(fresh.id)}
@@ -0,0 +1,99 @@
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from services.similarity_index import MIN_SIMILARITY, SimilarityIndex
+
+DOCS = {
+    "bail1": "pre arrest bail granted accused cheque dishonour",
+    "bail2": "post arrest bail refused accused murder",
+    "cheque": "cheque dishonour complaint accused",
+    "land": "land mutation revenue record",
+    "tax": "income tax assessment appeal",
+}
+
+
+def _brute_force(docs, case_id):
+    """Dense cosine of TF-IDF rows with the index's IDF formula."""
+    counts = {cid: Counter(text.split()) for cid, text in docs.items()}
+    vocabulary = sorted({t for c in counts.values() for t in c})
+    df = {t: sum(t in c for c in counts.values()) for t in vocabulary}
+    idf = {t: np.log(len(docs) / (df[t] + 1.0)) + 1.0 for t in vocabulary}
+    rows = {}
+    for cid, c in counts.items():
+        row = np.array([c[t] * idf[t] for t in vocabulary])
+        rows[cid] = row / np.linalg.norm(row)
+    scores = {cid: float(rows[case_id] @ row) for cid, row in rows.items() if cid != case_id}
+    return {cid: s for cid, s in scores.items() if s >= MIN_SIMILARITY}
+
+
+def _index(docs):
+    index = SimilarityIndex()
+    for cid, text in docs.items():
+        index.add(cid, text.split())
+    index.refresh_idf()
+    return index
+
+
+def _scores(index, case_id):
+    return dict(index.search_vector(index.case_vector(case_id), 10, exclude=case_id))
+
+
+def test_scores_match_dense_cosine():
+    index = _index(DOCS)
+    for case_id in DOCS:
+        expected = _brute_force(DOCS, case_id)
+        got = _scores(index, case_id)
+        assert got.keys() == expected.keys()
+        for cid, score in expected.items():
+            assert got[cid] == pytest.approx(score, abs=1e-5)
+
+
+def test_incremental_writes_match_a_rebuild_after_idf_refresh():
+    index = _index({k: v for k, v in DOCS.items() if k != "tax"})
+    index.add("tax", DOCS["tax"].split())
+    index.add("bail2", "bail refused land revenue".split())     # update
+    index.remove("land")
+    docs = {**DOCS, "bail2": "bail refused land revenue"}
+    del docs["land"]
+    index.refresh_idf()
+    fresh = _index(docs)
+    for case_id in docs:
+        expected = _scores(fresh, case_id)
+        got = _scores(index, case_id)
+        assert got.keys() == expected.keys()
+        assert all(got[c] == pytest.approx(expected[c], abs=1e-5) for c in expected)
+    assert "land" not in _scores(index, "bail2")
+
+
+def test_text_vector_ignores_unknown_terms():
+    index = _index(DOCS)
+    ranked = index.search_vector(index.text_vector("cheque dishonour unheardof"), 2)
+    assert [cid for cid, _ in ranked] == ["cheque", "bail1"]
+
+
+def test_save_and_load_round_trip(tmp_path):
+    index = _index(DOCS)
+    index.path = str(tmp_path / "similarity.bin")
+    index.save()
+    loaded = SimilarityIndex(index.path)
+    assert loaded.load()
+    assert _scores(loaded, "bail1") == pytest.approx(_scores(index, "bail1"))
+
+
+def test_similar_endpoint(client, make_case):
+    target = make_case(title="Bail in cheque case", summary="pre arrest bail cheque dishonour")
+    close = make_case(title="Cheque dishonour", summary="bail cheque dishonour complaint")
+    make_case(title="Income tax", summary="income tax assessment")
+    body = client.get(f"/api/ai/similar/{target.id}", query_string={"method": "tfidf"}).get_json()
+    assert body["similar_cases"][0]["id"] == str(close.id)
+
+
+@pytest.mark.parametrize("limit", ["-3", "0"])
+def test_similar_endpoint_clamps_limit(client, make_case, limit):
+    target = make_case(title="Bail in cheque case", summary="pre arrest bail cheque dishonour")
+    make_case(title="Cheque dishonour", summary="bail cheque dishonour complaint")
+    response = client.get(f"/api/ai/similar/{target.id}", query_string={"method": "tfidf", "limit": limit})
+    assert response.status_code == 200
+    assert len(response.get_json()["similar_cases"]) == 1
@@ -0,0 +1,39 @@
+from services.snippets import ELLIPSIS, MAX_SNIPPETS, SNIPPET_CHARS, highlight
+
+FILLER = "The learned counsel addressed the court at length. " * 40
+
+
+def _matched(snippet):
+    return [snippet["text"][s:e] for s, e in snippet["matches"]]
+
+
+def test_match_ranges_point_at_the_words(make_case):
+    case = make_case(summary="Bail was granted. The Bail application succeeded.")
+    snippets = highlight("bail", [str(case.id)])[str(case.id)]
+    assert _matched(snippets[0]) == ["Bail", "Bail"]
+    assert snippets[0]["field"] == "summary"
+
+
+def test_window_deep_in_the_judgment(make_case):
+    case = make_case(summary="Criminal appeal.",
+                     full_text=FILLER + "The accused sought pre-arrest bail. " + FILLER)
+    snippet = highlight("bail", [str(case.id)])[str(case.id)][0]
+    assert snippet["field"] == "full_text"
+    assert _matched(snippet) == ["bail"]
+    assert snippet["text"].startswith(ELLIPSIS) and snippet["text"].endswith(ELLIPSIS)
+    assert len(snippet["text"]) <= SNIPPET_CHARS + 2
+
+
+def test_prefers_windows_with_more_distinct_terms(make_case):
+    case = make_case(summary="bail " + FILLER + "bail was refused on the cheque charge " + FILLER)
+    snippets = highlight("bail cheque", [str(case.id)])[str(case.id)]
+    assert len(snippets) <= MAX_SNIPPETS
+    assert sorted(_matched(snippets[0])) == ["bail", "cheque"]
+
+
+def test_search_results_carry_highlights(client, make_case):
+    make_case(summary="Pre-arrest bail was granted.")
+    result = client.get("/api/search", query_string={"q": "bail"}).get_json()["results"][0]
+    assert _matched(result["highlights"][0]) == ["bail"]
+    plain = client.get("/api/search", query_string={"q": "bail", "highlight": "false"}).get_json()
+    assert plain["results"][0]["highlights"] == []
@@ -0,0 +1,70 @@
+from services.spelling import SpellingDictionary
+
+
+def test_lookup_corrects_within_distance():
+    speller = SpellingDictionary(max_distance=2, min_count=2)
+    for word in ("habeas", "corpus", "peshawar"):
+        speller.add(word, 5)
+    assert speller.lookup("habeus") == ("habeas", 1)
+    assert speller.lookup("peshawer") == ("peshawar", 1)
+    assert speller.lookup("habeas") is None
+    assert speller.lookup("zzzzzz") is None
+
+
+def test_cache_is_cleared_only_when_a_word_becomes_a_target():
+    speller = SpellingDictionary(max_distance=2, min_count=2)
+    speller.add("bail", 5)
+    assert speller.lookup("baill") == ("bail", 1)
+    speller.add("bail")            # already a target: memo survives
+    assert "baill" in speller._cache
+    speller.add("bails")           # count 1: not yet a target
+    assert "baill" in speller._cache
+    speller.add("bails")           # crosses min_count
+    assert speller._cache == {}
+    assert speller.lookup("baill") == ("bail", 1)
+
+
+def test_caches_are_per_instance():
+    first, second = SpellingDictionary(min_count=1), SpellingDictionary(min_count=1)
+    first.add("statute")
+    second.add("statue")
+    assert first.lookup("statuet") == ("statute", 2)
+    assert second.lookup("statuet") == ("statue", 1)
+
+
+def test_edits_count_only_the_words_they_change():
+    speller = SpellingDictionary(max_distance=2, min_count=2)
+    speller.add_case({"_id": "a", "summary": "baill granted"})
+    speller.add_case({"_id": "b", "summary": "baill refused"})
+    assert speller.lookup("bailll") == ("baill", 1)
+    speller.add_case({"_id": "b", "summary": "baill refused"})     # re-saved unchanged
+    assert speller.counts["baill"] == 2
+    speller.add_case({"_id": "a", "summary": "bail granted"})      # typo fixed
+    assert speller.counts["baill"] == 1
+    assert speller.lookup("bailll") is None
+    speller.remove_case("b")
+    assert "baill" not in speller.counts and "refused" not in speller.counts
+
+
+def test_refresh_picks_up_other_workers_writes(make_case):
+    from datetime import datetime
+
+    from models.case_deletion import CaseDeletion
+    from models.case_model import Case
+    from services import index_sync
+    from services.spelling import get_speller
+
+    speller = get_speller()
+    # Written by "another worker": straight to MongoDB, no case event
+    first = make_case(summary="wirasatnama disputed")
+    second = make_case(summary="wirasatnama upheld")
+    index_sync.run_once()
+    assert speller.known("wirasatnama")
+
+    Case.objects(id=first.id).update(set__summary="succession disputed",
+                                     set__updated_at=datetime.utcnow())
+    Case.objects(id=second.id).delete()
+    CaseDeletion(case_id=str(second.id)).save()
+    index_sync.run_once()
+    assert "wirasatnama" not in speller.counts
+    assert speller.counts["succession"] == 1
@@ -0,0 +1,53 @@
+import pytest
+
+from services.search_index import SearchIndex
+from services.text_analysis import analyze, analyze_with_positions, fold
+
+
+@pytest.mark.parametrize("variant,folded", [
+    ("كتاب", "کتاب"),            # Arabic kaf -> keheh
+    ("قاضي", "قاضی"),            # Arabic yeh -> Farsi yeh
+    ("عَدالت", "عدالت"),          # diacritics stripped
+    ("عدالـــت", "عدالت"),        # tatweel stripped
+    ("۲۰۱۹", "2019"),            # Extended Arabic-Indic digits
+    ("COURT", "court"),
+])
+def test_fold(variant, folded):
+    assert fold(variant) == folded
+
+
+def test_urdu_is_tokenized_without_stopwords_and_plurals():
+    assert analyze("عدالتوں نے ضمانت کی درخواست منظور کی") == ["عدالت", "ضمانت", "درخواست", "منظور"]
+
+
+def test_english_stemming_and_stopwords():
+    assert analyze("Courts granted the bails; hearing adjourned") == [
+        "court", "grant", "bail", "hear", "adjourn"]
+
+
+@pytest.mark.parametrize("forms", [
+    ("file", "files", "filed", "filing"),
+    ("charge", "charges", "charged", "charging"),
+    ("agree", "agrees", "agreed", "agreeing"),
+    ("issue", "issues", "issued"),
+    ("hear", "hearing", "hearings"),
+])
+def test_inflections_share_the_bare_form_stem(forms):
+    assert len({term for form in forms for term in analyze(form)}) == 1
+
+
+def test_positions_and_offsets_point_at_the_original_text():
+    text = "The bail of عَدالت"
+    tokens = list(analyze_with_positions(text))
+    assert [(term, position) for term, position, _, _ in tokens] == [("bail", 1), ("عدالت", 3)]
+    assert [text[start:start + length] for _, _, start, length in tokens] == ["bail", "عَدالت"]
+
+
+def test_zero_width_non_joiner_separates_compounds():
+    assert analyze("بے‌دخلی") == analyze("بے دخلی")
+
+
+def test_index_matches_urdu_spelling_variants():
+    index = SearchIndex()
+    index.add("c1", {"summary": "قاضي كى عدالت"})
+    assert [case_id for case_id, _ in index.search("قاضی عدالتوں")] == ["c1"]
@@ -0,0 +1,50 @@
+import pytest
+
+from services.search_index import search_ranked
+from services.transliteration import alternatives, expand
+
+
+@pytest.mark.parametrize("roman,urdu", [
+    ("zamanat", "ضمانت"),
+    ("qanoon", "قانون"),
+    ("kanoon", "قانون"),
+    ("saza", "سزا"),
+])
+def test_spelling_variants_reach_the_glossary(roman, urdu):
+    assert urdu in alternatives(roman)
+
+
+def test_phrases_skip_connectors():
+    assert expand("tauheen e adalat ka case") == (
+        ("tauheen e adalat", ("توہین عدالت", "contempt of court")),)
+    assert "dower" in alternatives("haq-e-mehr")
+
+
+def test_english_words_are_left_alone():
+    assert expand("bail granted") == ()
+
+
+def test_roman_query_matches_urdu_and_english_cases(make_case):
+    urdu = make_case(summary="درخواست ضمانت منظور")
+    english = make_case(summary="Bail granted to the accused")
+    make_case(summary="Land mutation")
+    assert {case_id for case_id, _ in search_ranked("zamanat")} == {str(urdu.id), str(english.id)}
+
+
+def test_hyphenated_roman_phrase_matches(make_case):
+    dower = make_case(summary="The wife claimed her dower")
+    assert [case_id for case_id, _ in search_ranked("haq-e-mehr")] == [str(dower.id)]
+
+
+@pytest.mark.parametrize("word", ["revenue", "dower", "court", "appeal", "habeas"])
+def test_english_words_are_not_transliterated(word):
+    assert expand(word) == ()
+
+
+def test_indexed_words_keep_the_plain_ranking_path(make_case, monkeypatch):
+    from services import query_parser
+
+    make_case(summary="The wife sought khula from the family court")
+    monkeypatch.setattr(query_parser, "execute", lambda *args, **kwargs: pytest.fail("structured path"))
+    assert expand("khula", query_parser.indexed_word) == ()
+    assert len(search_ranked("khula")) == 1
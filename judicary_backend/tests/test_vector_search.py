@@ -0,0 +1,54 @@
+import time
+import zlib
+
+import numpy as np
+import pytest
+
+from models.case_deletion import CaseDeletion
+from models.case_model import Case
+from services import embedding_service, index_sync, vector_search
+
+DIM = 16
+
+
+def _embed(texts, batch_size=32):
+    vectors = np.zeros((len(texts), DIM), dtype=np.float32)
+    for i, text in enumerate(texts):
+        for word in text.lower().split():
+            vectors[i, zlib.crc32(word.encode()) % DIM] += 1.0
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-9)
+
+
+@pytest.fixture
+def embeddings(monkeypatch):
+    monkeypatch.setattr(embedding_service, "is_available", lambda: True)
+    monkeypatch.setattr(embedding_service, "dimension", lambda: DIM)
+    monkeypatch.setattr(embedding_service, "embed_texts", _embed)
+
+
+def _ready_index():
+    index = vector_search.get_vector_index()
+    deadline = time.time() + 5
+    while not index.ready and time.time() < deadline:
+        time.sleep(0.01)
+    assert index.ready
+    return index
+
+
+def test_flagged_and_remotely_deleted_cases_leave_the_index(embeddings, make_case):
+    kept, deleted = make_case(summary="bail granted"), make_case(summary="bail refused")
+    index = _ready_index()
+    flagged = make_case(summary="bail granted again", duplicate_of=kept.id)
+    Case.objects(id=deleted.id).delete()
+    CaseDeletion(case_id=str(deleted.id)).save()
+
+    index_sync.run_once()
+    assert set(index.rows) == {str(kept.id)}
+    assert str(flagged.id) not in index.rows
+
+
+def test_queries_never_refresh_on_the_request_path(embeddings, make_case, monkeypatch):
+    case = make_case(summary="pre-arrest bail")
+    index = _ready_index()
+    monkeypatch.setattr(index, "refresh", lambda *args, **kwargs: pytest.fail("refreshed"))
+    assert [case_id for case_id, _ in vector_search.vector_ranked("pre-arrest bail")] == [str(case.id)]